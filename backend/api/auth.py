@@ -88,6 +88,9 @@ def _auto_enroll_student_in_classes(user: User, db: DBSession) -> None:
 
     db.commit()
 
+    from scripts.permission_helpers import invalidate_user_memberships
+    invalidate_user_memberships(user.id, db)
+
 
 def get_current_user(sid: str | None = Cookie(None),
                      db: DBSession = Depends(get_session)):
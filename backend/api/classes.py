@@ -6,7 +6,7 @@ from database.database import get_session
 from api.auth import get_current_user
 from scripts.permission_helpers import (
     user_is_instructor, user_has_role_in_class, get_user_classes_with_role, user_can_create_classes,
-    user_is_auto_enroll_admin
+    user_is_auto_enroll_admin, invalidate_user_memberships
 )
 from pydantic import BaseModel
 from typing import List, Optional
@@ -337,6 +337,7 @@ def create_class(
     
     db.add(membership)
     db.commit()
+    invalidate_user_memberships(current_user.id, db)
     
     return ClassResponse(
         id=class_obj.id,
@@ -397,6 +398,7 @@ def join_class(
     
     db.add(membership)
     db.commit()
+    invalidate_user_memberships(current_user.id, db)
     
     # Count members
     member_count = db.exec(
@@ -494,6 +496,7 @@ def leave_class(
     membership.is_active = False
     db.add(membership)
     db.commit()
+    invalidate_user_memberships(current_user.id, db)
     
     return {
         "message": f"Successfully left class '{class_obj.name}'",
@@ -698,6 +701,7 @@ def kick_class_member(
     target_membership.is_active = False
     db.add(target_membership)
     db.commit()
+    invalidate_user_memberships(request.user_id, db)
     
     return {
         "message": f"Successfully removed {target_user.email} from class '{class_obj.name}'",
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSoc
 from typing import List
 
 from .deployment_shared import *
+from services.websocket_protocol import negotiate_protocol, send_encoded
 
 router = APIRouter()
 
@@ -61,7 +62,7 @@ async def websocket_chat(
     websocket: WebSocket,
     deployment_id: str,
 ):
-    await websocket.accept()
+    await websocket.accept(subprotocol=negotiate_protocol(websocket))
     db: DBSession = DBSession(engine)
 
     try:
@@ -85,7 +86,7 @@ async def websocket_chat(
             )
             return
         
-        await websocket.send_json({"type": "auth_success", "message": "Authenticated successfully"})
+        await send_encoded(websocket, {"type": "auth_success", "message": "Authenticated successfully"})
 
         while True:
             try:
@@ -95,7 +96,7 @@ async def websocket_chat(
 
             msg_type = data.get("type")
             if msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await send_encoded(websocket, {"type": "pong"})
                 continue
             if msg_type != "chat":
                 continue 
@@ -106,14 +107,14 @@ async def websocket_chat(
 
             mcp_deployment = deployment["mcp_deployment"]
 
-            await websocket.send_json({"type": "typing", "message": "Assistant is typing..."})
+            await send_encoded(websocket, {"type": "typing", "message": "Assistant is typing..."})
 
             async def stream_callback(chunk: str) -> None:
-                await websocket.send_json({"type": "stream", "chunk": chunk})
+                await send_encoded(websocket, {"type": "stream", "chunk": chunk})
 
             result = await mcp_deployment.chat_streaming(message, history, stream_callback, user_id=user.id)
 
-            await websocket.send_json({
+            await send_encoded(websocket, {
                 "type": "response",
                 "response": result["response"],
                 "sources": result["sources"],
@@ -8,6 +8,7 @@ from models.database.db_models import User
 from .deployment_shared import _load_deployment_for_user, _authenticate_websocket_user
 import os
 from services.deployment_types.live_presentation import LivePresentationDeployment, ROOMCAST_REGISTRY
+from services.websocket_protocol import negotiate_protocol, send_encoded
 
 router = APIRouter()
 
@@ -138,24 +139,24 @@ async def websocket_roomcast_endpoint(
 ):
     """WebSocket endpoint for unauthenticated roomcast devices using 5-char code."""
     try:
-        await websocket.accept()
+        await websocket.accept(subprotocol=negotiate_protocol(websocket))
 
         # Lookup service by code
         service: LivePresentationDeployment = ROOMCAST_REGISTRY.get(code)
         if not service:
-            await websocket.send_text(json.dumps({"type": "error", "message": "invalid_code"}))
+            await send_encoded(websocket, {"type": "error", "message": "invalid_code"})
             await websocket.close()
             return
 
         # Ensure code not expired
         if service.roomcast_code_expires_at and service.roomcast_code_expires_at < __import__("datetime").datetime.now():
-            await websocket.send_text(json.dumps({"type": "error", "message": "code_expired"}))
+            await send_encoded(websocket, {"type": "error", "message": "code_expired"})
             await websocket.close()
             return
 
         ok = await service.connect_roomcast(websocket)
         if not ok:
-            await websocket.send_text(json.dumps({"type": "error", "message": "failed_to_connect"}))
+            await send_encoded(websocket, {"type": "error", "message": "failed_to_connect"})
             await websocket.close()
             return
 
@@ -311,7 +312,7 @@ async def websocket_student_endpoint(
     """WebSocket endpoint for students to connect to live presentations"""
     try:
         # Accept the connection first
-        await websocket.accept()
+        await websocket.accept(subprotocol=negotiate_protocol(websocket))
         
         # Authenticate user using session cookie (same as chat WebSocket)
         db = Session(engine)
@@ -330,10 +331,10 @@ async def websocket_student_endpoint(
                 print(f"🎤 Student - Is page based: {deployment.get('is_page_based', False)}")
             
             if not deployment:
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "error",
                     "message": "Deployment not found"
-                }))
+                })
                 await websocket.close()
                 return
             
@@ -352,10 +353,10 @@ async def websocket_student_endpoint(
             except Exception as service_error:
                 print(f"🎤 Student: Error getting live presentation service: {service_error}")
                 print(f"🎤 Student: mcp_deployment type: {type(mcp_deployment)}")
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "error",
                     "message": f"Failed to load deployment: {str(service_error)}"
-                }))
+                })
                 await websocket.close()
                 return
             
@@ -375,26 +376,26 @@ async def websocket_student_endpoint(
         except HTTPException as http_exc:
             # Handle HTTPException from _authenticate_websocket_user or _load_deployment_for_user
             db.close()
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": http_exc.detail
-            }))
+            })
             await websocket.close()
             return
         except Exception as e:
             db.close()
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": f"Failed to load deployment: {str(e)}"
-            }))
+            })
             await websocket.close()
             return
         
         if not live_presentation_service:
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": "Not a live presentation deployment"
-            }))
+            })
             await websocket.close()
             return
         
@@ -408,12 +409,20 @@ async def websocket_student_endpoint(
         print(f"🎤 Current teachers in service: {len(live_presentation_service.teacher_websockets)}")
         print(f"🎤 Teacher websockets: {[hex(id(ws)) for ws in live_presentation_service.teacher_websockets]}")
         
-        success = await live_presentation_service.connect_student(str(user.id), user.email, websocket)
+        # A reconnecting client presents its session's resume token and the last message it received
+        resume_token = websocket.query_params.get("resume_token")
+        try:
+            last_seq = int(websocket.query_params["last_seq"]) if "last_seq" in websocket.query_params else None
+        except ValueError:
+            last_seq = None
+        success = await live_presentation_service.connect_student(
+            str(user.id), user.email, websocket, resume_token=resume_token, last_seq=last_seq
+        )
         if not success:
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": "Failed to connect to live presentation"
-            }))
+            })
             await websocket.close()
             return
         
@@ -428,7 +437,7 @@ async def websocket_student_endpoint(
                 
         except WebSocketDisconnect:
             print(f"🎤 Student disconnected: {user.email} ({user.id})")
-            await live_presentation_service.disconnect_student(str(user.id))
+            await live_presentation_service.disconnect_student(str(user.id), websocket)
         finally:
             # Close the database session when WebSocket connection ends
             db.close()
@@ -451,7 +460,7 @@ async def websocket_teacher_endpoint(
     try:
         # Accept the connection first
         print(f"🎤 TEACHER: About to accept WebSocket connection")
-        await websocket.accept()
+        await websocket.accept(subprotocol=negotiate_protocol(websocket))
         print(f"🎤 TEACHER: WebSocket accepted successfully")
         
         # Authenticate user using session cookie (same as chat WebSocket)
@@ -468,10 +477,10 @@ async def websocket_teacher_endpoint(
             print(f"🎤 TEACHER: Checking if user is instructor")
             if not user_is_instructor(user, db):
                 print(f"🎤 TEACHER: User {user.email} is NOT an instructor - DENIED")
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "error",
                     "message": "Unauthorized - instructors only"
-                }))
+                })
                 await websocket.close()
                 return
             
@@ -487,10 +496,10 @@ async def websocket_teacher_endpoint(
                 print(f"🎤 Teacher - Is page based: {deployment.get('is_page_based', False)}")
             
             if not deployment:
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "error",
                     "message": "Deployment not found"
-                }))
+                })
                 await websocket.close()
                 return
             
@@ -509,10 +518,10 @@ async def websocket_teacher_endpoint(
             except Exception as service_error:
                 print(f"🎤 Teacher: Error getting live presentation service: {service_error}")
                 print(f"🎤 Teacher: mcp_deployment type: {type(mcp_deployment)}")
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "error",
                     "message": f"Failed to load deployment: {str(service_error)}"
-                }))
+                })
                 await websocket.close()
                 return
             
@@ -532,26 +541,26 @@ async def websocket_teacher_endpoint(
         except HTTPException as http_exc:
             # Handle HTTPException from _authenticate_websocket_user or _load_deployment_for_user
             db.close()
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": http_exc.detail
-            }))
+            })
             await websocket.close()
             return
         except Exception as e:
             db.close()
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": f"Failed to load deployment: {str(e)}"
-            }))
+            })
             await websocket.close()
             return
         
         if not live_presentation_service:
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": "Not a live presentation deployment"
-            }))
+            })
             await websocket.close()
             return
         
@@ -567,10 +576,10 @@ async def websocket_teacher_endpoint(
         
         success = await live_presentation_service.connect_teacher(websocket)
         if not success:
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "error",
                 "message": "Failed to connect to live presentation"
-            }))
+            })
             await websocket.close()
             return
         
@@ -10,6 +10,7 @@ from services.pages_manager import (
     load_page_deployment_on_demand,
     get_active_page_deployment,
     get_behavior_execution_history,
+    get_behavior_execution,
     set_pages_accessible,
     get_locked_pages,
     set_page_lock,
@@ -19,6 +20,7 @@ from services.pages_manager import (
     get_deployment_due_date
 )
 from services.celery_tasks import execute_behavior_task, check_task_status
+from services.behavior_checkpoints import validate_rerun_stages
 from services.group_member_service import GroupMemberService
 
 router = APIRouter()
@@ -708,6 +710,76 @@ async def trigger_behavior_execution(
                 detail=f"Behavior execution failed: {str(e)}"
             )
 
+def _behavior_task_status(task_id: str) -> TaskStatusResponse:
+    """Build the status of a behavior execution task from its Celery result."""
+    from celery.result import AsyncResult
+    from services.celery_tasks import celery_app
+    
+    # Check task status
+    result = AsyncResult(task_id, app=celery_app)
+    
+    if result.state == 'PENDING':
+        response = TaskStatusResponse(
+            task_id=task_id,
+            state=result.state,
+            status='Task is waiting to be processed...',
+            progress=0,
+            stage='pending'
+        )
+    elif result.state == 'PROGRESS':
+        info = result.info or {}
+        response = TaskStatusResponse(
+            task_id=task_id,
+            state=result.state,
+            status=info.get('status', 'Processing...'),
+            progress=info.get('progress', 0),
+            stage=info.get('stage', 'processing')
+        )
+    elif result.state == 'SUCCESS':
+        success_result = result.result or {}
+        behavior_result = success_result.get('result', {})
+        response = TaskStatusResponse(
+            task_id=task_id,
+            state=result.state,
+            status='Task completed successfully',
+            progress=100,
+            stage='completed',
+            result=behavior_result
+        )
+    elif result.state == 'FAILURE':
+        error_info = result.info or {}
+        if isinstance(error_info, dict):
+            error_msg = error_info.get('error', str(error_info))
+        else:
+            error_msg = str(error_info)
+        
+        response = TaskStatusResponse(
+            task_id=task_id,
+            state=result.state,
+            status=f"Task failed: {error_msg}",
+            progress=0,
+            stage='failed',
+            error=error_msg
+        )
+    elif result.state == 'REVOKED':
+        response = TaskStatusResponse(
+            task_id=task_id,
+            state=result.state,
+            status='Task was cancelled',
+            progress=0,
+            stage='cancelled'
+        )
+    else:
+        response = TaskStatusResponse(
+            task_id=task_id,
+            state=result.state,
+            status=f'Unknown state: {result.state}',
+            progress=0,
+            stage='unknown'
+        )
+    
+    return response
+
 @router.get("/{deployment_id}/behaviors/tasks/{task_id}", response_model=TaskStatusResponse)
 async def get_behavior_task_status(
     deployment_id: str,
@@ -717,6 +789,7 @@ async def get_behavior_task_status(
 ):
     """
     Get the status of an async behavior execution task.
+    Prefer the /events stream over polling this endpoint.
     """
     
     # Validate deployment access and require instructor role
@@ -731,64 +804,7 @@ async def get_behavior_task_status(
         )
     
     try:
-        from celery.result import AsyncResult
-        from services.celery_tasks import celery_app
-        
-        # Check task status
-        result = AsyncResult(task_id, app=celery_app)
-        
-        if result.state == 'PENDING':
-            response = TaskStatusResponse(
-                task_id=task_id,
-                state=result.state,
-                status='Task is waiting to be processed...',
-                progress=0,
-                stage='pending'
-            )
-        elif result.state == 'PROGRESS':
-            info = result.info or {}
-            response = TaskStatusResponse(
-                task_id=task_id,
-                state=result.state,
-                status=info.get('status', 'Processing...'),
-                progress=info.get('progress', 0),
-                stage=info.get('stage', 'processing')
-            )
-        elif result.state == 'SUCCESS':
-            success_result = result.result or {}
-            behavior_result = success_result.get('result', {})
-            response = TaskStatusResponse(
-                task_id=task_id,
-                state=result.state,
-                status='Task completed successfully',
-                progress=100,
-                stage='completed',
-                result=behavior_result
-            )
-        elif result.state == 'FAILURE':
-            error_info = result.info or {}
-            if isinstance(error_info, dict):
-                error_msg = error_info.get('error', str(error_info))
-            else:
-                error_msg = str(error_info)
-            
-            response = TaskStatusResponse(
-                task_id=task_id,
-                state=result.state,
-                status=f"Task failed: {error_msg}",
-                progress=0,
-                stage='failed',
-                error=error_msg
-            )
-        else:
-            response = TaskStatusResponse(
-                task_id=task_id,
-                state=result.state,
-                status=f'Unknown state: {result.state}',
-                progress=0,
-                stage='unknown'
-            )
-        
+        response = _behavior_task_status(task_id)
         return response
         
     except Exception as e:
@@ -797,6 +813,41 @@ async def get_behavior_task_status(
             detail=f"Failed to get task status: {str(e)}"
         )
 
+@router.get("/{deployment_id}/behaviors/tasks/{task_id}/events")
+async def stream_behavior_task_status(
+    deployment_id: str,
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session)
+):
+    """
+    Stream the progress of an async behavior execution task as server-sent events.
+    Each event has the same shape as the task status endpoint; the stream ends
+    with the final SUCCESS/FAILURE status.
+    """
+    from fastapi.responses import StreamingResponse
+    from services.task_progress import task_event_stream, SSE_HEADERS
+    
+    # Validate deployment access and require instructor role
+    db_deployment = await get_deployment_and_check_access(
+        deployment_id, current_user, db, require_instructor=True
+    )
+    
+    if not db_deployment.is_page_based:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This deployment is not page-based and does not support behaviors"
+        )
+    
+    # Don't hold a database connection for the lifetime of the stream
+    db.close()
+    
+    return StreamingResponse(
+        task_event_stream(task_id, lambda tid: _behavior_task_status(tid).model_dump()),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
 @router.post("/{deployment_id}/behaviors/tasks/{task_id}/cancel")
 async def cancel_behavior_task(
     deployment_id: str,
@@ -822,8 +873,12 @@ async def cancel_behavior_task(
     try:
         from services.celery_tasks import celery_app
         
+        from services.task_progress import publish_task_event
+        
         # Revoke/cancel the task
         celery_app.control.revoke(task_id, terminate=True)
+        # A terminated task never reports a final state itself
+        publish_task_event(task_id, 'REVOKED')
         
         return {
             "message": f"Task {task_id} has been cancelled",
@@ -837,6 +892,87 @@ async def cancel_behavior_task(
             detail=f"Failed to cancel task: {str(e)}"
         )
 
+class BehaviorRerunRequest(BaseModel):
+    rerun_stages: Optional[List[str]] = None  # Defaults to the behavior's LLM stage
+    prompt_context: Optional[str] = None  # Assignment context to use for this run
+
+# Stages re-run by default: the LLM stage after embedding and clustering
+DEFAULT_RERUN_STAGES = {
+    "group": ["explanations"],
+    "themeCreator": ["enrichment"],
+}
+
+@router.post("/{deployment_id}/behaviors/executions/{execution_id}/rerun", response_model=AsyncBehaviorExecutionResponse)
+async def rerun_behavior_execution(
+    deployment_id: str,
+    execution_id: str,
+    request: BehaviorRerunRequest,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session)
+):
+    """
+    Re-run stages of an earlier group/theme execution as a new async execution.
+    Earlier stages (vectors, clustering) are reused from that execution's checkpoints,
+    e.g. to regenerate group explanations with a different prompt without re-embedding.
+    """
+    
+    # Validate deployment access and require instructor role
+    db_deployment = await get_deployment_and_check_access(
+        deployment_id, current_user, db, require_instructor=True
+    )
+    
+    if not db_deployment.is_page_based:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This deployment is not page-based and does not support behaviors"
+        )
+    
+    previous_execution = get_behavior_execution(deployment_id, execution_id, db)
+    if not previous_execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Behavior execution {execution_id} not found"
+        )
+    
+    if previous_execution.behavior_type not in DEFAULT_RERUN_STAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Behaviors of type '{previous_execution.behavior_type}' cannot be re-run by stage"
+        )
+    
+    try:
+        rerun_stages = validate_rerun_stages(
+            previous_execution.behavior_type,
+            request.rerun_stages or DEFAULT_RERUN_STAGES[previous_execution.behavior_type]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        task = execute_behavior_task.delay(
+            deployment_id=deployment_id,
+            behavior_number=previous_execution.behavior_number,
+            executed_by_user_id=current_user.id,
+            behavior_config={"behavior_type": previous_execution.behavior_type},
+            resume_from_execution_id=execution_id,
+            rerun_stages=rerun_stages,
+            prompt_context=request.prompt_context
+        )
+        
+        return AsyncBehaviorExecutionResponse(
+            behavior_number=previous_execution.behavior_number,
+            task_id=task.id,
+            status="PENDING",
+            message=f"Re-running {', '.join(rerun_stages)} of execution {execution_id}. Use task ID {task.id} to check progress."
+        )
+        
+    except Exception as e:
+        print(f"❌ Failed to start behavior re-run: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start behavior re-run: {str(e)}"
+        )
+
 @router.get("/{deployment_id}/behaviors", response_model=List[Dict[str, Any]])
 async def get_deployment_behaviors(
     deployment_id: str,
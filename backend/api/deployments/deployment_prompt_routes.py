@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timezone
+from itertools import groupby
+import copy
+import threading
 
 from .deployment_shared import *
-from api.file_storage import store_file
+from api.file_storage import store_file, stage_upload, FileTooLargeError
+from database.database import run_serialized_write_async
 from scripts.utils import get_user_collection_name
 import uuid
 from pathlib import Path
 import tempfile
 import sys
+from sqlalchemy import func
 
 # Optional config loading similar to documents API
 try:
@@ -187,10 +192,177 @@ async def get_user_group_info(deployment_id: str, user_email: str, db: DBSession
     except Exception as e:
         return None
 
+# Per-deployment snapshots of formatted submissions: deployment_id -> (version, result).
+# The version is a cheap aggregate over the deployment's completed sessions, so
+# writes made by other processes (e.g. Celery PDF ingestion) are also detected.
+_PROMPT_SUBMISSIONS_CACHE: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+_PROMPT_SUBMISSIONS_CACHE_LOCK = threading.Lock()
+
+
+def invalidate_prompt_submissions_cache(deployment_id: str) -> None:
+    """Drop the cached submission snapshot for a deployment after a submit/edit."""
+    with _PROMPT_SUBMISSIONS_CACHE_LOCK:
+        _PROMPT_SUBMISSIONS_CACHE.pop(deployment_id, None)
+
+
+def _get_prompt_submissions_version(db_deployment_id: int, db_session) -> Tuple[Any, ...]:
+    """Version stamp for a deployment's completed submissions (one aggregate query)."""
+    row = db_session.exec(
+        select(
+            func.count(PromptSubmission.id),
+            func.max(PromptSubmission.submitted_at),
+            func.count(func.distinct(PromptSession.id)),
+            func.max(PromptSession.completed_at),
+        ).join(PromptSession, PromptSubmission.session_id == PromptSession.id).where(
+            PromptSession.deployment_id == db_deployment_id,
+            PromptSession.is_active == True,
+            PromptSession.completed_at.isnot(None)
+        )
+    ).one()
+    return tuple(row)
+
+
+def _append_prompt_submission(
+    sub: PromptSubmission,
+    submission_responses: Dict[str, Any],
+    text_responses: List[str],
+    pdf_document_ids: List[int],
+) -> None:
+    """Format a single submission into the behavior input structures."""
+    # Create a unique key for this submission (could be improved with actual prompt IDs)
+    submission_key = f"submission_{sub.submission_index}"
+
+    media_type = getattr(sub, 'media_type', None)
+    if media_type == 'pdf':
+        try:
+            pdf_id = int(sub.user_response)
+            pdf_document_ids.append(pdf_id)
+            # Store PDF submission in responses
+            submission_responses[submission_key] = {
+                "media_type": "pdf",
+                "response": sub.user_response,
+                "text": "",  # PDFs don't have direct text
+                "submission_index": sub.submission_index
+            }
+        except Exception:
+            # Ignore bad IDs and treat as text
+            text_responses.append(sub.user_response)
+            submission_responses[submission_key] = {
+                "media_type": "text",
+                "response": sub.user_response,
+                "text": sub.user_response,
+                "submission_index": sub.submission_index
+            }
+    elif media_type == 'list':
+        # Stored as JSON array string. Parse and join items into text context.
+        import json
+        items_raw = sub.user_response
+        try:
+            data = json.loads(items_raw) if items_raw else []
+            if isinstance(data, list):
+                list_items = [str(x) for x in data if str(x).strip()]
+            else:
+                list_items = [str(data)]
+        except Exception:
+            # Fallback: treat as newline separated
+            list_items = [line.strip() for line in (items_raw or '').splitlines() if line.strip()]
+        # Add each item to text responses (could weight differently later)
+        joined_items = " ".join(list_items)
+        if joined_items:
+            text_responses.append(joined_items)
+        submission_responses[submission_key] = {
+            "media_type": "list",
+            "response": sub.user_response,  # raw stored JSON string
+            "items": list_items,
+            "text": joined_items,
+            "submission_index": sub.submission_index
+        }
+    elif media_type == 'dynamic_list':
+        # Stored as JSON array string. Parse and join items into text context.
+        # Same as list but indicates it was user-customizable
+        import json
+        items_raw = sub.user_response
+        try:
+            data = json.loads(items_raw) if items_raw else []
+            if isinstance(data, list):
+                list_items = [str(x) for x in data if str(x).strip()]
+            else:
+                list_items = [str(data)]
+        except Exception:
+            # Fallback: treat as newline separated
+            list_items = [line.strip() for line in (items_raw or '').splitlines() if line.strip()]
+        # Add each item to text responses (could weight differently later)
+        joined_items = " ".join(list_items)
+        if joined_items:
+            text_responses.append(joined_items)
+        submission_responses[submission_key] = {
+            "media_type": "dynamic_list",
+            "response": sub.user_response,  # raw stored JSON string
+            "items": list_items,
+            "text": joined_items,
+            "submission_index": sub.submission_index
+        }
+    elif media_type == 'websiteInfo':
+        # Stored as JSON array of website objects
+        import json
+        websites_raw = sub.user_response
+        try:
+            data = json.loads(websites_raw) if websites_raw else []
+            if isinstance(data, list):
+                websites = data
+            else:
+                websites = [data]
+        except Exception:
+            websites = []
+
+        # Create text representation of websites for behaviors
+        website_texts = []
+        for website in websites:
+            if isinstance(website, dict):
+                website_text = f"{website.get('name', 'Unknown')}: {website.get('url', '')} - {website.get('purpose', '')} (Platform: {website.get('platform', 'Unknown')})"
+                website_texts.append(website_text)
+
+        joined_websites = " | ".join(website_texts)
+        if joined_websites:
+            text_responses.append(joined_websites)
+
+        submission_responses[submission_key] = {
+            "media_type": "websiteInfo",
+            "response": sub.user_response,  # raw stored JSON string
+            "websites": websites,
+            "text": joined_websites,
+            "submission_index": sub.submission_index
+        }
+    elif media_type == 'multiple_choice':
+        selected_option = (sub.user_response or '').strip()
+        if selected_option:
+            text_responses.append(selected_option)
+        submission_responses[submission_key] = {
+            "media_type": "multiple_choice",
+            "response": sub.user_response,
+            "selected_option": selected_option,
+            "text": selected_option,
+            "submission_index": sub.submission_index
+        }
+    else:
+        # Treat any other (textarea/hyperlink) as text
+        text_responses.append(sub.user_response)
+        submission_responses[submission_key] = {
+            "media_type": "text" if media_type != 'hyperlink' else 'hyperlink',
+            "response": sub.user_response,
+            "text": sub.user_response,
+            "submission_index": sub.submission_index
+        }
+
+
 def get_all_prompt_submissions_for_deployment(deployment_id: str, db_session) -> Dict[str, Any]:
     """
     Get all prompt submissions for a specific deployment, formatted for behavior input.
     
+    Sessions and their submissions are loaded with a single joined query ordered by
+    session id and submission index, and the formatted result is cached until the
+    deployment's submissions change.
+    
     Args:
         deployment_id: The deployment ID to get submissions for
         db_session: Database session
@@ -208,174 +380,60 @@ def get_all_prompt_submissions_for_deployment(deployment_id: str, db_session) ->
         if not db_deployment:
             return {"students": [], "prompt_context": None}
         
-        # Get all prompt sessions for this deployment
-        sessions = db_session.exec(
-            select(PromptSession, User.email).join(User).where(
+        version = _get_prompt_submissions_version(db_deployment.id, db_session)
+        with _PROMPT_SUBMISSIONS_CACHE_LOCK:
+            cached = _PROMPT_SUBMISSIONS_CACHE.get(deployment_id)
+        if cached and cached[0] == version:
+            return copy.deepcopy(cached[1])
+        
+        # Get all completed sessions together with their submissions in one query
+        rows = db_session.exec(
+            select(PromptSession, User.email, PromptSubmission)
+            .join(User, PromptSession.user_id == User.id)
+            .join(PromptSubmission, PromptSubmission.session_id == PromptSession.id)
+            .where(
                 PromptSession.deployment_id == db_deployment.id,
                 PromptSession.is_active == True,
                 PromptSession.completed_at.isnot(None)  # Only get completed sessions
             )
-        ).all()
+            .order_by(PromptSession.id, PromptSubmission.submission_index)
+        )
         
         user_submissions = []
         prompt_context = None
         
-        for session, user_email in sessions:
+        for _, session_rows in groupby(rows, key=lambda row: row[0].id):
+            session_rows = list(session_rows)
+            session, user_email, _ = session_rows[0]
             # Capture the main question from the first session
             if prompt_context is None and session.main_question:
                 prompt_context = session.main_question
-            # Get all submissions for this session
-            submissions = db_session.exec(
-                select(PromptSubmission).where(PromptSubmission.session_id == session.id)
-                .order_by(PromptSubmission.submission_index)
-            ).all()
             
-            if submissions:
-                # Separate out PDF document IDs and textual responses
-                pdf_document_ids: List[int] = []
-                text_responses: List[str] = []
-                submission_responses: Dict[str, Any] = {}
-                
-                for sub in submissions:
-                    # Create a unique key for this submission (could be improved with actual prompt IDs)
-                    submission_key = f"submission_{sub.submission_index}"
-                    
-                    media_type = getattr(sub, 'media_type', None)
-                    if media_type == 'pdf':
-                        try:
-                            pdf_id = int(sub.user_response)
-                            pdf_document_ids.append(pdf_id)
-                            # Store PDF submission in responses
-                            submission_responses[submission_key] = {
-                                "media_type": "pdf",
-                                "response": sub.user_response,
-                                "text": "",  # PDFs don't have direct text
-                                "submission_index": sub.submission_index
-                            }
-                        except Exception:
-                            # Ignore bad IDs and treat as text
-                            text_responses.append(sub.user_response)
-                            submission_responses[submission_key] = {
-                                "media_type": "text",
-                                "response": sub.user_response,
-                                "text": sub.user_response,
-                                "submission_index": sub.submission_index
-                            }
-                    elif media_type == 'list':
-                        # Stored as JSON array string. Parse and join items into text context.
-                        import json
-                        items_raw = sub.user_response
-                        try:
-                            data = json.loads(items_raw) if items_raw else []
-                            if isinstance(data, list):
-                                list_items = [str(x) for x in data if str(x).strip()]
-                            else:
-                                list_items = [str(data)]
-                        except Exception:
-                            # Fallback: treat as newline separated
-                            list_items = [line.strip() for line in (items_raw or '').splitlines() if line.strip()]
-                        # Add each item to text responses (could weight differently later)
-                        joined_items = " ".join(list_items)
-                        if joined_items:
-                            text_responses.append(joined_items)
-                        submission_responses[submission_key] = {
-                            "media_type": "list",
-                            "response": sub.user_response,  # raw stored JSON string
-                            "items": list_items,
-                            "text": joined_items,
-                            "submission_index": sub.submission_index
-                        }
-                    elif media_type == 'dynamic_list':
-                        # Stored as JSON array string. Parse and join items into text context.
-                        # Same as list but indicates it was user-customizable
-                        import json
-                        items_raw = sub.user_response
-                        try:
-                            data = json.loads(items_raw) if items_raw else []
-                            if isinstance(data, list):
-                                list_items = [str(x) for x in data if str(x).strip()]
-                            else:
-                                list_items = [str(data)]
-                        except Exception:
-                            # Fallback: treat as newline separated
-                            list_items = [line.strip() for line in (items_raw or '').splitlines() if line.strip()]
-                        # Add each item to text responses (could weight differently later)
-                        joined_items = " ".join(list_items)
-                        if joined_items:
-                            text_responses.append(joined_items)
-                        submission_responses[submission_key] = {
-                            "media_type": "dynamic_list",
-                            "response": sub.user_response,  # raw stored JSON string
-                            "items": list_items,
-                            "text": joined_items,
-                            "submission_index": sub.submission_index
-                        }
-                    elif media_type == 'websiteInfo':
-                        # Stored as JSON array of website objects
-                        import json
-                        websites_raw = sub.user_response
-                        try:
-                            data = json.loads(websites_raw) if websites_raw else []
-                            if isinstance(data, list):
-                                websites = data
-                            else:
-                                websites = [data]
-                        except Exception:
-                            websites = []
-                        
-                        # Create text representation of websites for behaviors
-                        website_texts = []
-                        for website in websites:
-                            if isinstance(website, dict):
-                                website_text = f"{website.get('name', 'Unknown')}: {website.get('url', '')} - {website.get('purpose', '')} (Platform: {website.get('platform', 'Unknown')})"
-                                website_texts.append(website_text)
-                        
-                        joined_websites = " | ".join(website_texts)
-                        if joined_websites:
-                            text_responses.append(joined_websites)
-                        
-                        submission_responses[submission_key] = {
-                            "media_type": "websiteInfo",
-                            "response": sub.user_response,  # raw stored JSON string
-                            "websites": websites,
-                            "text": joined_websites,
-                            "submission_index": sub.submission_index
-                        }
-                    elif media_type == 'multiple_choice':
-                        selected_option = (sub.user_response or '').strip()
-                        if selected_option:
-                            text_responses.append(selected_option)
-                        submission_responses[submission_key] = {
-                            "media_type": "multiple_choice",
-                            "response": sub.user_response,
-                            "selected_option": selected_option,
-                            "text": selected_option,
-                            "submission_index": sub.submission_index
-                        }
-                    else:
-                        # Treat any other (textarea/hyperlink) as text
-                        text_responses.append(sub.user_response)
-                        submission_responses[submission_key] = {
-                            "media_type": "text" if media_type != 'hyperlink' else 'hyperlink',
-                            "response": sub.user_response,
-                            "text": sub.user_response,
-                            "submission_index": sub.submission_index
-                        }
-
-                combined_text = " ".join(text_responses)
-                user_submissions.append({
-                    "name": user_email,
-                    "text": combined_text,
-                    "pdf_document_ids": pdf_document_ids,
-                    "submission_responses": submission_responses,
-                    "session_id": session.id,
-                    "completed_at": session.completed_at.isoformat() if session.completed_at else None
-                })
+            # Separate out PDF document IDs and textual responses
+            pdf_document_ids: List[int] = []
+            text_responses: List[str] = []
+            submission_responses: Dict[str, Any] = {}
+            
+            for _, _, sub in session_rows:
+                _append_prompt_submission(sub, submission_responses, text_responses, pdf_document_ids)
+            
+            combined_text = " ".join(text_responses)
+            user_submissions.append({
+                "name": user_email,
+                "text": combined_text,
+                "pdf_document_ids": pdf_document_ids,
+                "submission_responses": submission_responses,
+                "session_id": session.id,
+                "completed_at": session.completed_at.isoformat() if session.completed_at else None
+            })
         
-        return {
+        result = {
             "students": user_submissions,
             "prompt_context": prompt_context
         }
+        with _PROMPT_SUBMISSIONS_CACHE_LOCK:
+            _PROMPT_SUBMISSIONS_CACHE[deployment_id] = (version, copy.deepcopy(result))
+        return result
     
     except Exception as e:
         print(f"Error getting prompt submissions for deployment {deployment_id}: {e}")
@@ -623,30 +681,39 @@ async def submit_prompt_response(
             entries = [line.strip() for line in raw.splitlines() if line.strip()]
         user_response_value = json.dumps(entries)
 
-    # Save the submission
-    submission = PromptSubmission(
-        session_id=session.id,
-        submission_index=request.submission_index,
-        prompt_text=requirement["prompt"],
-        media_type=requirement["mediaType"],
-        user_response=user_response_value,
-    )
-    
-    db.add(submission)
-    db.flush()  # Flush to make the new submission visible to the next query
-    
-    # Check if all submissions are complete
+    session_id = session.id
     total_submissions = len(session.submission_requirements)
-    current_submissions = db.exec(
-        select(PromptSubmission).where(PromptSubmission.session_id == session.id)
-    ).all()
-    
-    if len(current_submissions) == total_submissions:  # Now we can check the actual count
-        session.completed_at = datetime.now(timezone.utc)
-        db.add(session)
-    
-    db.commit()
-    db.refresh(submission)
+
+    def _write_submission(write_db: DBSession) -> PromptSubmission:
+        # Save the submission
+        submission = PromptSubmission(
+            session_id=session_id,
+            submission_index=request.submission_index,
+            prompt_text=requirement["prompt"],
+            media_type=requirement["mediaType"],
+            user_response=user_response_value,
+        )
+        
+        write_db.add(submission)
+        write_db.flush()  # Flush to make the new submission visible to the next query
+        
+        # Check if all submissions are complete
+        current_submissions = write_db.exec(
+            select(PromptSubmission).where(PromptSubmission.session_id == session_id)
+        ).all()
+        
+        if len(current_submissions) == total_submissions:  # Now we can check the actual count
+            write_session = write_db.get(PromptSession, session_id)
+            write_session.completed_at = datetime.now(timezone.utc)
+            write_db.add(write_session)
+        
+        write_db.commit()
+        write_db.refresh(submission)
+        return submission
+
+    # Submissions arrive in bursts during class; route them through the serialized writer
+    submission = await run_serialized_write_async(_write_submission)
+    invalidate_prompt_submissions_cache(deployment_id)
     
     return PromptSubmissionResponse(
         submission_index=submission.submission_index,
@@ -769,6 +836,7 @@ async def edit_prompt_response(
     
     db.add(existing_submission)
     db.commit()
+    invalidate_prompt_submissions_cache(deployment_id)
     db.refresh(existing_submission)
     
     return PromptSubmissionResponse(
@@ -832,17 +900,14 @@ async def submit_prompt_pdf(
     suffix = Path(filename).suffix.lower()
     if suffix != ".pdf" or file.content_type not in {"application/pdf", "application/x-pdf"}:
         raise HTTPException(status_code=400, detail="Invalid file. Only PDF files are allowed.")
-    file_bytes = await file.read()
     max_mb = _prompt_config.get("document_processing", {}).get("max_file_size_mb", 20)
-    if len(file_bytes) > max_mb * 1024 * 1024:
-        raise HTTPException(status_code=413, detail=f"File exceeds {max_mb}MB limit")
 
-    # Stage to shared temp directory
-    temp_dir = Path(_prompt_config.get("paths", {}).get("uploads_temp_dir", "./temp"))
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    temp_path = temp_dir / f"prompt_{uuid.uuid4().hex[:8]}_{Path(filename).name}"
-    with open(temp_path, 'wb') as tf:
-        tf.write(file_bytes)
+    # Stream to the shared temp directory, enforcing the size limit as chunks arrive
+    try:
+        staged = await stage_upload(file, "prompt", max_bytes=max_mb * 1024 * 1024)
+    except FileTooLargeError:
+        raise HTTPException(status_code=413, detail=f"File exceeds {max_mb}MB limit")
+    temp_path = staged.path
 
     # Enqueue Celery task
     from services.celery_tasks import process_prompt_pdf_submission_task
@@ -852,6 +917,7 @@ async def submit_prompt_pdf(
         user_id=current_user.id,
         temp_path=str(temp_path),
         filename=filename,
+        sha256=staged.sha256,
     )
 
     # Return 202 for polling
@@ -862,8 +928,7 @@ async def submit_prompt_pdf(
     })
 
 
-@router.get("/{deployment_id}/prompt/submit_pdf/status/{task_id}")
-async def get_prompt_pdf_status(deployment_id: str, task_id: str):
+def _prompt_pdf_task_status(task_id: str) -> Dict[str, Any]:
     from services.celery_tasks import celery_app
     from celery.result import AsyncResult
     result = AsyncResult(task_id, app=celery_app)
@@ -879,6 +944,30 @@ async def get_prompt_pdf_status(deployment_id: str, task_id: str):
         return {'state': state, 'status': str(result.info), 'error': str(result.info), 'progress': 0, 'stage': 'failed'}
     return {'state': state, 'status': 'Unknown', 'progress': 0, 'stage': 'unknown'}
 
+@router.get("/{deployment_id}/prompt/submit_pdf/status/{task_id}")
+async def get_prompt_pdf_status(deployment_id: str, task_id: str):
+    return _prompt_pdf_task_status(task_id)
+
+@router.get("/{deployment_id}/prompt/submit_pdf/status/{task_id}/events")
+async def stream_prompt_pdf_status(
+    deployment_id: str,
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    """Stream the status of a prompt PDF submission task as server-sent events."""
+    from fastapi.responses import StreamingResponse
+    from services.task_progress import task_event_stream, SSE_HEADERS
+
+    # Don't hold a database connection for the lifetime of the stream
+    db.close()
+
+    return StreamingResponse(
+        task_event_stream(task_id, _prompt_pdf_task_status),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
 @router.get("/{deployment_id}/prompt/session/{session_id}", response_model=PromptSessionResponse)
 async def get_prompt_session(
     deployment_id: str,
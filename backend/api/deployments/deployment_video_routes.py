@@ -17,6 +17,7 @@ from .deployment_shared import (
     validate_deployment_type,
 )
 from models.database.db_models import Video, VideoSession
+from services.video_streaming import signed_video_urls
 
 router = APIRouter()
 
@@ -30,6 +31,7 @@ class VideoAssetResponse(BaseModel):
     uploaded_at: Optional[str] = None
     status: Optional[str] = None
     stream_url: Optional[str] = None
+    hls_url: Optional[str] = None
     download_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
     source: Optional[str] = None
@@ -50,7 +52,8 @@ class VideoSessionResponse(BaseModel):
     is_completed: bool
 
 
-def _build_asset_from_db(video: Video) -> VideoAssetResponse:
+def _build_asset_from_db(video: Video, user_id: Optional[int] = None) -> VideoAssetResponse:
+    urls = signed_video_urls(video, user_id)
     return VideoAssetResponse(
         id=str(video.id),
         filename=video.original_filename or video.filename,
@@ -59,7 +62,8 @@ def _build_asset_from_db(video: Video) -> VideoAssetResponse:
         duration_seconds=video.duration_seconds,
         uploaded_at=video.uploaded_at.isoformat() if video.uploaded_at else None,
         status=video.status,
-        stream_url=f"/api/videos/{video.id}/stream",
+        stream_url=urls["stream_url"],
+        hls_url=urls["hls_url"],
         download_url=f"/api/videos/{video.id}/download",
         thumbnail_url=None,
         source="database",
@@ -183,7 +187,7 @@ async def get_video_deployment_details(
             db_video = None
 
     if db_video:
-        asset = _build_asset_from_db(db_video)
+        asset = _build_asset_from_db(db_video, current_user.id)
         return VideoDeploymentResponse(deployment_id=deployment_id, video=asset)
 
     # Fallback to workflow configuration metadata if database lookup fails.
@@ -13,7 +13,7 @@ from scripts.utils import create_qdrant_client, get_user_collection_name
 from scripts.permission_helpers import (
     user_can_access_workflow, user_can_modify_workflow, user_has_role_in_class
 )
-from api.file_storage import store_file, delete_stored_file
+from api.file_storage import store_file, delete_stored_file, stage_upload, FileTooLargeError
 import sys
 
 from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
@@ -109,27 +109,23 @@ async def upload_documents(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Invalid file type: {file.filename}. Only PDF, DOC, DOCX allowed."
                 )
-            # Check file size
-            file_content = await file.read()
+            # Stream to a temp file for the worker to pick up (shared temp dir from config),
+            # enforcing the size limit chunk by chunk instead of reading the whole upload
             max_file_size_mb = config.get("document_processing", {}).get("max_file_size_mb", 20)
-            max_file_size = max_file_size_mb * 1024 * 1024
-            if len(file_content) > max_file_size:
+            try:
+                staged = await stage_upload(file, "upload", max_bytes=max_file_size_mb * 1024 * 1024)
+            except FileTooLargeError:
                 raise HTTPException(
                     status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                     detail=f"File {file.filename} exceeds {max_file_size_mb}MB limit"
                 )
-
-            # Write to temp file for the worker to pick up (use shared temp dir from config)
-            temp_dir = Path(config.get("paths", {}).get("uploads_temp_dir", "./temp"))
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            temp_path = temp_dir / f"upload_{uuid.uuid4().hex[:8]}_{Path(file.filename or '').name}"
-            with open(temp_path, 'wb') as tf:
-                tf.write(file_content)
+            temp_path = staged.path
             temp_files.append(str(temp_path))
             staged_files.append({
                 'temp_path': str(temp_path),
                 'filename': file.filename,
-                'content_type': file.content_type or ''
+                'content_type': file.content_type or '',
+                'sha256': staged.sha256,
             })
 
         # Enqueue Celery task
@@ -432,42 +428,67 @@ async def delete_collection(
         ) 
 
 
-@router.get("/upload/status/{task_id}")
-async def get_upload_status(task_id: str):
-    """Poll the status of an async document upload task."""
+def _upload_task_status(task_id: str) -> dict:
+    """Build the status of an async document upload task from its Celery result."""
     from services.celery_tasks import celery_app
     from celery.result import AsyncResult
 
-    try:
-        result = AsyncResult(task_id, app=celery_app)
-        state = result.state
-        info = result.info if isinstance(result.info, dict) else {}
+    result = AsyncResult(task_id, app=celery_app)
+    state = result.state
+    info = result.info if isinstance(result.info, dict) else {}
 
-        if state == 'PENDING':
-            return { 'state': state, 'status': 'Pending', 'progress': 0, 'stage': 'pending' }
-        if state == 'PROGRESS':
-            return {
-                'state': state,
-                'status': info.get('status', 'Processing...'),
-                'progress': info.get('progress', 0),
-                'stage': info.get('stage', 'processing'),
-            }
-        if state == 'SUCCESS':
-            return {
-                'state': state,
-                'status': 'Completed',
-                'result': result.result,
-                'progress': 100,
-                'stage': 'completed',
-            }
-        if state == 'FAILURE':
-            return {
-                'state': state,
-                'status': str(result.info),
-                'error': str(result.info),
-                'progress': 0,
-                'stage': 'failed',
-            }
-        return { 'state': state, 'status': 'Unknown', 'progress': 0, 'stage': 'unknown' }
+    if state == 'PENDING':
+        return { 'state': state, 'status': 'Pending', 'progress': 0, 'stage': 'pending' }
+    if state == 'PROGRESS':
+        return {
+            'state': state,
+            'status': info.get('status', 'Processing...'),
+            'progress': info.get('progress', 0),
+            'stage': info.get('stage', 'processing'),
+        }
+    if state == 'SUCCESS':
+        return {
+            'state': state,
+            'status': 'Completed',
+            'result': result.result,
+            'progress': 100,
+            'stage': 'completed',
+        }
+    if state == 'FAILURE':
+        return {
+            'state': state,
+            'status': str(result.info),
+            'error': str(result.info),
+            'progress': 0,
+            'stage': 'failed',
+        }
+    return { 'state': state, 'status': 'Unknown', 'progress': 0, 'stage': 'unknown' }
+
+
+@router.get("/upload/status/{task_id}")
+async def get_upload_status(task_id: str):
+    """Poll the status of an async document upload task (prefer the /events stream)."""
+    try:
+        return _upload_task_status(task_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching task status: {e}")
+
+
+@router.get("/upload/status/{task_id}/events")
+async def stream_upload_status(
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    """Stream the status of an async document upload task as server-sent events."""
+    from fastapi.responses import StreamingResponse
+    from services.task_progress import task_event_stream, SSE_HEADERS
+
+    # Don't hold a database connection for the lifetime of the stream
+    db.close()
+
+    return StreamingResponse(
+        task_event_stream(task_id, _upload_task_status),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
@@ -1,14 +1,21 @@
 import os
+import json
+import time
 import shutil
+import hashlib
 import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import FileResponse
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session as DBSession, select
 from api.auth import get_current_user
-from models.database.db_models import User, Document, Workflow
-from database.database import get_session
+from models.database.db_models import User, Document, Workflow, StoredBlob
+from database.database import get_session, run_serialized_write
 from scripts.permission_helpers import user_can_access_workflow
 import sys
 
@@ -16,6 +23,11 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.config import load_config
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; appends fall back to a lock file
+    fcntl = None
+
 # Load config
 config = load_config()
 
@@ -24,6 +36,34 @@ router = APIRouter(prefix="/api/files", tags=["file_storage"])
 # Storage configuration
 STORAGE_BASE_DIR = Path(config.get("file_storage", {}).get("base_directory", "uploads"))
 ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx'}
+# Uploads are copied in chunks of this size, never read into memory whole
+UPLOAD_CHUNK_SIZE = int(config.get("file_storage", {}).get("chunk_size_kb", 1024)) * 1024
+UPLOADS_TEMP_DIR = Path(config.get("paths", {}).get("uploads_temp_dir", "./temp"))
+UPLOAD_SESSIONS_DIR = UPLOADS_TEMP_DIR / "upload_sessions"
+UPLOAD_SESSION_TTL_SECONDS = float(config.get("file_storage", {}).get("upload_session_ttl_hours", 24)) * 3600
+# File contents are stored once under blobs/ab/cd/<sha256>; storage paths are links to them
+BLOB_DIR_NAME = "blobs"
+# Files derived from a blob (e.g. HLS renditions of a video) live under renditions/<sha256>
+RENDITIONS_DIR_NAME = "renditions"
+
+
+class FileTooLargeError(ValueError):
+    """Raised while copying an upload once it exceeds its size limit."""
+
+
+class UploadSessionError(ValueError):
+    """Raised for chunks that don't fit the upload session (wrong offset, too much data)."""
+
+
+class UploadSessionConflictError(UploadSessionError):
+    """Raised when a chunk's offset is stale or another request is still appending to the session."""
+
+
+@dataclass
+class StagedFile:
+    path: Path
+    size: int
+    sha256: str
 
 # Ensure the storage directory exists
 def ensure_storage_directory():
@@ -37,14 +77,192 @@ def get_file_storage_path(workflow_id: int, upload_id: str, filename: str) -> Pa
     file_path.parent.mkdir(parents=True, exist_ok=True)
     return file_path
 
-# Store file content to disk and return the storage path
-def store_file(file_content: bytes, workflow_id: int, upload_id: str, filename: str) -> str:
+# Write a temp file next to the target and rename it into place, so readers never see a partial file
+def _atomic_write(file_path: Path, write) -> None:
+    part_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        with open(part_path, 'wb') as f:
+            write(f)
+        os.replace(part_path, file_path)
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Content-addressed blob store. Each distinct content is written once, to
+# blobs/ab/cd/<sha256>; the workflow_id/upload_id/filename storage path handed
+# out by store_file is a relative symlink to it, so serving code is unchanged.
+# StoredBlob.ref_count counts the links; the blob goes when the last one does.
+# ---------------------------------------------------------------------------
+
+def blob_path(sha256: str) -> Path:
+    return STORAGE_BASE_DIR / BLOB_DIR_NAME / sha256[:2] / sha256[2:4] / sha256
+
+
+def rendition_dir(key: str) -> Path:
+    """Directory for files derived from a blob; removed together with the blob."""
+    return STORAGE_BASE_DIR / RENDITIONS_DIR_NAME / key
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _HashingWriter:
+    """File wrapper that hashes and counts everything written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+
+# Put the content in the blob store's incoming dir (same filesystem as the blobs), hashing it unless known
+def _stage_blob(file_content: Union[bytes, BinaryIO, Path], move: bool, sha256: Optional[str]) -> tuple[Path, str, int]:
+    incoming_dir = STORAGE_BASE_DIR / BLOB_DIR_NAME / "incoming"
+    incoming_dir.mkdir(parents=True, exist_ok=True)
+    incoming = incoming_dir / f"{uuid.uuid4().hex}.part"
+
+    if isinstance(file_content, Path) and move:
+        try:
+            os.replace(file_content, incoming)
+            return incoming, sha256 or file_sha256(incoming), incoming.stat().st_size
+        except OSError:
+            pass  # e.g. temp dir on another filesystem: copy instead
+
+    try:
+        with open(incoming, 'wb') as f:
+            writer = _HashingWriter(f)
+            if isinstance(file_content, (bytes, bytearray)):
+                writer.write(file_content)
+            elif isinstance(file_content, Path):
+                with open(file_content, 'rb') as source:
+                    shutil.copyfileobj(source, writer, UPLOAD_CHUNK_SIZE)
+            else:
+                shutil.copyfileobj(file_content, writer, UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        incoming.unlink(missing_ok=True)
+        raise
+    if isinstance(file_content, Path) and move:
+        file_content.unlink()
+    return incoming, writer.digest.hexdigest(), writer.size
+
+
+# Add a reference to a blob, moving the incoming content into place if the blob is new
+def _acquire_blob(incoming: Path, sha256: str, size: int) -> Path:
+    target = blob_path(sha256)
+
+    def acquire(db: DBSession) -> None:
+        result = db.execute(
+            update(StoredBlob).where(StoredBlob.sha256 == sha256).values(ref_count=StoredBlob.ref_count + 1)
+        )
+        if result.rowcount == 0:
+            db.add(StoredBlob(sha256=sha256, size=size, ref_count=1))
+            db.flush()
+        # Placed while the row is locked, so a concurrent release of the last reference can't remove it
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(incoming, target)
+        db.commit()
+
+    try:
+        try:
+            run_serialized_write(acquire)
+        except IntegrityError:
+            # Another process created the same blob row first; now it's an update
+            run_serialized_write(acquire)
+    finally:
+        incoming.unlink(missing_ok=True)
+    return target
+
+
+# Drop a reference to a blob, deleting its files (and cached ingest data) with the last one
+def _release_blob(sha256: str) -> None:
+    def release(db: DBSession) -> None:
+        db.execute(
+            update(StoredBlob).where(StoredBlob.sha256 == sha256).values(ref_count=StoredBlob.ref_count - 1)
+        )
+        removed = db.execute(
+            delete(StoredBlob).where(StoredBlob.sha256 == sha256, StoredBlob.ref_count <= 0)
+        ).rowcount
+        if removed:
+            target = blob_path(sha256)
+            for path in target.parent.glob(f"{sha256}*"):
+                path.unlink(missing_ok=True)
+            shutil.rmtree(rendition_dir(sha256), ignore_errors=True)
+            try:
+                target.parent.rmdir()
+                target.parent.parent.rmdir()
+            except OSError:
+                pass  # Shard directories still in use
+        db.commit()
+
+    run_serialized_write(release)
+
+
+# The blob a storage path links to, or None for plain files stored before the blob store
+def _linked_blob_sha256(full_path: Path) -> Optional[str]:
+    if not full_path.is_symlink():
+        return None
+    target = Path(os.readlink(full_path))
+    sha256 = target.name
+    if target.parent.parent.parent.name != BLOB_DIR_NAME or len(sha256) != 64:
+        return None
+    return sha256
+
+
+def stored_blob_sha256(storage_path: str) -> Optional[str]:
+    """SHA-256 of the blob a storage path links to (None for files stored before the blob store)."""
+    return _linked_blob_sha256(STORAGE_BASE_DIR / storage_path)
+
+
+# Point a storage path at a blob; returns False when links are unsupported and a copy was made instead
+def _link_to_blob(file_path: Path, target: Path) -> bool:
+    link_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.link")
+    try:
+        os.symlink(os.path.relpath(target, file_path.parent), link_path)
+        os.replace(link_path, file_path)
+        return True
+    except (OSError, NotImplementedError):
+        if link_path.is_symlink():
+            link_path.unlink()
+        with open(target, 'rb') as source:
+            _atomic_write(file_path, lambda f: shutil.copyfileobj(source, f, UPLOAD_CHUNK_SIZE))
+        return False
+
+
+# Store file content and return the storage path (workflow_id/upload_id/filename).
+# file_content may be bytes, a readable binary file object (copied in chunks) or the Path of a
+# staged file; with move=True a staged file is renamed into storage instead of copied.
+# Identical content is stored once; pass sha256 when the caller already hashed it.
+def store_file(
+    file_content: Union[bytes, BinaryIO, Path],
+    workflow_id: int,
+    upload_id: str,
+    filename: str,
+    move: bool = False,
+    sha256: Optional[str] = None
+) -> str:
     try:
         file_path = get_file_storage_path(workflow_id, upload_id, filename)
-        
-        # Write file content to disk
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        incoming, sha256, size = _stage_blob(file_content, move, sha256)
+        target = _acquire_blob(incoming, sha256, size)
+
+        replaced_sha256 = _linked_blob_sha256(file_path)
+        if not _link_to_blob(file_path, target):
+            _release_blob(sha256)
+        if replaced_sha256:
+            _release_blob(replaced_sha256)
         
         # Return relative path from storage base
         return str(file_path.relative_to(STORAGE_BASE_DIR))
@@ -52,12 +270,211 @@ def store_file(file_content: bytes, workflow_id: int, upload_id: str, filename:
     except Exception as e:
         raise Exception(f"Failed to store file {filename}: {str(e)}")
 
-# Delete a stored file from disk
+
+# Copy an upload to a staging file in fixed-size chunks, enforcing max_bytes as it goes
+# and hashing on the fly. Works with FastAPI UploadFile and any async .read(size) source.
+async def stage_upload(upload: Any, prefix: str, max_bytes: Optional[int] = None, directory: Optional[Path] = None) -> StagedFile:
+    directory = directory or UPLOADS_TEMP_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    name = Path(getattr(upload, "filename", None) or "upload").name
+    staged_path = directory / f"{prefix}_{uuid.uuid4().hex[:8]}_{name}"
+    part_path = staged_path.with_name(staged_path.name + ".part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(part_path, 'wb') as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise FileTooLargeError(f"File {name} exceeds {max_bytes // (1024 * 1024)}MB limit")
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(part_path, staged_path)
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+
+    return StagedFile(path=staged_path, size=size, sha256=digest.hexdigest())
+
+
+# ---------------------------------------------------------------------------
+# Resumable chunked upload sessions (large videos). Session state lives on disk
+# next to the partial data, so any API worker can continue an upload, and after
+# a dropped connection the client asks for the received offset and resumes there.
+# ---------------------------------------------------------------------------
+
+def _session_dir(session_id: str) -> Path:
+    # Session ids are generated hex tokens; anything else could escape the sessions dir
+    if not session_id or not all(ch in "0123456789abcdef" for ch in session_id):
+        raise UploadSessionError("Invalid upload session id")
+    return UPLOAD_SESSIONS_DIR / session_id
+
+
+def _session_data_path(session_id: str) -> Path:
+    return _session_dir(session_id) / "data.part"
+
+
+def _write_session_meta(session_id: str, meta: Dict[str, Any]) -> None:
+    meta_path = _session_dir(session_id) / "meta.json"
+    tmp_path = meta_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(meta))
+    os.replace(tmp_path, meta_path)
+
+
+def create_upload_session(user_id: int, total_size: int, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Start a resumable upload of total_size bytes; metadata is kept for completing it."""
+    cleanup_expired_upload_sessions()
+    session_id = uuid.uuid4().hex
+    _session_dir(session_id).mkdir(parents=True, exist_ok=True)
+    _session_data_path(session_id).touch()
+    now = time.time()
+    meta = {
+        "session_id": session_id,
+        "user_id": user_id,
+        "total_size": int(total_size),
+        "metadata": metadata,
+        "created_at": now,
+        "updated_at": now,
+    }
+    _write_session_meta(session_id, meta)
+    return {**meta, "received": 0, "chunk_size": UPLOAD_CHUNK_SIZE}
+
+
+def get_upload_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """Session metadata plus the number of bytes received so far, or None if unknown."""
+    try:
+        meta = json.loads((_session_dir(session_id) / "meta.json").read_text())
+    except (OSError, ValueError):
+        return None
+    data_path = _session_data_path(session_id)
+    meta["received"] = data_path.stat().st_size if data_path.exists() else 0
+    meta["chunk_size"] = UPLOAD_CHUNK_SIZE
+    return meta
+
+
+@contextmanager
+def _exclusive_append(session_id: str, data_file: BinaryIO):
+    """Hold the session's append lock, or raise UploadSessionConflictError if another writer has it."""
+    if fcntl is not None:
+        # Released when data_file is closed, also if the worker dies mid-append
+        try:
+            fcntl.flock(data_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadSessionConflictError("Another chunk is being appended to this upload session")
+        yield
+        return
+
+    lock_path = _session_dir(session_id) / "append.lock"
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        raise UploadSessionConflictError("Another chunk is being appended to this upload session")
+    try:
+        yield
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+
+async def append_upload_chunk(session_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Append streamed bytes at offset, which must equal the bytes received so far.
+    Returns the new received size. Data beyond the session's total size is rejected,
+    and a chunk that fails midway is truncated back so the client can resend it.
+    One request appends to a session at a time; a concurrent one gets
+    UploadSessionConflictError, as does a stale offset.
+    """
+    session = get_upload_session(session_id)
+    if session is None:
+        raise UploadSessionError("Upload session not found")
+
+    with open(_session_data_path(session_id), 'r+b') as f, _exclusive_append(session_id, f):
+        # Checked under the lock: the size can't change until this append is done
+        received = os.fstat(f.fileno()).st_size
+        if offset != received:
+            raise UploadSessionConflictError(f"Expected offset {received}, got {offset}")
+
+        f.seek(received)
+        completed = False
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > session["total_size"]:
+                    raise UploadSessionError("Chunk exceeds the declared upload size")
+                f.write(chunk)
+            completed = True
+        finally:
+            if not completed:
+                f.truncate(offset)
+
+        session["updated_at"] = time.time()
+        _write_session_meta(session_id, {key: value for key, value in session.items() if key not in ("received", "chunk_size")})
+    return received
+
+
+def finish_upload_session(session_id: str, expected_sha256: Optional[str] = None) -> StagedFile:
+    """Check that every byte arrived (and the hash, if given) and hand over the staged data."""
+    session = get_upload_session(session_id)
+    if session is None:
+        raise UploadSessionError("Upload session not found")
+    if session["received"] != session["total_size"]:
+        raise UploadSessionError(f"Upload incomplete: {session['received']} of {session['total_size']} bytes received")
+
+    data_path = _session_data_path(session_id)
+    digest = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+    if expected_sha256 and expected_sha256.lower() != sha256:
+        raise UploadSessionError("Uploaded data does not match the expected SHA-256")
+    return StagedFile(path=data_path, size=session["total_size"], sha256=sha256)
+
+
+def delete_upload_session(session_id: str) -> bool:
+    try:
+        session_dir = _session_dir(session_id)
+    except UploadSessionError:
+        return False
+    if session_dir.exists():
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return True
+    return False
+
+
+# Remove sessions that have not received data within the TTL
+def cleanup_expired_upload_sessions() -> int:
+    if not UPLOAD_SESSIONS_DIR.exists():
+        return 0
+    removed = 0
+    cutoff = time.time() - UPLOAD_SESSION_TTL_SECONDS
+    for session_dir in UPLOAD_SESSIONS_DIR.iterdir():
+        meta = get_upload_session(session_dir.name) if session_dir.is_dir() else None
+        if meta is not None:
+            last_active = meta.get("updated_at", 0)
+        else:
+            # No meta.json yet: possibly a session another worker is creating right now
+            try:
+                last_active = session_dir.stat().st_mtime
+            except OSError:
+                continue
+        if last_active < cutoff:
+            shutil.rmtree(session_dir, ignore_errors=True)
+            removed += 1
+    return removed
+
+# Delete a stored file from disk (the blob itself goes once nothing links to it)
 def delete_stored_file(storage_path: str) -> bool:
     try:
         full_path = STORAGE_BASE_DIR / storage_path
-        if full_path.exists():
+        if full_path.exists() or full_path.is_symlink():
+            sha256 = _linked_blob_sha256(full_path)
             full_path.unlink()
+            if sha256:
+                _release_blob(sha256)
             
             # Remove empty parent directories
             try:
@@ -76,9 +493,14 @@ def delete_workflow_files(workflow_id: int) -> int:
     try:
         workflow_dir = STORAGE_BASE_DIR / str(workflow_id)
         if workflow_dir.exists():
-            file_count = sum(1 for f in workflow_dir.rglob('*') if f.is_file())
+            files = [f for f in workflow_dir.rglob('*') if f.is_file() or f.is_symlink()]
+            for f in files:
+                sha256 = _linked_blob_sha256(f)
+                if sha256:
+                    f.unlink()
+                    _release_blob(sha256)
             shutil.rmtree(workflow_dir)
-            return file_count
+            return len(files)
         return 0
     except Exception:
         return 0
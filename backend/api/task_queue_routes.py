@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session as DBSession
+
+from database.database import get_session
+from api.auth import get_current_user
+from models.database.db_models import User
+from scripts.permission_helpers import user_is_student_only
+from services.task_queues import get_queue_metrics
+
+router = APIRouter(prefix="/api/task-queues", tags=["task-queues"])
+
+
+@router.get("/metrics")
+async def get_task_queue_metrics(
+    include_workers: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    """
+    Depth and latency of the Celery workload queues (ingest, behaviors, llm, light).
+
+    Per queue: waiting messages (by priority), how long the oldest one has waited,
+    and wait/runtime percentiles over the most recent tasks. With include_workers,
+    the queues each running worker consumes from are listed too (slower: pings workers).
+    """
+    if user_is_student_only(current_user, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors can view task queue metrics",
+        )
+
+    try:
+        metrics = get_queue_metrics()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Task broker not reachable: {exc}",
+        )
+
+    if include_workers:
+        from services.celery_tasks import celery_app
+
+        try:
+            active_queues = celery_app.control.inspect(timeout=1.0).active_queues() or {}
+            metrics["workers"] = {
+                worker: [queue["name"] for queue in queues]
+                for worker, queues in active_queues.items()
+            }
+        except Exception as exc:
+            metrics["workers"] = {}
+            metrics["workers_error"] = str(exc)
+
+    return metrics
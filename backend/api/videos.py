@@ -1,17 +1,45 @@
 import uuid
+import shutil
 import mimetypes
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, UploadFile, File, Form, Request, status
 from fastapi.responses import JSONResponse, FileResponse
+from pydantic import BaseModel
 from sqlmodel import Session as DBSession, select
 
 from api.auth import get_current_user
 from models.database.db_models import User, Workflow, Video, Deployment
 from database.database import get_session
 from scripts.permission_helpers import user_can_access_workflow, user_can_modify_workflow, user_can_access_deployment
-from api.file_storage import store_file, delete_stored_file, STORAGE_BASE_DIR
+from services.video_streaming import (
+    HLS_ENABLED,
+    STREAM_TOKEN_TTL_SECONDS,
+    hls_file_path,
+    hls_key,
+    hls_media_type,
+    signed_video_urls,
+    stored_file_response,
+    verify_stream_token,
+)
+from api.file_storage import (
+    store_file,
+    delete_stored_file,
+    stage_upload,
+    create_upload_session,
+    get_upload_session,
+    append_upload_chunk,
+    finish_upload_session,
+    delete_upload_session,
+    FileTooLargeError,
+    StagedFile,
+    UploadSessionConflictError,
+    UploadSessionError,
+    STORAGE_BASE_DIR,
+    rendition_dir,
+    stored_blob_sha256,
+)
 import sys
 
 # Ensure we can load configuration from scripts
@@ -61,7 +89,9 @@ def _determine_mime_type(original_name: str, content_type: str | None) -> str:
     return "video/mp4"
 
 
-def _serialize_video(video: Video) -> dict:
+# With user_id, stream_url carries a signed token (and hls_url is set once renditions exist)
+def _serialize_video(video: Video, user_id: int | None = None) -> dict:
+    urls = signed_video_urls(video, user_id)
     return {
         "id": video.id,
         "filename": video.original_filename,
@@ -70,14 +100,26 @@ def _serialize_video(video: Video) -> dict:
         "duration_seconds": video.duration_seconds,
         "uploaded_at": video.uploaded_at.isoformat(),
         "thumbnail_url": None,
-        "stream_url": f"/api/videos/{video.id}/stream",
+        "stream_url": urls["stream_url"],
+        "hls_url": urls["hls_url"],
         "download_url": f"/api/videos/{video.id}/download",
         "status": video.status,
     }
 
 
-def _validate_video_file(upload: UploadFile, file_bytes: bytes) -> None:
-    original_name = upload.filename or "video"
+# Queue HLS segmentation for new videos (best-effort; progressive streaming works without it)
+def _queue_hls_renditions(videos: list[Video]) -> None:
+    if not HLS_ENABLED:
+        return
+    try:
+        from services.celery_tasks import generate_video_hls_task
+        for video in videos:
+            generate_video_hls_task.delay(video_id=video.id)
+    except Exception as exc:
+        print(f"⚠️  Failed to queue HLS renditions: {exc}")
+
+
+def _validate_video_file(original_name: str, content_type: str | None, file_size: int | None = None) -> None:
     extension = Path(original_name).suffix.lower()
     if extension not in ALLOWED_VIDEO_EXTENSIONS:
         allowed = ", ".join(sorted(ALLOWED_VIDEO_EXTENSIONS))
@@ -86,7 +128,7 @@ def _validate_video_file(upload: UploadFile, file_bytes: bytes) -> None:
             detail=f"Invalid video type for '{original_name}'. Allowed extensions: {allowed}",
         )
 
-    mime_type = (upload.content_type or "").lower()
+    mime_type = (content_type or "").lower()
     if mime_type and mime_type not in ALLOWED_VIDEO_MIME_TYPES:
         allowed_mime = ", ".join(sorted(ALLOWED_VIDEO_MIME_TYPES))
         raise HTTPException(
@@ -94,13 +136,49 @@ def _validate_video_file(upload: UploadFile, file_bytes: bytes) -> None:
             detail=f"Invalid MIME type '{mime_type}' for '{original_name}'. Allowed types: {allowed_mime}",
         )
 
-    if len(file_bytes) > MAX_VIDEO_SIZE_BYTES:
+    if file_size is not None and file_size > MAX_VIDEO_SIZE_BYTES:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File '{original_name}' exceeds {MAX_VIDEO_SIZE_MB}MB limit",
         )
 
 
+def _get_modifiable_workflow(workflow_id: int, current_user: User, db: DBSession) -> Workflow:
+    workflow = db.get(Workflow, workflow_id)
+    if not workflow or not workflow.is_active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
+
+    if not user_can_modify_workflow(current_user, workflow, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors of this class can upload videos",
+        )
+    return workflow
+
+
+# Move a fully received file into storage and build its Video row (not yet committed)
+def _store_video(staged: StagedFile, original_name: str, content_type: str | None, workflow_id: int, user_id: int) -> Video:
+    mime_type = _determine_mime_type(original_name, content_type)
+    upload_id = uuid.uuid4().hex
+    extension = Path(original_name).suffix.lower() or ".mp4"
+    sanitized = _sanitize_filename(original_name)
+    stored_filename = f"{sanitized}_{upload_id}{extension}"
+
+    storage_path = store_file(staged.path, workflow_id, upload_id, stored_filename, move=True, sha256=staged.sha256)
+
+    return Video(
+        filename=stored_filename,
+        original_filename=original_name,
+        file_size=staged.size,
+        mime_type=mime_type,
+        storage_path=storage_path,
+        upload_id=upload_id,
+        workflow_id=workflow_id,
+        uploaded_by_id=user_id,
+        status="ready",
+    )
+
+
 @router.post("/upload")
 async def upload_videos(
     files: List[UploadFile] = File(...),
@@ -120,60 +198,205 @@ async def upload_videos(
             detail=f"Maximum {MAX_FILES_PER_UPLOAD} videos allowed per upload",
         )
 
-    workflow = db.get(Workflow, workflow_id)
-    if not workflow or not workflow.is_active:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
-
-    if not user_can_modify_workflow(current_user, workflow, db):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only instructors of this class can upload videos",
-        )
+    _get_modifiable_workflow(workflow_id, current_user, db)
 
     created_videos: list[Video] = []
-
-    for file in files:
-        original_name = file.filename or "video"
-        file_bytes = await file.read()
-        _validate_video_file(file, file_bytes)
-
-        mime_type = _determine_mime_type(original_name, file.content_type)
-        upload_id = uuid.uuid4().hex
-        extension = Path(original_name).suffix.lower() or ".mp4"
-        sanitized = _sanitize_filename(original_name)
-        stored_filename = f"{sanitized}_{upload_id}{extension}"
-
-        storage_path = store_file(file_bytes, workflow_id, upload_id, stored_filename)
-
-        video = Video(
-            filename=stored_filename,
-            original_filename=original_name,
-            file_size=len(file_bytes),
-            mime_type=mime_type,
-            storage_path=storage_path,
-            upload_id=upload_id,
-            workflow_id=workflow_id,
-            uploaded_by_id=current_user.id,
-            status="ready",
-        )
-        db.add(video)
-        created_videos.append(video)
+    staged_files = []
+
+    try:
+        for file in files:
+            original_name = file.filename or "video"
+            _validate_video_file(original_name, file.content_type)
+
+            # Copy to disk in chunks; the size limit is enforced while streaming
+            try:
+                staged = await stage_upload(file, "video", max_bytes=MAX_VIDEO_SIZE_BYTES)
+            except FileTooLargeError:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File '{original_name}' exceeds {MAX_VIDEO_SIZE_MB}MB limit",
+                )
+            staged_files.append(staged)
+
+            video = _store_video(staged, original_name, file.content_type, workflow_id, current_user.id)
+            db.add(video)
+            created_videos.append(video)
+    except Exception:
+        for staged in staged_files:
+            staged.path.unlink(missing_ok=True)
+        for video in created_videos:
+            delete_stored_file(video.storage_path)
+        raise
 
     db.commit()
 
     for video in created_videos:
         db.refresh(video)
+    _queue_hls_renditions(created_videos)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "workflow_id": workflow_id,
-            "videos": [_serialize_video(video) for video in created_videos],
+            "videos": [_serialize_video(video, current_user.id) for video in created_videos],
             "message": "Videos uploaded successfully",
         },
     )
 
 
+# ---------------------------------------------------------------------------
+# Resumable chunked uploads for large videos:
+#   POST   /uploads                 start a session (validates type and declared size)
+#   PUT    /uploads/{id}?offset=N   append the request body at offset N
+#   GET    /uploads/{id}            bytes received so far, to resume after a dropped connection
+#   POST   /uploads/{id}/complete   verify (optional SHA-256) and create the Video
+#   DELETE /uploads/{id}            abandon the upload
+# ---------------------------------------------------------------------------
+
+class VideoUploadSessionRequest(BaseModel):
+    workflow_id: int
+    filename: str
+    total_size: int
+    content_type: Optional[str] = None
+
+
+class VideoUploadCompleteRequest(BaseModel):
+    sha256: Optional[str] = None
+
+
+def _serialize_upload_session(session: dict) -> dict:
+    return {
+        "upload_session_id": session["session_id"],
+        "filename": session["metadata"].get("filename"),
+        "total_size": session["total_size"],
+        "received": session["received"],
+        "chunk_size": session["chunk_size"],
+        "complete": session["received"] == session["total_size"],
+    }
+
+
+def _get_owned_upload_session(session_id: str, current_user: User) -> dict:
+    session = get_upload_session(session_id)
+    if not session or session.get("user_id") != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return session
+
+
+@router.post("/uploads")
+async def start_video_upload(
+    request: VideoUploadSessionRequest,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    _get_modifiable_workflow(request.workflow_id, current_user, db)
+    if request.total_size <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="total_size must be positive")
+    _validate_video_file(request.filename, request.content_type, request.total_size)
+
+    session = create_upload_session(
+        current_user.id,
+        request.total_size,
+        {
+            "workflow_id": request.workflow_id,
+            "filename": request.filename,
+            "content_type": request.content_type,
+        },
+    )
+    return JSONResponse(status_code=status.HTTP_201_CREATED, content=_serialize_upload_session(session))
+
+
+@router.get("/uploads/{session_id}")
+async def get_video_upload(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    return _serialize_upload_session(_get_owned_upload_session(session_id, current_user))
+
+
+@router.put("/uploads/{session_id}")
+async def upload_video_chunk(
+    session_id: str,
+    offset: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    session = _get_owned_upload_session(session_id, current_user)
+    if offset != session["received"]:
+        # Tell the client where to resume instead of accepting a gap or an overlap
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Offset does not match received bytes", "received": session["received"]},
+        )
+
+    try:
+        received = await append_upload_chunk(session_id, offset, request.stream())
+    except UploadSessionConflictError as exc:
+        # A concurrent request got there first; resume from whatever it stored
+        current = get_upload_session(session_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(exc), "received": current["received"] if current else session["received"]},
+        )
+    except UploadSessionError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    session["received"] = received
+    return _serialize_upload_session(session)
+
+
+@router.post("/uploads/{session_id}/complete")
+async def complete_video_upload(
+    session_id: str,
+    request: VideoUploadCompleteRequest | None = None,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    session = _get_owned_upload_session(session_id, current_user)
+    metadata = session["metadata"]
+    # Permissions may have changed since the upload started
+    _get_modifiable_workflow(metadata["workflow_id"], current_user, db)
+
+    try:
+        staged = finish_upload_session(session_id, request.sha256 if request else None)
+    except UploadSessionError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    try:
+        video = _store_video(
+            staged,
+            metadata["filename"],
+            metadata.get("content_type"),
+            metadata["workflow_id"],
+            current_user.id,
+        )
+        db.add(video)
+        db.commit()
+        db.refresh(video)
+    finally:
+        delete_upload_session(session_id)
+    _queue_hls_renditions([video])
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "workflow_id": metadata["workflow_id"],
+            "videos": [_serialize_video(video, current_user.id)],
+            "sha256": staged.sha256,
+            "message": "Video uploaded successfully",
+        },
+    )
+
+
+@router.delete("/uploads/{session_id}")
+async def abort_video_upload(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    _get_owned_upload_session(session_id, current_user)
+    delete_upload_session(session_id)
+    return {"message": "Upload cancelled", "upload_session_id": session_id}
+
+
 @router.get("/workflows/{workflow_id}/videos")
 async def list_workflow_videos(
     workflow_id: int,
@@ -200,16 +423,12 @@ async def list_workflow_videos(
         "workflow_id": workflow_id,
         "workflow_name": workflow.name,
         "video_count": len(videos),
-        "videos": [_serialize_video(video) for video in videos],
+        "videos": [_serialize_video(video, current_user.id) for video in videos],
     }
 
 
-@router.get("/{video_id}/stream")
-async def stream_video(
-    video_id: int,
-    current_user: User = Depends(get_current_user),
-    db: DBSession = Depends(get_session),
-):
+# Active video the user may watch: workflow access, or access to a deployment of its workflow
+def _get_viewable_video(video_id: int, current_user: User, db: DBSession) -> Video:
     video = db.get(Video, video_id)
     if not video or not video.is_active:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video not found")
@@ -240,63 +459,102 @@ async def stream_video(
     if not has_workflow_access and not has_deployment_access:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this video")
 
+    return video
+
+
+@router.get("/{video_id}/stream-url")
+async def get_video_stream_url(
+    video_id: int,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    """Fresh signed stream (and HLS) URLs, e.g. when a paused player's token has expired."""
+    video = _get_viewable_video(video_id, current_user, db)
+    urls = signed_video_urls(video, current_user.id)
+    return {**urls, "video_id": video.id, "expires_in": STREAM_TOKEN_TTL_SECONDS}
+
+
+@router.get("/{video_id}/stream")
+async def stream_video(
+    video_id: int,
+    request: Request,
+    token: Optional[str] = None,
+    sid: str | None = Cookie(None),
+    db: DBSession = Depends(get_session),
+):
+    """
+    Range-aware video stream. Requests with a valid signed token (from stream_url)
+    skip the session and permission checks; without one, the cookie session is used.
+    """
+    if verify_stream_token(token, video_id) is not None:
+        video = db.get(Video, video_id)
+        if not video or not video.is_active:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video not found")
+    else:
+        video = _get_viewable_video(video_id, get_current_user(sid, db), db)
+
     full_path = STORAGE_BASE_DIR / video.storage_path
     if not full_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
 
-    return FileResponse(
-        path=str(full_path),
-        filename=video.original_filename,
+    return stored_file_response(
+        request,
+        full_path,
         media_type=video.mime_type or "video/mp4",
-        headers={"Cache-Control": "private, max-age=3600"},
+        filename=video.original_filename,
+        sha256=stored_blob_sha256(video.storage_path),
     )
 
 
-@router.get("/{video_id}/download")
-async def download_video(
+@router.get("/{video_id}/hls/{token}/{file_path:path}")
+async def stream_video_hls(
     video_id: int,
-    current_user: User = Depends(get_current_user),
+    token: str,
+    file_path: str,
+    request: Request,
     db: DBSession = Depends(get_session),
 ):
+    """
+    HLS playlists and segments. The token is part of the path so the relative
+    segment URLs in the playlists carry it too.
+    """
+    if verify_stream_token(token, video_id) is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired stream token")
+
     video = db.get(Video, video_id)
     if not video or not video.is_active:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video not found")
 
-    workflow = db.get(Workflow, video.workflow_id)
-    if not workflow or not workflow.is_active:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
+    full_path = hls_file_path(video, file_path)
+    if full_path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="HLS file not found")
 
-    # Check if user has workflow access (owner/instructor)
-    has_workflow_access = user_can_access_workflow(current_user, workflow, db)
-    
-    # If not, check if user has access through any deployment using this video
-    has_deployment_access = False
-    if not has_workflow_access:
-        # Find deployments that use this workflow and check if user has access
-        deployments = db.exec(
-            select(Deployment).where(
-                Deployment.workflow_id == workflow.id,
-                Deployment.is_active == True
-            )
-        ).all()
-        
-        for deployment in deployments:
-            if user_can_access_deployment(current_user, deployment, db):
-                has_deployment_access = True
-                break
-    
-    if not has_workflow_access and not has_deployment_access:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this video")
+    # Segments never change once written; playlists are tiny and revalidated
+    cache_control = "private, max-age=31536000, immutable" if full_path.suffix == ".ts" else "private, no-cache"
+    return stored_file_response(request, full_path, media_type=hls_media_type(full_path), cache_control=cache_control)
+
+
+@router.get("/{video_id}/download")
+async def download_video(
+    video_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+):
+    video = _get_viewable_video(video_id, current_user, db)
 
     full_path = STORAGE_BASE_DIR / video.storage_path
     if not full_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
 
-    return FileResponse(
-        path=str(full_path),
-        filename=video.original_filename,
+    return stored_file_response(
+        request,
+        full_path,
         media_type=video.mime_type or "application/octet-stream",
-        headers={"Content-Disposition": f"attachment; filename=\"{video.original_filename}\""},
+        filename=video.original_filename,
+        sha256=stored_blob_sha256(video.storage_path),
+        cache_control="private, no-cache",
+        content_disposition_type="attachment",
     )
 
 
@@ -322,6 +580,9 @@ async def remove_video(
 
     if video.storage_path:
         try:
+            # Renditions keyed by content go with the blob; those of pre-blob files go now
+            if not stored_blob_sha256(video.storage_path):
+                shutil.rmtree(rendition_dir(hls_key(video)), ignore_errors=True)
             delete_stored_file(video.storage_path)
         except Exception as exc:  # pragma: no cover - best effort cleanup
             print(f"Warning: failed to delete stored video file {video.storage_path}: {exc}")
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for live presentation websockets.
+Simulates a classroom against a running server (or one it starts itself): N
+students join over /ws/live-presentation/{deployment_id}/student, answer a ready
+check and a series of prompts after a random think time, and some of them drop
+and reconnect with their resume token; a teacher drives the session over the
+/teacher socket and, optionally, one roomcast device per group joins with the
+roomcast code. Reports connect latency, prompt fan-out latency percentiles,
+reconnect latency, messages per second and the server's CPU and memory.
+
+Runs entirely locally against the SQLite database in config.yaml:
+- load-test students, their class memberships and auth sessions are seeded into
+  the database for an existing live presentation deployment (the teacher is the
+  deployment's owner), along with group assignments for them;
+- group summaries go to a stub OpenAI-compatible LLM served by the harness (the
+  spawned server gets OPENAI_BASE_URL pointing at it; start your own server with
+  the printed environment to use it there).
+
+Example:
+    python benchmark_live_presentation_load.py --deployment-id <id> --spawn-server --students 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the current directory to Python path
+sys.path.append('.')
+
+from services.websocket_protocol import JSON_CODEC, MSGPACK_CODEC, SUPPORTED_CODECS
+
+try:
+    from websockets.asyncio.client import connect as websocket_connect
+except ImportError:
+    websocket_connect = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+LOAD_TEST_EMAIL = "loadtest-student-{index}@loadtest.invalid"
+STUB_SUMMARY = "SUMMARY: The group agreed on the main points and raised one open question.\nKEY_THEMES:\n- evidence\n- sources"
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/max in milliseconds"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {"p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": ordered[-1] * 1000}
+
+
+def format_percentiles(values: List[float]) -> str:
+    if not values:
+        return "no samples"
+    stats = percentiles(values)
+    return (f"p50 {stats['p50']:.1f}ms  p90 {stats['p90']:.1f}ms  p99 {stats['p99']:.1f}ms  "
+            f"max {stats['max']:.1f}ms  (n={len(values)})")
+
+
+# ---------------------------------------------------------------------------
+# Database seeding
+# ---------------------------------------------------------------------------
+
+def seed_load_test_users(deployment_id: str, count: int, group_size: int, seed_groups: bool) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Create (or reuse) load-test students in the deployment's class, with fresh auth
+    sessions, and an auth session for the deployment's owner as the teacher.
+    Returns the teacher's session id and one {user_id, email, sid} per student.
+    """
+    from sqlmodel import Session, select
+    from database.database import engine
+    from models.database.db_models import AuthSession, ClassMembership, Deployment, User
+    from models.database.live_presentation_models import LivePresentationSession
+    from models.enums import ClassRole
+
+    lookup_deployment_id = deployment_id.split("_page_")[0] if "_page_" in deployment_id else deployment_id
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=4)
+
+    with Session(engine) as db:
+        deployment = db.exec(select(Deployment).where(Deployment.deployment_id == lookup_deployment_id)).first()
+        if deployment is None:
+            raise SystemExit(f"❌ Deployment {lookup_deployment_id} not found in the database")
+
+        teacher_session = AuthSession(user_id=deployment.user_id, expires_at=expires_at)
+        db.add(teacher_session)
+
+        students = []
+        for index in range(count):
+            email = LOAD_TEST_EMAIL.format(index=index)
+            user = db.exec(select(User).where(User.email == email)).first()
+            if user is None:
+                # No usable password: load-test users can only sign in through seeded sessions
+                user = User(email=email, hashed_password="!", first_name="Load", last_name=f"Student {index}")
+                db.add(user)
+                db.flush()
+            membership = db.exec(select(ClassMembership).where(
+                ClassMembership.class_id == deployment.class_id, ClassMembership.user_id == user.id
+            )).first()
+            if membership is None:
+                db.add(ClassMembership(class_id=deployment.class_id, user_id=user.id, role=ClassRole.STUDENT))
+            session = AuthSession(user_id=user.id, expires_at=expires_at)
+            db.add(session)
+            students.append({"user_id": user.id, "email": email, "session": session})
+
+        if seed_groups:
+            # Groups of load-test students, picked up when the presentation restores its session
+            emails = [student["email"] for student in students]
+            groups = {f"Group{g + 1}": emails[start:start + group_size]
+                      for g, start in enumerate(range(0, len(emails), group_size))}
+            record = db.exec(select(LivePresentationSession).where(LivePresentationSession.deployment_id == deployment_id)).first()
+            if record is None:
+                record = LivePresentationSession(deployment_id=deployment_id)
+            record.input_variable_data = groups
+            db.add(record)
+
+        db.commit()
+        return teacher_session.id, [
+            {"user_id": student["user_id"], "email": student["email"], "sid": student["session"].id}
+            for student in students
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Stub LLM and server process
+# ---------------------------------------------------------------------------
+
+class StubLLMServer:
+    """An OpenAI-compatible /v1/chat/completions endpoint with a fixed summary and configurable latency"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                stub.calls += 1
+                time.sleep(stub.latency_seconds)
+                body = json.dumps({
+                    "id": f"chatcmpl-stub-{stub.calls}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "stub",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": STUB_SUMMARY}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def environment(self) -> Dict[str, str]:
+        return {"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": self.base_url, "OPENAI_API_BASE": self.base_url}
+
+    def close(self):
+        self._server.shutdown()
+
+
+def spawn_server(port: int, environment: Dict[str, str], log_path: str) -> subprocess.Popen:
+    """Start uvicorn on the app in a child process and wait until it answers"""
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **environment}, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"❌ Server exited during startup; see {log_path}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"❌ Server did not start within 60s; see {log_path}")
+
+
+class ResourceSampler:
+    """Samples a process's CPU and resident memory in the background"""
+
+    def __init__(self, pid: int, interval_seconds: float = 0.5):
+        self.interval_seconds = interval_seconds
+        self.cpu_percent: List[float] = []
+        self.rss_bytes: List[int] = []
+        self._process = psutil.Process(pid) if psutil is not None else None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._process is None:
+            print("⚠️  psutil not installed; server CPU and memory are not sampled")
+            return
+        self._process.cpu_percent(None)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                self.cpu_percent.append(self._process.cpu_percent(None))
+                self.rss_bytes.append(self._process.memory_info().rss)
+            except psutil.Error:
+                return
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Websocket clients
+# ---------------------------------------------------------------------------
+
+class LoadStats:
+    def __init__(self):
+        self.connect_latency: List[float] = []
+        self.reconnect_latency: List[float] = []
+        self.fanout_latency: Dict[str, List[float]] = {}
+        self.summary_latency: List[float] = []
+        self.prompt_sent_at: Dict[str, float] = {}
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.replayed = 0
+        self.errors: List[str] = []
+        self.elapsed = 0.0
+        self.sampler: Optional[ResourceSampler] = None
+
+
+class Client:
+    """One websocket (student, teacher or roomcast device) with a receive loop"""
+
+    def __init__(self, url: str, stats: LoadStats, cookie: Optional[str] = None, encoding: str = "json"):
+        self.url = url
+        self.stats = stats
+        self.cookie = cookie
+        self.encoding = encoding
+        self.ws = None
+        self.codec = JSON_CODEC
+        self.waiters: Dict[str, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    async def open(self, url: Optional[str] = None):
+        subprotocols = [MSGPACK_CODEC.subprotocol, JSON_CODEC.subprotocol] if self.encoding == "msgpack" else [JSON_CODEC.subprotocol]
+        self.ws = await websocket_connect(
+            url or self.url,
+            additional_headers={"Cookie": f"sid={self.cookie}"} if self.cookie else None,
+            subprotocols=subprotocols,
+            compression="deflate",
+            max_size=None,
+            open_timeout=60,
+        )
+        self.codec = SUPPORTED_CODECS.get(self.ws.subprotocol, JSON_CODEC)
+        self._reader = asyncio.create_task(self._read())
+
+    def expect(self, *message_types: str) -> asyncio.Future:
+        """A future resolved with the next message of any of these types"""
+        future = asyncio.get_running_loop().create_future()
+        for message_type in message_types:
+            self.waiters[message_type] = future
+        return future
+
+    async def _read(self):
+        try:
+            async for frame in self.ws:
+                received_at = time.perf_counter()
+                self.stats.messages_received += 1
+                self.stats.bytes_received += len(frame)
+                message = self.codec.decode(frame)
+                self.on_message(message, received_at)
+                future = self.waiters.pop(message.get("type"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except Exception:
+            pass  # closed or dropped; the scenario decides whether that is an error
+
+    def on_message(self, message: Dict[str, Any], received_at: float):
+        pass
+
+    async def send(self, message: Dict[str, Any]):
+        await self.ws.send(json.dumps(message))
+        self.stats.messages_sent += 1
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            self._reader.cancel()
+
+    def drop(self):
+        """Lose the connection without a close handshake, like a client losing Wi-Fi"""
+        self.ws.transport.abort()
+
+
+class StudentClient(Client):
+    def __init__(self, url: str, stats: LoadStats, sid: str, email: str, encoding: str):
+        super().__init__(url, stats, sid, encoding)
+        self.email = email
+        self.resume_token: Optional[str] = None
+        self.last_seq = 0
+        self.prompts: Dict[str, asyncio.Future] = {}
+        self.ready_check = asyncio.Event()
+
+    def prompt_future(self, prompt_id: str) -> asyncio.Future:
+        if prompt_id not in self.prompts:
+            self.prompts[prompt_id] = asyncio.get_running_loop().create_future()
+        return self.prompts[prompt_id]
+
+    def on_message(self, message: Dict[str, Any], received_at: float):
+        if isinstance(message.get("resume_token"), str) and message.get("type") != "session_resumed":
+            self.resume_token, self.last_seq = message["resume_token"], 0
+        if isinstance(message.get("seq"), int):
+            if message["seq"] <= self.last_seq:
+                return  # replay overlap
+            self.last_seq = message["seq"]
+        message_type = message.get("type")
+        if message_type == "session_resumed":
+            self.stats.replayed += message.get("replayed", 0)
+        elif message_type in ("prompt_received", "send_prompt"):
+            prompt_id = (message.get("prompt") or {}).get("id")
+            future = self.prompt_future(prompt_id)
+            if not future.done():
+                future.set_result(received_at)
+                if prompt_id in self.stats.prompt_sent_at:
+                    self.stats.fanout_latency.setdefault(prompt_id, []).append(received_at - self.stats.prompt_sent_at[prompt_id])
+        elif message_type == "ready_check":
+            self.ready_check.set()
+        elif message_type == "group_summary":
+            prompt_id = message.get("prompt_id")
+            if prompt_id in self.stats.prompt_sent_at:
+                self.stats.summary_latency.append(received_at - self.stats.prompt_sent_at[prompt_id])
+
+    async def join(self):
+        start = time.perf_counter()
+        joined = self.expect("welcome", "waiting_for_teacher", "error")
+        await self.open()
+        message = await asyncio.wait_for(joined, 60)
+        if message.get("type") == "error":
+            raise RuntimeError(message.get("message"))
+        self.stats.connect_latency.append(time.perf_counter() - start)
+
+    async def reconnect(self):
+        start = time.perf_counter()
+        resumed = self.expect("session_resumed", "welcome", "waiting_for_teacher", "error")
+        url = self.url
+        if self.resume_token:
+            url += f"?resume_token={self.resume_token}&last_seq={self.last_seq}"
+        await self.open(url)
+        message = await asyncio.wait_for(resumed, 60)
+        if message.get("type") == "error":
+            raise RuntimeError(message.get("message"))
+        self.stats.reconnect_latency.append(time.perf_counter() - start)
+
+    async def ack(self):
+        await self.send({"type": "ack", "seq": self.last_seq})
+
+
+class RoomcastClient(Client):
+    def on_message(self, message: Dict[str, Any], received_at: float):
+        if message.get("type") == "group_summary_generated" and message.get("prompt_id") in self.stats.prompt_sent_at:
+            self.stats.summary_latency.append(received_at - self.stats.prompt_sent_at[message["prompt_id"]])
+
+
+async def http_json(base_url: str, path: str, sid: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def request():
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(f"{base_url}{path}", data=data, method="POST" if data is not None else "GET",
+                                     headers={"Cookie": f"sid={sid}", "Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return json.loads(response.read())
+
+    return await asyncio.to_thread(request)
+
+
+# ---------------------------------------------------------------------------
+# Scenario
+# ---------------------------------------------------------------------------
+
+async def gather_limited(coroutines, limit: int) -> List[Any]:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines), return_exceptions=True)
+
+
+async def run_scenario(args, teacher_sid: str, students: List[Dict[str, Any]], server_pid: Optional[int]) -> LoadStats:
+    stats = LoadStats()
+    ws_base = args.base_url.replace("http", "ws", 1) + "/api/deploy/ws/live-presentation"
+    sampler = ResourceSampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    teacher = Client(f"{ws_base}/{args.deployment_id}/teacher", stats, teacher_sid, args.encoding)
+    connected = teacher.expect("teacher_connected", "error")
+    await teacher.open()
+    message = await asyncio.wait_for(connected, 60)
+    if message.get("type") == "error":
+        raise SystemExit(f"❌ Teacher could not connect: {message.get('message')}")
+    print("👩‍🏫 Teacher connected")
+
+    roomcasts: List[RoomcastClient] = []
+    if args.roomcast:
+        api = f"{args.base_url}/api/deploy/live-presentation/{args.deployment_id}/roomcast"
+        status = await http_json(api, "/status", teacher_sid)
+        if not status.get("enabled"):
+            await http_json(api, "/toggle", teacher_sid, {"enabled": True})
+        status = await http_json(api, "/start", teacher_sid, {})
+        group_names = status.get("expected_groups") or []
+        for group_name in group_names:
+            device = RoomcastClient(f"{ws_base}/roomcast/{status['code']}", stats, encoding=args.encoding)
+            await device.open()
+            await device.send({"type": "register_roomcast", "group_name": group_name})
+            roomcasts.append(device)
+        print(f"📺 {len(roomcasts)} roomcast devices registered with code {status.get('code')}")
+
+    # Students join with bounded concurrency, like a class arriving at once
+    clients = [StudentClient(f"{ws_base}/{args.deployment_id}/student", stats, student["sid"], student["email"], args.encoding)
+               for student in students]
+    results = await gather_limited([client.join() for client in clients], args.connect_concurrency)
+    failures = [result for result in results if isinstance(result, Exception)]
+    stats.errors.extend(f"join: {failure}" for failure in failures)
+    clients = [client for client, result in zip(clients, results) if not isinstance(result, Exception)]
+    print(f"🎓 {len(clients)}/{len(students)} students connected ({format_percentiles(stats.connect_latency)})")
+
+    await teacher.send({"type": "start_presentation"})
+    await asyncio.sleep(1)
+
+    async def think():
+        await asyncio.sleep(rng.uniform(args.think_time[0], args.think_time[1]))
+
+    async def answer_ready_check(client: StudentClient):
+        await asyncio.wait_for(client.ready_check.wait(), 30)
+        await think()
+        await client.send({"type": "student_ready"})
+
+    await teacher.send({"type": "send_ready_check"})
+    await gather_limited([answer_ready_check(client) for client in clients], len(clients) or 1)
+
+    for round_number in range(args.prompts):
+        prompt_id = f"loadtest-{int(time.time())}-{round_number}"
+        dropping = set(rng.sample(range(len(clients)), int(len(clients) * args.reconnect_fraction))) if clients else set()
+
+        async def take_part(index: int, client: StudentClient):
+            try:
+                await asyncio.wait_for(client.prompt_future(prompt_id), 60)
+                if index in dropping:
+                    client.drop()
+                    await asyncio.sleep(rng.uniform(0.1, args.reconnect_delay))
+                    await client.reconnect()
+                await think()
+                await client.send({"type": "student_response", "prompt_id": prompt_id,
+                                   "response": f"Answer from {client.email} to round {round_number + 1}"})
+                await client.ack()
+            except Exception as e:
+                stats.errors.append(f"{prompt_id} {client.email}: {e!r}")
+
+        stats.prompt_sent_at[prompt_id] = time.perf_counter()
+        await teacher.send({"type": "send_prompt", "prompt": {
+            "id": prompt_id, "statement": f"Load test prompt {round_number + 1}", "hasInput": True,
+        }})
+        await asyncio.gather(*(take_part(index, client) for index, client in enumerate(clients)))
+        print(f"📨 Prompt {round_number + 1}/{args.prompts}: fan-out {format_percentiles(stats.fanout_latency.get(prompt_id, []))}")
+
+    # Give the stub LLM's summaries time to arrive
+    await asyncio.sleep(args.settle)
+    elapsed = time.perf_counter() - started
+
+    if not args.keep_presentation:
+        await teacher.send({"type": "end_presentation"})
+        await asyncio.sleep(1)
+    for client in [teacher, *roomcasts, *clients]:
+        try:
+            await client.close()
+        except Exception:
+            pass
+    if sampler:
+        sampler.stop()
+
+    stats.elapsed = elapsed
+    stats.sampler = sampler
+    return stats
+
+
+def report(args, stats: LoadStats, stub: StubLLMServer):
+    all_fanout = [latency for latencies in stats.fanout_latency.values() for latency in latencies]
+    print(f"\n📈 Results ({args.students} students, {args.prompts} prompts, encoding {args.encoding})")
+    print("=" * 80)
+    print(f"Connect latency:     {format_percentiles(stats.connect_latency)}")
+    print(f"Prompt fan-out:      {format_percentiles(all_fanout)}")
+    print(f"Reconnect latency:   {format_percentiles(stats.reconnect_latency)}  ({stats.replayed} messages replayed)")
+    print(f"Summary latency:     {format_percentiles(stats.summary_latency)}  ({stub.calls} stub LLM calls)")
+    print(f"Messages received:   {stats.messages_received} ({stats.messages_received / stats.elapsed:.0f}/s, "
+          f"{stats.bytes_received / 1024:.0f} KB)")
+    print(f"Messages sent:       {stats.messages_sent} ({stats.messages_sent / stats.elapsed:.0f}/s)")
+    sampler = stats.sampler
+    if sampler and sampler.cpu_percent:
+        print(f"Server CPU:          mean {statistics.mean(sampler.cpu_percent):.0f}%  peak {max(sampler.cpu_percent):.0f}%")
+        print(f"Server memory (RSS): start {sampler.rss_bytes[0] / 2**20:.0f} MB  peak {max(sampler.rss_bytes) / 2**20:.0f} MB")
+    if stats.errors:
+        print(f"\n⚠️  {len(stats.errors)} errors, first few:")
+        for error in stats.errors[:5]:
+            print(f"   {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live presentation websocket load test")
+    parser.add_argument("--deployment-id", required=True, help="Live presentation deployment id (page deployments as <id>_page_<n>)")
+    parser.add_argument("--students", type=int, default=300, help="Simulated students")
+    parser.add_argument("--group-size", type=int, default=5, help="Students per seeded group")
+    parser.add_argument("--no-seed-groups", dest="seed_groups", action="store_false", help="Keep the deployment's own group data")
+    parser.add_argument("--prompts", type=int, default=3, help="Prompts sent by the teacher")
+    parser.add_argument("--think-time", type=float, nargs=2, default=[1.0, 5.0], metavar=("MIN", "MAX"), help="Seconds before a student answers")
+    parser.add_argument("--reconnect-fraction", type=float, default=0.1, help="Share of students that drop and reconnect each prompt")
+    parser.add_argument("--reconnect-delay", type=float, default=2.0, help="Longest offline time before reconnecting (seconds)")
+    parser.add_argument("--connect-concurrency", type=int, default=50, help="Students connecting at the same time")
+    parser.add_argument("--roomcast", action="store_true", help="Register one roomcast device per group")
+    parser.add_argument("--encoding", choices=["json", "msgpack"], default="json", help="Websocket encoding to negotiate")
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="Stub LLM response time (seconds)")
+    parser.add_argument("--settle", type=float, default=5.0, help="Seconds to wait for summaries after the last prompt")
+    parser.add_argument("--keep-presentation", action="store_true", help="Don't end the presentation afterwards")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server to test")
+    parser.add_argument("--spawn-server", action="store_true", help="Start uvicorn on --port with the stub LLM")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --spawn-server")
+    parser.add_argument("--server-pid", type=int, help="Sample CPU and memory of an already running server")
+    parser.add_argument("--server-log", default="loadtest_server.log", help="Output of the spawned server")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for think times and reconnects")
+    args = parser.parse_args()
+
+    if websocket_connect is None:
+        raise SystemExit("❌ The websockets package is required (pip install websockets)")
+    if args.encoding == "msgpack" and MSGPACK_CODEC.subprotocol not in SUPPORTED_CODECS:
+        raise SystemExit("❌ msgpack is not installed")
+
+    print("🚀 Live Presentation WebSocket Load Test")
+    print("=" * 80)
+    teacher_sid, students = seed_load_test_users(args.deployment_id, args.students, args.group_size, args.seed_groups)
+    print(f"🌱 Seeded {len(students)} load-test students and a teacher session")
+
+    stub = StubLLMServer(args.llm_latency)
+    server = None
+    server_pid = args.server_pid
+    if args.spawn_server:
+        args.base_url = f"http://127.0.0.1:{args.port}"
+        server = spawn_server(args.port, stub.environment(), args.server_log)
+        server_pid = server.pid
+        print(f"🖥️  Server started on {args.base_url} (pid {server.pid}, log {args.server_log})")
+    else:
+        print(f"🤖 Stub LLM at {stub.base_url}; start the server with "
+              + " ".join(f"{key}={value}" for key, value in stub.environment().items()) + " to use it")
+
+    try:
+        stats = asyncio.run(run_scenario(args, teacher_sid, students, server_pid))
+        report(args, stats, stub)
+    finally:
+        stub.close()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark for SQLite write contention.
+Hammers a throwaway database with concurrent prompt submissions and live
+presentation responses, comparing the default engine settings against the
+performance mode (WAL + pragmas) with the serialized writer.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+# Add the current directory to Python path
+sys.path.append('.')
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from database.database import SerializedWriter, _sqlite_pragmas
+from models.database.db_models import (
+    User, Class, Deployment, PromptSession, PromptSubmission,
+    LivePresentationSession, LivePresentationStudentConnection, LivePresentationResponse,
+)
+
+PERFORMANCE_SETTINGS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout_ms": 15000,
+    "mmap_size_mb": 256,
+    "cache_size_mb": 64,
+}
+
+
+def create_benchmark_engine(path: str, performance_mode: bool):
+    """Create an engine the same way database.database does for the given mode."""
+    connect_args: Dict[str, Any] = {"check_same_thread": False}
+    if performance_mode:
+        connect_args["timeout"] = PERFORMANCE_SETTINGS["busy_timeout_ms"] / 1000
+    db_engine = create_engine(f"sqlite:///{path}", connect_args=connect_args, pool_size=32, max_overflow=32)
+
+    if performance_mode:
+        pragmas = _sqlite_pragmas(PERFORMANCE_SETTINGS)
+
+        @event.listens_for(db_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return db_engine
+
+
+def seed_database(db_engine, students: int) -> Dict[str, Any]:
+    """Create one prompt deployment and one live session with a connection per student."""
+    SQLModel.metadata.create_all(db_engine)
+    with Session(db_engine) as db:
+        users = [User(email=f"bench{i}@example.com", hashed_password="x") for i in range(students)]
+        class_obj = Class(code="BENCH1", name="Benchmark")
+        db.add_all(users + [class_obj])
+        db.flush()
+        deployment = Deployment(
+            deployment_id="bench-prompt",
+            user_id=users[0].id,
+            workflow_id=1,
+            class_id=class_obj.id,
+            workflow_name="Benchmark",
+            config={},
+            collection_name="bench",
+        )
+        live_session = LivePresentationSession(deployment_id="bench-live")
+        db.add_all([deployment, live_session])
+        db.flush()
+
+        prompt_sessions = []
+        connections = []
+        for user in users:
+            prompt_session = PromptSession(
+                user_id=user.id,
+                deployment_id=deployment.id,
+                main_question="What did you learn?",
+                submission_requirements=[{"prompt": f"Q{i}", "mediaType": "textarea"} for i in range(50)],
+            )
+            connection = LivePresentationStudentConnection(
+                session_id=live_session.id, user_id=str(user.id), user_name=user.email
+            )
+            db.add_all([prompt_session, connection])
+            prompt_sessions.append(prompt_session)
+            connections.append(connection)
+        db.commit()
+
+        return {
+            "live_session_id": live_session.id,
+            "prompt_session_ids": [s.id for s in prompt_sessions],
+            "connection_ids": [c.id for c in connections],
+        }
+
+
+def run_scenario(label: str, performance_mode: bool, serialized: bool, students: int, writes_per_student: int) -> Dict[str, Any]:
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="bench_sqlite_")
+    os.close(fd)
+    db_engine = create_benchmark_engine(path, performance_mode)
+    writer = SerializedWriter(db_engine, name=f"bench-writer-{label}") if serialized else None
+
+    try:
+        ids = seed_database(db_engine, students)
+        latencies: List[float] = []
+        errors: List[str] = []
+        lock = threading.Lock()
+
+        def write(callback: Callable[[Session], Any]) -> None:
+            if writer is not None:
+                writer.submit(callback).result()
+            else:
+                with Session(db_engine) as db:
+                    callback(db)
+
+        def student_worker(index: int) -> None:
+            prompt_session_id = ids["prompt_session_ids"][index]
+            connection_id = ids["connection_ids"][index]
+            for n in range(writes_per_student):
+                start = time.perf_counter()
+                try:
+                    # Reads happen on the request thread, as in the API
+                    with Session(db_engine) as db:
+                        db.exec(select(PromptSession).where(PromptSession.id == prompt_session_id)).first()
+                        db.exec(
+                            select(LivePresentationResponse).where(
+                                LivePresentationResponse.session_id == ids["live_session_id"],
+                                LivePresentationResponse.student_connection_id == connection_id,
+                            )
+                        ).all()
+
+                    def write_submission(db: Session, n=n) -> None:
+                        db.add(PromptSubmission(
+                            session_id=prompt_session_id,
+                            submission_index=n,
+                            prompt_text=f"Q{n}",
+                            media_type="textarea",
+                            user_response=f"Answer {n} from student {index}",
+                        ))
+                        db.commit()
+
+                    def write_response(db: Session, n=n) -> None:
+                        db.add(LivePresentationResponse(
+                            session_id=ids["live_session_id"],
+                            student_connection_id=connection_id,
+                            prompt_id=f"prompt-{n}",
+                            response_text=f"Live answer {n}",
+                        ))
+                        db.commit()
+
+                    write(write_submission)
+                    write(write_response)
+                except OperationalError as exc:
+                    with lock:
+                        errors.append(str(exc.orig))
+                finally:
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=students) as pool:
+            list(pool.map(student_worker, range(students)))
+        wall_time = time.perf_counter() - wall_start
+
+        latencies.sort()
+        operations = students * writes_per_student
+        return {
+            "label": label,
+            "wall_time": wall_time,
+            "operations": operations,
+            "throughput": operations / wall_time if wall_time else 0.0,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "lock_errors": sum(1 for e in errors if "locked" in e),
+            "errors": len(errors),
+        }
+    finally:
+        if writer is not None:
+            writer.shutdown(timeout=10)
+        db_engine.dispose()
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite write contention benchmark")
+    parser.add_argument("--students", type=int, default=32, help="Concurrent simulated students")
+    parser.add_argument("--writes", type=int, default=20, help="Prompt submissions + live responses per student")
+    args = parser.parse_args()
+
+    print("🚀 SQLite Write Contention Benchmark")
+    print("=" * 80)
+    print(f"📊 Setup: {args.students} concurrent students x {args.writes} (submission + live response) pairs")
+
+    scenarios = [
+        ("default", False, False),
+        ("performance mode", True, False),
+        ("performance mode + serialized writer", True, True),
+    ]
+
+    results = []
+    for label, performance_mode, serialized in scenarios:
+        print(f"\n🧪 Running scenario: {label}")
+        result = run_scenario(label, performance_mode, serialized, args.students, args.writes)
+        results.append(result)
+        print(f"   Time: {result['wall_time']:.2f}s  Throughput: {result['throughput']:.1f} ops/s")
+        print(f"   Latency p50: {result['p50_ms']:.1f}ms  p95: {result['p95_ms']:.1f}ms  max: {result['max_ms']:.1f}ms")
+        print(f"   'database is locked' errors: {result['lock_errors']} (all errors: {result['errors']})")
+
+    print(f"\n📈 Summary")
+    print("=" * 80)
+    print(f"{'Scenario':<40}{'ops/s':>10}{'p95 ms':>12}{'locked':>10}")
+    for result in results:
+        print(f"{result['label']:<40}{result['throughput']:>10.1f}{result['p95_ms']:>12.1f}{result['lock_errors']:>10}")
+
+    return all(result["lock_errors"] == 0 for result in results[1:])
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
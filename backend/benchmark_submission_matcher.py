@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark of SubmissionMatcher.find_best_match with and without the embedding
+prefilter. Matches a summary against synthetic website submissions (500 by
+default, spread over topics) and reports per strategy the LLM prompt size, the
+prefilter time with a cold and a warm embedding cache, and how many of the
+submissions the LLM ranks belong to the summary's topic.
+
+The LLM is a stub that picks the first submission it is shown (pass --live to use
+the configured OpenAI model). Embeddings come from FastEmbed when it is installed,
+otherwise from a hashed bag-of-words stand-in (--embedder).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.append('.')
+
+from services.deployment_types import submission_matcher
+from services.deployment_types.submission_matcher import (
+    SubmissionMatcher, SummaryData, WebsiteSubmission, clear_embedding_cache, prefilter_top_k,
+)
+
+TOPICS = {
+    "health": ("Health misinformation", ["vaccine side effect myths", "miracle herbal cures", "detox supplement claims", "anti vaccine testimonials"]),
+    "climate": ("Climate denial", ["climate change denial", "global warming hoax claims", "cherry picked temperature data", "fossil fuel funded skepticism"]),
+    "election": ("Election misinformation", ["voter fraud rumours", "fake ballot counting videos", "misleading polling place information", "doctored candidate quotes"]),
+    "finance": ("Financial scams", ["crypto pump and dump schemes", "get rich quick trading courses", "fake investment guarantees", "ponzi style referral programs"]),
+    "satire": ("Satire mistaken for news", ["satirical headlines shared as real", "parody news articles", "joke press releases", "comedy sites imitating newspapers"]),
+    "science": ("Pseudoscience", ["flat earth arguments", "astrology presented as science", "perpetual motion devices", "ancient aliens theories"]),
+}
+PLATFORMS = ["Independent blog", "Video channel", "Social media page", "Online forum", "News aggregator", "Podcast", "E-commerce site", "Wiki"]
+
+
+class HashingEmbeddings:
+    """Hashed bag-of-words vectors; stands in for FastEmbed where it isn't installed"""
+
+    model_name = "hashing-256"
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(256, dtype=np.float32)
+        for word in re.findall(r"[a-z]+", text.lower()):
+            vector[zlib.crc32(word.encode()) % 256] += 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+class StubChatModel:
+    """Picks the first submission in the prompt; records prompt sizes"""
+
+    def __init__(self):
+        self.prompt_chars: List[int] = []
+        self.shown: List[List[str]] = []
+
+    async def ainvoke(self, messages):
+        prompt = messages[-1].content
+        names = re.findall(r"^Submission \d+ - (.+):$", prompt, re.MULTILINE)
+        self.prompt_chars.append(len(prompt))
+        self.shown.append(names)
+        scores = "\n".join(f"- {name}: 0.5" for name in names)
+        content = f"BEST_MATCH: {names[0]}\nCONFIDENCE: 0.8\nREASONING: Stub.\n\nSCORES:\n{scores}"
+        return type("Message", (), {"content": content})()
+
+
+def make_submissions(count: int, seed: int) -> List[WebsiteSubmission]:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    submissions = []
+    for i in range(count):
+        topic = topics[i % len(topics)]
+        category, purposes = TOPICS[topic]
+        submissions.append(WebsiteSubmission(
+            student_name=f"{topic}-student-{i}",
+            url=f"https://{topic}{i}.example.com",
+            name=f"{category} site {i}",
+            purpose=f"{rng.choice(purposes)}, {rng.choice(purposes)} and related posts",
+            platform=rng.choice(PLATFORMS)
+        ))
+    return submissions
+
+
+def make_embeddings(name: str):
+    if name == "fastembed":
+        if submission_matcher.FastEmbedEmbeddings is None:
+            sys.exit("fastembed is not installed; use --embedder hashing")
+        return submission_matcher.FastEmbedEmbeddings()
+    return HashingEmbeddings()
+
+
+async def run_match(matcher, summary, submissions, strategy):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await matcher.find_best_match(summary, submissions, strategy)
+    return result, time.perf_counter() - start
+
+
+def benchmark_strategy(strategy: str, summary: SummaryData, submissions, embeddings, live: bool) -> Dict[str, float]:
+    llm = None if live else StubChatModel()
+    matcher = SubmissionMatcher(llm=llm, embeddings=embeddings)
+    top_k = prefilter_top_k(strategy)
+
+    # Without the prefilter: every submission goes into the prompt
+    submission_matcher.PREFILTER_TOP_K[strategy] = 0
+    _, full_seconds = asyncio.run(run_match(matcher, summary, submissions, strategy))
+    submission_matcher.PREFILTER_TOP_K[strategy] = top_k
+
+    clear_embedding_cache()
+    _, cold_seconds = asyncio.run(run_match(matcher, summary, submissions, strategy))
+    result, warm_seconds = asyncio.run(run_match(matcher, summary, submissions, strategy))
+
+    row = {
+        "top_k": top_k,
+        "candidates": result.candidate_count,
+        "full_seconds": full_seconds,
+        "cold_seconds": cold_seconds,
+        "warm_seconds": warm_seconds,
+    }
+    if llm is not None:
+        row["full_tokens"] = llm.prompt_chars[0] / 4
+        row["prefiltered_tokens"] = llm.prompt_chars[-1] / 4
+        on_topic = [name for name in llm.shown[-1] if name.startswith("health-")]
+        row["on_topic"] = len(on_topic) / max(1, len(llm.shown[-1]))
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submission matcher prefilter benchmark")
+    parser.add_argument("--submissions", type=int, default=500, help="Synthetic submissions to match against")
+    parser.add_argument("--embedder", choices=["fastembed", "hashing"],
+                        default="fastembed" if submission_matcher.FastEmbedEmbeddings is not None else "hashing")
+    parser.add_argument("--live", action="store_true", help="Call the configured OpenAI model instead of the stub")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print("🚀 Submission Matcher Prefilter Benchmark")
+    print("=" * 80)
+    print(f"📊 Setup: {args.submissions} submissions over {len(TOPICS)} topics, embedder: {args.embedder}, "
+          f"LLM: {'live' if args.live else 'stub'}")
+
+    submissions = make_submissions(args.submissions, args.seed)
+    embeddings = make_embeddings(args.embedder)
+    summary = SummaryData(
+        category="Health misinformation",
+        purpose="Sites pushing miracle herbal cures and vaccine side effect myths",
+        platform="Video channel",
+        strategy="Check medical claims against peer reviewed sources"
+    )
+
+    rows = {strategy: benchmark_strategy(strategy, summary, submissions, embeddings, args.live)
+            for strategy in ("comprehensive", "purpose_focused", "platform_focused")}
+
+    print(f"\n📈 Per match")
+    print("=" * 80)
+    header = f"{'Strategy':<18}{'k':>5}{'all s':>9}{'cold s':>9}{'warm s':>9}"
+    if not args.live:
+        header += f"{'all tokens':>12}{'k tokens':>10}{'on topic':>10}"
+    print(header)
+    for strategy, row in rows.items():
+        line = (f"{strategy:<18}{row['top_k']:>5}{row['full_seconds']:>9.3f}"
+                f"{row['cold_seconds']:>9.3f}{row['warm_seconds']:>9.3f}")
+        if not args.live:
+            line += f"{row['full_tokens']:>12.0f}{row['prefiltered_tokens']:>10.0f}{row['on_topic']:>10.0%}"
+        print(line)
+    if not args.live:
+        print("\nTokens are prompt characters / 4. 'on topic' is the share of ranked submissions from the summary's topic "
+              f"(1 in {len(TOPICS)} of all submissions).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Performance benchmark for the theme creator clustering engines.
+Clusters synthetic embedding vectors (100 to 20,000) with full-batch KMeans,
+MiniBatchKMeans and spherical k-means, reporting fit time and a sampled cosine
+silhouette score, plus the time taken by automatic theme count selection.
+"""
+
+import argparse
+import sys
+import time
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.append('.')
+
+# Suppress tokenizer warnings for cleaner output
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+from services.deployment_types.theme_creator import (
+    run_clustering, estimate_silhouette, select_num_clusters, CLUSTERING_THREADS,
+)
+
+
+def create_benchmark_vectors(count: int, dimensions: int, num_topics: int, seed: int = 42) -> np.ndarray:
+    """Create embedding-like vectors: noisy points around a few topic directions."""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(num_topics, dimensions))
+    assignments = rng.integers(0, num_topics, size=count)
+    vectors = topics[assignments] + 0.8 * rng.normal(size=(count, dimensions))
+    return vectors.astype(np.float32)
+
+
+def benchmark_engine(vectors: np.ndarray, engine: str, k: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    labels, _ = run_clustering(vectors, k, engine)
+    fit_time = time.perf_counter() - start
+    return {
+        "fit_time": fit_time,
+        "silhouette": estimate_silhouette(vectors, labels),
+        "clusters": len(np.unique(labels)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Theme clustering engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000], help="Vector counts")
+    parser.add_argument("--engines", nargs="+", default=["kmeans", "minibatch", "spherical"], help="Engines to compare")
+    parser.add_argument("--k", type=int, default=6, help="Number of themes")
+    parser.add_argument("--dimensions", type=int, default=384, help="Embedding dimensions (FastEmbed default is 384)")
+    parser.add_argument("--max-auto-themes", type=int, default=8, help="Upper bound for automatic theme count selection")
+    args = parser.parse_args()
+
+    print("🚀 Theme Clustering Engine Benchmark")
+    print("=" * 80)
+    print(f"📊 Setup: k={args.k}, {args.dimensions}-d vectors, {CLUSTERING_THREADS} clustering thread(s)")
+
+    rows: List[Dict[str, Any]] = []
+    for count in args.sizes:
+        vectors = create_benchmark_vectors(count, args.dimensions, num_topics=args.k)
+        print(f"\n🧪 {count} vectors")
+        for engine in args.engines:
+            result = benchmark_engine(vectors, engine, args.k)
+            rows.append({"count": count, "engine": engine, **result})
+            print(f"   {engine:<10} fit: {result['fit_time'] * 1000:>9.1f}ms  "
+                  f"silhouette: {result['silhouette']:.3f}  clusters: {result['clusters']}")
+
+        start = time.perf_counter()
+        best_k, scores = select_num_clusters(vectors, 2, args.max_auto_themes, "auto")
+        select_time = time.perf_counter() - start
+        print(f"   auto k     -> {best_k} in {select_time * 1000:.1f}ms "
+              f"(silhouette by k: {', '.join(f'{k}={score:.2f}' for k, score in scores.items())})")
+
+    print(f"\n📈 Summary (fit time, ms)")
+    print("=" * 80)
+    print(f"{'Vectors':>8}" + "".join(f"{engine:>14}" for engine in args.engines))
+    for count in args.sizes:
+        times = {row["engine"]: row["fit_time"] for row in rows if row["count"] == count}
+        print(f"{count:>8}" + "".join(f"{times[engine] * 1000:>14.1f}" for engine in args.engines))
+
+
+if __name__ == "__main__":
+    main()
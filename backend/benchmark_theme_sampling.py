@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for ThemeCreatorBehavior chunk filtering and diversity sampling.
+Compares the previous per-chunk Python implementation (pdist/squareform matrix
+plus a double loop, per-chunk relevance checks) against the NumPy-vectorized
+versions on synthetic PDF chunks, and checks both pick the same chunks.
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.append('.')
+
+from services.deployment_types.theme_creator import (
+    ThemeCreatorBehavior, EXCLUDE_PATTERNS, UI_INDICATORS, QUALITY_INDICATORS,
+)
+
+SENTENCES = [
+    "Researchers at the university published findings on coastal erosion and sediment transport.",
+    "According to officials, the investigation confirmed that the data had been altered before release.",
+    "The study used a mixed-method approach, combining interviews with a statistical analysis of records.",
+    "Despite the funding cuts, the team estimated that the new method reduced costs by approximately 30 percent.",
+    "Students argued that renewable energy policy should prioritize grid storage over new generation capacity.",
+    "Historical accounts of the trade route suggest that merchants adapted quickly to changing tariffs.",
+    "The spokesperson stated that the results would be reviewed by independent experts later this year.",
+    "Machine learning models trained on biased samples tend to reproduce those biases in their predictions.",
+]
+WEB_NOISE = [
+    "Sign in | Menu | Home | Search | Subscribe to our newsletter",
+    "Advertisement. Tired of too many ads? Go ad free now. Trending now: celebrity gossip",
+    "Copyright © 2024 All rights reserved. Privacy policy. Terms of service. Contact us.",
+    "SHARE THIS ARTICLE ON FACEBOOK TWITTER LINKEDIN",
+    "Updated: 10:32 IST | Published: 09:15 IST | Lifestyle/ Entertainment/",
+    "Read more >> Load more >> View all >> Related articles you may also like",
+]
+
+
+def create_benchmark_chunks(count: int, dimensions: int, seed: int = 7) -> List[Tuple[str, List[float]]]:
+    """Create synthetic (text, vector) chunks with a mix of article text and web artifacts."""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    centers = np_rng.normal(size=(16, dimensions))
+    vectors = centers[np_rng.integers(0, len(centers), size=count)] + 0.3 * np_rng.normal(size=(count, dimensions))
+
+    chunks = []
+    for i in range(count):
+        if rng.random() < 0.3:
+            text = rng.choice(WEB_NOISE)
+        else:
+            # Article chunks of roughly the ingestion chunk_size (800 characters)
+            text = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 8)))
+        chunks.append((text, vectors[i].tolist()))
+    return chunks
+
+
+def legacy_is_relevant_content(text: str) -> bool:
+    """The per-chunk relevance check as it was before vectorization."""
+    text_lower = text.lower().strip()
+    original_text = text.strip()
+    if len(text_lower) < 40 or len(text_lower) > 1000:
+        return False
+    exclude_count = sum(1 for pattern in EXCLUDE_PATTERNS if pattern in text_lower)
+    if exclude_count >= 2:
+        return False
+    ui_count = sum(1 for indicator in UI_INDICATORS if indicator in text_lower)
+    if ui_count >= 2:
+        return False
+    words = text_lower.split()
+    if len(words) < 8:
+        return False
+    capital_ratio = sum(1 for c in original_text if c.isupper()) / len(original_text)
+    if capital_ratio > 0.3:
+        return False
+    special_chars = sum(1 for c in text if not c.isalnum() and not c.isspace())
+    if special_chars > len(text) * 0.2:
+        return False
+    quality_count = sum(1 for indicator in QUALITY_INDICATORS if indicator in text_lower)
+    has_quality_content = quality_count >= 1 or len(words) >= 15
+    has_sentences = '.' in text and len([s for s in text.split('.') if len(s.strip()) > 8]) >= 1
+    has_no_major_exclusions = exclude_count == 0 and ui_count == 0
+    return (has_quality_content and has_sentences) or (has_no_major_exclusions and len(words) >= 12 and has_sentences)
+
+
+def legacy_sample_diverse_chunks(chunks: List[Tuple[str, List[float]]], max_chunks: int) -> List[int]:
+    """The pdist/squareform double-loop sampler as it was before vectorization."""
+    from scipy.spatial.distance import pdist, squareform
+
+    vectors = np.array([chunk[1] for chunk in chunks])
+    distance_matrix = squareform(pdist(vectors, metric='cosine'))
+    selected_indices = [0]
+    remaining_indices = list(range(1, len(chunks)))
+    for _ in range(max_chunks - 1):
+        max_min_distance = -1
+        best_candidate = None
+        for candidate_idx in remaining_indices:
+            min_distance = min(distance_matrix[candidate_idx][selected_idx] for selected_idx in selected_indices)
+            if min_distance > max_min_distance:
+                max_min_distance = min_distance
+                best_candidate = candidate_idx
+        selected_indices.append(best_candidate)
+        remaining_indices.remove(best_candidate)
+    return selected_indices
+
+
+def timed(func, *args) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def benchmark_size(behavior: ThemeCreatorBehavior, count: int, args) -> Dict[str, Any]:
+    chunks = create_benchmark_chunks(count, args.dimensions)
+    texts = [text for text, _ in chunks]
+    result: Dict[str, Any] = {"count": count}
+
+    result["filter_new"], new_mask = timed(behavior._relevant_content_mask, texts)
+    result["filter_old"], old_mask = timed(lambda: [legacy_is_relevant_content(t) for t in texts])
+    assert list(new_mask) == old_mask, "Vectorized relevance filter disagrees with the per-chunk filter"
+
+    # Time the sampler via the behavior so the chunk -> vector conversion is included
+    result["sample_new"], sampled = timed(behavior._sample_diverse_chunks, chunks, args.k)
+    position = {id(chunk): i for i, chunk in enumerate(chunks)}
+    new_indices = [position[id(chunk)] for chunk in sampled]
+
+    # The dense cosine matrix needs count^2 * 8 bytes (twice, for pdist + squareform)
+    matrix_gb = count * count * 8 * 1.5 / 1e9
+    if count <= args.legacy_max:
+        result["sample_old"], old_indices = timed(legacy_sample_diverse_chunks, chunks, args.k)
+        assert new_indices == old_indices, "Vectorized sampler picked different chunks"
+    else:
+        result["sample_old"] = None
+        result["sample_old_note"] = f"skipped (~{matrix_gb:.1f} GB distance matrix)"
+    return result
+
+
+def format_speedup(old: float, new: float) -> str:
+    return f"{old / new:.1f}x" if new else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Theme creator chunk filtering/sampling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Chunk counts to benchmark")
+    parser.add_argument("--k", type=int, default=8, help="Chunks to sample (max_chunks_per_student)")
+    parser.add_argument("--dimensions", type=int, default=384, help="Embedding dimensions (FastEmbed default is 384)")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="Largest size to run the dense-matrix sampler on")
+    args = parser.parse_args()
+
+    print("🚀 Theme Creator Chunk Filtering & Sampling Benchmark")
+    print("=" * 80)
+    print(f"📊 Setup: k={args.k}, {args.dimensions}-d vectors, sizes {args.sizes}")
+
+    behavior = ThemeCreatorBehavior({"filter_web_content": True})
+    # Warm up the character lookup tables so they are not billed to the first size
+    behavior._relevant_content_mask(["warm up the lookup tables for the benchmark."])
+
+    results = []
+    for count in args.sizes:
+        print(f"\n🧪 {count} chunks")
+        result = benchmark_size(behavior, count, args)
+        results.append(result)
+        print(f"   Relevance filter: {result['filter_old'] * 1000:.1f}ms -> {result['filter_new'] * 1000:.1f}ms "
+              f"({format_speedup(result['filter_old'], result['filter_new'])})")
+        if result["sample_old"] is not None:
+            print(f"   Diverse sampling: {result['sample_old'] * 1000:.1f}ms -> {result['sample_new'] * 1000:.1f}ms "
+                  f"({format_speedup(result['sample_old'], result['sample_new'])})")
+        else:
+            print(f"   Diverse sampling: {result['sample_old_note']} -> {result['sample_new'] * 1000:.1f}ms")
+
+    print(f"\n📈 Summary")
+    print("=" * 80)
+    print(f"{'Chunks':>8}{'filter old':>14}{'filter new':>14}{'sample old':>14}{'sample new':>14}")
+    for result in results:
+        sample_old = f"{result['sample_old'] * 1000:.1f}ms" if result["sample_old"] is not None else "skipped"
+        print(f"{result['count']:>8}{result['filter_old'] * 1000:>12.1f}ms{result['filter_new'] * 1000:>12.1f}ms"
+              f"{sample_old:>14}{result['sample_new'] * 1000:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
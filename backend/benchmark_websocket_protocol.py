@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark of websocket message encodings for a live presentation broadcast.
+Sends a prompt carrying group submission responses to a simulated session
+(300 students in groups of 5 by default), captures the messages each student is
+sent, and reports per broadcast the serialization CPU time and the bytes on the
+wire for json.dumps, orjson and msgpack, raw and after permessage-deflate.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, List
+
+# Add the current directory to Python path
+sys.path.append('.')
+
+from services import websocket_protocol
+from services.deployment_types.live_presentation import LivePresentationDeployment
+
+WORDS = ("river", "erosion", "sediment", "policy", "evidence", "source", "bias", "sample",
+         "interview", "archive", "trade", "tariff", "climate", "model", "survey", "claim")
+
+
+class CaptureWebSocket:
+    def __init__(self):
+        self.messages: List[Dict[str, Any]] = []
+
+    async def send_text(self, text):
+        self.messages.append(json.loads(text))
+
+
+def make_submissions(students: List[str], responses_per_student: int, words: int) -> Dict[str, Any]:
+    return {
+        "students": [
+            {"name": name, "submission_responses": {
+                f"submission_{k}": {
+                    "response": " ".join(WORDS[(i * 7 + k * 3 + w) % len(WORDS)] for w in range(words)),
+                    "media_type": "text",
+                }
+                for k in range(responses_per_student)
+            }}
+            for i, name in enumerate(students)
+        ]
+    }
+
+
+async def capture_broadcast(num_students: int, group_size: int, responses: int, words: int) -> List[Dict[str, Any]]:
+    """The messages one prompt broadcast sends, one list entry per student"""
+    students = [f"Student {i}" for i in range(num_students)]
+    groups = {f"Group{g + 1}": students[start:start + group_size]
+              for g, start in enumerate(range(0, num_students, group_size))}
+
+    presentation = LivePresentationDeployment({"title": "Benchmark"}, "deploy-benchmark")
+    presentation.input_variable_data = groups
+    presentation._submission_data = make_submissions(students, responses, words)
+    presentation._response_summarizer = None
+    presentation.presentation_active = True
+
+    sockets = []
+    for i, name in enumerate(students):
+        sockets.append(CaptureWebSocket())
+        await presentation.connect_student(f"id-{i}", name, sockets[-1])
+    for ws in sockets:
+        ws.messages.clear()
+
+    await presentation.send_prompt_to_students({
+        "id": "p-bench", "statement": "Compare your group's sources", "include_submission_responses": True,
+    })
+    presentation.cleanup()
+    return [message for ws in sockets for message in ws.messages]
+
+
+def encoders() -> Dict[str, Callable[[Dict[str, Any]], bytes]]:
+    result = {"json.dumps": lambda message: json.dumps(message).encode()}
+    if websocket_protocol.orjson is not None:
+        result["orjson"] = lambda message: websocket_protocol.dumps_text(message).encode()
+    if websocket_protocol.msgpack is not None:
+        result["msgpack"] = websocket_protocol.MSGPACK_CODEC.encode
+    return result
+
+
+def deflated_size(frames: List[bytes]) -> int:
+    """Bytes after permessage-deflate (raw deflate, sync flush, trailing 4 bytes dropped)"""
+    total = 0
+    for frame in frames:
+        # A fresh compressor per frame, as each student's socket compresses its own message
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        total += len(compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total
+
+
+def benchmark_encoder(encode, messages: List[Dict[str, Any]], rounds: int) -> Dict[str, Any]:
+    frames = [encode(message) for message in messages]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            encode(message)
+    encode_time = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        deflated = deflated_size(frames)
+    deflate_time = (time.perf_counter() - start) / rounds
+    return {
+        "encode_ms": encode_time * 1000,
+        "deflate_ms": deflate_time * 1000,
+        "raw_bytes": sum(len(frame) for frame in frames),
+        "deflated_bytes": deflated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live presentation websocket encoding benchmark")
+    parser.add_argument("--students", type=int, default=300, help="Students in the session")
+    parser.add_argument("--group-size", type=int, default=5, help="Students per group")
+    parser.add_argument("--responses", type=int, default=3, help="Submission responses per student")
+    parser.add_argument("--words", type=int, default=80, help="Words per submission response")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed repetitions per encoder")
+    args = parser.parse_args()
+
+    print("🚀 Live Presentation WebSocket Encoding Benchmark")
+    print("=" * 80)
+    print(f"📊 Setup: {args.students} students, groups of {args.group_size}, "
+          f"{args.responses} submissions x {args.words} words each")
+
+    # The presentation logs every send; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        messages = asyncio.run(capture_broadcast(args.students, args.group_size, args.responses, args.words))
+    print(f"📨 One prompt broadcast = {len(messages)} messages ({', '.join(sorted({m['type'] for m in messages}))})")
+    if websocket_protocol.orjson is None:
+        print("⚠️  orjson not installed; skipped")
+    if websocket_protocol.msgpack is None:
+        print("⚠️  msgpack not installed; skipped")
+
+    results = {name: benchmark_encoder(encode, messages, args.rounds) for name, encode in encoders().items()}
+    baseline = results["json.dumps"]
+
+    print(f"\n📈 Per broadcast")
+    print("=" * 80)
+    print(f"{'Encoding':<12}{'encode ms':>12}{'deflate ms':>12}{'raw KB':>12}{'deflated KB':>14}{'vs json.dumps':>16}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['encode_ms']:>12.2f}{result['deflate_ms']:>12.2f}"
+              f"{result['raw_bytes'] / 1024:>12.1f}{result['deflated_bytes'] / 1024:>14.1f}"
+              f"{result['deflated_bytes'] / baseline['raw_bytes']:>15.0%}")
+
+
+if __name__ == "__main__":
+    main()
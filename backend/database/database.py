@@ -1,6 +1,11 @@
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy import text
+from sqlalchemy import text, event, inspect
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import queue
 import sys
+import threading
 from pathlib import Path
 
 # Add parent directory to path to import from config
@@ -10,10 +15,104 @@ from scripts.config import load_config
 # Load config
 config = load_config()
 
-engine = create_engine(
-    config.get("database", {}).get("url", "sqlite:///./database/app.db"), 
-    connect_args=config.get("database", {}).get("connect_args", {})
-)
+_database_config = config.get("database", {})
+DATABASE_URL = _database_config.get("url", "sqlite:///./database/app.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+SQLITE_SETTINGS = _database_config.get("sqlite", {}) or {}
+POOL_SETTINGS = _database_config.get("pool", {}) or {}
+POSTGRES_SETTINGS = _database_config.get("postgres", {}) or {}
+
+_SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+T = TypeVar("T")
+
+
+def _sqlite_pragmas(settings: dict) -> list[str]:
+    """Build the PRAGMA statements applied to every new SQLite connection in performance mode."""
+    journal_mode = str(settings.get("journal_mode", "WAL")).upper()
+    if journal_mode not in _SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLite journal_mode: {journal_mode}")
+
+    synchronous = str(settings.get("synchronous", "NORMAL")).upper()
+    if synchronous not in _SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported SQLite synchronous mode: {synchronous}")
+
+    busy_timeout_ms = int(settings.get("busy_timeout_ms", 15000))
+    mmap_size = int(settings.get("mmap_size_mb", 256)) * 1024 * 1024
+    # Negative cache_size is interpreted by SQLite as KiB instead of pages
+    cache_size_kib = int(settings.get("cache_size_mb", 64)) * 1024
+
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={busy_timeout_ms}",
+        f"PRAGMA mmap_size={mmap_size}",
+        f"PRAGMA cache_size=-{cache_size_kib}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def _postgres_connect_args(settings: dict) -> dict:
+    """Server-side timeouts passed as libpq startup options so every pooled connection gets them."""
+    options = []
+    statement_timeout_ms = int(settings.get("statement_timeout_ms", 30000))
+    if statement_timeout_ms > 0:
+        options.append(f"-c statement_timeout={statement_timeout_ms}")
+    lock_timeout_ms = int(settings.get("lock_timeout_ms", 10000))
+    if lock_timeout_ms > 0:
+        options.append(f"-c lock_timeout={lock_timeout_ms}")
+    idle_in_transaction_timeout_ms = int(settings.get("idle_in_transaction_timeout_ms", 60000))
+    if idle_in_transaction_timeout_ms > 0:
+        options.append(f"-c idle_in_transaction_session_timeout={idle_in_transaction_timeout_ms}")
+
+    connect_args = {"application_name": settings.get("application_name", "agent-builder")}
+    if options:
+        connect_args["options"] = " ".join(options)
+    connect_args["connect_timeout"] = int(settings.get("connect_timeout_seconds", 10))
+    return connect_args
+
+
+def _create_engine(database_url: Optional[str] = None):
+    """Build the app engine for database_url (default: the configured DATABASE_URL)."""
+    database_url = database_url or DATABASE_URL
+    if not database_url.startswith("sqlite"):
+        # Server databases (PostgreSQL): sized QueuePool with liveness checks
+        return create_engine(
+            database_url,
+            pool_size=int(POOL_SETTINGS.get("size", 10)),
+            max_overflow=int(POOL_SETTINGS.get("max_overflow", 20)),
+            pool_timeout=float(POOL_SETTINGS.get("timeout_seconds", 30)),
+            pool_recycle=int(POOL_SETTINGS.get("recycle_seconds", 1800)),
+            pool_pre_ping=True,
+            connect_args=_postgres_connect_args(POSTGRES_SETTINGS),
+        )
+
+    connect_args = dict(_database_config.get("connect_args", {}) or {})
+    performance_mode = bool(SQLITE_SETTINGS.get("performance_mode", False))
+
+    if performance_mode:
+        # pysqlite's own busy handler; keep it in line with PRAGMA busy_timeout
+        connect_args.setdefault("timeout", int(SQLITE_SETTINGS.get("busy_timeout_ms", 15000)) / 1000)
+
+    db_engine = create_engine(database_url, connect_args=connect_args)
+
+    if performance_mode:
+        pragmas = _sqlite_pragmas(SQLITE_SETTINGS)
+
+        @event.listens_for(db_engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return db_engine
+
+
+engine = _create_engine()
 
 
 def get_session():
@@ -21,56 +120,151 @@ def get_session():
         yield session
 
 
+class SerializedWriter:
+    """Runs write callbacks one at a time on a dedicated thread.
+    
+    SQLite allows a single writer; funnelling high-frequency writes (live responses,
+    prompt submissions) through one thread keeps API threads and the event loop from
+    contending for the write lock. Each callback receives its own Session and is
+    responsible for committing.
+    """
+
+    def __init__(self, db_engine, name: str = "db-writer"):
+        self._engine = db_engine
+        self._name = name
+        self._queue: "queue.Queue[Optional[tuple[Callable[[Session], Any], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, write: Callable[[Session], T]) -> "Future[T]":
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((write, future))
+        return future
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            write, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with Session(self._engine) as session:
+                    future.set_result(write(session))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+
+_serialized_writer: Optional[SerializedWriter] = (
+    SerializedWriter(engine) if IS_SQLITE and SQLITE_SETTINGS.get("serialized_writes", False) else None
+)
+
+
+def run_serialized_write(write: Callable[[Session], T]) -> T:
+    """Run a write callback on the serialized writer (or inline when it is disabled)."""
+    if _serialized_writer is None:
+        with Session(engine) as session:
+            return write(session)
+    return _serialized_writer.submit(write).result()
+
+
+async def run_serialized_write_async(write: Callable[[Session], T]) -> T:
+    """Async variant of run_serialized_write that never blocks the event loop."""
+    if _serialized_writer is None:
+        return await asyncio.to_thread(run_serialized_write, write)
+    return await asyncio.wrap_future(_serialized_writer.submit(write))
+
+
 def init_db():
     SQLModel.metadata.create_all(engine)
-    _apply_sqlite_migrations()
+    _apply_schema_migrations()
     # Recreate tables after migration (in case any were dropped)
     SQLModel.metadata.create_all(engine)
 
 
 def shutdown_db():
+    if _serialized_writer is not None:
+        _serialized_writer.shutdown(timeout=10)
     engine.dispose()
 
 
-def _apply_sqlite_migrations():
+def _quote(conn, name: str) -> str:
+    """Quote an identifier for the active dialect (e.g. "user" is reserved in PostgreSQL)."""
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def _existing_columns(conn, table_name: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table_name)}
+
+
+def _execute_migration(conn, stmt: str):
+    """Run a single migration statement.
+    
+    PostgreSQL aborts the whole transaction on the first error, so each statement runs
+    inside a savepoint there; SQLite keeps running statements directly.
+    """
+    if conn.dialect.name == "sqlite":
+        return conn.execute(text(stmt))
+    with conn.begin_nested():
+        return conn.execute(text(stmt))
+
+
+def _apply_schema_migrations():
     """Lightweight migrations to add newly introduced nullable columns safely.
     This keeps existing user data and adds columns if they are missing.
+    Uses the SQLAlchemy inspector so it runs on SQLite and PostgreSQL alike.
     """
     try:
         with engine.begin() as conn:
             # Inspect existing columns on the user table
-            result = conn.execute(text("PRAGMA table_info('user')"))
-            existing_columns = {row[1] for row in result.fetchall()}  # name is at index 1
+            existing_columns = _existing_columns(conn, 'user')
+            user_table = _quote(conn, 'user')
 
             migrations: list[tuple[str, str]] = []
 
             if 'first_name' not in existing_columns:
                 migrations.append((
                     'first_name',
-                    "ALTER TABLE user ADD COLUMN first_name TEXT"
+                    f"ALTER TABLE {user_table} ADD COLUMN first_name TEXT"
                 ))
 
             if 'last_name' not in existing_columns:
                 migrations.append((
                     'last_name',
-                    "ALTER TABLE user ADD COLUMN last_name TEXT"
+                    f"ALTER TABLE {user_table} ADD COLUMN last_name TEXT"
                 ))
 
             if 'about_me' not in existing_columns:
                 migrations.append((
                     'about_me',
-                    "ALTER TABLE user ADD COLUMN about_me TEXT"
+                    f"ALTER TABLE {user_table} ADD COLUMN about_me TEXT"
                 ))
 
             if 'birthday' not in existing_columns:
                 # Store as TEXT (YYYY-MM-DD) for SQLite compatibility
                 migrations.append((
                     'birthday',
-                    "ALTER TABLE user ADD COLUMN birthday TEXT"
+                    f"ALTER TABLE {user_table} ADD COLUMN birthday TEXT"
                 ))
 
             for _, stmt in migrations:
-                conn.execute(text(stmt))
+                _execute_migration(conn, stmt)
             
             # Theme table migrations
             _apply_theme_table_migrations(conn)
@@ -80,17 +274,23 @@ def _apply_sqlite_migrations():
             
             # Page deployment variable table migrations
             _apply_page_variable_table_migrations(conn)
+            
+            # Composite indexes for hot lookups
+            _apply_index_migrations(conn)
     except Exception:
         # Avoid startup failure due to best-effort migration
         pass
 
 
+# Previous name, kept for scripts that import it directly
+_apply_sqlite_migrations = _apply_schema_migrations
+
+
 def _apply_theme_table_migrations(conn):
     """Apply migrations for theme-related tables."""
     try:
         # Check if theme_assignments table exists
-        result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='theme_assignments'"))
-        if not result.fetchone():
+        if not inspect(conn).has_table('theme_assignments'):
             return  # Table doesn't exist yet, will be created by SQLModel
         
         # Check if theme tables need migration (only recreate if schema is wrong)
@@ -98,44 +298,36 @@ def _apply_theme_table_migrations(conn):
         
         # Check if theme tables exist and have correct schema
         try:
-            result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='theme_assignments'"))
-            theme_assignment_exists = result.fetchone() is not None
+            # Check if theme_assignment table has all required columns
+            theme_columns = _existing_columns(conn, 'theme_assignments')
+            required_columns = {'id', 'execution_id', 'page_deployment_id', 'total_students', 'total_themes', 'num_themes_target', 'clustering_method', 'includes_llm_polish', 'llm_polish_prompt', 'created_at', 'is_active'}
             
-            if theme_assignment_exists:
-                # Check if theme_assignment table has all required columns
-                result = conn.execute(text("PRAGMA table_info('theme_assignments')"))
-                theme_columns = {row[1] for row in result.fetchall()}
-                required_columns = {'id', 'execution_id', 'page_deployment_id', 'total_students', 'total_themes', 'num_themes_target', 'clustering_method', 'includes_llm_polish', 'llm_polish_prompt', 'created_at', 'is_active'}
-                
-                if required_columns.issubset(theme_columns):
-                    print("✅ Theme tables exist with correct schema - preserving data")
-                else:
-                    print("⚠️ Theme tables exist but schema is outdated - recreating...")
-                    theme_tables = [
-                        'theme_student_associations',
-                        'theme_snippets', 
-                        'theme_keywords',
-                        'themes',
-                        'theme_assignments'
-                    ]
-                    # Drop theme tables in correct order (respecting foreign keys)
-                    for table in theme_tables:
-                        try:
-                            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
-                        except Exception as e:
-                            print(f"Warning dropping {table}: {e}")
+            if required_columns.issubset(theme_columns):
+                print("✅ Theme tables exist with correct schema - preserving data")
             else:
-                print("Theme tables don't exist - will be created by SQLModel")
+                print("⚠️ Theme tables exist but schema is outdated - recreating...")
+                theme_tables = [
+                    'theme_student_associations',
+                    'theme_snippets', 
+                    'theme_keywords',
+                    'themes',
+                    'theme_assignments'
+                ]
+                # Drop theme tables in correct order (respecting foreign keys)
+                for table in theme_tables:
+                    try:
+                        _execute_migration(conn, f"DROP TABLE IF EXISTS {_quote(conn, table)}")
+                    except Exception as e:
+                        print(f"Warning dropping {table}: {e}")
         except Exception as e:
             print(f"Theme table schema check failed: {e} - will let SQLModel handle creation")
         
         # Check if output_themes_created column exists in behavior_execution_history
         try:
-            result = conn.execute(text("PRAGMA table_info('behaviorexecutionhistory')"))
-            behavior_columns = {row[1] for row in result.fetchall()}
+            behavior_columns = _existing_columns(conn, 'behaviorexecutionhistory')
             
             if 'output_themes_created' not in behavior_columns:
-                conn.execute(text("ALTER TABLE behaviorexecutionhistory ADD COLUMN output_themes_created INTEGER"))
+                _execute_migration(conn, "ALTER TABLE behaviorexecutionhistory ADD COLUMN output_themes_created INTEGER")
         except Exception:
             pass  # Table might not exist yet
             
@@ -148,13 +340,17 @@ def _apply_theme_table_migrations(conn):
 def _apply_live_presentation_table_migrations(conn):
     """Apply migrations for live presentation tables."""
     try:
-        # Live presentation tables are new, so we just ensure they will be created
-        # by SQLModel.metadata.create_all() after migrations
-        # 
-        # If we need to migrate existing live presentation data in the future,
-        # we can add specific migrations here
+        # Live presentation tables are created by SQLModel.metadata.create_all() after migrations;
+        # columns added later are migrated here
+        if not inspect(conn).has_table('livepresentationsession'):
+            print("Live presentation tables will be created by SQLModel if they don't exist")
+            return
         
-        print("Live presentation tables will be created by SQLModel if they don't exist")
+        session_columns = _existing_columns(conn, 'livepresentationsession')
+        if 'timer_ends_at' not in session_columns:
+            _execute_migration(conn, "ALTER TABLE livepresentationsession ADD COLUMN timer_ends_at TIMESTAMP")
+        if 'timer_duration_seconds' not in session_columns:
+            _execute_migration(conn, "ALTER TABLE livepresentationsession ADD COLUMN timer_duration_seconds INTEGER DEFAULT 0")
         
     except Exception as e:
         print(f"Live presentation table migration failed: {e}")
@@ -165,14 +361,12 @@ def _apply_page_variable_table_migrations(conn):
     """Apply migrations for PageDeploymentVariable table to add new columns."""
     try:
         # Check if pagedeploymentvariable table exists
-        result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='pagedeploymentvariable'"))
-        if not result.fetchone():
+        if not inspect(conn).has_table('pagedeploymentvariable'):
             print("PageDeploymentVariable table doesn't exist yet, will be created by SQLModel")
             return  # Table doesn't exist yet, will be created by SQLModel
         
         # Check existing columns
-        result = conn.execute(text("PRAGMA table_info('pagedeploymentvariable')"))
-        existing_columns = {row[1] for row in result.fetchall()}  # name is at index 1
+        existing_columns = _existing_columns(conn, 'pagedeploymentvariable')
         
         migrations = []
         
@@ -203,7 +397,7 @@ def _apply_page_variable_table_migrations(conn):
         for column_name, stmt in migrations:
             try:
                 print(f"Adding column '{column_name}' to pagedeploymentvariable table...")
-                conn.execute(text(stmt))
+                _execute_migration(conn, stmt)
                 print(f"✅ Successfully added column '{column_name}'")
             except Exception as e:
                 print(f"⚠️ Migration for column '{column_name}' failed: {e}")
@@ -213,3 +407,37 @@ def _apply_page_variable_table_migrations(conn):
     except Exception as e:
         print(f"Page variable table migration failed: {e}")
         pass
+
+
+def _apply_index_migrations(conn):
+    """Create non-unique indexes declared on the models that are missing from existing tables.
+    
+    create_all() only emits indexes when it creates a table, so composite indexes added
+    to __table_args__ later (e.g. ix_submission_problem_user_submitted) never reach an
+    existing database without this step.
+    """
+    try:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue  # Table doesn't exist yet, will be created by SQLModel with its indexes
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.unique or index.name in existing_indexes:
+                    continue
+                try:
+                    print(f"Creating index '{index.name}' on {table.name}...")
+                    if conn.dialect.name == "sqlite":
+                        index.create(conn, checkfirst=True)
+                    else:
+                        with conn.begin_nested():
+                            index.create(conn, checkfirst=True)
+                    print(f"✅ Successfully created index '{index.name}'")
+                except Exception as e:
+                    print(f"⚠️ Creating index '{index.name}' failed: {e}")
+        
+    except Exception as e:
+        print(f"Index migration failed: {e}")
+        pass
@@ -27,6 +27,7 @@ from pathlib import Path
 from scripts.config import load_config
 import os
 from api.summary_routes import router as summary_router
+from api.task_queue_routes import router as task_queue_router
 
 # Load config
 config = load_config()
@@ -118,6 +119,7 @@ app.include_router(video_router)
 app.include_router(deployment_router)
 app.include_router(file_storage_router)
 app.include_router(summary_router)
+app.include_router(task_queue_router)
 
 @app.get("/")
 def read_root():
@@ -162,6 +164,7 @@ if __name__ == "__main__":
         reload=True,
         ws_ping_interval=30,  # WebSocket ping interval
         ws_ping_timeout=10,   # WebSocket ping timeout
+        ws_per_message_deflate=config.get("websocket", {}).get("per_message_deflate", True),  # compress websocket frames
         access_log=True,
         log_level="info"
     )
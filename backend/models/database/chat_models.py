@@ -1,5 +1,5 @@
 import datetime as dt
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column, Index
 from typing import List, Optional
 
 
@@ -27,4 +27,9 @@ class ChatMessage(SQLModel, table=True):
     created_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
     
     # Relationships
-    conversation: Optional[ChatConversation] = Relationship(back_populates="messages") 
+    conversation: Optional[ChatConversation] = Relationship(back_populates="messages")
+    
+    __table_args__ = (
+        Index("ix_chatmessage_conversation_created", "conversation_id", "created_at"),
+    )
+
@@ -1,5 +1,5 @@
 import datetime as dt
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, Index
 from typing import List, Optional
 from ..enums import ClassRole
 
@@ -34,6 +34,7 @@ class ClassMembership(SQLModel, table=True):
     # Ensure unique user-class combination
     __table_args__ = (
         UniqueConstraint("class_id", "user_id", name="unique_class_user"),
+        Index("ix_classmembership_user_class_active", "user_id", "class_id", "is_active"),
     ) 
 
 
@@ -1,5 +1,5 @@
 import datetime as dt
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column, UniqueConstraint, Index
 from typing import List, Optional, Any
 from ..enums import SubmissionStatus
 from .deployment_models import DeploymentProblemLink
@@ -63,4 +63,9 @@ class Submission(SQLModel, table=True):
 
     # Relationships
     user: Optional["User"] = Relationship(back_populates="submissions")
-    problem: "Problem" = Relationship(back_populates="submissions") 
+    problem: "Problem" = Relationship(back_populates="submissions")
+
+    __table_args__ = (
+        Index("ix_submission_problem_user_submitted", "problem_id", "user_id", "submitted_at"),
+    )
+
@@ -1,7 +1,7 @@
 from ..enums import ClassRole, SubmissionStatus, DeploymentType
 from .user_models import User, AuthSession
 from .class_models import Class, ClassMembership, AutoEnrollClass
-from .workflow_models import Workflow, Document, Video
+from .workflow_models import Workflow, Document, Video, StoredBlob
 from .deployment_models import Deployment, DeploymentProblemLink
 from .code_models import Problem, TestCase, UserProblemState, Submission
 from .chat_models import ChatConversation, ChatMessage
@@ -9,7 +9,7 @@ from .mcq_models import MCQSession, MCQAnswer, MCQChatConversation, MCQChatMessa
 from .prompt_models import PromptSession, PromptSubmission
 from .video_models import VideoSession
 from .grading_models import StudentDeploymentGrade
-from .page_models import PageDeploymentState, PageDeploymentVariable, BehaviorExecutionHistory
+from .page_models import PageDeploymentState, PageDeploymentVariable, BehaviorExecutionHistory, BehaviorExecutionCheckpoint
 from .grouping_models import GroupAssignment, Group, GroupMember
 from .theme_models import ThemeAssignment, Theme, ThemeKeyword, ThemeSnippet, ThemeStudentAssociation
 from .live_presentation_models import (
@@ -33,6 +33,7 @@ __all__ = [
     "Workflow",
     "Document",
     "Video",
+    "StoredBlob",
     "ChatConversation",
     "ChatMessage",
     "Deployment",
@@ -51,6 +52,7 @@ __all__ = [
     "PageDeploymentState",
     "PageDeploymentVariable",
     "BehaviorExecutionHistory",
+    "BehaviorExecutionCheckpoint",
     "GroupAssignment",
     "Group",
     "GroupMember",
@@ -1,5 +1,5 @@
 import datetime as dt
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column, UniqueConstraint, Index
 from typing import List, Optional, Dict, Any
 
 
@@ -29,6 +29,10 @@ class LivePresentationSession(SQLModel, table=True):
     # Navigation state for group submission navigation
     navigation_state: Dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
     
+    # Running timer as an absolute deadline (UTC), shared by every worker serving the session
+    timer_ends_at: dt.datetime | None = None
+    timer_duration_seconds: int = Field(default=0)
+    
     # Metadata
     created_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
     updated_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
@@ -107,6 +111,10 @@ class LivePresentationResponse(SQLModel, table=True):
     # Relationships
     session: Optional["LivePresentationSession"] = Relationship(back_populates="student_responses")
     student_connection: Optional["LivePresentationStudentConnection"] = Relationship(back_populates="responses")
+    
+    __table_args__ = (
+        Index("ix_livepresentationresponse_session_prompt", "session_id", "prompt_id"),
+    )
 
 
 class LivePresentationPrompt(SQLModel, table=True):
@@ -89,3 +89,22 @@ class BehaviorExecutionHistory(SQLModel, table=True):
     # Relationships
     page_deployment: Optional["PageDeploymentState"] = Relationship(back_populates="behavior_executions")
     executed_by: Optional["User"] = Relationship()  # type: ignore 
+
+
+class BehaviorExecutionCheckpoint(SQLModel, table=True):
+    """Intermediate artifact of one stage of a behavior execution (e.g. vectors, clustering)"""
+    id: int | None = Field(default=None, primary_key=True)
+    execution_id: str = Field(index=True)  # BehaviorExecutionHistory.execution_id
+    stage: str
+    
+    # Hash of the inputs the artifact was computed from; a mismatch means it is stale
+    input_fingerprint: str | None = None
+    is_complete: bool = Field(default=True)  # False while a stage saves partial progress
+    artifact: Dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
+    
+    created_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
+    updated_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
+    
+    __table_args__ = (
+        UniqueConstraint("execution_id", "stage", name="unique_execution_stage"),
+    )
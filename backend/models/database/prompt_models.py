@@ -1,5 +1,5 @@
 import datetime as dt
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column, UniqueConstraint, Index
 from typing import List, Optional, Dict, Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -27,6 +27,7 @@ class PromptSession(SQLModel, table=True):
     
     __table_args__ = (
         UniqueConstraint("user_id", "deployment_id", name="unique_user_prompt_session"),
+        Index("ix_promptsession_deployment_active_completed", "deployment_id", "is_active", "completed_at"),
     )
 
 
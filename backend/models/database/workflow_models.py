@@ -84,3 +84,11 @@ class Video(SQLModel, table=True):
 
     uploaded_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
     is_active: bool = True
+
+
+class StoredBlob(SQLModel, table=True):
+    """One stored file content (content-addressed by SHA-256), shared by every upload of it."""
+    sha256: str = Field(primary_key=True, max_length=64)
+    size: int
+    ref_count: int = 0  # Storage paths (workflow_id/upload_id/filename links) pointing at this blob
+    created_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
@@ -7,30 +7,33 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlmodel import create_engine, Session
-from sqlalchemy import text
-from scripts.config import load_config
+from sqlmodel import Session
+from sqlalchemy import text, inspect
+from database.database import engine
+from models.database.mcq_models import MCQChatConversation, MCQChatMessage
+
+
+def _existing_columns(session: Session, table_name: str) -> list[str]:
+    """Column names of a table, via the SQLAlchemy inspector (works on SQLite and PostgreSQL)"""
+    return [column["name"] for column in inspect(session.connection()).get_columns(table_name)]
+
 
 def run_migration_now():
     """Run all necessary migrations"""
-    config = load_config()
-    database_url = config.get("database", {}).get("url", "sqlite:///./database/app.db")
-    connect_args = config.get("database", {}).get("connect_args", {})
-    
-    engine = create_engine(database_url, connect_args=connect_args)
-    
     # Migration 1: Add assigned_list_items column
     with Session(engine) as session:
         try:
             print("🔧 Adding assigned_list_items column to livepresentationstudentconnection table...")
             
-            # Try to add the column (will fail if it already exists, which is fine)
-            session.execute(text("""
-                ALTER TABLE livepresentationstudentconnection 
-                ADD COLUMN assigned_list_items TEXT DEFAULT '{}'
-            """))
-            session.commit()
-            print("✅ Successfully added assigned_list_items column!")
+            if 'assigned_list_items' in _existing_columns(session, 'livepresentationstudentconnection'):
+                print("✅ assigned_list_items column already exists - no action needed")
+            else:
+                session.execute(text("""
+                    ALTER TABLE livepresentationstudentconnection 
+                    ADD COLUMN assigned_list_items TEXT DEFAULT '{}'
+                """))
+                session.commit()
+                print("✅ Successfully added assigned_list_items column!")
             
         except Exception as e:
             if "duplicate column name" in str(e).lower() or "already exists" in str(e).lower():
@@ -55,9 +58,8 @@ def run_migration_now():
         try:
             print("🔧 Adding button customization columns to pagedeploymentstate table...")
             
-            # Check if columns already exist using SQLite's PRAGMA table_info
-            result = session.execute(text("PRAGMA table_info(pagedeploymentstate)")).fetchall()
-            existing_columns = [row[1] for row in result]  # Column name is at index 1
+            # Check if columns already exist
+            existing_columns = _existing_columns(session, 'pagedeploymentstate')
             
             if 'student_button_text' not in existing_columns:
                 print("➕ Adding student_button_text column...")
@@ -111,15 +113,14 @@ def run_migration_now():
         try:
             print("🔧 Adding due_date column to pagedeploymentstate table...")
             
-            # Check if column already exists using SQLite's PRAGMA table_info
-            result = session.execute(text("PRAGMA table_info(pagedeploymentstate)")).fetchall()
-            existing_columns = [row[1] for row in result]  # Column name is at index 1
+            # Check if column already exists
+            existing_columns = _existing_columns(session, 'pagedeploymentstate')
             
             if 'due_date' not in existing_columns:
                 print("➕ Adding due_date column...")
                 session.execute(text("""
                     ALTER TABLE pagedeploymentstate 
-                    ADD COLUMN due_date DATETIME DEFAULT NULL
+                    ADD COLUMN due_date TIMESTAMP DEFAULT NULL
                 """))
                 print("✅ Added due_date column")
             else:
@@ -139,8 +140,7 @@ def run_migration_now():
     with Session(engine) as session:
         try:
             print("🔧 Adding navigation_state column to livepresentationsession table...")
-            result = session.execute(text("PRAGMA table_info(livepresentationsession)")).fetchall()
-            existing_columns = [row[1] for row in result]
+            existing_columns = _existing_columns(session, 'livepresentationsession')
 
             if 'navigation_state' not in existing_columns:
                 print("➕ Adding navigation_state column...")
@@ -166,56 +166,24 @@ def run_migration_now():
         try:
             print("🔧 Adding MCQ chat tables (mcqchatconversation and mcqchatmessage)...")
             
-            # Check if MCQChatConversation table exists
-            result = session.execute(text(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='mcqchatconversation'"
-            ))
-            mcq_chat_conversation_exists = result.fetchone() is not None
-
-            # Check if MCQChatMessage table exists
-            result = session.execute(text(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='mcqchatmessage'"
-            ))
-            mcq_chat_message_exists = result.fetchone() is not None
+            inspector = inspect(session.connection())
+            mcq_chat_conversation_exists = inspector.has_table('mcqchatconversation')
+            mcq_chat_message_exists = inspector.has_table('mcqchatmessage')
 
             if mcq_chat_conversation_exists and mcq_chat_message_exists:
                 print("ℹ️  MCQ chat tables already exist")
             else:
-                # Create MCQChatConversation table
+                # Create the tables from the models so the DDL matches the active dialect
                 if not mcq_chat_conversation_exists:
                     print("➕ Creating mcqchatconversation table...")
-                    session.execute(text("""
-                        CREATE TABLE mcqchatconversation (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            session_id INTEGER NOT NULL,
-                            user_id INTEGER NOT NULL,
-                            deployment_id INTEGER NOT NULL,
-                            created_at TIMESTAMP NOT NULL,
-                            updated_at TIMESTAMP NOT NULL,
-                            FOREIGN KEY (session_id) REFERENCES mcqsession (id),
-                            FOREIGN KEY (user_id) REFERENCES user (id),
-                            FOREIGN KEY (deployment_id) REFERENCES deployment (id),
-                            CONSTRAINT unique_mcq_chat_conversation UNIQUE (session_id, user_id)
-                        )
-                    """))
+                    MCQChatConversation.__table__.create(session.connection(), checkfirst=True)
                     print("✅ Created mcqchatconversation table")
                 else:
                     print("ℹ️  mcqchatconversation table already exists")
 
-                # Create MCQChatMessage table
                 if not mcq_chat_message_exists:
                     print("➕ Creating mcqchatmessage table...")
-                    session.execute(text("""
-                        CREATE TABLE mcqchatmessage (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            conversation_id INTEGER NOT NULL,
-                            message_text TEXT NOT NULL,
-                            is_user_message BOOLEAN NOT NULL,
-                            sources JSON,
-                            created_at TIMESTAMP NOT NULL,
-                            FOREIGN KEY (conversation_id) REFERENCES mcqchatconversation (id)
-                        )
-                    """))
+                    MCQChatMessage.__table__.create(session.connection(), checkfirst=True)
                     print("✅ Created mcqchatmessage table")
                 else:
                     print("ℹ️  mcqchatmessage table already exists")
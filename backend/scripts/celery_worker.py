@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Start a Celery worker for one workload queue, with the concurrency and prefetch
+configured for it in config.yaml (celery.queues).
+
+Usage (from backend/):
+    python -m scripts.celery_worker behaviors
+    python -m scripts.celery_worker all      # one worker serving every queue
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.task_queues import TASK_QUEUES, worker_argv
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Usage: python -m scripts.celery_worker <{'|'.join(list(TASK_QUEUES) + ['all'])}> [extra celery args]")
+        sys.exit(2)
+
+    try:
+        argv = worker_argv(sys.argv[1]) + sys.argv[2:]
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    print(f"🚀 Starting Celery worker: {' '.join(argv)}")
+    os.execvp(argv[0], argv)
+
+
+if __name__ == "__main__":
+    main()
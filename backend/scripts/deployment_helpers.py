@@ -15,6 +15,7 @@ from models.database.db_models import (
     User,
 )
 from scripts.permission_helpers import user_can_access_deployment
+from services.websocket_protocol import send_encoded
 from services.deployment_manager import (
     get_active_deployment,
     load_deployment_on_demand,
@@ -47,7 +48,7 @@ async def _send_error_and_close(
     message: str,
     reason: str = "error",
 ) -> None:
-    await websocket.send_json({"type": "error", "message": message})
+    await send_encoded(websocket, {"type": "error", "message": message})
     await websocket.close(code=1000, reason=reason)
 
 
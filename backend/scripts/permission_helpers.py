@@ -1,3 +1,6 @@
+import itertools
+import threading
+import time
 from sqlmodel import Session as DBSession, select
 from models.database.db_models import User, Class, ClassMembership, Workflow, Deployment, ClassRole
 from scripts.config import load_config
@@ -7,19 +10,83 @@ AUTO_ENROLL_ADMIN_EMAILS = {
     email.lower() for email in config.get("auto_enroll", {}).get("admin_emails", [])
     if isinstance(email, str)
 }
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+# Membership snapshots (user_id -> {class_id: role}) shared across requests.
+# Writers in this process call invalidate_user_memberships(); the TTL bounds
+# staleness for changes made by other workers or maintenance scripts.
+MEMBERSHIP_CACHE_TTL_SECONDS = float(
+    config.get("permissions", {}).get("membership_cache_ttl_seconds", 60)
+)
+_MEMBERSHIP_CACHE: Dict[int, tuple[float, Dict[int, ClassRole]]] = {}
+_MEMBERSHIP_CACHE_LOCK = threading.Lock()
+_SESSION_MEMBERSHIP_KEY = "class_memberships"
+# Bumped by every invalidation: a snapshot loaded under an older generation is
+# neither stored in the shared cache nor reused from a session's copy
+_MEMBERSHIP_GENERATIONS: Dict[int, int] = {}
+_membership_generation_counter = itertools.count(1)
+_membership_cleared_generation = 0
+
+
+def _membership_generation(user_id: int) -> int:
+    # Caller holds _MEMBERSHIP_CACHE_LOCK
+    return max(_MEMBERSHIP_GENERATIONS.get(user_id, 0), _membership_cleared_generation)
+
+
+# Get the user's active memberships as {class_id: role}, loaded at most once per request
+def get_user_memberships(user: User, db: DBSession) -> Dict[int, ClassRole]:
+    now = time.monotonic()
+    with _MEMBERSHIP_CACHE_LOCK:
+        generation = _membership_generation(user.id)
+        cached = _MEMBERSHIP_CACHE.get(user.id)
+
+    # The session's own copy (generation, expires_at, snapshot), also for long-lived
+    # sessions such as a websocket's: dropped once invalidated or expired
+    request_cache = db.info.setdefault(_SESSION_MEMBERSHIP_KEY, {})
+    session_cached = request_cache.get(user.id)
+    if session_cached is not None and session_cached[0] == generation and session_cached[1] > now:
+        return session_cached[2]
+
+    if cached and cached[0] > now:
+        expires_at, snapshot = cached
+    else:
+        rows = db.exec(
+            select(ClassMembership.class_id, ClassMembership.role).where(
+                ClassMembership.user_id == user.id,
+                ClassMembership.is_active == True
+            )
+        ).all()
+        snapshot = {class_id: role for class_id, role in rows}
+        expires_at = now + MEMBERSHIP_CACHE_TTL_SECONDS
+        with _MEMBERSHIP_CACHE_LOCK:
+            # Skip the write if memberships were invalidated while loading; this snapshot may predate the change
+            if _membership_generation(user.id) == generation:
+                _MEMBERSHIP_CACHE[user.id] = (expires_at, snapshot)
+
+    request_cache[user.id] = (generation, expires_at, snapshot)
+    return snapshot
+
+
+# Drop cached memberships after a join/leave/kick so the next check reloads them
+def invalidate_user_memberships(user_id: int, db: Optional[DBSession] = None) -> None:
+    with _MEMBERSHIP_CACHE_LOCK:
+        _MEMBERSHIP_CACHE.pop(user_id, None)
+        _MEMBERSHIP_GENERATIONS[user_id] = next(_membership_generation_counter)
+    if db is not None:
+        db.info.get(_SESSION_MEMBERSHIP_KEY, {}).pop(user_id, None)
+
+
+def clear_membership_cache() -> None:
+    global _membership_cleared_generation
+    with _MEMBERSHIP_CACHE_LOCK:
+        _MEMBERSHIP_CACHE.clear()
+        _MEMBERSHIP_GENERATIONS.clear()
+        _membership_cleared_generation = next(_membership_generation_counter)
+
 
 # Check if user has specific role in a given class
 def user_has_role_in_class(user: User, class_id: int, role: ClassRole, db: DBSession) -> bool:
-    membership = db.exec(
-        select(ClassMembership).where(
-            ClassMembership.user_id == user.id,
-            ClassMembership.class_id == class_id,
-            ClassMembership.role == role,
-            ClassMembership.is_active == True
-        )
-    ).first()
-    return membership is not None
+    return get_user_memberships(user, db).get(class_id) == role
 
 
 # Check if user is an instructor in any class (replaces old current_user.student check)
@@ -29,14 +96,7 @@ def user_is_instructor(user: User, db: DBSession) -> bool:
         return True
     
     # Check if user has instructor role in any class
-    membership = db.exec(
-        select(ClassMembership).where(
-            ClassMembership.user_id == user.id,
-            ClassMembership.role == ClassRole.INSTRUCTOR,
-            ClassMembership.is_active == True
-        )
-    ).first()
-    return membership is not None
+    return ClassRole.INSTRUCTOR in get_user_memberships(user, db).values()
 
 
 # Check if user can create classes (instructor or if no classes exist yet for system bootstrap)
@@ -87,90 +147,45 @@ def user_can_modify_deployment(user: User, deployment: Deployment, db: DBSession
 
 # Check if user can access deployment (member of the class)
 def user_can_access_deployment(user: User, deployment: Deployment, db: DBSession) -> bool:
-    # Check if user is a member (student or instructor) of the deployment's class
-    print(f"🔍 DEBUG: Checking deployment access for user {user.id} ({user.email}) to deployment class {deployment.class_id}")
-    membership = db.exec(
-        select(ClassMembership).where(
-            ClassMembership.user_id == user.id,
-            ClassMembership.class_id == deployment.class_id,
-            ClassMembership.is_active == True
-        )
-    ).first()
-    
-    if membership:
-        print(f"🔍 DEBUG: Found membership: user {user.id} has role {membership.role} in class {deployment.class_id}")
-    else:
-        print(f"🔍 DEBUG: No membership found for user {user.id} in class {deployment.class_id}")
-        # Let's also check what memberships this user does have
-        all_memberships = db.exec(
-            select(ClassMembership).where(
-                ClassMembership.user_id == user.id,
-                ClassMembership.is_active == True
-            )
-        ).all()
-        print(f"🔍 DEBUG: User {user.id} has memberships in classes: {[m.class_id for m in all_memberships]}")
-    
-    return membership is not None
+    memberships = get_user_memberships(user, db)
+    if deployment.class_id in memberships:
+        return True
 
+    print(f"🔍 DEBUG: No membership found for user {user.id} in class {deployment.class_id} (member of classes: {sorted(memberships)})")
+    return False
 
-# Get all classes where user has specific role
-def get_user_classes_with_role(user: User, role: ClassRole, db: DBSession) -> List[Class]:
-    memberships = db.exec(
-        select(ClassMembership).where(
-            ClassMembership.user_id == user.id,
-            ClassMembership.role == role,
-            ClassMembership.is_active == True
-        )
-    ).all()
-    
-    class_ids = [membership.class_id for membership in memberships]
+
+def _get_active_classes(class_ids: List[int], db: DBSession) -> List[Class]:
     if not class_ids:
         return []
-    
+
     classes = db.exec(
         select(Class).where(
             Class.id.in_(class_ids),
             Class.is_active == True
         )
     ).all()
-    
+
     return list(classes)
 
 
+# Get all classes where user has specific role
+def get_user_classes_with_role(user: User, role: ClassRole, db: DBSession) -> List[Class]:
+    class_ids = [
+        class_id for class_id, member_role in get_user_memberships(user, db).items()
+        if member_role == role
+    ]
+    return _get_active_classes(class_ids, db)
+
+
 # Get all classes where user is a member (any role)
 def get_user_classes(user: User, db: DBSession) -> List[Class]:
-    memberships = db.exec(
-        select(ClassMembership).where(
-            ClassMembership.user_id == user.id,
-            ClassMembership.is_active == True
-        )
-    ).all()
-    
-    class_ids = [membership.class_id for membership in memberships]
-    if not class_ids:
-        return []
-    
-    classes = db.exec(
-        select(Class).where(
-            Class.id.in_(class_ids),
-            Class.is_active == True
-        )
-    ).all()
-    
-    return list(classes)
+    return _get_active_classes(list(get_user_memberships(user, db)), db)
 
 
 # Get user's role in a specific class
 def get_user_role_in_class(user: User, class_id: int, db: DBSession) -> Optional[ClassRole]:
-    membership = db.exec(
-        select(ClassMembership).where(
-            ClassMembership.user_id == user.id,
-            ClassMembership.class_id == class_id,
-            ClassMembership.is_active == True
-        )
-    ).first()
-    
-    return membership.role if membership else None
+    return get_user_memberships(user, db).get(class_id)
 
 
 # Check if user can create workflows/deployments (must be instructor in at least one class)
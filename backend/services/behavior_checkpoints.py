@@ -0,0 +1,154 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timezone
+import hashlib
+import json
+
+from sqlmodel import Session, select
+from models.database.page_models import BehaviorExecutionCheckpoint
+
+
+# Checkpointed stages of each staged behavior type, in execution order
+BEHAVIOR_STAGES: Dict[str, Tuple[str, ...]] = {
+    "group": ("vectors", "clustering", "explanations"),
+    "themeCreator": ("vectors", "clustering", "labels", "enrichment"),
+}
+
+
+def validate_rerun_stages(behavior_type: str, rerun_stages: Iterable[str]) -> List[str]:
+    """Return rerun_stages as a list, or raise ValueError for a stage the behavior doesn't have.
+
+    An unknown name would match no checkpoint, so every stage would be reused and
+    the rerun would silently change nothing.
+    """
+    stages = BEHAVIOR_STAGES.get(behavior_type)
+    if stages is None:
+        raise ValueError(f"Behaviors of type '{behavior_type}' cannot be re-run by stage")
+    rerun_stages = list(rerun_stages)
+    unknown = [stage for stage in rerun_stages if stage not in stages]
+    if unknown:
+        raise ValueError(
+            f"Unknown stage(s) for '{behavior_type}' behaviors: {', '.join(unknown)} "
+            f"(available: {', '.join(stages)})"
+        )
+    return rerun_stages
+
+
+def checkpoint_fingerprint(*parts: Any) -> str:
+    """Stable hash of the inputs a stage artifact is computed from."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# JSON encoder fallback for NumPy scalars and arrays in stage artifacts
+def _to_json_value(value: Any) -> Any:
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class BehaviorCheckpointStore:
+    """
+    Persists the intermediate artifacts of a staged behavior execution, keyed by execution_id.
+
+    Behaviors load their stages in order (e.g. vectors -> clustering -> explanations).
+    A stage that is missing, stale (different input fingerprint) or listed in
+    rerun_stages has to be recomputed, and so does every stage after it, because
+    later artifacts were derived from the old one.
+
+    When source_execution_id is given, completed artifacts of that earlier execution
+    are reused (and copied to this execution), so a rerun of e.g. only the
+    explanation stage does not re-embed or re-cluster.
+    """
+
+    def __init__(
+        self,
+        db_session: Session,
+        execution_id: str,
+        source_execution_id: Optional[str] = None,
+        rerun_stages: Optional[Iterable[str]] = None
+    ):
+        self.db_session = db_session
+        self.execution_id = execution_id
+        self.source_execution_id = source_execution_id if source_execution_id != execution_id else None
+        self.rerun_stages = set(rerun_stages or [])
+        self.resumed_stages: List[str] = []
+        self.computed_stages: List[str] = []
+        self._recomputing = False
+
+    def _get(self, execution_id: str, stage: str) -> Optional[BehaviorExecutionCheckpoint]:
+        return self.db_session.exec(
+            select(BehaviorExecutionCheckpoint).where(
+                BehaviorExecutionCheckpoint.execution_id == execution_id,
+                BehaviorExecutionCheckpoint.stage == stage
+            )
+        ).first()
+
+    def load(self, stage: str, fingerprint: Optional[str] = None, include_partial: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Return the stage artifact if it can be reused, otherwise None.
+
+        With include_partial, the progress saved by an interrupted run of this stage is
+        returned too; the stage still counts as recomputed for the stages after it.
+        """
+        if self._recomputing or stage in self.rerun_stages:
+            self._recomputing = True
+            return None
+
+        try:
+            checkpoint = self._get(self.execution_id, stage)
+            if checkpoint is None and self.source_execution_id:
+                checkpoint = self._get(self.source_execution_id, stage)
+                if checkpoint is not None and checkpoint.is_complete and checkpoint.input_fingerprint == fingerprint:
+                    # Copy so this execution can resume on its own later
+                    self._write(stage, checkpoint.artifact or {}, fingerprint, complete=True)
+                else:
+                    checkpoint = None
+        except Exception as e:
+            print(f"⚠️  Failed to load '{stage}' checkpoint for execution {self.execution_id}: {e}")
+            self.db_session.rollback()
+            checkpoint = None
+
+        if checkpoint is None or checkpoint.input_fingerprint != fingerprint:
+            self._recomputing = True
+            return None
+        if not checkpoint.is_complete:
+            self._recomputing = True
+            if not include_partial:
+                return None
+            print(f"♻️  Resuming partial '{stage}' stage of execution {self.execution_id}")
+            return checkpoint.artifact or {}
+
+        print(f"♻️  Reusing '{stage}' checkpoint of execution {self.execution_id}")
+        self.resumed_stages.append(stage)
+        return checkpoint.artifact or {}
+
+    def _write(self, stage: str, artifact: Dict[str, Any], fingerprint: Optional[str], complete: bool) -> None:
+        checkpoint = self._get(self.execution_id, stage)
+        if checkpoint is None:
+            checkpoint = BehaviorExecutionCheckpoint(execution_id=self.execution_id, stage=stage)
+        checkpoint.artifact = json.loads(json.dumps(artifact, default=_to_json_value))
+        checkpoint.input_fingerprint = fingerprint
+        checkpoint.is_complete = complete
+        checkpoint.updated_at = datetime.now(timezone.utc)
+        self.db_session.add(checkpoint)
+        self.db_session.commit()
+
+    def save(self, stage: str, artifact: Dict[str, Any], fingerprint: Optional[str] = None, complete: bool = True) -> None:
+        """Persist a stage artifact; complete=False records progress within a stage."""
+        try:
+            self._write(stage, artifact, fingerprint, complete)
+            if complete and stage not in self.computed_stages:
+                self.computed_stages.append(stage)
+        except Exception as e:
+            # Checkpoints only speed up reruns; never fail the execution over them
+            print(f"⚠️  Failed to save '{stage}' checkpoint for execution {self.execution_id}: {e}")
+            self.db_session.rollback()
+
+    def summary(self) -> Dict[str, Any]:
+        """Checkpoint info for the execution result metadata."""
+        return {
+            "execution_id": self.execution_id,
+            "source_execution_id": self.source_execution_id,
+            "resumed_stages": list(self.resumed_stages),
+            "computed_stages": list(self.computed_stages),
+        }
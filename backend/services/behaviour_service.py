@@ -38,12 +38,14 @@ class BehaviorDeployment:
         """Get the type of behavior (e.g., 'group')"""
         return self.behavior_type
     
-    def execute_behavior(self, input_data: Any, db_session: Optional[Any] = None, prompt_context: Optional[str] = None, progress_callback: Optional[callable] = None) -> Dict[str, Any]:
+    def execute_behavior(self, input_data: Any, db_session: Optional[Any] = None, prompt_context: Optional[str] = None, progress_callback: Optional[callable] = None, partial_result_callback: Optional[callable] = None, checkpoint_store: Optional[Any] = None) -> Dict[str, Any]:
         """
         Execute the behavior with the provided input data.
         
         Args:
             input_data: Input data for the behavior (format depends on behavior type)
+            partial_result_callback: Optional callable receiving partial results while the behavior runs
+            checkpoint_store: Optional BehaviorCheckpointStore for resuming staged behaviors
             
         Returns:
             Dictionary containing the results of the behavior execution
@@ -61,9 +63,9 @@ class BehaviorDeployment:
                 try:
                     # For group and theme behaviors, pass deployment context for better auto-fetch
                     if self.behavior_type == BehaviorType.GROUP:
-                        result = self._behavior_handler.execute(input_data, db_session=db_session, prompt_context=prompt_context, deployment_context=self.behavior_id, progress_callback=progress_callback)
+                        result = self._behavior_handler.execute(input_data, db_session=db_session, prompt_context=prompt_context, deployment_context=self.behavior_id, progress_callback=progress_callback, partial_result_callback=partial_result_callback, checkpoint_store=checkpoint_store)
                     elif self.behavior_type == BehaviorType.THEME:
-                        result = self._behavior_handler.execute(input_data, db_session=db_session, prompt_context=prompt_context, deployment_context=self.behavior_id, progress_callback=progress_callback)
+                        result = self._behavior_handler.execute(input_data, db_session=db_session, prompt_context=prompt_context, deployment_context=self.behavior_id, progress_callback=progress_callback, checkpoint_store=checkpoint_store)
                     else:
                         result = self._behavior_handler.execute(input_data, db_session=db_session, prompt_context=prompt_context, progress_callback=progress_callback)
                 except TypeError:
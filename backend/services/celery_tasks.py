@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.exceptions import SoftTimeLimitExceeded
 from database.database import get_session, engine
 from sqlmodel import Session, select
 from services.summary_agent import SummaryAgent
@@ -13,32 +14,54 @@ import tempfile
 
 from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.docstore.document import Document as LangchainDocument
 from langchain_community.embeddings import FastEmbedEmbeddings
 from langchain_community.vectorstores import Qdrant
 
-from models.database.db_models import Workflow, Document, Deployment, PromptSession, PromptSubmission
+from models.database.db_models import Workflow, Document, Deployment, PromptSession, PromptSubmission, Video
 from scripts.config import load_config
 from scripts.utils import get_user_collection_name
-from api.file_storage import store_file, delete_stored_file
+from api.file_storage import store_file, delete_stored_file, file_sha256, STORAGE_BASE_DIR
+from services.ingest_cache import CachedEmbeddings, ingest_fingerprint, load_ingest_cache, save_ingest_cache
+from services.task_queues import DEFAULT_QUEUE, TASK_QUEUES, celery_queue_settings, validate_task_queues
+from services.task_progress import ProgressTask
 
 # Configure Celery
 broker_url = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 result_backend = os.getenv("CELERY_RESULT_BACKEND", broker_url)
 
-celery_app = Celery("agent_tasks", broker=broker_url, backend=result_backend)
+# Tasks publish every update_state over Redis pub/sub for the progress event streams
+celery_app = Celery("agent_tasks", broker=broker_url, backend=result_backend, task_cls=ProgressTask)
+
+config = load_config()
 
 # Configure task settings for longer-running tasks
 celery_app.conf.update(
-    task_soft_time_limit=300,  # 5 minutes soft limit
-    task_time_limit=600,       # 10 minutes hard limit
+    task_soft_time_limit=int((config.get("celery") or {}).get("task_soft_time_limit", 300)),  # default soft limit
+    task_time_limit=int((config.get("celery") or {}).get("task_time_limit", 600)),            # default hard limit
     worker_prefetch_multiplier=1,  # Process one task at a time for heavy operations
     task_track_started=True,   # Track when tasks start
     task_serializer='json',
     result_serializer='json',
     accept_content=['json'],
+    # Route tasks to the ingest/behaviors/llm/light queues, with per-queue time limits and priorities
+    **celery_queue_settings(),
 )
 
-config = load_config()
+# How often a behavior execution is resumed (from its checkpoints) after a time limit or lost worker
+BEHAVIOR_MAX_RESUMES = int((config.get("celery") or {}).get("behavior_max_resumes", 2))
+BEHAVIOR_RESUME_DELAY_SECONDS = int((config.get("celery") or {}).get("behavior_resume_delay_seconds", 5))
+
+
+def _caused_by(exc: BaseException, exc_type: type) -> bool:
+    """True if exc or any exception it was raised from/while handling is an exc_type."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, exc_type):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
 
 
 @celery_app.task(name="embed_analyses_to_qdrant")
@@ -52,31 +75,71 @@ def embed_analyses_to_qdrant_task(problem_id: int):
         print(f"[Celery] embed_analyses_to_qdrant_task failed for problem {problem_id}: {exc}")
 
 
-@celery_app.task(name="execute_behavior", bind=True)
-def execute_behavior_task(self, deployment_id: str, behavior_number: str, executed_by_user_id: int, behavior_config: Dict[str, Any], student_data: Optional[list] = None):
+# acks_late + reject_on_worker_lost: a task whose worker dies is redelivered with the same
+# task id, and so resumes the same execution from its checkpoints
+@celery_app.task(name="execute_behavior", bind=True, acks_late=True, reject_on_worker_lost=True)
+def execute_behavior_task(
+    self,
+    deployment_id: str,
+    behavior_number: str,
+    executed_by_user_id: int,
+    behavior_config: Dict[str, Any],
+    student_data: Optional[list] = None,
+    execution_id: Optional[str] = None,
+    resume_from_execution_id: Optional[str] = None,
+    rerun_stages: Optional[list] = None,
+    prompt_context: Optional[str] = None
+):
     """
     Execute a behavior (group assignment or theme creation) asynchronously.
     
+    Group and theme behaviors run in checkpointed stages keyed by execution_id
+    (the task id unless given), so retries after a soft time limit and redeliveries
+    after a worker restart resume from the last completed stage.
+    
     Args:
         deployment_id: The deployment ID
         behavior_number: The behavior number to execute
         executed_by_user_id: ID of the user executing the behavior
         behavior_config: Configuration for the behavior
         student_data: Optional student data (will be auto-fetched if None)
+        execution_id: Execution to run or resume (defaults to the task id)
+        resume_from_execution_id: Earlier execution whose completed stages are reused
+        rerun_stages: Stages to recompute even if checkpointed (e.g. ["explanations"])
+        prompt_context: Assignment context override for this run
     
     Returns:
         Dict with execution results
     """
     task_id = self.request.id
+    execution_id = execution_id or task_id
     print(f"🚀 [Celery] Starting behavior execution task {task_id}")
     print(f"   Deployment: {deployment_id}")
     print(f"   Behavior: {behavior_number}")
     print(f"   Config: {behavior_config.get('behavior_type', 'unknown')}")
+    print(f"   Execution: {execution_id} (attempt {self.request.retries + 1})")
     
     try:
         # Create session directly for Celery tasks (not using FastAPI dependency injection)
         with Session(engine) as db:
             from services.pages_manager import get_active_page_deployment
+            from models.database.page_models import BehaviorExecutionHistory
+            
+            # A redelivered task may already have finished, or keep failing at the same stage
+            previous_run = db.exec(
+                select(BehaviorExecutionHistory).where(BehaviorExecutionHistory.execution_id == execution_id)
+            ).first()
+            if previous_run and previous_run.success:
+                print(f"✅ [Celery] Execution {execution_id} already completed, returning saved result")
+                return {
+                    'status': 'SUCCESS',
+                    'result': {**(previous_run.execution_result or {}), 'task_id': task_id},
+                    'progress': 100,
+                    'stage': 'completed'
+                }
+            attempts = (previous_run.execution_result or {}).get('attempts', 0) if previous_run else 0
+            if attempts > BEHAVIOR_MAX_RESUMES:
+                raise Exception(f"Behavior execution {execution_id} did not finish after {attempts} attempts")
             
             # Update task state to PROGRESS
             self.update_state(
@@ -156,7 +219,11 @@ def execute_behavior_task(self, deployment_id: str, behavior_number: str, execut
             result = page_deployment.execute_behavior_with_resolved_input(
                 behavior_number, 
                 executed_by_user_id=executed_by_user_id,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                execution_id=execution_id,
+                resume_from_execution_id=resume_from_execution_id,
+                rerun_stages=rerun_stages,
+                prompt_context=prompt_context
             )
             
             end_time = datetime.now()
@@ -176,6 +243,7 @@ def execute_behavior_task(self, deployment_id: str, behavior_number: str, execut
             result['executed_at'] = end_time.isoformat()
             result['executed_by_user_id'] = executed_by_user_id
             result['task_id'] = task_id
+            result['execution_id'] = execution_id
             
             print(f"✅ [Celery] Behavior execution completed successfully")
             print(f"   Task ID: {task_id}")
@@ -200,6 +268,19 @@ def execute_behavior_task(self, deployment_id: str, behavior_number: str, execut
             }
             
     except Exception as exc:
+        # Out of time: retry under the same task id, which resumes from the completed stages
+        if _caused_by(exc, SoftTimeLimitExceeded) and self.request.retries < BEHAVIOR_MAX_RESUMES:
+            print(f"⏱️ [Celery] Behavior execution {execution_id} hit the time limit, resuming in {BEHAVIOR_RESUME_DELAY_SECONDS}s")
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'status': 'Time limit reached, resuming from the last completed stage...',
+                    'progress': 30,
+                    'stage': 'resuming'
+                }
+            )
+            raise self.retry(exc=exc, countdown=BEHAVIOR_RESUME_DELAY_SECONDS, max_retries=BEHAVIOR_MAX_RESUMES)
+        
         error_msg = str(exc)
         error_traceback = traceback.format_exc()
         
@@ -330,6 +411,9 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
                     chunk_overlap=chunk_settings.get("chunk_overlap", 100),
                     add_start_index=chunk_settings.get("add_start_index", True),
                 )
+                # Files already ingested elsewhere (same content hash) reuse their chunks and vectors
+                embeddings = CachedEmbeddings(FastEmbedEmbeddings())
+                fingerprint = ingest_fingerprint(chunk_settings, embeddings)
 
                 # Stage: read and chunk
                 for f in files:
@@ -339,12 +423,20 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
                     if not temp_path.exists():
                         raise Exception(f"Temp file missing: {temp_path}")
 
-                    docs = load_document(temp_path)
-                    if not docs:
-                        # Skip empty docs
+                    sha256 = f.get("sha256") or file_sha256(temp_path)
+                    cached = load_ingest_cache(sha256, fingerprint)
+                    if cached:
+                        chunks = cached["chunks"]
+                        embeddings.vectors.update(cached["vectors"])
+                    else:
+                        docs = load_document(temp_path)
+                        if not docs:
+                            # Skip empty docs
+                            continue
+                        chunks = splitter.split_documents(docs)
+                    if not chunks:
                         continue
-
-                    chunks = splitter.split_documents(docs)
+                    file_chunks = [LangchainDocument(page_content=c.page_content, metadata=dict(c.metadata)) for c in chunks]
                     upload_id = str(uuid.uuid4())
 
                     for c in chunks:
@@ -365,6 +457,9 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
                         'size': file_size,
                         'file_type': file_type,
                         'temp_path': str(temp_path),
+                        'sha256': sha256,
+                        'cached': bool(cached),
+                        'file_chunks': file_chunks,
                     })
                     all_chunks.extend(chunks)
 
@@ -374,7 +469,6 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
                 self.update_state(state='PROGRESS', meta={'status': 'Embedding and indexing...', 'progress': 50, 'stage': 'indexing'})
 
                 # Embeddings + vector store
-                embeddings = FastEmbedEmbeddings()
                 user_collection = get_user_collection_name(workflow.workflow_collection_id, user_id)
 
                 Qdrant.from_documents(
@@ -393,15 +487,17 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
                 for info in processed_files:
                     storage_path = None
                     try:
-                        # Read file bytes for permanent storage
-                        with open(info['temp_path'], 'rb') as fh:
-                            content_bytes = fh.read()
+                        # Move the staged temp file into permanent storage (no full read into memory)
                         storage_path = store_file(
-                            file_content=content_bytes,
+                            file_content=Path(info['temp_path']),
                             workflow_id=workflow.id,
                             upload_id=info['upload_id'],
                             filename=info['filename'],
+                            move=True,
+                            sha256=info['sha256'],
                         )
+                        if not info['cached']:
+                            save_ingest_cache(info['sha256'], fingerprint, info['file_chunks'], embeddings.vectors)
                     except Exception as storage_error:
                         print(f"Warning: Failed to store file {info['filename']}: {storage_error}")
 
@@ -426,6 +522,7 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
                         'size': info['size'],
                         'file_type': info['file_type'],
                         'storage_path': storage_path,
+                        'reused_ingest': info['cached'],
                     })
 
                 db.commit()
@@ -467,7 +564,7 @@ def process_document_uploads_task(self, *, workflow_id: int, user_id: int, files
 
 
 @celery_app.task(name="process_prompt_pdf_submission", bind=True)
-def process_prompt_pdf_submission_task(self, *, deployment_id: str, submission_index: int, user_id: int, temp_path: str, filename: str):
+def process_prompt_pdf_submission_task(self, *, deployment_id: str, submission_index: int, user_id: int, temp_path: str, filename: str, sha256: Optional[str] = None):
     self.update_state(state='PROGRESS', meta={'status': 'Initializing...', 'progress': 5, 'stage': 'init'})
     try:
         tp = Path(temp_path)
@@ -517,47 +614,58 @@ def process_prompt_pdf_submission_task(self, *, deployment_id: str, submission_i
 
             self.update_state(state='PROGRESS', meta={'status': 'Storing file...', 'progress': 25, 'stage': 'store'})
 
-            # Read file bytes and persist to storage
-            file_bytes = tp.read_bytes()
+            # Copy the staged file to storage in chunks (the temp file is still needed for parsing)
+            file_size = tp.stat().st_size
+            sha256 = sha256 or file_sha256(tp)
             upload_id = str(uuid.uuid4())
             try:
                 storage_path = store_file(
-                    file_content=file_bytes,
+                    file_content=tp,
                     workflow_id=workflow.id,
                     upload_id=upload_id,
                     filename=filename,
+                    sha256=sha256,
                 )
             except Exception as e:
                 raise Exception(f"Failed to store PDF: {e}")
 
             self.update_state(state='PROGRESS', meta={'status': 'Embedding (best-effort)...', 'progress': 55, 'stage': 'embedding'})
 
-            # Try to split/embed
+            # Try to split/embed (a PDF already ingested elsewhere reuses its chunks and vectors)
             chunks = []
+            cached = None
+            embeddings = None
             try:
-                docs = PyPDFLoader(str(tp)).load()
-                if docs:
-                    chunk_settings = config.get("document_processing", {}).get("chunk_settings", {})
-                    splitter = RecursiveCharacterTextSplitter(
-                        chunk_size=chunk_settings.get("chunk_size", 800),
-                        chunk_overlap=chunk_settings.get("chunk_overlap", 100),
-                        add_start_index=chunk_settings.get("add_start_index", True),
-                    )
-                    chunks = splitter.split_documents(docs)
-                    for c in chunks:
-                        c.metadata.update({
-                            'user_id': user_id,
-                            'filename': filename,
-                            'source': filename,
-                            'upload_id': upload_id,
-                        })
+                chunk_settings = config.get("document_processing", {}).get("chunk_settings", {})
+                embeddings = CachedEmbeddings(FastEmbedEmbeddings())
+                fingerprint = ingest_fingerprint(chunk_settings, embeddings)
+                cached = load_ingest_cache(sha256, fingerprint)
+                if cached:
+                    chunks = cached["chunks"]
+                    embeddings.vectors.update(cached["vectors"])
+                else:
+                    docs = PyPDFLoader(str(tp)).load()
+                    if docs:
+                        splitter = RecursiveCharacterTextSplitter(
+                            chunk_size=chunk_settings.get("chunk_size", 800),
+                            chunk_overlap=chunk_settings.get("chunk_overlap", 100),
+                            add_start_index=chunk_settings.get("add_start_index", True),
+                        )
+                        chunks = splitter.split_documents(docs)
+                file_chunks = [LangchainDocument(page_content=c.page_content, metadata=dict(c.metadata)) for c in chunks]
+                for c in chunks:
+                    c.metadata.update({
+                        'user_id': user_id,
+                        'filename': filename,
+                        'source': filename,
+                        'upload_id': upload_id,
+                    })
             except Exception:
                 chunks = []
 
             chunk_count = 0
             try:
                 if chunks:
-                    embeddings = FastEmbedEmbeddings()
                     user_collection = get_user_collection_name(workflow.workflow_collection_id, user_id)
                     Qdrant.from_documents(
                         documents=chunks,
@@ -568,6 +676,8 @@ def process_prompt_pdf_submission_task(self, *, deployment_id: str, submission_i
                         ids=[str(uuid.uuid4()) for _ in chunks],
                     )
                     chunk_count = len(chunks)
+                    if not cached:
+                        save_ingest_cache(sha256, fingerprint, file_chunks, embeddings.vectors)
             except Exception:
                 pass
 
@@ -585,7 +695,7 @@ def process_prompt_pdf_submission_task(self, *, deployment_id: str, submission_i
             document = Document(
                 filename=filename,
                 original_filename=filename,
-                file_size=len(file_bytes),
+                file_size=file_size,
                 file_type="pdf",
                 collection_name=workflow.workflow_collection_id,
                 user_collection_name=get_user_collection_name(workflow.workflow_collection_id, user_id),
@@ -734,6 +844,8 @@ def match_submission_to_summary_task(
             'similarity_score': result.similarity_score,
             'reasoning': result.reasoning,
             'all_scores': result.all_scores,
+            'candidate_count': result.candidate_count,
+            'prefilter_scores': result.prefilter_scores,
             'timestamp': result.timestamp.isoformat()
         }
         
@@ -774,3 +886,47 @@ def match_submission_to_summary_task(
             }
         )
         raise
+
+
+@celery_app.task(name="generate_video_hls", bind=True)
+def generate_video_hls_task(self, *, video_id: int):
+    """
+    Pre-segment an uploaded video into HLS renditions with ffmpeg (video_processing.hls).
+    Renditions are keyed by content hash, so a video uploaded twice is segmented once.
+    """
+    from services.video_streaming import generate_hls_renditions, hls_key
+
+    task_id = self.request.id
+    self.update_state(state='PROGRESS', meta={'status': 'Preparing video...', 'progress': 5, 'stage': 'init'})
+
+    try:
+        with Session(engine) as db:
+            video = db.get(Video, video_id)
+            if not video or not video.is_active or not video.storage_path:
+                return {'status': 'SUCCESS', 'result': {'skipped': True, 'reason': 'Video not found'}, 'progress': 100, 'stage': 'completed'}
+
+            source = STORAGE_BASE_DIR / video.storage_path
+            if not source.exists():
+                raise Exception(f"Video file missing: {video.storage_path}")
+
+            self.update_state(state='PROGRESS', meta={'status': 'Segmenting video...', 'progress': 20, 'stage': 'transcoding'})
+            result = generate_hls_renditions(source, hls_key(video))
+
+            if result.get('duration') and not video.duration_seconds:
+                video.duration_seconds = result['duration']
+                db.add(video)
+                db.commit()
+
+        print(f"✅ [Celery] HLS renditions ready for video {video_id}: {result.get('renditions') or 'already segmented'}")
+        return {'status': 'SUCCESS', 'result': result, 'progress': 100, 'stage': 'completed'}
+
+    except Exception as exc:
+        error_msg = str(exc)
+        error_traceback = traceback.format_exc()
+        print(f"❌ [Celery] HLS task {task_id} for video {video_id} failed: {error_msg}")
+        self.update_state(state='FAILURE', meta={'status': f'Segmenting failed: {error_msg}', 'error': error_msg, 'traceback': error_traceback, 'progress': 0, 'stage': 'failed'})
+        raise
+
+
+# Fail at startup if celery.queues routes a task name that isn't registered here
+validate_task_queues(TASK_QUEUES, DEFAULT_QUEUE, [name for name in celery_app.tasks if not name.startswith("celery.")])
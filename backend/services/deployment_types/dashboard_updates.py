@@ -0,0 +1,81 @@
+"""
+Dashboard Updates - Coalesced teacher dashboard deltas for live presentations
+
+Student connects, disconnects, ready clicks and responses are recorded here as they
+happen and flushed to teachers as one delta message per interval (students added,
+updated or removed, new responses and per-prompt response counts). Teachers get a
+full stats snapshot only when they (re)connect or ask for one.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+
+@dataclass
+class DashboardChanges:
+    """Everything that changed since the last flush"""
+    student_ids: Set[str] = field(default_factory=set)
+    all_students: bool = False
+    responses: List[Dict[str, Any]] = field(default_factory=list)
+    prompt_ids: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.student_ids or self.all_students or self.responses)
+
+
+class DashboardUpdateBatcher:
+    """Accumulates dashboard changes and flushes them at most once per interval"""
+
+    def __init__(self, flush: Callable[[DashboardChanges, int], Awaitable[None]], interval_seconds: float = 0.25):
+        self._flush = flush
+        self.interval_seconds = interval_seconds
+        self.seq = 0  # sequence number of the last delta; snapshots carry it so clients can spot gaps
+        self._pending = DashboardChanges()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def student_changed(self, user_id: str):
+        self._pending.student_ids.add(user_id)
+        self._schedule()
+
+    def all_students_changed(self):
+        self._pending.all_students = True
+        self._schedule()
+
+    def response_received(self, user_id: str, prompt_id: str, entry: Dict[str, Any]):
+        self._pending.student_ids.add(user_id)
+        self._pending.prompt_ids.add(prompt_id)
+        self._pending.responses.append(entry)
+        self._schedule()
+
+    async def flush_now(self):
+        """Send pending changes immediately (e.g. before a state change that teachers must see in order)"""
+        if self._flush_task and not self._flush_task.done() and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+        self._flush_task = None
+        changes, self._pending = self._pending, DashboardChanges()
+        if changes:
+            self.seq += 1
+            await self._flush(changes, self.seq)
+
+    def cancel(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        self._pending = DashboardChanges()
+
+    def _schedule(self):
+        if self._flush_task and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No running loop (synchronous setup code): changes go out with the next flush
+            self._flush_task = None
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval_seconds)
+        try:
+            await self.flush_now()
+        except Exception as e:
+            print(f"❌ Error flushing dashboard update: {e}")
@@ -1,9 +1,13 @@
 import numpy as np
 from scipy.cluster.hierarchy import linkage, to_tree
 from scipy.spatial.distance import pdist, squareform
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import hashlib
+import random
 import threading
+import time
 import os
 import json
 
@@ -15,6 +19,54 @@ from langchain_community.embeddings import FastEmbedEmbeddings
 from langchain_community.vectorstores import Qdrant
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
+from celery.exceptions import SoftTimeLimitExceeded
+
+from scripts.config import load_config
+from services.behavior_checkpoints import checkpoint_fingerprint
+
+_GROUP_ASSIGNMENT_CONFIG = load_config().get("group_assignment", {}) or {}
+
+# Batched LLM explanation settings (see group_assignment in config.yaml)
+EXPLANATION_MODEL = str(_GROUP_ASSIGNMENT_CONFIG.get("explanation_model", "gpt-5-mini"))
+EXPLANATION_GROUPS_PER_REQUEST = max(1, int(_GROUP_ASSIGNMENT_CONFIG.get("explanation_groups_per_request", 5)))
+EXPLANATION_MAX_CONCURRENT_REQUESTS = max(1, int(_GROUP_ASSIGNMENT_CONFIG.get("explanation_max_concurrent_requests", 4)))
+EXPLANATION_REQUESTS_PER_MINUTE = int(_GROUP_ASSIGNMENT_CONFIG.get("explanation_requests_per_minute", 60))
+EXPLANATION_MAX_RETRIES = int(_GROUP_ASSIGNMENT_CONFIG.get("explanation_max_retries", 4))
+EXPLANATION_RETRY_BASE_SECONDS = float(_GROUP_ASSIGNMENT_CONFIG.get("explanation_retry_base_seconds", 1.0))
+EXPLANATION_REQUEST_TIMEOUT_SECONDS = float(_GROUP_ASSIGNMENT_CONFIG.get("explanation_request_timeout_seconds", 90))
+EXPLANATION_CACHE_TTL_SECONDS = float(_GROUP_ASSIGNMENT_CONFIG.get("explanation_cache_ttl_seconds", 86400))
+
+# Structured output the LLM must return when explaining a batch of groups
+EXPLANATION_BATCH_SCHEMA = {
+    "title": "group_explanations",
+    "description": "One explanation per student group.",
+    "type": "object",
+    "properties": {
+        "explanations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "group_id": {"type": "string"},
+                    "explanation": {"type": "string"},
+                },
+                "required": ["group_id", "explanation"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["explanations"],
+    "additionalProperties": False,
+}
+
+EXPLANATION_GUIDANCE = (
+    "When possible, cite specific phrases or concrete topics from the PDF snippets (e.g., 'robotics', 'data visualization', 'sustainability'). "
+    "Avoid generic statements. Two concise sentences maximum."
+)
+
+# Explanations keyed by a hash of group membership, member profiles and prompt context
+_EXPLANATION_CACHE: Dict[str, Tuple[float, str]] = {}
+_EXPLANATION_CACHE_LOCK = threading.Lock()
 
 class GroupAssignmentBehavior:
     """
@@ -40,13 +92,16 @@ class GroupAssignmentBehavior:
         
         print(f"🔧 GROUP BEHAVIOR INIT: include_explanations={self.include_explanations} (from config: {config.get('include_explanations', 'NOT_SET')})")
     
-    def execute(self, student_data: List[Dict[str, Any]], db_session: Optional[Any] = None, prompt_context: Optional[str] = None, deployment_context: Optional[str] = None, progress_callback: Optional[callable] = None) -> Dict[str, Any]:
+    def execute(self, student_data: List[Dict[str, Any]], db_session: Optional[Any] = None, prompt_context: Optional[str] = None, deployment_context: Optional[str] = None, progress_callback: Optional[callable] = None, partial_result_callback: Optional[callable] = None, checkpoint_store: Optional[Any] = None) -> Dict[str, Any]:
         """
         Execute group assignment with the provided student data.
         Optimized for async execution with better memory management.
         
         Args:
             student_data: List of student dictionaries with 'name' and 'text' keys
+            partial_result_callback: Optional callable receiving {"groups", "explanations"} as explanation batches complete
+            checkpoint_store: Optional BehaviorCheckpointStore; the vectors, clustering and explanations
+                stages are reused from it when their inputs are unchanged
             
         Returns:
             Dictionary with group assignments and metadata
@@ -96,47 +151,70 @@ class GroupAssignmentBehavior:
             # Memory optimization: Clear intermediate variables
             del student_data  # Free original data after filtering
             
+            # Checkpoint fingerprints: a stage is reused only if its inputs are unchanged
+            data_fingerprint = checkpoint_fingerprint(filtered_student_data)
+            clustering_fingerprint = checkpoint_fingerprint(data_fingerprint, self.group_size, self.grouping_method, self.group_size_mode)
+            
             # Report progress for vector building
             if progress_callback:
                 progress_callback(50, "Building student vectors...")
             
-            # Incorporate vectors from PDFs when available
-            try:
-                students_with_vectors = self._build_student_vectors(filtered_student_data, db_session)
-            except Exception as e:
-                # Fall back to text-only vectors
-                print(f"Warning: PDF vector enrichment failed, using text only. Error: {e}")
-                students_with_vectors = [(s["name"], student_to_vector(s.get("text", ""))) for s in filtered_student_data]
+            vectors_checkpoint = checkpoint_store.load("vectors", data_fingerprint) if checkpoint_store else None
+            if vectors_checkpoint:
+                names = vectors_checkpoint["names"]
+                vectors = vectors_checkpoint["vectors"]
+            else:
+                # Incorporate vectors from PDFs when available
+                try:
+                    students_with_vectors = self._build_student_vectors(filtered_student_data, db_session)
+                except SoftTimeLimitExceeded:
+                    # Out of time, not a PDF problem: text-only vectors must not be checkpointed as the real ones
+                    raise
+                except Exception as e:
+                    # Fall back to text-only vectors
+                    print(f"Warning: PDF vector enrichment failed, using text only. Error: {e}")
+                    students_with_vectors = [(s["name"], student_to_vector(s.get("text", ""))) for s in filtered_student_data]
 
-            # Memory optimization: Extract data and clear large objects
-            names = [name for name, _ in students_with_vectors]
-            vectors = [vec for _, vec in students_with_vectors]
-            
-            # Free up memory from students_with_vectors
-            del students_with_vectors
+                # Memory optimization: Extract data and clear large objects
+                names = [name for name, _ in students_with_vectors]
+                vectors = [vec for _, vec in students_with_vectors]
+                
+                # Free up memory from students_with_vectors
+                del students_with_vectors
+                
+                if checkpoint_store:
+                    checkpoint_store.save("vectors", {"names": names, "vectors": np.asarray(vectors, dtype=float).tolist()}, data_fingerprint)
             
             # Report progress for grouping
             if progress_callback:
                 progress_callback(60, "Performing hierarchical clustering...")
             
-            # Debug the vectors and names before grouping
-            print(f"🔍 GROUPING DEBUG: Number of students: {len(names)}")
-            print(f"🔍 GROUPING DEBUG: Student names: {names}")
-            print(f"🔍 GROUPING DEBUG: Number of vectors: {len(vectors)}")
-            print(f"🔍 GROUPING DEBUG: Group size target: {self.group_size}")
-            print(f"🔍 GROUPING DEBUG: Grouping method: {self.grouping_method}")
-            
-            # Perform grouping using our computed vectors
-            vectors_array = np.asarray(vectors)
-            group_indices = _hierarchical_assign(vectors_array, self.group_size, self.grouping_method, self.group_size_mode)
-            
-            # Memory cleanup
-            del vectors, vectors_array
-            
-            print(f"🔍 GROUPING DEBUG: Raw group indices: {group_indices}")
-            print(f"🔍 GROUPING DEBUG: Number of groups created: {len(group_indices)}")
-            
-            groups: Dict[str, List[str]] = {f"Group{i+1}": [names[j] for j in idxs] for i, idxs in enumerate(group_indices)}
+            clustering_checkpoint = checkpoint_store.load("clustering", clustering_fingerprint) if checkpoint_store else None
+            if clustering_checkpoint:
+                groups: Dict[str, List[str]] = clustering_checkpoint["groups"]
+            else:
+                # Debug the vectors and names before grouping
+                print(f"🔍 GROUPING DEBUG: Number of students: {len(names)}")
+                print(f"🔍 GROUPING DEBUG: Student names: {names}")
+                print(f"🔍 GROUPING DEBUG: Number of vectors: {len(vectors)}")
+                print(f"🔍 GROUPING DEBUG: Group size target: {self.group_size}")
+                print(f"🔍 GROUPING DEBUG: Grouping method: {self.grouping_method}")
+                
+                # Perform grouping using our computed vectors
+                vectors_array = np.asarray(vectors)
+                group_indices = _hierarchical_assign(vectors_array, self.group_size, self.grouping_method, self.group_size_mode)
+                
+                # Memory cleanup
+                del vectors_array
+                
+                print(f"🔍 GROUPING DEBUG: Raw group indices: {group_indices}")
+                print(f"🔍 GROUPING DEBUG: Number of groups created: {len(group_indices)}")
+                
+                groups: Dict[str, List[str]] = {f"Group{i+1}": [names[j] for j in idxs] for i, idxs in enumerate(group_indices)}
+                
+                if checkpoint_store:
+                    checkpoint_store.save("clustering", {"groups": groups}, clustering_fingerprint)
+            del vectors
             print(f"🔍 GROUPING DEBUG: Final groups: {groups}")
 
             # Generate explanations if requested
@@ -146,18 +224,46 @@ class GroupAssignmentBehavior:
                     progress_callback(75, "Generating group explanations...")
                 
                 print(f"🔍 GENERATING EXPLANATIONS: include_explanations={self.include_explanations}")
+                explanations_fingerprint = checkpoint_fingerprint(clustering_fingerprint, groups, prompt_context, self.selected_submission_prompts)
+                
+                # Explanations finished before an interruption are kept, only the rest are generated
+                explained: Dict[str, str] = {}
+                if checkpoint_store:
+                    explanations_checkpoint = checkpoint_store.load("explanations", explanations_fingerprint, include_partial=True)
+                    explained = {
+                        group_name: text for group_name, text in ((explanations_checkpoint or {}).get("explanations") or {}).items()
+                        if group_name in groups
+                    }
+                remaining_groups = {group_name: members for group_name, members in groups.items() if group_name not in explained}
+                
+                def on_explanations(explanations_so_far: Dict[str, str]):
+                    merged = {**explained, **explanations_so_far}
+                    if checkpoint_store:
+                        checkpoint_store.save("explanations", {"explanations": merged}, explanations_fingerprint, complete=False)
+                    if partial_result_callback:
+                        partial_result_callback({"groups": groups, "explanations": merged})
+                
                 try:
-                    explanations = _generate_group_explanations(
-                        groups, 
-                        filtered_student_data, 
-                        self.grouping_method, 
-                        db_session=db_session, 
-                        prompt_context=prompt_context,
-                        selected_prompts=self.selected_submission_prompts
-                    )
+                    explanations = dict(explained)
+                    if remaining_groups:
+                        explanations.update(_generate_group_explanations(
+                            remaining_groups, 
+                            filtered_student_data, 
+                            self.grouping_method, 
+                            db_session=db_session, 
+                            prompt_context=prompt_context,
+                            selected_prompts=self.selected_submission_prompts,
+                            on_explanations=on_explanations
+                        ))
+                    explanations = {group_name: explanations[group_name] for group_name in groups if group_name in explanations}
+                    if checkpoint_store:
+                        checkpoint_store.save("explanations", {"explanations": explanations}, explanations_fingerprint)
                     print(f"✅ EXPLANATIONS GENERATED: {len(explanations)} explanations")
                     for group_name, explanation in explanations.items():
                         print(f"   {group_name}: {explanation[:100]}...")
+                except SoftTimeLimitExceeded:
+                    # Let the task resume from the saved partial explanations
+                    raise
                 except Exception as e:
                     print(f"⚠️  Warning: Explanation generation failed: {e}")
                     explanations = {group_name: f"Group explanation unavailable due to processing error." for group_name in groups.keys()}
@@ -179,6 +285,8 @@ class GroupAssignmentBehavior:
                     "label": self.label
                 }
             }
+            if checkpoint_store:
+                result["metadata"]["checkpoints"] = checkpoint_store.summary()
             
             if explanations:
                 result["explanations"] = explanations
@@ -808,58 +916,260 @@ def _hierarchical_assign(vectors, group_size, mode, group_size_mode="students_pe
     
     return result
 
-def _generate_single_llm_explanation(
-    group_id: str, 
-    members: List[str], 
-    student_profiles: Dict[str, str], 
-    strategy: str, 
-    prompt_context: Optional[str], 
-    selected_prompts: Optional[List[Dict[str, Any]]], 
-    llm: ChatOpenAI
-) -> Tuple[str, str]:
-    """Generate a single group explanation using LLM. Returns (group_id, explanation)."""
-    try:
-        # Get the profiles for members in this group
-        member_profiles = [f"{name}: {student_profiles.get(name, 'No description')}" 
-                          for name in members]
-        profiles_text = "\n".join(member_profiles)
-
-        # Add guidance and require citing concrete traits/interests or brief quotes from PDF snippets.
-        guidance = (
-            "When possible, cite specific phrases or concrete topics from the PDF snippets (e.g., 'robotics', 'data visualization', 'sustainability'). "
-            "Avoid generic statements. Two concise sentences maximum."
+# Fallback used when the LLM could not explain a group
+def _fallback_explanation(strategy: str) -> str:
+    return f"This group has been formed based on the {strategy} strategy to balance skills and interests."
+
+
+# Cache key for one group's explanation: membership, member profiles and the prompt context
+def _explanation_cache_key(
+    members: List[str],
+    student_profiles: Dict[str, str],
+    strategy: str,
+    prompt_context: Optional[str],
+    selected_prompts: Optional[List[Dict[str, Any]]]
+) -> str:
+    payload = json.dumps({
+        "members": sorted([name, student_profiles.get(name, "")] for name in members),
+        "strategy": strategy,
+        "prompt_context": prompt_context or "",
+        "prompts": [prompt.get('prompt', '') for prompt in (selected_prompts or [])],
+        "model": EXPLANATION_MODEL,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_explanation(key: str) -> Optional[str]:
+    with _EXPLANATION_CACHE_LOCK:
+        cached = _EXPLANATION_CACHE.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        _EXPLANATION_CACHE.pop(key, None)
+    return None
+
+
+def cache_explanation(key: str, explanation: str) -> None:
+    with _EXPLANATION_CACHE_LOCK:
+        _EXPLANATION_CACHE[key] = (time.monotonic() + EXPLANATION_CACHE_TTL_SECONDS, explanation)
+
+
+def clear_explanation_cache() -> None:
+    with _EXPLANATION_CACHE_LOCK:
+        _EXPLANATION_CACHE.clear()
+
+
+def _create_explanation_llm() -> ChatOpenAI:
+    # Retries are handled by the explanation engine so rate limits back off across all batches
+    return ChatOpenAI(
+        model=EXPLANATION_MODEL,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        timeout=EXPLANATION_REQUEST_TIMEOUT_SECONDS,
+        max_retries=0,
+    )
+
+
+def _build_batch_explanation_prompt(
+    batch: List[Tuple[str, List[str]]],
+    student_profiles: Dict[str, str],
+    strategy: str,
+    prompt_context: Optional[str],
+    selected_prompts: Optional[List[Dict[str, Any]]]
+) -> str:
+    """Build one prompt asking for explanations of every group in the batch."""
+    # Build the assignment context
+    assignment_context = ""
+    if prompt_context:
+        assignment_context = f"\nOriginal assignment: {prompt_context}\n"
+
+    # Build context about which prompts were used for grouping
+    prompts_context = ""
+    if selected_prompts:
+        prompt_questions = [prompt.get('prompt', 'Unknown prompt')[:100] for prompt in selected_prompts]
+        prompts_context = f"\nGrouping was based on responses to these specific questions: {'; '.join(prompt_questions)}\n"
+
+    group_sections = []
+    for group_id, members in batch:
+        profiles_text = "\n".join(f"{name}: {student_profiles.get(name, 'No description')}" for name in members)
+        group_sections.append(
+            f"### {group_id}\nStudents: {', '.join(members)}.\n"
+            f"Student profiles (including content from their submitted documents):\n{profiles_text}"
         )
-        
-        # Build the assignment context
-        assignment_context = ""
-        if prompt_context:
-            assignment_context = f"\nOriginal assignment: {prompt_context}\n"
-        
-        # Build context about which prompts were used for grouping
-        prompts_context = ""
-        if selected_prompts:
-            prompt_questions = [prompt.get('prompt', 'Unknown prompt')[:100] for prompt in selected_prompts]
-            prompts_context = f"\nGrouping was based on responses to these specific questions: {'; '.join(prompt_questions)}\n"
-        
-        # Create the explanation prompt
-        prompt = f"""You are an instructor assistant helping students understand their team formation.
+
+    return f"""You are an instructor assistant helping students understand their team formation.
 The course is forming project teams using a '{strategy}' strategy.{assignment_context}{prompts_context}
-Students in **{group_id}**: {', '.join(members)}.
+{chr(10).join(group_sections)}
 
-Student profiles (including content from their submitted documents):
-{profiles_text}
+For each group above, write 2 concise sentences explaining why these students were grouped together for this assignment. Base each explanation on specific themes, topics, or approaches from their submitted materials. {EXPLANATION_GUIDANCE}
+Return exactly one entry per group, using the group id exactly as written after '###'."""
 
-Write 2 concise sentences explaining why these students were grouped together for this assignment. Base your explanation on specific themes, topics, or approaches from their submitted materials. {guidance}"""
 
-        # Get explanation from LLM
-        response = llm.invoke([
-            SystemMessage(content="You are a helpful academic writing assistant."),
-            HumanMessage(content=prompt)
-        ])
-        return group_id, response.content.strip()
-    except Exception as e:
-        print(f"Error generating explanation for {group_id}: {e}")
-        return group_id, f"This group has been formed based on the {strategy} strategy to balance skills and interests."
+# Pull {group_id: explanation} for the requested groups out of a structured LLM response
+def _parse_batch_explanations(response: Any, group_ids: List[str]) -> Dict[str, str]:
+    if hasattr(response, "content"):
+        response = response.content
+    if isinstance(response, str):
+        response = json.loads(response)
+    wanted = set(group_ids)
+    explanations = {}
+    for item in (response or {}).get("explanations", []):
+        group_id = str(item.get("group_id", "")).strip()
+        explanation = str(item.get("explanation", "")).strip()
+        if group_id in wanted and explanation:
+            explanations[group_id] = explanation
+    return explanations
+
+
+# Rate limits, timeouts and provider-side errors are worth retrying; bad requests are not
+def _is_retryable_llm_error(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    return type(error).__name__ in ("RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError")
+
+
+# Exponential backoff with jitter, honouring a Retry-After header when the provider sends one
+def _retry_delay_seconds(error: Exception, attempt: int) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        retry_after = 0.0
+    backoff = EXPLANATION_RETRY_BASE_SECONDS * (2 ** attempt)
+    return max(retry_after, backoff * (0.5 + random.random() / 2))
+
+
+class ExplanationRateLimiter:
+    """
+    Spaces out request starts so no more than requests_per_minute are sent.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _explain_group_batch(
+    batch: List[Tuple[str, List[str]]],
+    student_profiles: Dict[str, str],
+    strategy: str,
+    prompt_context: Optional[str],
+    selected_prompts: Optional[List[Dict[str, Any]]],
+    llm: Any,
+    semaphore: asyncio.Semaphore,
+    rate_limiter: ExplanationRateLimiter
+) -> Dict[str, str]:
+    """Explain one batch of groups with a single structured LLM request, retrying rate limits."""
+    group_ids = [group_id for group_id, _ in batch]
+    messages = [
+        SystemMessage(content="You are a helpful academic writing assistant."),
+        HumanMessage(content=_build_batch_explanation_prompt(batch, student_profiles, strategy, prompt_context, selected_prompts))
+    ]
+    structured_llm = llm.with_structured_output(EXPLANATION_BATCH_SCHEMA, method="json_schema", strict=True)
+
+    for attempt in range(EXPLANATION_MAX_RETRIES + 1):
+        try:
+            async with semaphore:
+                await rate_limiter.acquire()
+                response = await structured_llm.ainvoke(messages)
+            return _parse_batch_explanations(response, group_ids)
+        except SoftTimeLimitExceeded:
+            raise
+        except Exception as e:
+            if attempt >= EXPLANATION_MAX_RETRIES or not _is_retryable_llm_error(e):
+                print(f"Error generating explanations for {', '.join(group_ids)}: {e}")
+                return {}
+            delay = _retry_delay_seconds(e, attempt)
+            print(f"⏳ Explanation request for {len(group_ids)} groups throttled ({type(e).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    return {}
+
+
+async def _generate_llm_explanations_async(
+    groups: Dict[str, List[str]],
+    student_profiles: Dict[str, str],
+    strategy: str,
+    prompt_context: Optional[str],
+    selected_prompts: Optional[List[Dict[str, Any]]],
+    llm: Any,
+    on_explanations: Optional[Callable[[Dict[str, str]], None]] = None
+) -> Dict[str, str]:
+    """
+    Explain all groups, several per request, serving unchanged groups from the cache.
+
+    on_explanations is called with the explanations gathered so far each time a
+    batch completes, so callers can persist partial results.
+    """
+    explanations: Dict[str, str] = {}
+    cache_keys: Dict[str, str] = {}
+    pending: List[Tuple[str, List[str]]] = []
+    for group_id, members in groups.items():
+        cache_keys[group_id] = _explanation_cache_key(members, student_profiles, strategy, prompt_context, selected_prompts)
+        cached = get_cached_explanation(cache_keys[group_id])
+        if cached is not None:
+            explanations[group_id] = cached
+        else:
+            pending.append((group_id, members))
+
+    print(f"🗂️  {len(explanations)} explanations from cache, {len(pending)} groups to explain")
+
+    def report_progress():
+        if on_explanations and explanations:
+            try:
+                on_explanations(dict(explanations))
+            except Exception as e:
+                print(f"⚠️  Failed to report partial explanations: {e}")
+
+    report_progress()
+    if not pending:
+        return explanations
+
+    semaphore = asyncio.Semaphore(EXPLANATION_MAX_CONCURRENT_REQUESTS)
+    rate_limiter = ExplanationRateLimiter(EXPLANATION_REQUESTS_PER_MINUTE)
+    batches = [pending[i:i + EXPLANATION_GROUPS_PER_REQUEST] for i in range(0, len(pending), EXPLANATION_GROUPS_PER_REQUEST)]
+    print(f"🚀 Explaining {len(pending)} groups in {len(batches)} requests "
+          f"(up to {EXPLANATION_MAX_CONCURRENT_REQUESTS} concurrent)")
+
+    async def run_batch(batch):
+        return batch, await _explain_group_batch(
+            batch, student_profiles, strategy, prompt_context, selected_prompts, llm, semaphore, rate_limiter
+        )
+
+    for finished in asyncio.as_completed([run_batch(batch) for batch in batches]):
+        batch, batch_explanations = await finished
+        for group_id, _ in batch:
+            if group_id in batch_explanations:
+                explanations[group_id] = batch_explanations[group_id]
+                cache_explanation(cache_keys[group_id], batch_explanations[group_id])
+            else:
+                # Not cached, so the next run asks the LLM again
+                explanations[group_id] = _fallback_explanation(strategy)
+        print(f"✅ Completed explanations for {', '.join(group_id for group_id, _ in batch)}")
+        report_progress()
+
+    return explanations
+
+
+# Run a coroutine from sync code, also when the calling thread already runs an event loop
+def _run_coroutine_sync(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 def _generate_single_rule_based_explanation(
     group_id: str, 
@@ -895,8 +1205,37 @@ def _generate_single_rule_based_explanation(
     
     return group_id, explanation
 
-def _generate_group_explanations(groups: dict, student_data: list, strategy: str, use_llm: bool = True, db_session: Optional[Any] = None, prompt_context: Optional[str] = None, selected_prompts: Optional[List[Dict[str, Any]]] = None) -> dict:
-    """Generate explanations for why students were grouped together using LLM or simple rules with concurrent processing."""
+# Up to five text snippets for a document: its Qdrant chunks, else the snippets stored in doc_metadata
+def _fetch_document_snippets(qdrant_client: Any, doc: Any) -> List[str]:
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+    snippets: List[str] = []
+    try:
+        recs, _ = qdrant_client.scroll(
+            collection_name=doc.user_collection_name,
+            scroll_filter=Filter(must=[FieldCondition(key="upload_id", match=MatchValue(value=doc.upload_id))]),
+            limit=32
+        )
+        for rec in recs:
+            payload = getattr(rec, 'payload', {}) or {}
+            # LangChain typically stores 'text' or 'page_content'
+            text = payload.get('text') or payload.get('page_content') or ""
+            if text:
+                snippets.append(text)
+            if len(snippets) >= 5:
+                break
+    except Exception:
+        pass  # Qdrant retrieval failed, try fallback
+
+    if not snippets and doc.doc_metadata and 'snippets' in doc.doc_metadata:
+        fallback_snippets = doc.doc_metadata['snippets']
+        if isinstance(fallback_snippets, list):
+            snippets.extend(fallback_snippets[:5])
+    return snippets
+
+
+def _generate_group_explanations(groups: dict, student_data: list, strategy: str, use_llm: bool = True, db_session: Optional[Any] = None, prompt_context: Optional[str] = None, selected_prompts: Optional[List[Dict[str, Any]]] = None, on_explanations: Optional[Callable[[Dict[str, str]], None]] = None) -> dict:
+    """Generate explanations for why students were grouped together using batched async LLM requests or simple rules."""
     print(f"🎯 EXPLANATION FUNCTION CALLED:")
     print(f"   Groups: {list(groups.keys())}")
     print(f"   Students: {len(student_data)}")
@@ -910,98 +1249,68 @@ def _generate_group_explanations(groups: dict, student_data: list, strategy: str
     
     # Attempt to retrieve brief snippets from PDFs for each student via Qdrant
     try:
-        if db_session is not None:
+        doc_ids = set()
+        for pdf_ids in student_pdf_map.values():
+            for doc_id in pdf_ids:
+                try:
+                    doc_ids.add(int(doc_id))
+                except (TypeError, ValueError):
+                    continue
+        if db_session is not None and doc_ids:
+            from sqlmodel import select
             from scripts.utils import create_qdrant_client
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
             from models.database.db_models import Document
-            qdrant_client = create_qdrant_client()
+
+            # One query for every referenced document, then the Qdrant scrolls run concurrently
+            docs = db_session.exec(select(Document).where(Document.id.in_(doc_ids))).all()
+            active_docs = {doc.id: doc for doc in docs if doc.is_active}
+            doc_snippets: Dict[int, List[str]] = {}
+            if active_docs:
+                qdrant_client = create_qdrant_client()
+                with ThreadPoolExecutor(max_workers=min(8, len(active_docs))) as executor:
+                    fetched = executor.map(lambda doc: _fetch_document_snippets(qdrant_client, doc), active_docs.values())
+                    doc_snippets = dict(zip(active_docs.keys(), fetched))
+
             for name, pdf_ids in student_pdf_map.items():
-                if not pdf_ids:
-                    continue
-                snippets: list[str] = []
+                snippets: List[str] = []
                 for doc_id in pdf_ids:
                     try:
-                        doc = db_session.get(Document, int(doc_id))
-                        if not doc or not doc.is_active:
-                            continue
-                        
-                        # Try Qdrant first
-                        try:
-                            recs, _ = qdrant_client.scroll(
-                                collection_name=doc.user_collection_name,
-                                scroll_filter=Filter(must=[FieldCondition(key="upload_id", match=MatchValue(value=doc.upload_id))]),
-                                limit=32
-                            )
-                            for rec in recs:
-                                payload = getattr(rec, 'payload', {}) or {}
-                                # LangChain typically stores 'text' or 'page_content'
-                                text = payload.get('text') or payload.get('page_content') or ""
-                                if text:
-                                    snippets.append(text)
-                                if len(snippets) >= 5:
-                                    break
-                        except Exception as qdrant_err:
-                            pass  # Qdrant retrieval failed, try fallback
-                        
-                        # If no Qdrant results, try fallback to stored snippets in doc_metadata
-                        if not snippets and doc.doc_metadata and 'snippets' in doc.doc_metadata:
-                            fallback_snippets = doc.doc_metadata['snippets']
-                            if isinstance(fallback_snippets, list):
-                                snippets.extend(fallback_snippets[:5])
-                        
-                        if len(snippets) >= 5:
-                            break
-                    except Exception:
+                        snippets.extend(doc_snippets.get(int(doc_id), []))
+                    except (TypeError, ValueError):
                         continue
+                    if len(snippets) >= 5:
+                        break
                 if snippets:
                     # Append a compact snippet to the student's profile text
-                    merged = "\n".join(snippets)
+                    merged = "\n".join(snippets[:5])
                     merged = merged.replace("\n\n", "\n").strip()
                     # keep at most ~800 chars to keep prompts brief
                     merged = merged[:800]
                     base_text = student_profiles.get(name, "") or ""
                     student_profiles[name] = (base_text + ("\n" if base_text else "") + f"PDF snippets: {merged}").strip()
+    except SoftTimeLimitExceeded:
+        raise
     except Exception as e:
         # If RAG enrichment fails, continue with base profiles
         print(f"RAG enrichment for explanations failed: {e}")
     
     explanations = {}
     
-    # Determine optimal thread count (max 8 to avoid overwhelming API rate limits)
-    max_workers = min(8, len(groups))
-    print(f"🚀 Using {max_workers} concurrent workers for explanation generation")
-    
     if use_llm and os.getenv("OPENAI_API_KEY"):
-        # Initialize the LLM
         try:
-            llm = ChatOpenAI(
-                model="gpt-5-mini", 
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
-            
-            # Use ThreadPoolExecutor for concurrent LLM calls
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_group = {
-                    executor.submit(
-                        _generate_single_llm_explanation,
-                        group_id,
-                        members,
-                        student_profiles,
-                        strategy,
-                        prompt_context,
-                        selected_prompts,
-                        llm
-                    ): group_id
-                    for group_id, members in groups.items()
-                }
-                
-                # Collect results as they complete
-                for future in as_completed(future_to_group):
-                    group_id, explanation = future.result()
-                    explanations[group_id] = explanation
-                    print(f"✅ Completed explanation for {group_id}")
-                    
+            llm = _create_explanation_llm()
+            explanations = _run_coroutine_sync(_generate_llm_explanations_async(
+                groups,
+                student_profiles,
+                strategy,
+                prompt_context,
+                selected_prompts,
+                llm,
+                on_explanations=on_explanations
+            ))
+        except SoftTimeLimitExceeded:
+            # Streamed explanations are checkpointed; rule-based ones must not replace them
+            raise
         except Exception as e:
             print(f"Error initializing LLM: {e}")
             use_llm = False
@@ -1016,30 +1325,19 @@ def _generate_group_explanations(groups: dict, student_data: list, strategy: str
             prompt_count = len(selected_prompts)
             prompts_info = f" based on responses to {prompt_count} selected submission prompt{'s' if prompt_count != 1 else ''}"
         
-        # Use ThreadPoolExecutor for concurrent rule-based generation
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_group = {
-                executor.submit(
-                    _generate_single_rule_based_explanation,
-                    group_id,
-                    members,
-                    student_profiles,
-                    strategy,
-                    prompts_info
-                ): group_id
-                for group_id, members in groups.items()
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_group):
-                group_id, explanation = future.result()
-                explanations[group_id] = explanation
-                print(f"✅ Completed rule-based explanation for {group_id}")
+        for group_id, members in groups.items():
+            group_id, explanation = _generate_single_rule_based_explanation(
+                group_id,
+                members,
+                student_profiles,
+                strategy,
+                prompts_info
+            )
+            explanations[group_id] = explanation
+        if on_explanations:
+            on_explanations(dict(explanations))
     
-    print(f"🎯 EXPLANATIONS COMPLETED: {len(explanations)} explanations generated concurrently")
-    for group_id, explanation in explanations.items():
-        print(f"   {group_id}: {explanation[:150]}...")
+    print(f"🎯 EXPLANATIONS COMPLETED: {len(explanations)} explanations generated")
     
     return explanations
 
@@ -0,0 +1,110 @@
+"""
+Group Completion Index - Incremental response tracking for live presentation groups
+
+Keeps, for every group, the set of connected members and, per prompt, the set of
+those members who have responded. The index is updated as students connect,
+disconnect, change group and respond, so checking whether a group has finished a
+prompt is a pair of set sizes instead of a rescan of every connected student.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class GroupCompletionIndex:
+    """group -> connected members, and prompt -> group -> members who responded"""
+
+    def __init__(self):
+        self._student_groups: Dict[str, Optional[str]] = {}  # user_id -> group_name (None = no group)
+        self._student_prompts: Dict[str, Set[str]] = {}  # user_id -> prompt ids responded to
+        self._members: Dict[Optional[str], Set[str]] = {}  # group_name -> connected user_ids
+        self._responded: Dict[str, Dict[Optional[str], Set[str]]] = {}  # prompt_id -> group_name -> user_ids
+        self._summarized: Dict[str, Set[str]] = {}  # prompt_id -> groups whose summary was claimed
+
+    def add_student(self, user_id: str, group_name: Optional[str], responded_prompt_ids: Iterable[str] = ()):
+        """Track a connected student (replacing any previous connection for the same user)"""
+        self.remove_student(user_id)
+        self._student_groups[user_id] = group_name
+        self._student_prompts[user_id] = set(responded_prompt_ids)
+        self._members.setdefault(group_name, set()).add(user_id)
+        for prompt_id in self._student_prompts[user_id]:
+            self._responded.setdefault(prompt_id, {}).setdefault(group_name, set()).add(user_id)
+
+    def remove_student(self, user_id: str):
+        """Stop tracking a disconnected student"""
+        if user_id not in self._student_groups:
+            return
+        group_name = self._student_groups.pop(user_id)
+        self._discard(self._members, group_name, user_id)
+        for prompt_id in self._student_prompts.pop(user_id, set()):
+            self._discard(self._responded.get(prompt_id, {}), group_name, user_id)
+
+    def set_group(self, user_id: str, group_name: Optional[str]):
+        """Move a tracked student (and their responses) to another group"""
+        if user_id not in self._student_groups or self._student_groups[user_id] == group_name:
+            return
+        prompt_ids = self._student_prompts.get(user_id, set())
+        self.add_student(user_id, group_name, prompt_ids)
+
+    def record_response(self, user_id: str, prompt_id: str) -> Optional[str]:
+        """Record a response; returns the student's group if this completed it, claimed for summarizing"""
+        if user_id not in self._student_groups:
+            return None
+        group_name = self._student_groups[user_id]
+        self._student_prompts[user_id].add(prompt_id)
+        self._responded.setdefault(prompt_id, {}).setdefault(group_name, set()).add(user_id)
+
+        if group_name is None or not self.is_complete(prompt_id, group_name):
+            return None
+        claimed = self._summarized.setdefault(prompt_id, set())
+        if group_name in claimed:
+            return None
+        # Claimed before any await in the caller, so concurrent responses summarize a group once
+        claimed.add(group_name)
+        return group_name
+
+    def is_complete(self, prompt_id: str, group_name: Optional[str]) -> bool:
+        members = self._members.get(group_name)
+        responded = self._responded.get(prompt_id, {}).get(group_name)
+        return bool(members) and responded is not None and len(responded) == len(members)
+
+    def progress(self, prompt_id: str, group_name: Optional[str]) -> Tuple[int, int]:
+        """(responded, connected) member counts for a group on a prompt"""
+        return (len(self._responded.get(prompt_id, {}).get(group_name, ())), len(self._members.get(group_name, ())))
+
+    def response_count(self, prompt_id: str) -> int:
+        """Connected students (in any group) who responded to a prompt"""
+        return sum(len(members) for members in self._responded.get(prompt_id, {}).values())
+
+    def release_summary(self, prompt_id: str, group_name: str):
+        """Allow a group's summary to be claimed again (e.g. after generation failed)"""
+        self._summarized.get(prompt_id, set()).discard(group_name)
+
+    def group_of(self, user_id: str) -> Optional[str]:
+        return self._student_groups.get(user_id)
+
+    def groups(self) -> Dict[Optional[str], List[str]]:
+        """group_name -> connected user_ids (None collects students without a group)"""
+        return {group_name: list(members) for group_name, members in self._members.items() if members}
+
+    def clear_responses(self):
+        """Forget all responses and claimed summaries, keeping group membership"""
+        for prompt_ids in self._student_prompts.values():
+            prompt_ids.clear()
+        self._responded.clear()
+        self._summarized.clear()
+
+    def clear(self):
+        self._student_groups.clear()
+        self._student_prompts.clear()
+        self._members.clear()
+        self._responded.clear()
+        self._summarized.clear()
+
+    @staticmethod
+    def _discard(index: Dict[Optional[str], Set[str]], group_name: Optional[str], user_id: str):
+        members = index.get(group_name)
+        if members is None:
+            return
+        members.discard(user_id)
+        if not members:
+            del index[group_name]
@@ -0,0 +1,88 @@
+"""
+Group Summaries - Background, concurrency-limited group summary generation
+
+When a group completes a prompt, its summary is generated in a background task
+instead of inside the message handler of the student whose answer completed the
+group. Jobs are deduplicated per (presentation, prompt, group) while they are
+queued or running, LLM calls share one process-wide concurrency limit across every
+presentation, and a call that runs past the timeout is abandoned so the caller can
+send a fallback summary instead.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+SummaryJobKey = Tuple[str, str, str]  # (deployment_id, prompt_id, group_name)
+
+
+class GroupSummaryQueue:
+    """Background summary jobs with per-key deduplication and a shared limit on concurrent LLM calls"""
+
+    def __init__(self, max_concurrent: int = 4, timeout_seconds: float = 45):
+        self.max_concurrent = max_concurrent  # 0 = no limit
+        self.timeout_seconds = timeout_seconds
+        self.running = 0  # LLM calls holding a slot right now
+        self._jobs: Dict[SummaryJobKey, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def submit(self, key: SummaryJobKey, job: Callable[[], Awaitable[None]]) -> bool:
+        """Run job in the background, unless a job for the same key is already queued or running"""
+        existing = self._jobs.get(key)
+        if existing is not None and not existing.done():
+            return False
+        self._jobs[key] = asyncio.get_running_loop().create_task(self._run(key, job))
+        return True
+
+    async def _run(self, key: SummaryJobKey, job: Callable[[], Awaitable[None]]):
+        try:
+            await job()
+        except Exception as e:
+            print(f"❌ Group summary job failed for {key[2]} (prompt {key[1]}): {e}")
+        finally:
+            if self._jobs.get(key) is asyncio.current_task():
+                del self._jobs[key]
+
+    async def call(self, summarize: Callable[[], Awaitable[T]]) -> T:
+        """Run one LLM call in a concurrency slot; raises asyncio.TimeoutError after timeout_seconds"""
+        limiter = self._limiter()
+        if limiter is None:
+            return await asyncio.wait_for(summarize(), self.timeout_seconds)
+        async with limiter:
+            self.running += 1
+            try:
+                return await asyncio.wait_for(summarize(), self.timeout_seconds)
+            finally:
+                self.running -= 1
+
+    def _limiter(self) -> Optional[asyncio.Semaphore]:
+        if self.max_concurrent <= 0:
+            return None
+        # Semaphores belong to one event loop; tests run each scenario in a new one
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _tasks(self, deployment_id: Optional[str] = None) -> List[asyncio.Task]:
+        return [task for key, task in self._jobs.items()
+                if not task.done() and (deployment_id is None or key[0] == deployment_id)]
+
+    def pending_count(self, deployment_id: Optional[str] = None) -> int:
+        """Jobs queued or running (for one presentation, or all of them)"""
+        return len(self._tasks(deployment_id))
+
+    async def wait(self, deployment_id: Optional[str] = None):
+        """Wait for the jobs queued so far to finish"""
+        tasks = self._tasks(deployment_id)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel(self, deployment_id: str) -> int:
+        """Drop a presentation's queued and running jobs"""
+        tasks = self._tasks(deployment_id)
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
@@ -1,15 +1,46 @@
 import asyncio
 import json
+import math
 import uuid
 from datetime import datetime, timedelta, timezone
 import secrets
 import string
+import time
 from typing import Dict, Any, List, Optional, Set
 from fastapi import WebSocket, WebSocketDisconnect
 from enum import Enum
 
 # Import response summarizer for group summary generation
-from .response_summarizer import ResponseSummarizer, QuestionContext, StudentResponse
+from .response_summarizer import ResponseSummarizer, QuestionContext, StudentResponse, SummaryResult
+from .group_completion import GroupCompletionIndex
+from .dashboard_updates import DashboardChanges, DashboardUpdateBatcher
+from .presentation_clock import PresentationClock
+from .prompt_payloads import GroupPromptPayload, PreparedPrompt, PromptPayloadCache, SubmissionIndex
+from .student_sessions import StudentSession, StudentSessionStore
+from .group_summaries import GroupSummaryQueue
+from services.websocket_protocol import EncodedMessage, send_encoded
+from scripts.config import load_config
+
+_LIVE_PRESENTATION_CONFIG = load_config().get("live_presentation", {}) or {}
+
+# Teacher dashboard deltas are coalesced and sent at most once per interval
+DASHBOARD_UPDATE_INTERVAL_SECONDS = max(0, int(_LIVE_PRESENTATION_CONFIG.get("dashboard_update_interval_ms", 250))) / 1000
+
+# One scheduler for every presentation timer in this process; clients count down to the
+# deadline themselves and only get expiry and occasional drift corrections (0 disables them)
+PRESENTATION_CLOCK = PresentationClock(max(0, int(_LIVE_PRESENTATION_CONFIG.get("timer_sync_interval_seconds", 30))))
+
+# Disconnected students can resume their session (state replayed from memory) within this window (0 disables)
+STUDENT_RESUME_WINDOW_SECONDS = max(0, int(_LIVE_PRESENTATION_CONFIG.get("student_resume_window_seconds", 120)))
+# Unacknowledged messages kept per student for replay on resume
+STUDENT_REPLAY_BUFFER_SIZE = max(1, int(_LIVE_PRESENTATION_CONFIG.get("student_replay_buffer_size", 200)))
+
+# Group summaries run in the background with a process-wide cap on concurrent LLM calls;
+# a call that takes longer than the timeout is replaced by a fallback summary
+GROUP_SUMMARY_QUEUE = GroupSummaryQueue(
+    max_concurrent=max(0, int(_LIVE_PRESENTATION_CONFIG.get("group_summary_concurrency", 4))),
+    timeout_seconds=max(1, float(_LIVE_PRESENTATION_CONFIG.get("group_summary_timeout_seconds", 45)))
+)
 
 # Global registry mapping 5-char roomcast codes to live presentation services
 # This enables unauthenticated devices to connect by code without loading deployments
@@ -34,10 +65,12 @@ class MessageType(str, Enum):
     STUDENT_READY = "student_ready"
     STUDENT_RESPONSE = "student_response"
     STUDENT_JOIN = "student_join"
+    STUDENT_ACK = "ack"
     
     # System messages
     CONNECTION_UPDATE = "connection_update"
     PROMPT_RECEIVED = "prompt_received"
+    SESSION_RESUMED = "session_resumed"
     TIMER_UPDATE = "timer_update"
     TIMER_STARTED = "timer_started"
     TIMER_STOPPED = "timer_stopped"
@@ -82,11 +115,15 @@ class StudentConnection:
         self.responses: Dict[str, Any] = {}  # prompt_id -> response data
         self.group_info: Optional[Dict[str, Any]] = None
         self.assigned_list_items: Dict[str, Any] = {}  # prompt_id -> assigned list item
+        self.session: Optional[StudentSession] = None  # resumable session (numbered, replayable messages)
     
-    async def send_message(self, message: Dict[str, Any]):
+    async def send_message(self, message: Dict[str, Any], sequenced: bool = True):
         """Send a message to this student"""
         try:
-            await self.websocket.send_text(json.dumps(message))
+            if sequenced and self.session is not None:
+                # Numbered and buffered before sending, so a message lost with the socket can be replayed
+                message = self.session.record(message)
+            await send_encoded(self.websocket, message)
             self.last_activity = datetime.now()
             print(f"✅ Message sent successfully to {self.user_name}: {message.get('type', 'unknown')}")
             return True  # Indicate success
@@ -176,8 +213,15 @@ class LivePresentationDeployment:
         self.timer_active = False
         self.timer_start_time: Optional[datetime] = None
         self.timer_duration_seconds: int = 0
-        self.timer_remaining_seconds: int = 0
-        self.timer_task: Optional[asyncio.Task] = None
+        self.timer_ends_at: Optional[datetime] = None
+        self._timer_key = f"{deployment_id}:{id(self)}"
+        
+        # Per-group prompt payloads, prepared once per send and reused for late joiners and
+        # roomcast resyncs; the version changes whenever the group data is replaced
+        self._group_assignment_version: int = 0
+        self._prompt_payloads = PromptPayloadCache()
+        self._submission_index: Optional[SubmissionIndex] = None
+        self._submission_index_source: Optional[Dict[str, Any]] = None
         
         # Variable data (for group info, list items, etc.)
         self.input_variable_data: Optional[Any] = None
@@ -185,9 +229,6 @@ class LivePresentationDeployment:
         # Separate storage for theme data (list items) to avoid conflicts with group data
         self._theme_data: Optional[List[Any]] = None
         
-        # Track current group item assignments for late-joining roomcast devices
-        self._current_group_item_assignments: Dict[str, Any] = {}
-        
         # Cache for submission prompt data for display alongside live presentation prompts
         self._submission_data: Optional[Dict[str, Any]] = None
         
@@ -200,8 +241,18 @@ class LivePresentationDeployment:
         # Database session for persistence
         self._db_session = None
         
-        # Group response completion tracking: prompt_id -> {group_name -> {completed: bool, summary_sent: bool}}
-        self._group_completion_status: Dict[str, Dict[str, Dict[str, bool]]] = {}
+        # Group response completion tracking, updated on connect/disconnect/regroup/response
+        self._completion_index = GroupCompletionIndex()
+        
+        # Responses restored from the database after a restart: user_id -> {prompt_id -> response data}
+        self._restored_responses: Dict[str, Dict[str, Any]] = {}
+        
+        # Resumable student sessions: reconnects within the window are restored from memory
+        self._student_sessions = StudentSessionStore(STUDENT_RESUME_WINDOW_SECONDS, STUDENT_REPLAY_BUFFER_SIZE)
+        
+        # Coalesced teacher dashboard updates, and the student stats teachers last received
+        self._dashboard_updates = DashboardUpdateBatcher(self._send_dashboard_delta, DASHBOARD_UPDATE_INTERVAL_SECONDS)
+        self._dashboard_students: Dict[str, Dict[str, Any]] = {}
         
         # Navigation state for group submission navigation
         self.navigation_state: Optional[Dict[str, Any]] = None
@@ -322,6 +373,16 @@ class LivePresentationDeployment:
         
         print(f"🎤 Added system prompts: 1 (Thank you prompt)")
     
+    @property
+    def input_variable_data(self) -> Optional[Any]:
+        return self._input_variable_data
+    
+    @input_variable_data.setter
+    def input_variable_data(self, data: Optional[Any]):
+        # Prepared prompt payloads depend on group membership
+        self._input_variable_data = data
+        self._group_assignment_version += 1
+    
     def set_input_variable_data(self, data: Any):
         """Set data from connected input variable (e.g., group data)"""
         self.input_variable_data = data
@@ -926,37 +987,140 @@ class LivePresentationDeployment:
         """Get submission prompt responses for a specific student"""
         if not self._submission_data:
             return None
-        
-        try:
-            students = self._submission_data.get("students", [])
-            for student in students:
-                if student.get("name") == user_name:
-                    # Standardize on 'submission_responses'
-                    return student.get("submission_responses", {})
-            return None
-        except Exception as e:
-            print(f"❌ Error getting submission data for student {user_name}: {e}")
-            return None
+        return self._get_submission_index().for_student(user_name)
 
     def get_submission_data_for_group(self, group_members: List[str]) -> Dict[str, Any]:
         """Get submission prompt responses for all members of a group"""
         if not self._submission_data:
             return {}
-        
-        try:
-            group_responses = {}
-            students = self._submission_data.get("students", [])
-            
-            for member_name in group_members:
-                for student in students:
-                    if student.get("name") == member_name:
-                        group_responses[member_name] = student.get("submission_responses", {})
-                        break
-            
-            return group_responses
-        except Exception as e:
-            print(f"❌ Error getting submission data for group: {e}")
+        return self._get_submission_index().for_group(group_members)
+    
+    def _get_submission_index(self) -> SubmissionIndex:
+        """Name -> responses index over the submission data, rebuilt whenever the data is replaced"""
+        if self._submission_index is None or self._submission_index_source is not self._submission_data:
+            self._submission_index = SubmissionIndex(self._submission_data)
+            self._submission_index_source = self._submission_data
+        return self._submission_index
+    
+    # ---------------------------
+    # Prepared prompt payloads
+    # ---------------------------
+    def _prompt_requests_submission_responses(self, prompt: Dict[str, Any]) -> bool:
+        """Only include submission responses for prompts that explicitly ask for review/discussion of past responses"""
+        # Check explicit flags first
+        if prompt.get("include_submission_responses", False) or prompt.get("show_group_responses", False):
+            return True
+        # System prompts (like thank you messages) should never include responses
+        if prompt.get("isSystemPrompt", False) or prompt.get("category") == "closing":
+            return False
+        # Check if the prompt statement suggests it wants to review previous responses
+        if self._submission_data:
+            statement = (prompt.get("statement") or "").lower()
+            review_keywords = ["insights", "screen", "discuss", "review", "look at", "based on", "consider your", "reflect on", "responses", "navigate"]
+            return any(keyword in statement for keyword in review_keywords)
+        return False
+    
+    def _prepare_prompt(self, prompt: Dict[str, Any], list_data: Optional[List[Any]] = None, refresh: bool = False) -> PreparedPrompt:
+        """Per-group payloads for a prompt, cached by prompt id and group assignment version.
+        Sending a prompt prepares it afresh (refresh=True); when only the group data changed,
+        list items already dealt to groups are carried over so nobody's item changes.
+        """
+        prompt_id = prompt.get("id") or "default"
+        version = self._group_assignment_version
+        if not refresh:
+            prepared = self._prompt_payloads.get(prompt_id, version)
+            if prepared:
+                return prepared
+        
+        prepared = PreparedPrompt(
+            prompt_id=prompt_id,
+            version=version,
+            include_responses=self._prompt_requests_submission_responses(prompt),
+            requested_keys=self._extract_requested_submission_keys(prompt)
+        )
+        previous = self._prompt_payloads.latest(prompt_id)
+        if list_data is not None:
+            prepared.shuffle_list_items(list_data)
+        elif previous and not refresh:
+            prepared.list_items = previous.list_items
+            prepared.item_assignments = previous.item_assignments
+        self._prompt_payloads.put(prepared)
+        print(f"🧮 Prepared payloads for prompt {prompt_id} (group assignment version {version}, include_responses={prepared.include_responses})")
+        return prepared
+    
+    def _filter_group_submissions(self, group_responses: Dict[str, Any], allowed_keys: Optional[Set[str]]) -> Dict[str, Any]:
+        """Filter each member's responses to the requested keys, dropping members left with none"""
+        filtered_group: Dict[str, Any] = {}
+        for member, response_map in group_responses.items():
+            filtered = self._filter_submission_map_to_keys(response_map, allowed_keys)
+            if filtered:
+                filtered_group[member] = filtered
+        return filtered_group
+    
+    def _group_prompt_payload(self, prepared: PreparedPrompt, group_name: str) -> GroupPromptPayload:
+        """A group's members and submissions for a prepared prompt, computed on first use"""
+        payload = prepared.groups.get(group_name)
+        if payload is None:
+            members = self._get_group_members(group_name)
+            payload = GroupPromptPayload(members=members)
+            if prepared.include_responses and self._submission_data and members:
+                group_responses = self._get_submission_index().for_group(members)
+                payload.submission_responses = self._filter_group_submissions(group_responses, prepared.requested_keys)
+            prepared.groups[group_name] = payload
+        return payload
+    
+    def _submission_fields_for_student(self, prepared: PreparedPrompt, student: "StudentConnection") -> Dict[str, Any]:
+        """Prompt fields carrying submissions: the group's, or the student's own without a group"""
+        if not prepared.include_responses or not self._submission_data:
             return {}
+        group_name = self._student_group_name(student)
+        if group_name:
+            group_responses = self._group_prompt_payload(prepared, group_name).submission_responses
+            return {"group_submission_responses": group_responses} if group_responses else {}
+        
+        if student.user_name not in prepared.student_submissions:
+            responses = self._get_submission_index().for_student(student.user_name)
+            prepared.student_submissions[student.user_name] = (
+                self._filter_submission_map_to_keys(responses, prepared.requested_keys) if responses else {}
+            )
+        responses = prepared.student_submissions[student.user_name]
+        return {"submission_responses": responses} if responses else {}
+    
+    def _prompt_payload_for_student(self, prepared: PreparedPrompt, student: "StudentConnection", prompt: Dict[str, Any]) -> Dict[str, Any]:
+        """The prompt as one student receives it, with their group's list item and submissions"""
+        payload = {**prompt, **self._submission_fields_for_student(prepared, student)}
+        if prepared.list_items:
+            payload["assigned_list_item"] = prepared.assign_list_item(self._student_group_name(student) or "No Group")
+        return payload
+    
+    def _roomcast_prompt_fields(self, prepared: PreparedPrompt, group_name: str) -> Dict[str, Any]:
+        """Prompt fields for a group's roomcast display: its list item and its members' submissions"""
+        fields: Dict[str, Any] = {}
+        if prepared.list_items:
+            fields["assigned_list_item"] = prepared.assign_list_item(group_name)
+        if prepared.include_responses and self._submission_data:
+            payload = self._group_prompt_payload(prepared, group_name)
+            if payload.members:
+                group_responses = payload.submission_responses
+            else:
+                # Fallback: include all students' data if we can't detect members
+                group_responses = self._all_prompt_submissions(prepared)
+                print(f"📝 No members detected for '{group_name}'. Falling back to all submission data ({len(group_responses)} students)")
+            if group_responses:
+                fields["group_submission_responses"] = group_responses
+        return fields
+    
+    def _all_prompt_submissions(self, prepared: PreparedPrompt) -> Dict[str, Any]:
+        """Every student's submissions for a prepared prompt (displays that belong to no known group)"""
+        payload = prepared.groups.get(None)
+        if payload is None:
+            index = self._get_submission_index()
+            # Prefer names from submission cache (DB), fallback to connected students
+            names = index.names() or [student.user_name for student in self.students.values()]
+            payload = GroupPromptPayload(members=names)
+            payload.submission_responses = self._filter_group_submissions(index.for_group(names), prepared.requested_keys)
+            prepared.groups[None] = payload
+        return payload.submission_responses
     
     def _try_get_parent_page_deployment(self):
         """Try to get parent page deployment from deployment manager"""
@@ -988,6 +1152,20 @@ class LivePresentationDeployment:
     
     def _assign_group_info_to_student(self, student: "StudentConnection"):
         """Assign group info to a student based on current variable data"""
+        self._find_group_info_for_student(student)
+        
+        # Keep the completion index in step with group changes of connected students
+        if self.students.get(student.user_id) is student:
+            self._completion_index.set_group(student.user_id, self._student_group_name(student))
+    
+    @staticmethod
+    def _student_group_name(student: "StudentConnection") -> Optional[str]:
+        if student.group_info and student.group_info.get("group_name"):
+            return student.group_info["group_name"]
+        return None
+    
+    def _find_group_info_for_student(self, student: "StudentConnection"):
+        """Set a student's group_info from the current variable data"""
         student.group_info = None  # Reset first
         
         print(f"🔍 Assigning group info to student: {student.user_name}")
@@ -1108,6 +1286,19 @@ class LivePresentationDeployment:
             self.current_prompt = session_record.current_prompt
             self.input_variable_data = session_record.input_variable_data
             
+            # Re-arm a timer that is still running (deadlines are absolute, so nothing is lost)
+            timer_ends_at = getattr(session_record, 'timer_ends_at', None)
+            if timer_ends_at and self.presentation_active:
+                if timer_ends_at.tzinfo is None:
+                    timer_ends_at = timer_ends_at.replace(tzinfo=timezone.utc)
+                if timer_ends_at > datetime.now(timezone.utc):
+                    self.timer_active = True
+                    self.timer_ends_at = timer_ends_at
+                    self.timer_duration_seconds = session_record.timer_duration_seconds or 0
+                    self.timer_start_time = timer_ends_at - timedelta(seconds=self.timer_duration_seconds)
+                    self._arm_timer()
+                    print(f"⏰ Re-armed timer ending at {timer_ends_at.isoformat()}")
+            
             # Restore saved prompts (but preserve system prompts)
             if session_record.saved_prompts:
                 # First, separate system prompts from regular prompts
@@ -1127,7 +1318,31 @@ class LivePresentationDeployment:
             # Note: Student connections are not restored on server restart
             # Students will need to reconnect, but their data remains in the database
             # However, their assigned list items will be restored when they reconnect
-            
+
+            # Responses are reattached on reconnect so group completion carries over the restart
+            response_rows = self._db_session.exec(
+                select(LivePresentationResponse, LivePresentationStudentConnection.user_id)
+                .join(LivePresentationStudentConnection, LivePresentationResponse.student_connection_id == LivePresentationStudentConnection.id)
+                .where(
+                    LivePresentationResponse.session_id == session_record.id,
+                    LivePresentationResponse.is_active == True
+                )
+                .order_by(LivePresentationResponse.submitted_at)
+            ).all()
+            self._restored_responses = {}
+            for response_record, user_id in response_rows:
+                response_data = response_record.response_data or {}
+                # Later responses to the same prompt replace earlier ones, as in StudentConnection.add_response
+                self._restored_responses.setdefault(user_id, {})[response_record.prompt_id] = {
+                    "response": response_record.response_text,
+                    "prompt_id": response_record.prompt_id,
+                    "timestamp": response_record.submitted_at.isoformat(),
+                    "user_id": user_id,
+                    "user_name": response_data.get("user_name")
+                }
+            if self._restored_responses:
+                print(f"🎤 Restored {len(response_rows)} responses from {len(self._restored_responses)} students")
+
             print(f"🎤 Session state restored for {self.deployment_id}")
             print(f"   Session active: {self.session_active}")
             print(f"   Ready check active: {self.ready_check_active}")
@@ -1237,7 +1452,9 @@ class LivePresentationDeployment:
                     ready_check_active=self.ready_check_active,
                     current_prompt=self.current_prompt,
                     input_variable_data=self.input_variable_data,
-                    saved_prompts=[prompt.to_dict() for prompt in self.saved_prompts if not prompt.is_system_prompt]
+                    saved_prompts=[prompt.to_dict() for prompt in self.saved_prompts if not prompt.is_system_prompt],
+                    timer_ends_at=self.timer_ends_at if self.timer_active else None,
+                    timer_duration_seconds=self.timer_duration_seconds if self.timer_active else 0
                 )
                 self._db_session.add(session_record)
             else:
@@ -1248,6 +1465,9 @@ class LivePresentationDeployment:
                 session_record.current_prompt = self.current_prompt
                 session_record.input_variable_data = self.input_variable_data
                 session_record.saved_prompts = [prompt.to_dict() for prompt in self.saved_prompts if not prompt.is_system_prompt]
+                # The deadline is shared so another worker (or a restart) can re-arm the same timer
+                session_record.timer_ends_at = self.timer_ends_at if self.timer_active else None
+                session_record.timer_duration_seconds = self.timer_duration_seconds if self.timer_active else 0
                 session_record.updated_at = datetime.now()
                 self._db_session.add(session_record)
             
@@ -1495,6 +1715,7 @@ class LivePresentationDeployment:
                 LivePresentationSession, LivePresentationStudentConnection, LivePresentationResponse
             )
             from sqlmodel import select
+            from database.database import run_serialized_write_async
             
             # Get session and student connection records
             session_record = self._db_session.exec(
@@ -1526,8 +1747,12 @@ class LivePresentationDeployment:
                         }
                     )
                     
-                    self._db_session.add(response_record)
-                    self._db_session.commit()
+                    def _write_response(write_session):
+                        write_session.add(response_record)
+                        write_session.commit()
+                    
+                    # High-frequency write: go through the serialized writer instead of the shared session
+                    await run_serialized_write_async(_write_response)
                     print(f"🎤 Response saved for {student.user_name} on prompt {prompt_id}")
                     
         except Exception as e:
@@ -1581,8 +1806,18 @@ class LivePresentationDeployment:
         except Exception as e:
             print(f"❌ Error restoring list items for {student.user_name}: {e}")
     
-    async def connect_student(self, user_id: str, user_name: str, websocket: WebSocket) -> bool:
-        """Connect a student to the live presentation"""
+    async def connect_student(
+        self,
+        user_id: str,
+        user_name: str,
+        websocket: WebSocket,
+        resume_token: Optional[str] = None,
+        last_seq: Optional[int] = None
+    ) -> bool:
+        """Connect a student to the live presentation.
+        A student presenting the resume token of a session that is still in memory is resumed
+        without touching the database; everyone else takes the full (cold start) path.
+        """
         try:
             # WebSocket is already accepted in the route handler
             print(f"🎤 LivePresentationDeployment.connect_student called")
@@ -1590,6 +1825,12 @@ class LivePresentationDeployment:
             print(f"🎤 Current students in this instance: {len(self.students)}")
             print(f"🎤 Student names in this instance: {[s.user_name for s in self.students.values()]}")
             
+            if resume_token:
+                session = self._student_sessions.resume(user_id, resume_token)
+                if session is not None:
+                    return await self._resume_student(session, websocket, last_seq)
+                print(f"🔁 Session for {user_name} can't be resumed (unknown or expired token); reconnecting from the database")
+            
             # Try to auto-detect group variables if we don't have data yet
             print(f"🔍 DEBUG: input_variable_data is None: {self.input_variable_data is None}")
             print(f"🔍 DEBUG: parent_page_deployment exists: {self._parent_page_deployment is not None}")
@@ -1626,7 +1867,16 @@ class LivePresentationDeployment:
             # Restore assigned list items from database if this is a returning student
             await self._restore_student_list_items(student)
             
+            # Reattach responses given before a server restart
+            student.responses.update(self._restored_responses.pop(user_id, {}))
+            
             self.students[user_id] = student
+            self._completion_index.add_student(user_id, self._student_group_name(student), student.responses.keys())
+            
+            # A new resumable session, so a reconnect within the resume window can skip all of this
+            PRESENTATION_CLOCK.cancel(self._student_session_key(user_id))
+            if self._student_sessions.enabled:
+                student.session = self._student_sessions.open(student, self._group_assignment_version)
             
             # Send welcome message based on presentation state
             if self.presentation_active:
@@ -1645,6 +1895,8 @@ class LivePresentationDeployment:
                     "presentation_active": self.presentation_active,
                     "group_info": student.group_info
                 }
+            if student.session is not None:
+                welcome_message["resume_token"] = student.session.token
             await student.send_message(welcome_message)
             
             # Immediately inform the newly connected student if roomcast mode is active
@@ -1676,52 +1928,7 @@ class LivePresentationDeployment:
                         self.current_prompt = recent_prompt
                         print(f"🎤 Updated current_prompt for late-joining student compatibility")
                     
-                    # Check if this student should get a specific list item for this prompt
-                    prompt_id = recent_prompt.get("id")
-                    assigned_list_item = None
-                    
-                    # First, check if we already have a stored assignment for this student and prompt
-                    if prompt_id:
-                        assigned_list_item = student.get_assigned_list_item(prompt_id)
-                        if assigned_list_item:
-                            print(f"🔄 Using restored list item assignment for {user_name} on prompt {prompt_id}")
-                    
-                    # If no stored assignment but prompt uses list items, assign one
-                    if (assigned_list_item is None and prompt_id and recent_prompt.get("useRandomListItem") and 
-                        recent_prompt.get("selectedListVariable")):
-                        print(f"🎯 Late-joining student needs list item assignment for prompt {prompt_id}")
-                        assigned_list_item = await self._get_list_item_for_late_joining_student(
-                            student, prompt_id, recent_prompt.get("selectedListVariable")
-                        )
-                    
-                    # Send the prompt with the assigned list item (if any)
-                    prompt_message = {
-                        "type": "prompt_received", 
-                        "prompt": recent_prompt,
-                        "is_late_join": True  # Flag to indicate this is for a late-joining student
-                    }
-                    
-                    if assigned_list_item is not None:
-                        prompt_message["prompt"]["assigned_list_item"] = assigned_list_item
-                        print(f"🎤 Including assigned list item for late-joining student {user_name}")
-                    
-                    # Check if this is a navigation prompt and add navigation data
-                    if recent_prompt.get('enableGroupSubmissionNavigation') and student.group_info:
-                        group_name = student.group_info.get('group_name')
-                        submission_prompt_id = recent_prompt.get('submissionPromptId')
-                        
-                        if group_name and submission_prompt_id and self.navigation_state:
-                            navigation_data = self.navigation_state.get('navigation_data', {})
-                            group_submissions = navigation_data.get(group_name, [])
-                            
-                            if group_submissions:
-                                print(f"🧭 Adding navigation data for late-joining student {user_name} in {group_name}")
-                                prompt_message["prompt"]["groupSubmissions"] = group_submissions
-                                prompt_message["prompt"]["currentSubmissionIndex"] = 0
-                                prompt_message["prompt"]["totalSubmissions"] = len(group_submissions)
-                                prompt_message["prompt"]["currentStudentName"] = group_submissions[0].get('studentName') if group_submissions else None
-                                prompt_message["prompt"]["currentSubmission"] = group_submissions[0].get('submission') if group_submissions else None
-                    
+                    prompt_message = await self._late_join_prompt_message(student, recent_prompt)
                     await student.send_message(prompt_message)
             
             # Send group info message if student has group assignment (for late-joining students)
@@ -1733,6 +1940,10 @@ class LivePresentationDeployment:
                     "is_late_join": True  # Flag to indicate this is for a late-joining student
                 })
             
+            # Late joiners see a running timer (students only see timers when roomcast is off)
+            if self.timer_active and not self.roomcast_enabled:
+                await student.send_message({**self._timer_message("timer_started"), "is_late_join": True})
+            
             # Check if there's an active ready check and send it to late-joining student
             # Only send ready checks if presentation is active
             if self.ready_check_active and self.presentation_active:
@@ -1747,7 +1958,7 @@ class LivePresentationDeployment:
             await self._save_student_connection(student)
             
             # Notify teachers of new connection
-            await self._notify_teachers_connection_update()
+            await self._notify_teachers_connection_update(user_id)
             
             print(f"🎤 Student connected: {user_name} ({user_id})")
             return True
@@ -1756,6 +1967,132 @@ class LivePresentationDeployment:
             print(f"Error connecting student {user_name}: {e}")
             return False
     
+    async def _late_join_prompt_message(self, student: "StudentConnection", recent_prompt: Dict[str, Any]) -> Dict[str, Any]:
+        """The prompt_received message for a student who joined (or came back) after the prompt was sent"""
+        # Check if this student should get a specific list item for this prompt
+        prompt_id = recent_prompt.get("id")
+        assigned_list_item = None
+        
+        # First, check if we already have a stored assignment for this student and prompt
+        if prompt_id:
+            assigned_list_item = student.get_assigned_list_item(prompt_id)
+            if assigned_list_item:
+                print(f"🔄 Using restored list item assignment for {student.user_name} on prompt {prompt_id}")
+        
+        # If no stored assignment but prompt uses list items, assign one
+        if (assigned_list_item is None and prompt_id and recent_prompt.get("useRandomListItem") and 
+            recent_prompt.get("selectedListVariable")):
+            print(f"🎯 Late-joining student needs list item assignment for prompt {prompt_id}")
+            assigned_list_item = await self._get_list_item_for_late_joining_student(
+                student, prompt_id, recent_prompt.get("selectedListVariable")
+            )
+        
+        # Send the prompt with the assigned list item (if any)
+        prompt_message = {
+            "type": "prompt_received", 
+            "prompt": dict(recent_prompt),
+            "is_late_join": True  # Flag to indicate this is for a late-joining student
+        }
+        
+        # Submissions prepared for the student's group when the prompt was sent
+        if prompt_id:
+            prepared = self._prepare_prompt(recent_prompt)
+            prompt_message["prompt"].update(self._submission_fields_for_student(prepared, student))
+        
+        if assigned_list_item is not None:
+            prompt_message["prompt"]["assigned_list_item"] = assigned_list_item
+            print(f"🎤 Including assigned list item for late-joining student {student.user_name}")
+        
+        # Check if this is a navigation prompt and add navigation data
+        if recent_prompt.get('enableGroupSubmissionNavigation') and student.group_info:
+            group_name = student.group_info.get('group_name')
+            submission_prompt_id = recent_prompt.get('submissionPromptId')
+        
+            if group_name and submission_prompt_id and self.navigation_state:
+                navigation_data = self.navigation_state.get('navigation_data', {})
+                group_submissions = navigation_data.get(group_name, [])
+        
+                if group_submissions:
+                    print(f"🧭 Adding navigation data for late-joining student {student.user_name} in {group_name}")
+                    prompt_message["prompt"]["groupSubmissions"] = group_submissions
+                    prompt_message["prompt"]["currentSubmissionIndex"] = 0
+                    prompt_message["prompt"]["totalSubmissions"] = len(group_submissions)
+                    prompt_message["prompt"]["currentStudentName"] = group_submissions[0].get('studentName') if group_submissions else None
+                    prompt_message["prompt"]["currentSubmission"] = group_submissions[0].get('submission') if group_submissions else None
+        
+        
+        return prompt_message
+    
+    def _student_session_key(self, user_id: str) -> str:
+        """Presentation clock key for a detached student's resume window"""
+        return f"{self._timer_key}:student:{user_id}"
+    
+    async def _resume_student(self, session: StudentSession, websocket: WebSocket, last_seq: Optional[int]) -> bool:
+        """Reattach a student to their in-memory session: replay missed messages, then catch up on
+        whatever changed while they were away. No database reads or writes.
+        """
+        user_id = session.user_id
+        PRESENTATION_CLOCK.cancel(self._student_session_key(user_id))
+        
+        # The socket may have dropped without the server noticing yet; the session holds the same connection
+        student: StudentConnection = self.students.get(user_id) or session.student
+        student.websocket = websocket
+        student.session = session
+        student.status = ConnectionStatus.READY if user_id in self.ready_students else ConnectionStatus.CONNECTED
+        student.last_activity = datetime.now()
+        
+        # Group data replaced while the student was away: recompute their group in memory
+        previous_group_info = student.group_info
+        if session.group_version != self._group_assignment_version:
+            self._find_group_info_for_student(student)
+            session.group_version = self._group_assignment_version
+        
+        self.students[user_id] = student
+        self._completion_index.add_student(user_id, self._student_group_name(student), student.responses.keys())
+        
+        missed = session.missed_since(last_seq)
+        await student.send_message({
+            "type": MessageType.SESSION_RESUMED,
+            "resume_token": session.token,
+            "replayed": len(missed) if missed is not None else 0,
+            "session_active": self.session_active,
+            "presentation_active": self.presentation_active,
+            "group_info": student.group_info
+        }, sequenced=False)
+        
+        # Messages lost with the old socket, in order and with their original numbers
+        for message in missed or []:
+            if not await student.send_message(message, sequenced=False):
+                await self.disconnect_student(user_id, websocket)
+                return True
+        print(f"🔁 Resumed session for {student.user_name}: replayed {len(missed) if missed is not None else 'none (gap)'} messages")
+        
+        # Then what was broadcast while the student wasn't connected
+        if self.presentation_active and self.current_prompt and (missed is None or session.prompt_id != self.current_prompt.get("id")):
+            await student.send_message(await self._late_join_prompt_message(student, self.current_prompt))
+        if student.group_info and (missed is None or student.group_info != previous_group_info):
+            await student.send_message({"type": "group_info", "group_info": student.group_info, "is_late_join": True})
+        if self.timer_active and not self.roomcast_enabled:
+            await student.send_message({**self._timer_message("timer_started"), "is_late_join": True})
+        if self.ready_check_active and self.presentation_active and user_id not in self.ready_students:
+            await student.send_message({
+                "type": "ready_check",
+                "message": "Please click 'I'm Ready' when you're ready to continue",
+                "is_late_join": True
+            })
+        
+        await self._notify_teachers_connection_update(user_id)
+        return True
+    
+    async def _expire_student_session(self, user_id: str):
+        """Resume window passed: forget the session and persist the disconnect"""
+        session = self._student_sessions.get(user_id)
+        if session is None or session.detached_at is None:
+            return
+        self._student_sessions.drop(user_id)
+        print(f"⌛ Resume window for {session.student.user_name} passed; recording disconnect")
+        await self._save_student_connection(session.student)
+    
     async def connect_teacher(self, websocket: WebSocket) -> bool:
         """Connect a teacher to the live presentation"""
         try:
@@ -1784,12 +2121,12 @@ class LivePresentationDeployment:
             stats = self.get_presentation_stats()
             print(f"🎤 Sending teacher_connected message with stats: total_students={stats.get('total_students', 0)}, connected_students={stats.get('connected_students', 0)}")
             
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "teacher_connected",
                 "stats": stats,
                 "saved_prompts": [prompt.to_dict() for prompt in self.saved_prompts],
                 "presentation_active": self.presentation_active
-            }))
+            })
             
             print(f"🎤 Teacher connected successfully to {self.deployment_id}")
             print(f"🎤 Final teacher count: {len(self.teacher_websockets)}")
@@ -1801,17 +2138,29 @@ class LivePresentationDeployment:
             traceback.print_exc()
             return False
     
-    async def disconnect_student(self, user_id: str):
-        """Disconnect a student"""
+    async def disconnect_student(self, user_id: str, websocket: Optional[WebSocket] = None):
+        """Disconnect a student (websocket: only if this is still the student's socket)"""
         if user_id in self.students:
             student = self.students[user_id]
+            if websocket is not None and student.websocket is not websocket:
+                # The student has already reconnected on a new socket
+                return
             student.status = ConnectionStatus.DISCONNECTED
             
-            # Save disconnection to database
-            await self._save_student_connection(student)
+            if self._student_sessions.detach(user_id) is not None:
+                # Resumable: the disconnect is only saved if the student doesn't come back in time
+                PRESENTATION_CLOCK.schedule(
+                    self._student_session_key(user_id),
+                    time.time() + self._student_sessions.resume_window_seconds,
+                    lambda: self._expire_student_session(user_id)
+                )
+            else:
+                # Save disconnection to database
+                await self._save_student_connection(student)
             
             del self.students[user_id]
-            await self._notify_teachers_connection_update()
+            self._completion_index.remove_student(user_id)
+            await self._notify_teachers_connection_update(user_id)
             print(f"🎤 Student disconnected: {user_id}")
     
     async def disconnect_teacher(self, websocket: WebSocket):
@@ -1837,11 +2186,17 @@ class LivePresentationDeployment:
                 print(f"❌ Student {user_id} not found in students dict")
                 return
             
+            if message_type == MessageType.STUDENT_ACK:
+                # Delivery acknowledgement: the session no longer needs to keep these messages for replay
+                if student.session is not None and isinstance(message.get("seq"), int):
+                    student.session.ack(message["seq"])
+                return
+            
             if message_type == MessageType.STUDENT_READY:
                 print(f"🎤 Student {student.user_name} is ready")
                 student.set_ready()
                 self.ready_students.add(user_id)
-                await self._notify_teachers_connection_update()
+                await self._notify_teachers_connection_update(user_id)
                 
             elif message_type == MessageType.STUDENT_RESPONSE:
                 prompt_id = message.get("prompt_id")
@@ -1863,7 +2218,7 @@ class LivePresentationDeployment:
                     await self._notify_teachers_response_received(student, prompt_id, response_text)
                     
                     # Check if this completes a group's responses and trigger summary if needed
-                    await self._check_group_completion_and_summarize(prompt_id)
+                    await self._check_group_completion_and_summarize(prompt_id, user_id)
                 else:
                     print(f"❌ No prompt_id in student response from {student.user_name}")
             
@@ -1985,7 +2340,7 @@ class LivePresentationDeployment:
         for ws, ws_group_name in self._roomcast_ws_lookup.items():
             if ws_group_name == group_name:
                 try:
-                    await ws.send_text(json.dumps(update_message))
+                    await send_encoded(ws, update_message)
                 except Exception as e:
                     print(f"❌ Failed to send update to roomcast: {e}")
         
@@ -2199,7 +2554,7 @@ class LivePresentationDeployment:
             ws_group_name = self._roomcast_ws_lookup.get(ws)
             if ws_group_name == group_name:
                 try:
-                    await ws.send_text(json.dumps(message))
+                    await send_encoded(ws, message)
                 except Exception as e:
                     print(f"❌ Failed to send to roomcast {group_name}: {e}")
     
@@ -2240,30 +2595,30 @@ class LivePresentationDeployment:
                 
                 # Send test results to teacher
                 try:
-                    await websocket.send_text(json.dumps({
+                    await send_encoded(websocket, {
                         "type": "connection_test_result",
                         "message": f"Connection test complete. {failed_count} dead connections removed.",
                         "failed_count": failed_count,
                         "stats": stats
-                    }))
+                    })
                 except Exception as e:
                     print(f"❌ Failed to send connection test result to teacher: {e}")
                 
             elif message_type == MessageType.GET_STATS:
                 stats = self.get_presentation_stats()
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "stats_update",
                     "stats": stats
-                }))
+                })
             
             elif message_type == "refresh_variable_data":
                 # Manual refresh of variable data from page deployment
                 print(f"🔄 Teacher requested manual variable data refresh")
                 # This would need to be implemented by the calling context
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "refresh_requested",
                     "message": "Variable data refresh requested - check server logs"
-                }))
+                })
             
             elif message_type == "diagnose_config":
                 # Diagnose the current configuration
@@ -2272,22 +2627,22 @@ class LivePresentationDeployment:
                 print(f"🔍 Current deployment_id: {self.deployment_id}")
                 print(f"🔍 Current input_variable_data: {self.input_variable_data}")
                 print(f"🔍 Full diagnosis: {diagnosis}")
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "diagnosis_complete",
                     "message": "Configuration diagnosis complete - check server logs",
                     "diagnosis": diagnosis
-                }))
+                })
             
             elif message_type == "refresh_group_variables":
                 # Manually refresh group variable data
                 print(f"🔄 Teacher requested group variable refresh")
                 self.refresh_group_variable_data()
                 diagnosis = self.diagnose_group_data_issues()
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "group_variables_refreshed",
                     "message": "Group variables refreshed - check server logs",
                     "diagnosis": diagnosis
-                }))
+                })
             
             elif message_type == "diagnose_list_variables":
                 # Diagnose list variable configuration
@@ -2296,20 +2651,20 @@ class LivePresentationDeployment:
                 print(f"🔍 List variable diagnosis complete:")
                 print(f"    Prompts with list variables: {len(diagnosis['prompts_with_list_variables'])}")
                 print(f"    Available list variables: {len(diagnosis['available_list_variables'])}")
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "list_variables_diagnosed",
                     "message": "List variable diagnosis complete - check server logs for details",
                     "diagnosis": diagnosis
-                }))
+                })
             
             elif message_type == "clear_list_cache":
                 # Clear list variable cache
                 print(f"🔄 Teacher requested list variable cache clear")
                 self.clear_list_variable_cache()
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "list_cache_cleared",
                     "message": "List variable cache cleared - next prompt will reload data fresh"
-                }))
+                })
             
             elif message_type == "validate_list_configuration":
                 # Validate list variable configuration
@@ -2320,11 +2675,11 @@ class LivePresentationDeployment:
                     print(f"    Errors: {validation['errors']}")
                 if validation['warnings']:
                     print(f"    Warnings: {validation['warnings']}")
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "list_configuration_validated",
                     "message": f"Configuration validation complete: {'Valid' if validation['valid'] else 'Issues found'}",
                     "validation": validation
-                }))
+                })
                 
             elif message_type == "rebuild_variable_mapping":
                 # Rebuild variable mapping using workflow data
@@ -2334,25 +2689,25 @@ class LivePresentationDeployment:
                     self._parent_page_deployment.rebuild_variable_id_mapping(workflow_data)
                     # Clear cache to force fresh lookups
                     self.clear_list_variable_cache()
-                    await websocket.send_text(json.dumps({
+                    await send_encoded(websocket, {
                         "type": "variable_mapping_rebuilt",
                         "message": "Variable mapping rebuilt successfully - try sending prompts again"
-                    }))
+                    })
                 else:
-                    await websocket.send_text(json.dumps({
+                    await send_encoded(websocket, {
                         "type": "variable_mapping_rebuild_failed", 
                         "message": "Failed to rebuild variable mapping - check server logs for details"
-                    }))
+                    })
             
             elif message_type == "debug_config_structure":
                 # Debug the configuration structure to understand what's available
                 print(f"🔍 Teacher requested config structure debug")
                 debug_info = await self._debug_configuration_structure()
-                await websocket.send_text(json.dumps({
+                await send_encoded(websocket, {
                     "type": "config_debug_complete",
                     "message": "Configuration debug complete - check logs for details",
                     "debug_info": debug_info
-                }))
+                })
             
             elif message_type == "rotate_summaries":
                 # Handle rotation quiz game trigger from teacher
@@ -2432,9 +2787,6 @@ class LivePresentationDeployment:
             await self._send_prompt_with_group_list_items(prompt_data, list_variable_id)
         else:
             # Standard prompt - send same message to all students
-            # Clear group item assignments since this is not a group-item prompt
-            self._current_group_item_assignments = {}
-            
             print(f"🔍 USING STANDARD PROMPT - NOT group-based assignment")
             print(f"   Reason: use_random_list_item={use_random_list_item}, list_variable_id={list_variable_id}")
             print(f"   Available theme variables: {available_theme_vars if 'available_theme_vars' in locals() else 'None checked'}")
@@ -2445,25 +2797,9 @@ class LivePresentationDeployment:
             except Exception:
                 pass
 
-            # Check if we need to include submission data
-            # Only include submission responses for prompts that explicitly ask for review/discussion of past responses
-            # This can be determined by:
-            # 1. Explicit flag in the prompt data
-            # 2. System prompts (like "thank you") should never include responses
-            # 3. Prompts that mention "insights", "screen", "discuss", "review" might want responses
-            should_include_responses = False
-            
-            # Check explicit flags first
-            if self.current_prompt.get("include_submission_responses", False) or self.current_prompt.get("show_group_responses", False):
-                should_include_responses = True
-            # System prompts (like thank you messages) should never include responses
-            elif self.current_prompt.get("isSystemPrompt", False) or self.current_prompt.get("category") == "closing":
-                should_include_responses = False
-            # Check if the prompt statement suggests it wants to review previous responses
-            elif self._submission_data:
-                statement = self.current_prompt.get("statement", "").lower()
-                review_keywords = ["insights", "screen", "discuss", "review", "look at", "based on", "consider your", "reflect on", "responses", "navigate"]
-                should_include_responses = any(keyword in statement for keyword in review_keywords)
+            # Prepare once: each group's submissions are looked up a single time, not once per member
+            prepared = self._prepare_prompt(self.current_prompt, refresh=True)
+            should_include_responses = prepared.include_responses and bool(self._submission_data)
             
             print(f"🎤 Standard prompt processing: use_random_list_item={use_random_list_item}, should_include_responses={should_include_responses}")
             if should_include_responses:
@@ -2471,9 +2807,6 @@ class LivePresentationDeployment:
                 print(f"📝 Including submission data ({'selected '+str(sel_count) if sel_count else 'all'} prompts) because prompt requested responses")
             else:
                 print(f"📝 NOT including submission data - prompt doesn't request responses (system={self.current_prompt.get('isSystemPrompt', False)}, category={self.current_prompt.get('category', 'none')})")
-            
-            # Determine per-prompt requested submission keys to avoid over-sending
-            requested_keys = self._extract_requested_submission_keys(self.current_prompt)
 
             # Send to all connected students
             sent_count = 0
@@ -2482,46 +2815,8 @@ class LivePresentationDeployment:
                 if student.status != ConnectionStatus.DISCONNECTED:
                     message = {
                         "type": "prompt_received",
-                        "prompt": self.current_prompt
+                        "prompt": self._prompt_payload_for_student(prepared, student, self.current_prompt)
                     }
-                    
-                    # Add submission data ONLY if the prompt explicitly requests it
-                    if should_include_responses and self._submission_data:
-                        # Check if student has a group - if so, get GROUP submissions
-                        if student.group_info and student.group_info.get('group_name'):
-                            group_name = student.group_info['group_name']
-                            group_members = self._get_group_members(group_name)
-                            
-                            if group_members:
-                                # Get submissions for all group members
-                                group_submission_responses = self.get_submission_data_for_group(group_members)
-                                if group_submission_responses:
-                                    # Filter to requested keys
-                                    filtered_group_responses = self._filter_submission_map_to_keys(group_submission_responses, requested_keys)
-                                    if filtered_group_responses:
-                                        try:
-                                            if isinstance(message["prompt"], dict):
-                                                message["prompt"]["group_submission_responses"] = filtered_group_responses
-                                            print(f"📝 Added group submissions for {student.user_name}'s group {group_name}: {len(filtered_group_responses)} members")
-                                        except Exception as e:
-                                            print(f"❌ Error adding group submissions: {e}")
-                        else:
-                            # No group - fall back to individual submissions
-                            submission_responses = self.get_submission_data_for_student(student.user_name)
-                            if submission_responses:
-                                # Filter to requested keys to prevent sending extra submissions
-                                filtered_responses = self._filter_submission_map_to_keys(submission_responses, requested_keys)
-                                if filtered_responses:
-                                    # Embed inside prompt to match frontend expectations
-                                    try:
-                                        if isinstance(message["prompt"], dict):
-                                            message["prompt"]["submission_responses"] = filtered_responses
-                                    except Exception:
-                                        pass
-                                    try:
-                                        print(f"📝 Added {len(filtered_responses)} filtered submission responses for {student.user_name} (requested_keys={sorted(list(requested_keys)) if requested_keys else 'deployment-level/default'})")
-                                    except Exception:
-                                        pass
 
                     success = await student.send_message(message)
                     if success:
@@ -2619,27 +2914,15 @@ class LivePresentationDeployment:
             
             print(f"🎯 Found {len(groups_to_students)} groups for list item assignment")
             
-            # Assign list items to groups (cycle through list if more groups than items)
-            import random
-            available_items = list_data.copy()
-            
-            # Use deterministic randomization based on prompt ID to ensure consistency
-            # across all students (including late-joining students)
-            prompt_id = self.current_prompt.get("id", "default")
-            random.seed(hash(prompt_id) % (2**32))  # Create deterministic seed from prompt ID
-            random.shuffle(available_items)  # Randomize the list items consistently
-            print(f"🎯 Using deterministic shuffle based on prompt ID: {prompt_id}")
-            
-            group_assignments = {}
-            # Store assignments for late-joining roomcast devices
-            self._current_group_item_assignments = {}
-            
-            for i, (group_name, students) in enumerate(groups_to_students.items()):
-                # Cycle through available items if we have more groups than items
-                item_index = i % len(available_items)
-                selected_item = available_items[item_index]
-                group_assignments[group_name] = selected_item
-                self._current_group_item_assignments[group_name] = selected_item
+            # Prepare every group's payload once. List items are dealt to groups (cycling if there are
+            # more groups than items) from a shuffle seeded by the prompt ID, and late-joining students
+            # and roomcast devices reuse this deal instead of recomputing it
+            prepared = self._prepare_prompt(self.current_prompt, list_data=list_data, refresh=True)
+            print(f"🎯 Using deterministic shuffle based on prompt ID: {prepared.prompt_id}")
+            
+            for group_name, students in groups_to_students.items():
+                item_index = len(prepared.item_assignments) % len(prepared.list_items)
+                selected_item = prepared.assign_list_item(group_name)
                 
                 # Log what's being assigned (truncate for theme data)
                 item_preview = str(selected_item)[:100] if not isinstance(selected_item, dict) else selected_item.get('title', 'Theme')
@@ -2654,39 +2937,9 @@ class LivePresentationDeployment:
                         
                         message = {
                             "type": "prompt_received",
-                            "prompt": {
-                                **self.current_prompt,
-                                "assigned_list_item": selected_item
-                            }
+                            "prompt": self._prompt_payload_for_student(prepared, student, self.current_prompt)
                         }
                         
-                        # Add submission data ONLY if the prompt explicitly requests it
-                        # Only include submission responses for prompts that explicitly ask for review/discussion of past responses
-                        should_include_responses = False
-                        
-                        # Check explicit flags first
-                        if self.current_prompt.get("include_submission_responses", False) or self.current_prompt.get("show_group_responses", False):
-                            should_include_responses = True
-                        # System prompts (like thank you messages) should never include responses
-                        elif self.current_prompt.get("isSystemPrompt", False) or self.current_prompt.get("category") == "closing":
-                            should_include_responses = False
-                        # Check if the prompt statement suggests it wants to review previous responses
-                        elif self._submission_data:
-                            statement = self.current_prompt.get("statement", "").lower()
-                            review_keywords = ["insights", "screen", "discuss", "review", "look at", "based on", "consider your", "reflect on", "responses", "navigate"]
-                            should_include_responses = any(keyword in statement for keyword in review_keywords)
-                        
-                        if should_include_responses and self._submission_data:
-                            submission_responses = self.get_submission_data_for_student(student.user_name)
-                            if submission_responses:
-                                # Embed inside prompt to match frontend expectations
-                                try:
-                                    if isinstance(message["prompt"], dict):
-                                        message["prompt"]["submission_responses"] = submission_responses
-                                except Exception:
-                                    pass
-                                print(f"📝 Added {len(submission_responses)} submission responses for {student.user_name} (prompt requested responses)")
-                        
                         success = await student.send_message(message)
                         if success:
                             print(f"  📤 Sent theme '{item_preview}' to {student.user_name}")
@@ -2700,7 +2953,7 @@ class LivePresentationDeployment:
             
             print(f"✅ Successfully sent prompts with group-specific list items to all students")
             # Broadcast display prompt per group to roomcast devices
-            await self._broadcast_prompt_to_roomcast(self.current_prompt, group_item_map=group_assignments)
+            await self._broadcast_prompt_to_roomcast(self.current_prompt, group_item_map=dict(prepared.item_assignments))
             
         except Exception as e:
             print(f"❌ Error sending prompt with group list items: {e}")
@@ -2961,63 +3214,27 @@ class LivePresentationDeployment:
         else:
             print(f"⚠️ No group assignment data found in database")
     
-    async def _check_group_completion_and_summarize(self, prompt_id: str):
-        """Check if any groups have completed all responses for a prompt and generate summaries"""
+    async def _check_group_completion_and_summarize(self, prompt_id: str, user_id: str):
+        """Check if a student's response completed their group for a prompt and generate the summary"""
         try:
-            print(f"🎯 Checking group completion for prompt {prompt_id}")
-            
-            # Group current connected students by their assignments
-            groups_to_students = self._group_students_by_assignment()
-            
-            if not groups_to_students:
-                print(f"🔍 No group assignments found, skipping group summary")
+            # The index claims a completed group exactly once, so no other response re-triggers it
+            group_name = self._completion_index.record_response(user_id, prompt_id)
+            responded, connected = self._completion_index.progress(prompt_id, self._completion_index.group_of(user_id))
+            print(f"🎯 Group {self._completion_index.group_of(user_id) or 'No Group'}: {responded}/{connected} responded to prompt {prompt_id}")
+            if not group_name:
                 return
             
-            # Initialize completion tracking for this prompt if not exists
-            if prompt_id not in self._group_completion_status:
-                self._group_completion_status[prompt_id] = {}
-            
-            prompt_completion = self._group_completion_status[prompt_id]
-            
-            # Check completion status for each group
-            for group_name, students_in_group in groups_to_students.items():
-                if group_name == "No Group":
-                    continue  # Skip students without group assignments
-                
-                # Initialize group status if not exists
-                if group_name not in prompt_completion:
-                    prompt_completion[group_name] = {"completed": False, "summary_sent": False}
-                
-                group_status = prompt_completion[group_name]
-                
-                # Skip if we already sent a summary for this group
-                if group_status["summary_sent"]:
-                    continue
-                
-                # Check if all students in this group have responded
-                students_with_responses = [
-                    student for student in students_in_group 
-                    if (student.status != ConnectionStatus.DISCONNECTED and 
-                        prompt_id in student.responses)
-                ]
-                
-                connected_students_in_group = [
-                    student for student in students_in_group 
-                    if student.status != ConnectionStatus.DISCONNECTED
-                ]
-                
-                print(f"🔍 Group {group_name}: {len(students_with_responses)}/{len(connected_students_in_group)} responded")
-                
-                # If all connected students in the group have responded, generate summary
-                if (len(connected_students_in_group) > 0 and 
-                    len(students_with_responses) == len(connected_students_in_group)):
-                    
-                    print(f"✅ Group {group_name} completed! Generating summary...")
-                    group_status["completed"] = True
-                    
-                    # Generate and send group summary
-                    await self._generate_and_send_group_summary(prompt_id, group_name, students_with_responses)
-                    group_status["summary_sent"] = True
+            students_in_group = [
+                self.students[member_id]
+                for member_id in self._completion_index.groups().get(group_name, [])
+                if member_id in self.students
+            ]
+            # Generated in the background, so the student whose answer completed the group isn't kept waiting
+            queued = GROUP_SUMMARY_QUEUE.submit(
+                (self.deployment_id, prompt_id, group_name),
+                lambda: self._generate_and_send_group_summary(prompt_id, group_name, students_in_group)
+            )
+            print(f"✅ Group {group_name} completed! Summary {'queued' if queued else 'already in progress'}")
                     
         except Exception as e:
             print(f"❌ Error checking group completion: {e}")
@@ -3081,12 +3298,20 @@ class LivePresentationDeployment:
                 return
             
             print(f"🎯 Calling response summarizer for {len(student_responses)} responses...")
-            summary_result = await self._response_summarizer.summarize_responses(
-                question_context=question_context,
-                student_responses=student_responses,
-                group_by="all",  # Since we're already processing one group
-                summary_style="comprehensive"
-            )
+            fallback = False
+            try:
+                summary_result = await GROUP_SUMMARY_QUEUE.call(lambda: self._response_summarizer.summarize_responses(
+                    question_context=question_context,
+                    student_responses=student_responses,
+                    group_by="all",  # Since we're already processing one group
+                    summary_style="comprehensive"
+                ))
+            except asyncio.TimeoutError:
+                print(f"⏱️ Summary for {group_name} timed out after {GROUP_SUMMARY_QUEUE.timeout_seconds}s, sending fallback")
+                summary_result, fallback = self._fallback_group_summary(group_name, student_responses), True
+            except Exception as e:
+                print(f"❌ Summarizer failed for {group_name}: {e}, sending fallback")
+                summary_result, fallback = self._fallback_group_summary(group_name, student_responses), True
             
             # Format group name to add space between "Group" and number (e.g., "Group1" -> "Group 1")
             formatted_group_name = group_name.replace(r'^Group(\d+)$', r'Group \1') if group_name.startswith('Group') else group_name
@@ -3104,7 +3329,8 @@ class LivePresentationDeployment:
                     "text": summary_result.summary_text,
                     "key_themes": summary_result.key_themes,
                     "response_count": summary_result.student_count,
-                    "generated_at": summary_result.timestamp.isoformat()
+                    "generated_at": summary_result.timestamp.isoformat(),
+                    "fallback": fallback
                 }
             }
             
@@ -3123,10 +3349,23 @@ class LivePresentationDeployment:
                 print(f"✅ Group summary sent to roomcast for {group_name} (student delivery suppressed)")
             
             # Notify teachers about the summary generation
-            await self._notify_teachers_group_summary_generated(prompt_id, group_name, summary_result, sent_count)
+            await self._notify_teachers_group_summary_generated(prompt_id, group_name, summary_result, sent_count, fallback)
             
         except Exception as e:
             print(f"❌ Error generating group summary for {group_name}: {e}")
+    
+    def _fallback_group_summary(self, group_name: str, student_responses: List[StudentResponse]) -> SummaryResult:
+        """Stand-in summary when the LLM is too slow or fails: the group's answers, briefly"""
+        excerpts = [
+            f"{response.student_name}: {response.response_text[:200]}"
+            for response in student_responses if response.response_text
+        ]
+        return SummaryResult(
+            summary_text="The summary isn't available right now. Here is what the group said:\n" + "\n".join(excerpts),
+            key_themes=[],
+            student_count=len(student_responses),
+            group_id=group_name
+        )
 
     async def _notify_roomcast_summary_generation_started(self, group_name: str, message: Dict[str, Any]):
         try:
@@ -3135,7 +3374,7 @@ class LivePresentationDeployment:
                 return
             ws: WebSocket = device.get("websocket")  # type: ignore
             if ws:
-                await ws.send_text(json.dumps(message))
+                await send_encoded(ws, message)
         except Exception as e:
             print(f"❌ Failed to notify roomcast summary generation started for {group_name}: {e}")
 
@@ -3146,11 +3385,11 @@ class LivePresentationDeployment:
                 return
             ws: WebSocket = device.get("websocket")  # type: ignore
             if ws:
-                await ws.send_text(json.dumps(message))
+                await send_encoded(ws, message)
         except Exception as e:
             print(f"❌ Failed to send group summary to roomcast for {group_name}: {e}")
     
-    async def _notify_teachers_group_summary_generated(self, prompt_id: str, group_name: str, summary_result, sent_count: int):
+    async def _notify_teachers_group_summary_generated(self, prompt_id: str, group_name: str, summary_result, sent_count: int, fallback: bool = False):
         """Notify teachers that a group summary was generated"""
         try:
             message = {
@@ -3160,7 +3399,8 @@ class LivePresentationDeployment:
                 "summary": {
                     "text": summary_result.summary_text,
                     "key_themes": summary_result.key_themes,
-                    "response_count": summary_result.student_count
+                    "response_count": summary_result.student_count,
+                    "fallback": fallback
                 },
                 "sent_to_students": sent_count,
                 "timestamp": datetime.now().isoformat()
@@ -3169,7 +3409,7 @@ class LivePresentationDeployment:
             disconnected_teachers = set()
             for teacher_ws in self.teacher_websockets:
                 try:
-                    await teacher_ws.send_text(json.dumps(message))
+                    await send_encoded(teacher_ws, message)
                 except:
                     disconnected_teachers.add(teacher_ws)
             
@@ -3183,31 +3423,18 @@ class LivePresentationDeployment:
             print(f"❌ Error notifying teachers about group summary: {e}")
     
     def _group_students_by_assignment(self) -> Dict[str, List["StudentConnection"]]:
-        """Group students by their group assignments"""
-        groups = {}
-        
-        print(f"🔍 Grouping {len(self.students)} students by assignment:")
-        
-        for student in self.students.values():
-            if student.status == ConnectionStatus.DISCONNECTED:
-                continue
-                
-            print(f"  - {student.user_name}: group_info = {student.group_info}")
-                
-            if student.group_info and student.group_info.get("group_name"):
-                group_name = student.group_info["group_name"]
-                if group_name not in groups:
-                    groups[group_name] = []
-                groups[group_name].append(student)
-                print(f"    ✅ Assigned to group: {group_name}")
-            else:
+        """Group connected students by their group assignments (from the completion index)"""
+        groups: Dict[str, List["StudentConnection"]] = {}
+        for group_name, member_ids in self._completion_index.groups().items():
+            members = [
+                self.students[member_id] for member_id in member_ids
+                if member_id in self.students and self.students[member_id].status != ConnectionStatus.DISCONNECTED
+            ]
+            if members:
                 # Students without group assignments go to a default group
-                if "No Group" not in groups:
-                    groups["No Group"] = []
-                groups["No Group"].append(student)
-                print(f"    ⚠️ No group assignment - added to 'No Group'")
+                groups[group_name or "No Group"] = members
         
-        print(f"🔍 Final grouping result: {[(name, len(students)) for name, students in groups.items()]}")
+        print(f"🔍 Grouped {len(self.students)} students: {[(name, len(students)) for name, students in groups.items()]}")
         return groups
 
     def _get_group_members(self, group_name: str) -> List[str]:
@@ -3304,7 +3531,7 @@ class LivePresentationDeployment:
             }
             
             try:
-                await ws.send_text(json.dumps(group_info_message))
+                await send_encoded(ws, group_info_message)
                 print(f"✅ Sent updated group info to roomcast for {group_name}")
             except Exception as e:
                 print(f"❌ Failed to send group info update: {e}")
@@ -3321,9 +3548,8 @@ class LivePresentationDeployment:
                     prompt_payload["live_response_state"] = live_response_state
                     print(f"📺 Including updated live response state: {len(live_response_state)} students responded")
                 
-                # Check if prompt has group-specific list items
-                if hasattr(self, '_current_group_item_assignments') and group_name in self._current_group_item_assignments:
-                    prompt_payload["assigned_list_item"] = self._current_group_item_assignments[group_name]
+                # The group's list item and submissions, from the payloads prepared for this prompt
+                prompt_payload.update(self._roomcast_prompt_fields(self._prepare_prompt(self.current_prompt), group_name))
                 
                 prompt_message = {
                     "type": "roomcast_prompt",
@@ -3332,7 +3558,7 @@ class LivePresentationDeployment:
                 }
                 
                 try:
-                    await ws.send_text(json.dumps(prompt_message))
+                    await send_encoded(ws, prompt_message)
                     print(f"✅ Sent updated prompt state to roomcast for {group_name}")
                 except Exception as e:
                     print(f"❌ Failed to send prompt update: {e}")
@@ -3370,52 +3596,29 @@ class LivePresentationDeployment:
             print(f"   List Variable ID: {list_variable_id}")
             print(f"   Student Group: {student.group_info}")
             
-            # Get the list data from the variable
-            list_data = self._get_list_variable_data(list_variable_id)
-            if not list_data:
-                print(f"⚠️ No list data found for variable {list_variable_id}")
-                return None
-            
-            # Check if student has group assignment
-            if not student.group_info or not student.group_info.get("group_name"):
-                print(f"⚠️ Student {student.user_name} has no group assignment, using first list item")
-                assigned_item = list_data[0] if list_data else None
-                if assigned_item:
-                    student.set_assigned_list_item(prompt_id, assigned_item)
-                return assigned_item
-            
-            # Get all current students grouped by assignment
-            groups_to_students = self._group_students_by_assignment()
-            student_group_name = student.group_info["group_name"]
-            
-            # Find which list item this group should get
-            import random
-            available_items = list_data.copy()
-            
-            # Use the SAME deterministic randomization as the original assignment
-            # This ensures late-joining students get the same theme as their group
-            random.seed(hash(prompt_id) % (2**32))  # Same seed as original assignment
-            random.shuffle(available_items)  # Use same randomization logic
-            print(f"🎯 Late-joining: Using same deterministic shuffle for prompt ID: {prompt_id}")
-            
-            # Assign items to groups in the same order as the original assignment
-            group_names = list(groups_to_students.keys())
-            if student_group_name in group_names:
-                group_index = group_names.index(student_group_name)
-                item_index = group_index % len(available_items)
-                assigned_item = available_items[item_index]
-                
-                print(f"✅ Assigned list item {item_index + 1} to late-joining student {student.user_name} (group: {student_group_name})")
-                
-                # Store the assignment for this student
-                student.set_assigned_list_item(prompt_id, assigned_item)
-                return assigned_item
-            else:
-                print(f"⚠️ Student group {student_group_name} not found in current groups, using first item")
-                assigned_item = list_data[0] if list_data else None
-                if assigned_item:
-                    student.set_assigned_list_item(prompt_id, assigned_item)
-                return assigned_item
+            # Reuse the deal made when the prompt was sent
+            prepared = self._prompt_payloads.latest(prompt_id)
+            if prepared is None or not prepared.list_items:
+                # Not prepared in this process (e.g. after a restart): deal the list once, in the
+                # order of the groups connected now, and keep it for everyone who joins after
+                list_data = self._get_list_variable_data(list_variable_id)
+                if not list_data:
+                    print(f"⚠️ No list data found for variable {list_variable_id}")
+                    return None
+                prompt = self.current_prompt if self.current_prompt and self.current_prompt.get("id") == prompt_id else {"id": prompt_id}
+                prepared = self._prepare_prompt(prompt, list_data=list_data, refresh=True)
+                for group_name in self._group_students_by_assignment():
+                    prepared.assign_list_item(group_name)
+                print(f"🎯 Late-joining: Dealt list items for prompt ID: {prompt_id}")
+            
+            # Students without a group share the "No Group" item, as they did when the prompt was sent
+            student_group_name = self._student_group_name(student) or "No Group"
+            assigned_item = prepared.assign_list_item(student_group_name)
+            print(f"✅ Assigned list item to late-joining student {student.user_name} (group: {student_group_name})")
+            
+            # Store the assignment for this student
+            student.set_assigned_list_item(prompt_id, assigned_item)
+            return assigned_item
                 
         except Exception as e:
             print(f"❌ Error getting list item for late-joining student: {e}")
@@ -3423,19 +3626,18 @@ class LivePresentationDeployment:
 
     async def _send_prompt_with_list_item_to_all(self, prompt_data: Dict[str, Any], list_item: Any):
         """Send prompt with the same list item to all students"""
-        message = {
-            "type": "prompt_received",
-            "prompt": {
-                **self.current_prompt,
-                "assigned_list_item": list_item
-            }
-        }
+        # A one-item deal, so late joiners get the same item too
+        prepared = self._prepare_prompt(self.current_prompt, list_data=[list_item], refresh=True)
         
         failed_students = []
         for user_id, student in list(self.students.items()):
             if student.status != ConnectionStatus.DISCONNECTED:
                 # Store the assigned list item for each student
                 student.set_assigned_list_item(self.current_prompt["id"], list_item)
+                message = {
+                    "type": "prompt_received",
+                    "prompt": self._prompt_payload_for_student(prepared, student, self.current_prompt)
+                }
                 success = await student.send_message(message)
                 if not success:
                     failed_students.append(user_id)
@@ -3680,7 +3882,7 @@ class LivePresentationDeployment:
             disconnected_teachers = set()
             for teacher_ws in self.teacher_websockets:
                 try:
-                    await teacher_ws.send_text(json.dumps(result_message))
+                    await send_encoded(teacher_ws, result_message)
                 except:
                     disconnected_teachers.add(teacher_ws)
             
@@ -3717,7 +3919,7 @@ class LivePresentationDeployment:
             if student.status != ConnectionStatus.DISCONNECTED:
                 try:
                     # Test the connection by sending a small message
-                    await student.websocket.send_text(json.dumps(test_message))
+                    await send_encoded(student.websocket, test_message)
                     print(f"✅ Connection test OK: {student.user_name}")
                 except Exception as e:
                     print(f"❌ Connection test FAILED: {student.user_name} - {e}")
@@ -3791,10 +3993,9 @@ class LivePresentationDeployment:
         # (Requirement: "remove all the cache associated with the presentation".)
         try:
             # 1. Forget group completion + summary tracking
-            if getattr(self, "_group_completion_status", None):
-                cleared_prompts = len(self._group_completion_status)
-                self._group_completion_status.clear()
-                print(f"🧹 Cleared group completion cache for {cleared_prompts} prompts")
+            self._completion_index.clear_responses()
+            self._restored_responses.clear()
+            print(f"🧹 Cleared group completion tracking")
             # 2. Clear any list variable cache (so regenerated / re-fetched next start)
             if getattr(self, "_list_variable_cache", None) is not None:
                 cache_size = len(self._list_variable_cache)
@@ -3818,16 +4019,21 @@ class LivePresentationDeployment:
             if cleared_responses or cleared_assigned:
                 print(f"🧹 Cleared {cleared_responses} stored responses and {cleared_assigned} assigned list items from students")
             # 4. Timer state reset (if it was running we already stopped elsewhere, but ensure counters are zeroed)
+            PRESENTATION_CLOCK.cancel(self._timer_key)
             self.timer_active = False
             self.timer_start_time = None
             self.timer_duration_seconds = 0
-            self.timer_remaining_seconds = 0
+            self.timer_ends_at = None
             # 5. Ready student tracking (also cleared a few lines below, but do it early for clarity)
             self.ready_students.clear()
             # 6. Any roomcast session code is cleared later via _clear_roomcast_session(); ensure waiting flag reset
             self.roomcast_waiting = False
             # 7. Mark a timestamp of cache clear for debugging
             self._last_cache_clear_at = datetime.now().isoformat()
+            # 8. Students still inside their resume window reconnect from scratch next time
+            for session in self._student_sessions.detached():
+                PRESENTATION_CLOCK.cancel(self._student_session_key(session.user_id))
+                await self._expire_student_session(session.user_id)
         except Exception as e:
             print(f"⚠️ Cache clear encountered an error (continuing): {e}")
         try:
@@ -3909,6 +4115,30 @@ class LivePresentationDeployment:
         
         print(f"🎤 Ready check started for {len(self.students)} students")
     
+    @property
+    def timer_remaining_seconds(self) -> int:
+        """Whole seconds left on the timer, from its absolute deadline"""
+        if not self.timer_active or not self.timer_ends_at:
+            return 0
+        return max(0, math.ceil((self.timer_ends_at - datetime.now(timezone.utc)).total_seconds()))
+    
+    def _timer_message(self, message_type: str) -> Dict[str, Any]:
+        """Timer state with the absolute deadline; clients count down to ends_at themselves"""
+        return {
+            "type": message_type,
+            "duration_seconds": self.timer_duration_seconds,
+            "remaining_seconds": self.timer_remaining_seconds,
+            "start_time": self.timer_start_time.isoformat() if self.timer_start_time else None,
+            "ends_at": self.timer_ends_at.isoformat() if self.timer_ends_at else None,
+            # Lets clients correct for their own clock being off
+            "server_time": datetime.now(timezone.utc).isoformat()
+        }
+    
+    def _arm_timer(self):
+        PRESENTATION_CLOCK.schedule(
+            self._timer_key, self.timer_ends_at.timestamp(), self._on_timer_expired, self._on_timer_sync
+        )
+    
     async def start_timer(self, minutes: int, seconds: int):
         """Start a countdown timer for the specified duration"""
         if not self.presentation_active:
@@ -3927,22 +4157,16 @@ class LivePresentationDeployment:
         # Use timezone-aware UTC timestamp to avoid client-side timezone misinterpretation
         self.timer_start_time = datetime.now(timezone.utc)
         self.timer_duration_seconds = total_seconds
-        self.timer_remaining_seconds = total_seconds
+        self.timer_ends_at = self.timer_start_time + timedelta(seconds=total_seconds)
 
-        print(f"⏰ Starting timer for {minutes}m {seconds}s ({total_seconds}s)")
+        print(f"⏰ Starting timer for {minutes}m {seconds}s ({total_seconds}s), ends at {self.timer_ends_at.isoformat()}")
 
-        # Create background task to handle timer updates
-        self.timer_task = asyncio.create_task(self._timer_countdown_task())
+        # The shared clock fires the expiry (and drift corrections); no per-presentation loop
+        self._arm_timer()
 
         # Notify all connected users about timer start
-        message = {
-            "type": "timer_started",
-            "duration_seconds": total_seconds,
-            "remaining_seconds": total_seconds,
-            "start_time": self.timer_start_time.isoformat()
-        }
-
-        await self._broadcast_timer_message(message)
+        await self._broadcast_timer_message(self._timer_message("timer_started"))
+        await self._save_session_state()
     
     async def stop_timer(self):
         """Stop the current timer"""
@@ -3951,19 +4175,11 @@ class LivePresentationDeployment:
         
         print(f"⏰ Stopping timer")
         
+        PRESENTATION_CLOCK.cancel(self._timer_key)
         self.timer_active = False
         self.timer_start_time = None
         self.timer_duration_seconds = 0
-        self.timer_remaining_seconds = 0
-        
-        # Cancel the timer task if it exists
-        if self.timer_task and not self.timer_task.done():
-            self.timer_task.cancel()
-            try:
-                await self.timer_task
-            except asyncio.CancelledError:
-                pass
-        self.timer_task = None
+        self.timer_ends_at = None
         
         # Notify all connected users about timer stop
         message = {
@@ -3971,60 +4187,22 @@ class LivePresentationDeployment:
         }
         
         await self._broadcast_timer_message(message)
+        await self._save_session_state()
     
-    async def _timer_countdown_task(self):
-        """Background task that handles timer countdown and periodic updates"""
-        try:
-            # Track last update time in UTC
-            last_update_time = datetime.now(timezone.utc)
-            
-            while self.timer_active and self.timer_remaining_seconds > 0:
-                await asyncio.sleep(1)  # Wait 1 second
-                
-                if not self.timer_active:
-                    break
-                
-                # Calculate actual remaining time based on start time (UTC-aware)
-                if self.timer_start_time:
-                    now_utc = datetime.now(timezone.utc)
-                    elapsed = (now_utc - self.timer_start_time).total_seconds()
-                    self.timer_remaining_seconds = max(0, self.timer_duration_seconds - int(elapsed))
-                
-                # Send update every 10 seconds or when timer expires
-                current_time = datetime.now(timezone.utc)
-                time_since_last_update = (current_time - last_update_time).total_seconds()
-                
-                should_send_update = (
-                    time_since_last_update >= 10 or  # Every 10 seconds
-                    self.timer_remaining_seconds <= 0  # When timer expires
-                )
-                
-                if should_send_update:
-                    message = {
-                        "type": "timer_update",
-                        "remaining_seconds": self.timer_remaining_seconds,
-                        "duration_seconds": self.timer_duration_seconds
-                    }
-                    
-                    if self.timer_remaining_seconds <= 0:
-                        message["type"] = "timer_expired"
-                        print(f"⏰ Timer expired!")
-                        self.timer_active = False
-                    
-                    await self._broadcast_timer_message(message)
-                    last_update_time = current_time
-                
-                if self.timer_remaining_seconds <= 0:
-                    break
-            
-        except asyncio.CancelledError:
-            print(f"⏰ Timer countdown task cancelled")
-            raise
-        except Exception as e:
-            print(f"❌ Error in timer countdown task: {e}")
-        finally:
-            if self.timer_active:
-                self.timer_active = False
+    async def _on_timer_sync(self):
+        """Periodic drift correction from the presentation clock"""
+        if self.timer_active:
+            await self._broadcast_timer_message(self._timer_message("timer_update"))
+    
+    async def _on_timer_expired(self):
+        """Deadline reached (fired once by the presentation clock)"""
+        if not self.timer_active:
+            return
+        print(f"⏰ Timer expired!")
+        message = {**self._timer_message("timer_expired"), "remaining_seconds": 0}
+        self.timer_active = False
+        await self._broadcast_timer_message(message)
+        await self._save_session_state()
     
     async def _broadcast_timer_message(self, message: Dict[str, Any]):
         """Broadcast timer message to students, teachers, and roomcast devices"""
@@ -4044,7 +4222,7 @@ class LivePresentationDeployment:
         disconnected_teachers = set()
         for teacher_ws in self.teacher_websockets:
             try:
-                await teacher_ws.send_text(json.dumps(message))
+                await send_encoded(teacher_ws, message)
             except Exception as e:
                 print(f"❌ Failed to send timer message to teacher: {e}")
                 disconnected_teachers.add(teacher_ws)
@@ -4065,7 +4243,7 @@ class LivePresentationDeployment:
                     **message,
                     "group_name": self._roomcast_ws_lookup.get(roomcast_ws, "Unknown")
                 }
-                await roomcast_ws.send_text(json.dumps(roomcast_message))
+                await send_encoded(roomcast_ws, roomcast_message)
             except Exception as e:
                 print(f"❌ Failed to send timer message to roomcast: {e}")
                 disconnected_roomcasts.add(roomcast_ws)
@@ -4083,7 +4261,7 @@ class LivePresentationDeployment:
                     **message,
                     "group_name": self._roomcast_ws_lookup.get(roomcast_ws, "Unknown")
                 }
-                await roomcast_ws.send_text(json.dumps(roomcast_message))
+                await send_encoded(roomcast_ws, roomcast_message)
             except Exception as e:
                 print(f"❌ Failed to send ready check message to roomcast: {e}")
                 disconnected_roomcasts.add(roomcast_ws)
@@ -4106,7 +4284,7 @@ class LivePresentationDeployment:
         disconnected_teachers = set()
         for teacher_ws in self.teacher_websockets:
             try:
-                await teacher_ws.send_text(json.dumps(message))
+                await send_encoded(teacher_ws, message)
                 print(f"✅ Presentation state change sent to teacher")
             except Exception as e:
                 print(f"❌ Failed to send presentation state change to teacher: {e}")
@@ -4117,37 +4295,15 @@ class LivePresentationDeployment:
             self.teacher_websockets.discard(teacher_ws)
             print(f"🗑️ Removed disconnected teacher websocket")
 
-    async def _notify_teachers_connection_update(self):
-        """Notify all teachers of connection/status updates"""
-        # Clean up any disconnected students first to get accurate stats
-        await self._cleanup_disconnected_students()
-        
-        stats = self.get_presentation_stats()
-        message = {
-            "type": "connection_update",
-            "stats": stats
-        }
-        
-        print(f"🎤 Notifying {len(self.teacher_websockets)} teachers of connection update")
-        print(f"   Total students: {stats.get('total_students', 0)}")
-        print(f"   Connected students: {stats.get('connected_students', 0)}")
-        
-        disconnected_teachers = set()
-        for teacher_ws in self.teacher_websockets:
-            try:
-                await teacher_ws.send_text(json.dumps(message))
-                print(f"✅ Connection update sent to teacher")
-            except Exception as e:
-                print(f"❌ Failed to send connection update to teacher: {e}")
-                disconnected_teachers.add(teacher_ws)
-        
-        # Remove disconnected teachers
-        for teacher_ws in disconnected_teachers:
-            self.teacher_websockets.discard(teacher_ws)
-            print(f"🗑️ Removed disconnected teacher websocket")
+    async def _notify_teachers_connection_update(self, user_id: Optional[str] = None):
+        """Queue a dashboard update for one student (or all students) for the next teacher delta"""
+        if user_id:
+            self._dashboard_updates.student_changed(user_id)
+        else:
+            self._dashboard_updates.all_students_changed()
     
     async def _notify_teachers_response_received(self, student: StudentConnection, prompt_id: str, response: str):
-        """Notify teachers when a student submits a response"""
+        """Notify teachers (in the next dashboard delta) and the group's roomcast when a student responds"""
         message = {
             "type": "student_response_received",
             "student": {
@@ -4159,18 +4315,82 @@ class LivePresentationDeployment:
             "response": response,
             "timestamp": datetime.now().isoformat()
         }
+        self._dashboard_updates.response_received(student.user_id, prompt_id, {
+            "user_id": student.user_id,
+            "user_name": student.user_name,
+            "group_name": self._student_group_name(student),
+            "prompt_id": prompt_id,
+            "response": response,
+            "timestamp": message["timestamp"]
+        })
+
+        # Also notify matching roomcast device (for progress display) if enabled
+        try:
+            if self.roomcast_enabled and student.group_info and student.group_info.get("group_name"):
+                await self._notify_roomcast_response_received(student.group_info.get("group_name"), message)
+        except Exception as e:
+            print(f"❌ Failed to notify roomcast of response: {e}")
+
+    async def _send_dashboard_delta(self, changes: DashboardChanges, seq: int):
+        """Send one coalesced dashboard delta to all teachers"""
+        if not self.teacher_websockets:
+            # Nobody to update; teachers get a full snapshot when they connect
+            self._dashboard_students.clear()
+            return
+        
+        # Clean up any disconnected students first to get accurate stats
+        await self._cleanup_disconnected_students()
+        
+        student_ids = set(changes.student_ids)
+        if changes.all_students:
+            student_ids.update(self.students.keys())
+            student_ids.update(self._dashboard_students.keys())
         
-        print(f"🎤 Notifying {len(self.teacher_websockets)} teachers of response from {student.user_name}")
-        print(f"   Prompt ID: {prompt_id}")
-        print(f"   Response length: {len(response)} characters")
+        added, updated, removed = [], [], []
+        for user_id in student_ids:
+            student = self.students.get(user_id)
+            if student is None:
+                removed.append(user_id)
+                self._dashboard_students.pop(user_id, None)
+                continue
+            student_stats = json.loads(json.dumps(student.to_stats_dict(), default=str))
+            previous = self._dashboard_students.get(user_id)
+            if previous == student_stats:
+                continue
+            (updated if previous is not None else added).append(student_stats)
+            self._dashboard_students[user_id] = student_stats
+        
+        if not (added or updated or removed or changes.responses):
+            return
+        
+        group_members = self._completion_index.groups()
+        message = {
+            "type": "dashboard_delta",
+            "seq": seq,
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+            "responses": changes.responses,
+            "response_counts": {prompt_id: self._completion_index.response_count(prompt_id) for prompt_id in changes.prompt_ids},
+            "counts": {
+                "total_students": len(self.students),
+                "connected_students": sum(len(members) for members in group_members.values()),
+                "ready_students": len(self.ready_students)
+            },
+            "group_connected": {group_name: len(members) for group_name, members in group_members.items() if group_name}
+        }
+        # Serialized once per encoding, however many teachers are watching
+        encoded = EncodedMessage(message)
+        
+        print(f"🎤 Dashboard delta #{seq} to {len(self.teacher_websockets)} teachers: "
+              f"+{len(added)} ~{len(updated)} -{len(removed)} students, {len(changes.responses)} responses")
         
         disconnected_teachers = set()
-        for teacher_ws in self.teacher_websockets:
+        for teacher_ws in list(self.teacher_websockets):
             try:
-                await teacher_ws.send_text(json.dumps(message))
-                print(f"✅ Response notification sent to teacher")
+                await encoded.send(teacher_ws)
             except Exception as e:
-                print(f"❌ Failed to send response notification to teacher: {e}")
+                print(f"❌ Failed to send dashboard delta to teacher: {e}")
                 disconnected_teachers.add(teacher_ws)
         
         # Remove disconnected teachers
@@ -4178,13 +4398,6 @@ class LivePresentationDeployment:
             self.teacher_websockets.discard(teacher_ws)
             print(f"🗑️ Removed disconnected teacher websocket")
 
-        # Also notify matching roomcast device (for progress display) if enabled
-        try:
-            if self.roomcast_enabled and student.group_info and student.group_info.get("group_name"):
-                await self._notify_roomcast_response_received(student.group_info.get("group_name"), message)
-        except Exception as e:
-            print(f"❌ Failed to notify roomcast of response: {e}")
-
     async def _notify_roomcast_response_received(self, group_name: str, message: Dict[str, Any]):
         """Send a student_response_received style message to the roomcast device for a group."""
         try:
@@ -4193,7 +4406,7 @@ class LivePresentationDeployment:
                 return
             ws: WebSocket = device.get("websocket")  # type: ignore
             if ws:
-                await ws.send_text(json.dumps(message))
+                await send_encoded(ws, message)
                 print(f"📺 Sent response progress update to roomcast for {group_name}")
         except Exception as e:
             print(f"❌ Error sending response progress to roomcast {group_name}: {e}")
@@ -4221,7 +4434,7 @@ class LivePresentationDeployment:
         disconnected_teachers = set()
         for teacher_ws in list(self.teacher_websockets):
             try:
-                await teacher_ws.send_text(json.dumps(message))
+                await send_encoded(teacher_ws, message)
                 print(f"✅ Sent summary submission to teacher for group {group_name}")
             except Exception as e:
                 print(f"❌ Failed to send summary notification to teacher: {e}")
@@ -4313,7 +4526,7 @@ class LivePresentationDeployment:
         
         for teacher_ws in list(self.teacher_websockets):
             try:
-                await teacher_ws.send_text(json.dumps(teacher_message))
+                await send_encoded(teacher_ws, teacher_message)
             except:
                 pass
     
@@ -4356,6 +4569,7 @@ class LivePresentationDeployment:
         ready_students = len(self.ready_students)
         
         students_list = [student.to_stats_dict() for student in self.students.values()]
+        group_members = self._completion_index.groups()
         
         # Group statistics if we have group data
         group_stats = {}
@@ -4363,9 +4577,7 @@ class LivePresentationDeployment:
             # Standard group assignment format
             for group_name, members in self.input_variable_data.items():
                 if isinstance(members, list):
-                    connected_in_group = sum(1 for s in self.students.values() 
-                                           if s.group_info and s.group_info.get("group_name") == group_name 
-                                           and s.status != ConnectionStatus.DISCONNECTED)
+                    connected_in_group = len(group_members.get(group_name, []))
                     group_stats[group_name] = {
                         "total_members": len(members),
                         "connected_members": connected_in_group,
@@ -4377,9 +4589,7 @@ class LivePresentationDeployment:
                 if isinstance(theme, dict) and 'student_names' in theme and 'title' in theme:
                     group_name = theme.get('title', 'Unknown Theme')
                     members = theme.get('student_names', [])
-                    connected_in_group = sum(1 for s in self.students.values() 
-                                           if s.group_info and s.group_info.get("group_name") == group_name 
-                                           and s.status != ConnectionStatus.DISCONNECTED)
+                    connected_in_group = len(group_members.get(group_name, []))
                     group_stats[group_name] = {
                         "total_members": len(members),
                         "connected_members": connected_in_group,
@@ -4415,6 +4625,10 @@ class LivePresentationDeployment:
             "ready_students": ready_students,
             "students": students_list,
             "group_stats": group_stats,
+            "response_counts": {
+                self.current_prompt["id"]: self._completion_index.response_count(self.current_prompt["id"])
+            } if self.current_prompt and self.current_prompt.get("id") else {},
+            "dashboard_seq": self._dashboard_updates.seq,
             "current_prompt": self.current_prompt,
             "saved_prompts_count": len(self.saved_prompts),
             "roomcast": roomcast_status,
@@ -4422,7 +4636,9 @@ class LivePresentationDeployment:
                 "active": self.timer_active,
                 "remaining_seconds": self.timer_remaining_seconds if self.timer_active else 0,
                 "duration_seconds": self.timer_duration_seconds if self.timer_active else 0,
-                "start_time": self.timer_start_time.isoformat() if self.timer_start_time else None
+                "start_time": self.timer_start_time.isoformat() if self.timer_start_time else None,
+                "ends_at": self.timer_ends_at.isoformat() if self.timer_active and self.timer_ends_at else None,
+                "server_time": datetime.now(timezone.utc).isoformat()
             }
         }
         
@@ -4578,6 +4794,13 @@ class LivePresentationDeployment:
         """
         navigation_data = {}
         
+        # Fetch submissions once, in bulk; each student is then a dictionary lookup
+        if not self._submission_data:
+            # Try to refresh submission data from database
+            self._submission_data = self._get_submission_data_from_database()
+        if not self._submission_data:
+            print(f"⚠️ No submission data available")
+        
         for group_name, students_in_group in groups_to_students.items():
             if group_name == "No Group":
                 continue
@@ -4589,10 +4812,7 @@ class LivePresentationDeployment:
                 student_name = student.user_name
                 
                 # Get submission data for this student
-                submission = await self._fetch_student_submission(
-                    student_name, 
-                    submission_prompt_id
-                )
+                submission = self._lookup_student_submission(student_name, submission_prompt_id)
                 
                 if submission:
                     group_submissions.append({
@@ -4623,35 +4843,17 @@ class LivePresentationDeployment:
             print(f"⚠️ No submission data available")
             return None
         
-        # Find the student's submission
-        students = self._submission_data.get('students', [])
-        for student in students:
-            if student.get('name') == student_name:
-                # Look for the specific submission prompt
-                submission_responses = student.get('submission_responses', {})
-                
-                # Parse submission_prompt_id to get the index
-                # Format: "submission_0", "submission_1", etc.
-                if submission_responses:
-                    # Try direct key match first
-                    if submission_prompt_id in submission_responses:
-                        response = submission_responses[submission_prompt_id]
-                        return self._parse_submission_response(response)
-                    
-                    # Try extracting index and building key
-                    try:
-                        if '_' in submission_prompt_id:
-                            parts = submission_prompt_id.split('_')
-                            index = parts[-1]
-                            key = f"submission_{index}"
-                            if key in submission_responses:
-                                response = submission_responses[key]
-                                return self._parse_submission_response(response)
-                    except:
-                        pass
-        
-        print(f"⚠️ No submission found for {student_name} prompt {submission_prompt_id}")
-        return None
+        return self._lookup_student_submission(student_name, submission_prompt_id)
+    
+    def _lookup_student_submission(self, student_name: str, submission_prompt_id: str) -> Optional[Dict[str, Any]]:
+        """A student's parsed submission from the bulk index ("submission_0", or any id ending in the index)"""
+        if not self._submission_data:
+            return None
+        response = self._get_submission_index().submission(student_name, submission_prompt_id)
+        if response is None:
+            print(f"⚠️ No submission found for {student_name} prompt {submission_prompt_id}")
+            return None
+        return self._parse_submission_response(response)
     
     def _parse_submission_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Parse a submission response into a structured format"""
@@ -4879,7 +5081,7 @@ class LivePresentationDeployment:
                 sanitized_prompt.pop('groupSubmissions', None)
 
                 try:
-                    await ws.send_json({
+                    await send_encoded(ws, {
                         'type': 'roomcast_navigation_prompt',
                         'group_name': group_name,
                         'prompt': {
@@ -4928,7 +5130,7 @@ class LivePresentationDeployment:
                     submission_payload = current_submission.get('submission')
 
                 try:
-                    await ws.send_json({
+                    await send_encoded(ws, {
                         'type': 'roomcast_navigation_update',
                         'currentIndex': new_index,
                         'currentSubmission': {
@@ -4951,7 +5153,7 @@ class LivePresentationDeployment:
             ws_group_name = self._roomcast_ws_lookup.get(ws)
             if ws_group_name == group_name:
                 try:
-                    await ws.send_json({
+                    await send_encoded(ws, {
                         'type': 'roomcast_submission_updated',
                         'submissionIndex': submission_index,
                         'updatedData': updated_data
@@ -5141,13 +5343,13 @@ class LivePresentationDeployment:
             expected_groups = self._get_expected_group_names()
             has_actual_groups = self._has_actual_groups()
             
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "roomcast_connected",
                 "deployment_id": self.deployment_id,
                 "expected_groups": expected_groups,
                 "groups_are_predicted": not has_actual_groups and expected_groups is not None,
                 "connected_groups": list(self.roomcast_devices.keys())
-            }))
+            })
             return True
         except Exception as e:
             print(f"❌ Error connecting roomcast: {e}")
@@ -5167,10 +5369,10 @@ class LivePresentationDeployment:
             self.roomcast_devices[group_name] = {"websocket": websocket, "connected_at": datetime.now()}
             self._roomcast_ws_lookup[websocket] = group_name
             print(f"📺 Roomcast registered for group '{group_name}'")
-            await websocket.send_text(json.dumps({
+            await send_encoded(websocket, {
                 "type": "roomcast_registered",
                 "group_name": group_name
-            }))
+            })
             
             # Send current prompt state immediately if there's an active prompt
             # This ensures late-joining roomcast devices get synced with current state
@@ -5184,9 +5386,8 @@ class LivePresentationDeployment:
                     prompt_payload["live_response_state"] = live_response_state
                     print(f"📺 Including live response state for {group_name}: {len(live_response_state)} students responded")
                 
-                # Check if prompt has group-specific list items
-                if hasattr(self, '_current_group_item_assignments') and group_name in self._current_group_item_assignments:
-                    prompt_payload["assigned_list_item"] = self._current_group_item_assignments[group_name]
+                # The group's list item and submissions, from the payloads prepared for this prompt
+                prompt_payload.update(self._roomcast_prompt_fields(self._prepare_prompt(self.current_prompt), group_name))
                 
                 sync_message = {
                     "type": "roomcast_prompt",
@@ -5195,11 +5396,15 @@ class LivePresentationDeployment:
                 }
                 
                 try:
-                    await websocket.send_text(json.dumps(sync_message))
+                    await send_encoded(websocket, sync_message)
                     print(f"✅ Sent current prompt state to {group_name}")
                 except Exception as e:
                     print(f"❌ Failed to send prompt state to {group_name}: {e}")
             
+            # A running timer is sent once as its deadline; the device counts down locally
+            if self.timer_active:
+                await send_encoded(websocket, {**self._timer_message("timer_started"), "group_name": group_name})
+            
             # Do not auto-send group info; wait for explicit teacher action
             # Notify everyone of updated roomcast status
             await self._notify_all_roomcast_status()
@@ -5240,19 +5445,19 @@ class LivePresentationDeployment:
             if msg_type == "register_roomcast":
                 group_name = message.get("group_name")
                 if not isinstance(group_name, str) or not group_name:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "group_name required"}))
+                    await send_encoded(websocket, {"type": "error", "message": "group_name required"})
                     return
                 await self.register_roomcast_for_group(websocket, group_name)
             elif msg_type == "submit_summary":
                 # Handle summary form submission from roomcast
                 group_name = self._roomcast_ws_lookup.get(websocket)
                 if not group_name:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "roomcast not registered"}))
+                    await send_encoded(websocket, {"type": "error", "message": "roomcast not registered"})
                     return
                 
                 summary_data = message.get("summary_data")
                 if not summary_data:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "summary_data required"}))
+                    await send_encoded(websocket, {"type": "error", "message": "summary_data required"})
                     return
                 
                 # Process the summary submission directly with group name
@@ -5261,20 +5466,20 @@ class LivePresentationDeployment:
                 # Handle quiz answer submission from roomcast
                 group_name = self._roomcast_ws_lookup.get(websocket)
                 if not group_name:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "roomcast not registered"}))
+                    await send_encoded(websocket, {"type": "error", "message": "roomcast not registered"})
                     return
                 
                 selected_category = message.get("selected_category")
                 if not selected_category:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "selected_category required"}))
+                    await send_encoded(websocket, {"type": "error", "message": "selected_category required"})
                     return
                 
                 # Process the quiz answer
                 await self.handle_quiz_answer(group_name, selected_category)
             elif msg_type == "ping":
-                await websocket.send_text(json.dumps({"type": "pong", "ts": datetime.now().isoformat()}))
+                await send_encoded(websocket, {"type": "pong", "ts": datetime.now().isoformat()})
             else:
-                await websocket.send_text(json.dumps({"type": "error", "message": "unknown_message_type"}))
+                await send_encoded(websocket, {"type": "error", "message": "unknown_message_type"})
         except Exception as e:
             print(f"❌ Error handling roomcast message: {e}")
             import traceback
@@ -5285,29 +5490,10 @@ class LivePresentationDeployment:
         if not self.roomcast_websockets:
             return
         try:
-            # Only include submission responses for prompts that explicitly ask for review/discussion of past responses
-            # This can be determined by:
-            # 1. Explicit flag in the prompt data
-            # 2. System prompts (like "thank you") should never include responses
-            # 3. Prompts that mention "insights", "screen", "discuss", "review" might want responses
-            should_include_responses = False
-            
-            # Check explicit flags first
-            if prompt.get("include_submission_responses", False) or prompt.get("show_group_responses", False):
-                should_include_responses = True
-            # System prompts (like thank you messages) should never include responses
-            elif prompt.get("isSystemPrompt", False) or prompt.get("category") == "closing":
-                should_include_responses = False
-            # Check if the prompt statement suggests it wants to review previous responses
-            elif self._submission_data:
-                statement = prompt.get("statement", "").lower()
-                review_keywords = ["insights", "screen", "discuss", "review", "look at", "based on", "consider your", "reflect on", "responses", "navigate"]
-                should_include_responses = any(keyword in statement for keyword in review_keywords)
-            
-            print(f"📺 Roomcast broadcast: should_include_responses={should_include_responses} (system={prompt.get('isSystemPrompt', False)}, category={prompt.get('category', 'none')})")
-            
-            # Determine per-prompt requested submission keys to avoid over-sending on roomcast
-            requested_keys = self._extract_requested_submission_keys(prompt)
+            # Submission responses are only included for prompts that ask to review past responses;
+            # each group's (filtered) submissions come from the payloads prepared for the prompt
+            prepared = self._prepare_prompt(prompt)
+            print(f"📺 Roomcast broadcast: should_include_responses={prepared.include_responses} (system={prompt.get('isSystemPrompt', False)}, category={prompt.get('category', 'none')})")
 
             if group_item_map:
                 for group_name, item in group_item_map.items():
@@ -5316,7 +5502,7 @@ class LivePresentationDeployment:
                         continue
                     ws: WebSocket = device["websocket"]
                     # Build prompt payload and embed submission data (if any)
-                    prompt_payload = {**prompt, "assigned_list_item": item}
+                    prompt_payload = {**prompt, **self._roomcast_prompt_fields(prepared, group_name), "assigned_list_item": item}
                     
                     # Add live response tracking state for this group
                     live_response_state = self._get_live_response_state_for_group(group_name, prompt.get("id"))
@@ -5330,46 +5516,8 @@ class LivePresentationDeployment:
                         "prompt": prompt_payload
                     }
 
-                    # Add submission data for this group ONLY if the prompt explicitly requests it
-                    if should_include_responses and self._submission_data:
-                        group_members = self._get_group_members(group_name)
-                        group_submission_data: Dict[str, Any] = {}
-                        if group_members:
-                            group_submission_data = self.get_submission_data_for_group(group_members)
-                        else:
-                            # Fallback: include all students' data if we can't detect members
-                            try:
-                                student_entries = self._submission_data.get("students", []) if isinstance(self._submission_data, dict) else []
-                                all_students = [s.get("name") for s in student_entries if isinstance(s, dict) and s.get("name")]
-                                group_submission_data = self.get_submission_data_for_group(all_students)
-                                print(f"📝 No members detected for '{group_name}'. Falling back to all submission data ({len(group_submission_data)} students)")
-                            except Exception:
-                                group_submission_data = {}
-                        if group_submission_data:
-                            # Filter each student's responses to requested keys (or deployment selection)
-                            try:
-                                filtered_group_data = {}
-                                for member, resp_map in group_submission_data.items():
-                                    filtered = self._filter_submission_map_to_keys(resp_map, requested_keys)
-                                    if filtered:
-                                        filtered_group_data[member] = filtered
-                            except Exception:
-                                filtered_group_data = {}
-
-                            if filtered_group_data:
-                                # Embed inside prompt to match frontend expectations
-                                try:
-                                    if isinstance(message["prompt"], dict):
-                                        message["prompt"]["group_submission_responses"] = filtered_group_data
-                                except Exception:
-                                    pass
-                                try:
-                                    print(f"📝 Added filtered submission data for group {group_name} to roomcast (requested_keys={sorted(list(requested_keys)) if requested_keys else 'deployment-level/default'})")
-                                except Exception:
-                                    pass
-
                     try:
-                        await ws.send_text(json.dumps(message))
+                        await send_encoded(ws, message)
                     except Exception:
                         await self.disconnect_roomcast(ws)
             else:
@@ -5378,7 +5526,7 @@ class LivePresentationDeployment:
                 # Send to registered devices keyed by group
                 for group_name, device in list(self.roomcast_devices.items()):
                     ws: WebSocket = device["websocket"]
-                    prompt_payload = dict(prompt)
+                    prompt_payload = {**prompt, **self._roomcast_prompt_fields(prepared, group_name)}
                     
                     # Add live response tracking state for this group
                     live_response_state = self._get_live_response_state_for_group(group_name, prompt.get("id"))
@@ -5392,97 +5540,32 @@ class LivePresentationDeployment:
                         "prompt": prompt_payload
                     }
                     
-                    # Add submission data for this group ONLY if the prompt explicitly requests it
-                    if should_include_responses and self._submission_data:
-                        group_members = self._get_group_members(group_name)
-                        group_submission_data: Dict[str, Any] = {}
-                        if group_members:
-                            group_submission_data = self.get_submission_data_for_group(group_members)
-                        else:
-                            # Fallback: include all students' data if we can't detect members
-                            try:
-                                student_entries = self._submission_data.get("students", []) if isinstance(self._submission_data, dict) else []
-                                all_students = [s.get("name") for s in student_entries if isinstance(s, dict) and s.get("name")]
-                                group_submission_data = self.get_submission_data_for_group(all_students)
-                                print(f"📝 No members detected for '{group_name}'. Falling back to all submission data ({len(group_submission_data)} students)")
-                            except Exception:
-                                group_submission_data = {}
-                        if group_submission_data:
-                            # Filter each student's responses to requested keys (or deployment selection)
-                            try:
-                                filtered_group_data = {}
-                                for member, resp_map in group_submission_data.items():
-                                    filtered = self._filter_submission_map_to_keys(resp_map, requested_keys)
-                                    if filtered:
-                                        filtered_group_data[member] = filtered
-                            except Exception:
-                                filtered_group_data = {}
-
-                            if filtered_group_data:
-                                try:
-                                    if isinstance(message["prompt"], dict):
-                                        message["prompt"]["group_submission_responses"] = filtered_group_data
-                                except Exception:
-                                    pass
-                                try:
-                                    print(f"📝 Added filtered submission data for group {group_name} to roomcast (requested_keys={sorted(list(requested_keys)) if requested_keys else 'deployment-level/default'})")
-                                except Exception:
-                                    pass
-                    
                     try:
-                        await ws.send_text(json.dumps(message))
+                        await send_encoded(ws, message)
                         sent_ws.add(ws)
                     except Exception:
                         await self.disconnect_roomcast(ws)
                 # Also send to any connected but unregistered roomcast websockets
-                for ws in list(self.roomcast_websockets):
-                    if ws in sent_ws:
-                        continue
+                unregistered = [ws for ws in list(self.roomcast_websockets) if ws not in sent_ws]
+                if unregistered:
                     prompt_payload = dict(prompt)
-                    message = {
+                    
+                    # Unregistered devices belong to no group, so they get everyone's submissions
+                    if prepared.include_responses and self._submission_data:
+                        all_submission_data = self._all_prompt_submissions(prepared)
+                        if all_submission_data:
+                            prompt_payload["group_submission_responses"] = all_submission_data
+                    
+                    encoded = EncodedMessage({
                         "type": "roomcast_prompt",
                         "group_name": "",
                         "prompt": prompt_payload
-                    }
-                    
-                    # For unregistered roomcast devices, include submission data ONLY if the prompt explicitly requests it
-                    if should_include_responses and self._submission_data:
-                        # Prefer names from submission cache (DB), fallback to connected students
+                    })
+                    for ws in unregistered:
                         try:
-                            student_entries = self._submission_data.get("students", []) if isinstance(self._submission_data, dict) else []
-                            if student_entries:
-                                all_students = [s.get("name") for s in student_entries if isinstance(s, dict) and s.get("name")]
-                            else:
-                                all_students = [student.user_name for student in self.students.values()]
+                            await encoded.send(ws)
                         except Exception:
-                            all_students = [student.user_name for student in self.students.values()]
-                        all_submission_data = self.get_submission_data_for_group(all_students)
-                        if all_submission_data:
-                            # Filter each student's responses to requested keys (or deployment selection)
-                            try:
-                                filtered_group_data = {}
-                                for member, resp_map in all_submission_data.items():
-                                    filtered = self._filter_submission_map_to_keys(resp_map, requested_keys)
-                                    if filtered:
-                                        filtered_group_data[member] = filtered
-                            except Exception:
-                                filtered_group_data = {}
-
-                            if filtered_group_data:
-                                try:
-                                    if isinstance(message["prompt"], dict):
-                                        message["prompt"]["group_submission_responses"] = filtered_group_data
-                                except Exception:
-                                    pass
-                                try:
-                                    print(f"📝 Added filtered submission data to unregistered roomcast device (requested_keys={sorted(list(requested_keys)) if requested_keys else 'deployment-level/default'})")
-                                except Exception:
-                                    pass
-                    
-                    try:
-                        await ws.send_text(json.dumps(message))
-                    except Exception:
-                        await self.disconnect_roomcast(ws)
+                            await self.disconnect_roomcast(ws)
         except Exception as e:
             print(f"❌ Error broadcasting prompt to roomcast: {e}")
 
@@ -5516,15 +5599,16 @@ class LivePresentationDeployment:
             
             if ws:
                 try:
-                    await ws.send_text(json.dumps(message))
+                    await send_encoded(ws, message)
                     print(f"✅ Sent group info to registered roomcast for {group_name}")
                 except Exception:
                     await self.disconnect_roomcast(ws)
             else:
                 # Broadcast to all connected roomcast websockets if not registered yet
+                encoded = EncodedMessage(message)
                 for rws in list(self.roomcast_websockets):
                     try:
-                        await rws.send_text(json.dumps(message))
+                        await encoded.send(rws)
                         print(f"✅ Broadcast group info to unregistered roomcast device")
                     except Exception:
                         await self.disconnect_roomcast(rws)
@@ -5538,7 +5622,7 @@ class LivePresentationDeployment:
             disconnected_teachers = set()
             for teacher_ws in self.teacher_websockets:
                 try:
-                    await teacher_ws.send_text(json.dumps(message))
+                    await send_encoded(teacher_ws, message)
                 except Exception:
                     disconnected_teachers.add(teacher_ws)
             for teacher_ws in disconnected_teachers:
@@ -5576,10 +5660,15 @@ class LivePresentationDeployment:
         print(f"🎤 LivePresentationDeployment {self.deployment_id} cleaned up")
         
         # Stop timer if active
-        if self.timer_active and self.timer_task and not self.timer_task.done():
-            self.timer_task.cancel()
+        if self.timer_active:
+            PRESENTATION_CLOCK.cancel(self._timer_key)
             self.timer_active = False
         
+        self._dashboard_updates.cancel()
+        GROUP_SUMMARY_QUEUE.cancel(self.deployment_id)
+        for session in self._student_sessions.detached():
+            PRESENTATION_CLOCK.cancel(self._student_session_key(session.user_id))
+        self._student_sessions.clear()
         self._clear_roomcast_session()
 
     def validate_list_variable_configuration(self) -> Dict[str, Any]:
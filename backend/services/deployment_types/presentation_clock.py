@@ -0,0 +1,127 @@
+"""
+Presentation Clock - One process-wide scheduler for live presentation timers
+
+Timers are absolute deadlines (UTC epoch seconds). Clients are told the deadline
+once and count down locally; the clock only wakes up to fire a timer's expiry and,
+optionally, periodic drift corrections. All timers share a single heap and a single
+asyncio task, however many presentations are running. Deadlines are wall-clock
+times, so a worker that loads a presentation with a persisted deadline can re-arm
+the same timer.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+TimerCallback = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class _ClockTimer:
+    ends_at: float
+    on_expire: TimerCallback
+    on_sync: Optional[TimerCallback]
+    generation: int
+
+
+class PresentationClock:
+    """Heap of timer deadlines served by one background task"""
+
+    EXPIRE = "expire"
+    SYNC = "sync"
+
+    def __init__(self, sync_interval_seconds: float = 30):
+        self.sync_interval_seconds = sync_interval_seconds
+        self._timers: Dict[str, _ClockTimer] = {}
+        self._heap: List[Tuple[float, int, str, int, str]] = []  # (fire_at, seq, key, generation, kind)
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._callback_tasks: Set[asyncio.Task] = set()  # strong references until callbacks finish
+
+    def schedule(self, key: str, ends_at: float, on_expire: TimerCallback, on_sync: Optional[TimerCallback] = None):
+        """(Re)arm the timer for key; replaces any timer already scheduled under it"""
+        generation = next(self._counter)
+        self._timers[key] = _ClockTimer(ends_at, on_expire, on_sync, generation)
+        self._push(ends_at, key, generation, self.EXPIRE)
+        next_sync = time.time() + self.sync_interval_seconds
+        if on_sync and self.sync_interval_seconds > 0 and next_sync < ends_at:
+            self._push(next_sync, key, generation, self.SYNC)
+        self._ensure_running()
+
+    def cancel(self, key: str) -> bool:
+        """Drop a timer; its heap entries are discarded lazily when they come up"""
+        return self._timers.pop(key, None) is not None
+
+    def remaining_seconds(self, key: str) -> Optional[float]:
+        timer = self._timers.get(key)
+        return None if timer is None else max(0.0, timer.ends_at - time.time())
+
+    def pending_count(self) -> int:
+        return len(self._timers)
+
+    def _push(self, fire_at: float, key: str, generation: int, kind: str):
+        is_earliest = not self._heap or fire_at < self._heap[0][0]
+        heapq.heappush(self._heap, (fire_at, next(self._counter), key, generation, kind))
+        if is_earliest and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Started by the next schedule() made from async code
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def _is_current(self, key: str, generation: int) -> bool:
+        timer = self._timers.get(key)
+        return timer is not None and timer.generation == generation
+
+    async def _run(self):
+        while True:
+            # Discard entries of cancelled or re-armed timers
+            while self._heap and not self._is_current(self._heap[0][2], self._heap[0][3]):
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._task = None
+                return
+
+            self._wakeup.clear()
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                # Woken early by an earlier deadline, or on time; either way look at the heap again
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            fire_at, _, key, generation, kind = heapq.heappop(self._heap)
+            if not self._is_current(key, generation):
+                continue
+            timer = self._timers[key]
+            if kind == self.EXPIRE:
+                del self._timers[key]
+                self._fire(timer.on_expire, key, kind)
+            else:
+                self._fire(timer.on_sync, key, kind)
+                next_sync = fire_at + self.sync_interval_seconds
+                if next_sync < timer.ends_at:
+                    self._push(next_sync, key, generation, self.SYNC)
+
+    def _fire(self, callback: TimerCallback, key: str, kind: str):
+        # Callbacks broadcast to websockets; run them as tasks so one slow room doesn't delay the others
+        async def run():
+            try:
+                await callback()
+            except Exception as e:
+                print(f"❌ Presentation clock {kind} callback failed for {key}: {e}")
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
@@ -0,0 +1,112 @@
+"""
+Prompt Payloads - Per-group prompt payloads prepared once per prompt send
+
+When a prompt is sent, everything that depends only on the group (the assigned list
+item and the group's submission responses) is computed once per group from a bulk
+index of the submission data, and cached under the prompt id and the group
+assignment version. Late-joining students and roomcast resyncs reuse the cached
+payload instead of repeating list variable, group and submission lookups.
+"""
+
+import hashlib
+import random
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class SubmissionIndex:
+    """Student name -> submission responses, built once from the submission data cache"""
+
+    def __init__(self, submission_data: Optional[Dict[str, Any]]):
+        self._responses: Dict[str, Dict[str, Any]] = {}
+        students = submission_data.get("students", []) if isinstance(submission_data, dict) else []
+        for student in students:
+            if isinstance(student, dict) and student.get("name"):
+                # First entry wins, like the linear scans this replaces
+                self._responses.setdefault(student["name"], student.get("submission_responses", {}) or {})
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def names(self) -> List[str]:
+        return list(self._responses)
+
+    def for_student(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._responses.get(name)
+
+    def for_group(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {name: self._responses[name] for name in names if name in self._responses}
+
+    def submission(self, name: str, submission_prompt_id: str) -> Optional[Dict[str, Any]]:
+        """A student's response to one submission prompt ("submission_0", or any id ending in the index)"""
+        responses = self._responses.get(name)
+        if not responses:
+            return None
+        if submission_prompt_id in responses:
+            return responses[submission_prompt_id]
+        if "_" in submission_prompt_id:
+            return responses.get(f"submission_{submission_prompt_id.split('_')[-1]}")
+        return None
+
+
+@dataclass
+class GroupPromptPayload:
+    """What every member of one group receives for a prompt"""
+    members: List[str] = field(default_factory=list)
+    submission_responses: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # member -> filtered responses
+
+
+@dataclass
+class PreparedPrompt:
+    """A prompt's per-group payloads for one group assignment version"""
+    prompt_id: str
+    version: int
+    include_responses: bool = False
+    requested_keys: Optional[Set[str]] = None
+    list_items: Optional[List[Any]] = None  # shuffled once per prompt
+    item_assignments: Dict[str, Any] = field(default_factory=dict)  # group_name -> list item
+    groups: Dict[Optional[str], GroupPromptPayload] = field(default_factory=dict)  # None = every student
+    student_submissions: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # students without a group
+
+    def shuffle_list_items(self, list_data: List[Any]):
+        # Deterministic per prompt, so the same prompt always deals items in the same order.
+        # Seeded from a digest rather than hash(), which is randomized per process and
+        # would deal a different order after a restart or on another worker.
+        self.list_items = list(list_data)
+        seed = int.from_bytes(hashlib.sha256(self.prompt_id.encode()).digest()[:4], "big")
+        random.Random(seed).shuffle(self.list_items)
+
+    def assign_list_item(self, group_name: str) -> Any:
+        """The group's list item; groups first seen after the send get the next item in the deal"""
+        if group_name not in self.item_assignments and self.list_items:
+            self.item_assignments[group_name] = self.list_items[len(self.item_assignments) % len(self.list_items)]
+        return self.item_assignments.get(group_name)
+
+
+class PromptPayloadCache:
+    """Most recently prepared payloads per prompt id (one group assignment version each)"""
+
+    def __init__(self, max_prompts: int = 8):
+        self.max_prompts = max_prompts
+        self._prepared: "OrderedDict[str, PreparedPrompt]" = OrderedDict()
+
+    def get(self, prompt_id: str, version: int) -> Optional[PreparedPrompt]:
+        prepared = self._prepared.get(prompt_id)
+        if prepared is None or prepared.version != version:
+            return None
+        self._prepared.move_to_end(prompt_id)
+        return prepared
+
+    def latest(self, prompt_id: str) -> Optional[PreparedPrompt]:
+        """The last preparation of a prompt, whatever group assignment version it was built for"""
+        return self._prepared.get(prompt_id)
+
+    def put(self, prepared: PreparedPrompt):
+        self._prepared[prepared.prompt_id] = prepared
+        self._prepared.move_to_end(prepared.prompt_id)
+        while len(self._prepared) > self.max_prompts:
+            self._prepared.popitem(last=False)
+
+    def clear(self):
+        self._prepared.clear()
@@ -3,15 +3,25 @@ Response Summarizer - Creates summaries of student responses to questions
 
 This script analyzes student submissions to questions and generates summaries
 either for individual groups or across all students.
+
+Per-group and per-student summaries run concurrently (bounded by a semaphore), and
+in batched mode several groups/students are packed into one structured request up
+to a token budget. Summaries are cached by a hash of the response set, so
+re-summarizing unchanged responses needs no LLM call.
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
+import hashlib
 import json
 import os
+import threading
+import time
 from datetime import datetime
 
+from scripts.config import load_config
+
 # LLM imports using existing patterns from your codebase
 try:
     from langchain_openai import ChatOpenAI
@@ -20,6 +30,86 @@ try:
 except ImportError:
     print("Warning: Could not import LangChain. Please install langchain and langchain-openai.")
 
+_RESPONSE_SUMMARIZER_CONFIG = load_config().get("response_summarizer", {}) or {}
+
+# Concurrency, batching and caching settings (see response_summarizer in config.yaml)
+SUMMARY_MAX_CONCURRENT_REQUESTS = max(1, int(_RESPONSE_SUMMARIZER_CONFIG.get("max_concurrent_requests", 8)))
+SUMMARY_BATCH_TOKEN_BUDGET = max(1, int(_RESPONSE_SUMMARIZER_CONFIG.get("batch_token_budget", 6000)))
+SUMMARY_BATCH_MAX_ITEMS = max(1, int(_RESPONSE_SUMMARIZER_CONFIG.get("batch_max_items", 8)))
+SUMMARY_CACHE_TTL_SECONDS = float(_RESPONSE_SUMMARIZER_CONFIG.get("cache_ttl_seconds", 86400))
+SUMMARY_CACHE_MAX_ENTRIES = max(1, int(_RESPONSE_SUMMARIZER_CONFIG.get("cache_max_entries", 2000)))
+
+# Output tokens reserved per item of a batched request, so a batch's summaries fit in max_tokens
+SUMMARY_BATCH_OUTPUT_TOKENS_PER_ITEM = 250
+
+# Structured output the LLM must return when summarizing a batch of groups/students
+SUMMARY_BATCH_SCHEMA = {
+    "title": "response_summaries",
+    "description": "One summary per item (group or student) of student responses.",
+    "type": "object",
+    "properties": {
+        "summaries": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "item_id": {"type": "string"},
+                    "summary": {"type": "string"},
+                    "key_themes": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["item_id", "summary", "key_themes"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["summaries"],
+    "additionalProperties": False,
+}
+
+SUMMARY_STYLE_INSTRUCTIONS = {
+    "comprehensive": """
+            Create a comprehensive summary that synthesizes the student responses by:
+            - Identifying the main themes and ideas that emerged from the students' actual responses
+            - Highlighting different perspectives and viewpoints students shared
+            - Noting areas where students agreed or disagreed
+            - Capturing specific insights, examples, or connections students made
+            - Drawing meaningful conclusions based on what students actually wrote
+            - Focus on the CONTENT of their responses, not generic observations about engagement
+            """,
+    "brief": """
+            Create a brief, focused summary that captures:
+            - The main themes that emerged from students' responses
+            - Key points of agreement or consensus among students
+            - The most significant insights students shared
+            - Base this entirely on what students actually wrote, not assumptions
+            """,
+    "themes_only": """
+            Extract the main themes directly from student responses:
+            - Identify 3-7 key themes based on what students actually said
+            - Provide brief explanation for each theme with examples from responses
+            - Note how many students mentioned each theme
+            """
+}
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You are an advanced AI educational assistant powered by GPT-5, specialized in analyzing and "
+    "synthesizing student responses to academic discussion questions. Your enhanced reasoning capabilities "
+    "allow you to identify nuanced themes, subtle connections between ideas, and meaningful patterns "
+    "in student thinking. "
+    "\n\n"
+    "Your objectives:\n"
+    "- Extract and synthesize the core ideas from actual student responses\n"
+    "- Identify sophisticated themes and intellectual connections students are making\n"
+    "- Recognize diverse perspectives and how they complement or contrast with each other\n"
+    "- Highlight innovative insights, creative connections, or particularly thoughtful analysis\n"
+    "- Focus entirely on the substance of what students wrote, not their engagement level\n"
+    "- Use your advanced reasoning to find deeper patterns that might not be immediately obvious"
+)
+
+# (summary_text, key_themes) keyed by a hash of the question, style, scope and response set
+_SUMMARY_CACHE: Dict[str, Tuple[float, Tuple[str, List[str]]]] = {}
+_SUMMARY_CACHE_LOCK = threading.Lock()
+
 
 @dataclass
 class StudentResponse:
@@ -54,10 +144,48 @@ class SummaryResult:
             self.timestamp = datetime.now()
 
 
+# One group's or one student's responses to summarize: (scope label used in the prompt, responses, group_id)
+SummaryItem = Tuple[str, List[StudentResponse], Optional[str]]
+
+
+def _estimate_tokens(text: str) -> int:
+    # About four characters per token for English text; close enough for packing
+    return len(text) // 4 + 1
+
+
+def get_cached_summary(key: str) -> Optional[Tuple[str, List[str]]]:
+    with _SUMMARY_CACHE_LOCK:
+        cached = _SUMMARY_CACHE.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1][0], list(cached[1][1])
+        _SUMMARY_CACHE.pop(key, None)
+    return None
+
+
+def cache_summary(key: str, summary_text: str, key_themes: List[str]) -> None:
+    with _SUMMARY_CACHE_LOCK:
+        _SUMMARY_CACHE.pop(key, None)
+        while len(_SUMMARY_CACHE) >= SUMMARY_CACHE_MAX_ENTRIES:
+            _SUMMARY_CACHE.pop(next(iter(_SUMMARY_CACHE)))
+        _SUMMARY_CACHE[key] = (time.monotonic() + SUMMARY_CACHE_TTL_SECONDS, (summary_text, list(key_themes)))
+
+
+def clear_summary_cache() -> None:
+    with _SUMMARY_CACHE_LOCK:
+        _SUMMARY_CACHE.clear()
+
+
 class ResponseSummarizer:
     """Main class for summarizing student responses"""
     
-    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.7, max_tokens: int = 1500):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o",
+        temperature: float = 0.7,
+        max_tokens: int = 1500,
+        max_concurrent: int = SUMMARY_MAX_CONCURRENT_REQUESTS,
+        llm: Optional[Any] = None
+    ):
         """
         Initialize the response summarizer
         
@@ -65,10 +193,20 @@ class ResponseSummarizer:
             model_name: The LLM model to use for summarization (defaults to GPT-4o)
             temperature: Temperature for LLM responses
             max_tokens: Maximum tokens for LLM responses
+            max_concurrent: LLM requests this summarizer runs at once
+            llm: Chat model to use instead of creating a ChatOpenAI one
         """
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.max_concurrent = max(1, max_concurrent)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        if llm is not None:
+            self._llm = llm
+            print(f"🤖 ResponseSummarizer initialized with a provided chat model")
+            return
         
         # Check if OpenAI API key is available
         api_key = os.getenv("OPENAI_API_KEY")
@@ -90,7 +228,8 @@ class ResponseSummarizer:
         question_context: QuestionContext,
         student_responses: List[StudentResponse],
         group_by: str = "all",  # "all", "group", or "individual"
-        summary_style: str = "comprehensive"  # "comprehensive", "brief", "themes_only"
+        summary_style: str = "comprehensive",  # "comprehensive", "brief", "themes_only"
+        batched: bool = False
     ) -> Union[SummaryResult, List[SummaryResult]]:
         """
         Summarize student responses to a question
@@ -100,6 +239,7 @@ class ResponseSummarizer:
             student_responses: List of student responses to summarize
             group_by: How to group the responses ("all", "group", "individual")
             summary_style: Style of summary to generate
+            batched: For "group" and "individual", pack several groups/students into each LLM request
             
         Returns:
             Single SummaryResult or list of SummaryResults depending on grouping
@@ -114,9 +254,9 @@ class ResponseSummarizer:
         if group_by == "all":
             return await self._summarize_all_responses(question_context, student_responses, summary_style)
         elif group_by == "group":
-            return await self._summarize_by_groups(question_context, student_responses, summary_style)
+            return await self._summarize_by_groups(question_context, student_responses, summary_style, batched)
         elif group_by == "individual":
-            return await self._summarize_individual_responses(question_context, student_responses, summary_style)
+            return await self._summarize_individual_responses(question_context, student_responses, summary_style, batched)
         else:
             raise ValueError(f"Invalid group_by option: {group_by}")
     
@@ -137,7 +277,8 @@ class ResponseSummarizer:
         )
         
         # Get summary from LLM
-        summary_text, key_themes = await self._get_llm_summary(prompt, summary_style)
+        cache_key = self._response_set_key(question_context, student_responses, summary_style, "all students")
+        summary_text, key_themes = await self._get_llm_summary(prompt, summary_style, cache_key)
         
         return SummaryResult(
             summary_text=summary_text,
@@ -149,7 +290,8 @@ class ResponseSummarizer:
         self,
         question_context: QuestionContext,
         student_responses: List[StudentResponse],
-        summary_style: str
+        summary_style: str,
+        batched: bool = False
     ) -> List[SummaryResult]:
         """Summarize responses grouped by student groups"""
         
@@ -161,54 +303,110 @@ class ResponseSummarizer:
                 grouped_responses[group_id] = []
             grouped_responses[group_id].append(response)
         
-        # Create summaries for each group
-        summaries = []
-        for group_id, group_responses in grouped_responses.items():
-            prompt = self._build_summarization_prompt(
-                question_context,
-                group_responses,
-                summary_style,
-                group_context=f"Group {group_id}"
-            )
-            
-            summary_text, key_themes = await self._get_llm_summary(prompt, summary_style)
-            
-            summaries.append(SummaryResult(
-                summary_text=summary_text,
-                key_themes=key_themes,
-                student_count=len(group_responses),
-                group_id=group_id
-            ))
-        
-        return summaries
+        items = [(f"Group {group_id}", group_responses, group_id) for group_id, group_responses in grouped_responses.items()]
+        return await self._summarize_items(question_context, items, summary_style, batched)
     
     async def _summarize_individual_responses(
         self,
         question_context: QuestionContext,
         student_responses: List[StudentResponse],
-        summary_style: str
+        summary_style: str,
+        batched: bool = False
     ) -> List[SummaryResult]:
         """Create individual summaries for each response (useful for detailed analysis)"""
         
-        summaries = []
-        for response in student_responses:
-            prompt = self._build_summarization_prompt(
-                question_context,
-                [response],
-                summary_style,
-                group_context=f"Student {response.student_name}"
+        items = [(f"Student {response.student_name}", [response], response.group_id) for response in student_responses]
+        return await self._summarize_items(question_context, items, summary_style, batched)
+    
+    async def _summarize_items(
+        self,
+        question_context: QuestionContext,
+        items: List[SummaryItem],
+        summary_style: str,
+        batched: bool
+    ) -> List[SummaryResult]:
+        """Summarize each item (a group's or a student's responses) concurrently, batching requests if asked"""
+        
+        cache_keys = [self._response_set_key(question_context, responses, summary_style, label) for label, responses, _ in items]
+        summaries: Dict[int, Tuple[str, List[str]]] = {}
+        pending = []
+        for index, cache_key in enumerate(cache_keys):
+            cached = get_cached_summary(cache_key)
+            if cached is not None:
+                summaries[index] = cached
+            else:
+                pending.append(index)
+        
+        print(f"🗂️  {len(summaries)} summaries from cache, {len(pending)} to generate"
+              f"{' in batches' if batched and len(pending) > 1 else ''}")
+        
+        async def summarize_one(index: int):
+            label, responses, _ = items[index]
+            prompt = self._build_summarization_prompt(question_context, responses, summary_style, group_context=label)
+            summaries[index] = await self._get_llm_summary(prompt, summary_style, cache_keys[index])
+        
+        async def summarize_batch(batch: List[int]):
+            if len(batch) == 1:
+                await summarize_one(batch[0])
+                return
+            batch_summaries = await self._get_llm_batch_summaries(
+                question_context, [(index, items[index], cache_keys[index]) for index in batch], summary_style
             )
-            
-            summary_text, key_themes = await self._get_llm_summary(prompt, summary_style)
-            
-            summaries.append(SummaryResult(
-                summary_text=summary_text,
-                key_themes=key_themes,
-                student_count=1,
-                group_id=response.group_id
-            ))
+            summaries.update(batch_summaries)
+            # Items the batched response left out or garbled are asked for on their own
+            missing = [index for index in batch if index not in batch_summaries]
+            if missing:
+                print(f"🔁 Batched summary missed {len(missing)} of {len(batch)} items, summarizing them individually")
+                await asyncio.gather(*[summarize_one(index) for index in missing])
         
-        return summaries
+        if batched:
+            await asyncio.gather(*[summarize_batch(batch) for batch in self._pack_batches(items, pending, summary_style)])
+        else:
+            await asyncio.gather(*[summarize_one(index) for index in pending])
+        
+        return [
+            SummaryResult(
+                summary_text=summaries[index][0],
+                key_themes=summaries[index][1],
+                student_count=len(responses),
+                group_id=group_id
+            )
+            for index, (_, responses, group_id) in enumerate(items)
+        ]
+    
+    def _pack_batches(self, items: List[SummaryItem], indexes: List[int], summary_style: str) -> List[List[int]]:
+        """Pack items, in order, into batches that fit the token budget and the per-request output"""
+        
+        max_items = max(1, min(SUMMARY_BATCH_MAX_ITEMS, self.max_tokens // SUMMARY_BATCH_OUTPUT_TOKENS_PER_ITEM))
+        batches: List[List[int]] = []
+        batch_tokens = 0
+        for index in indexes:
+            label, responses, _ = items[index]
+            tokens = _estimate_tokens(self._format_responses(responses)) + _estimate_tokens(label)
+            # An item over the budget on its own still gets a request, alone
+            if not batches or len(batches[-1]) >= max_items or batch_tokens + tokens > SUMMARY_BATCH_TOKEN_BUDGET:
+                batches.append([])
+                batch_tokens = 0
+            batches[-1].append(index)
+            batch_tokens += tokens
+        return batches
+    
+    def _response_set_key(
+        self,
+        question_context: QuestionContext,
+        responses: List[StudentResponse],
+        summary_style: str,
+        group_context: str
+    ) -> str:
+        """Cache key for one summary: the question, style, scope and the set of responses"""
+        payload = json.dumps({
+            "question": [question_context.question_text, question_context.question_type, question_context.additional_context or ""],
+            "style": summary_style,
+            "scope": group_context,
+            "responses": sorted([response.student_id, response.student_name, response.response_text] for response in responses),
+            "model": self.model_name,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
     
     def _build_summarization_prompt(
         self,
@@ -219,31 +417,6 @@ class ResponseSummarizer:
     ) -> str:
         """Build the prompt for LLM summarization"""
         
-        style_instructions = {
-            "comprehensive": """
-            Create a comprehensive summary that synthesizes the student responses by:
-            - Identifying the main themes and ideas that emerged from the students' actual responses
-            - Highlighting different perspectives and viewpoints students shared
-            - Noting areas where students agreed or disagreed
-            - Capturing specific insights, examples, or connections students made
-            - Drawing meaningful conclusions based on what students actually wrote
-            - Focus on the CONTENT of their responses, not generic observations about engagement
-            """,
-            "brief": """
-            Create a brief, focused summary that captures:
-            - The main themes that emerged from students' responses
-            - Key points of agreement or consensus among students
-            - The most significant insights students shared
-            - Base this entirely on what students actually wrote, not assumptions
-            """,
-            "themes_only": """
-            Extract the main themes directly from student responses:
-            - Identify 3-7 key themes based on what students actually said
-            - Provide brief explanation for each theme with examples from responses
-            - Note how many students mentioned each theme
-            """
-        }
-        
         prompt = f"""You are analyzing student responses to an educational question. Please create a {summary_style} summary for {group_context}.
 
 QUESTION CONTEXT:
@@ -254,16 +427,12 @@ Type: {question_context.question_type}
 STUDENT RESPONSES ({len(responses)} total):
 """
         
-        for i, response in enumerate(responses, 1):
-            prompt += f"""
-Response {i} - {response.student_name}:
-{response.response_text}
-"""
+        prompt += self._format_responses(responses)
         
         prompt += f"""
 
 INSTRUCTIONS:
-{style_instructions.get(summary_style, style_instructions["comprehensive"])}
+{SUMMARY_STYLE_INSTRUCTIONS.get(summary_style, SUMMARY_STYLE_INSTRUCTIONS["comprehensive"])}
 
 IMPORTANT: 
 - Analyze the actual content of each student's response
@@ -284,33 +453,72 @@ KEY_THEMES:
         
         return prompt
     
-    async def _get_llm_summary(self, prompt: str, summary_style: str) -> tuple[str, List[str]]:
+    def _format_responses(self, responses: List[StudentResponse]) -> str:
+        return "".join(f"""
+Response {i} - {response.student_name}:
+{response.response_text}
+""" for i, response in enumerate(responses, 1))
+    
+    def _build_batch_summarization_prompt(
+        self,
+        question_context: QuestionContext,
+        batch: List[Tuple[str, SummaryItem]],
+        summary_style: str
+    ) -> str:
+        """Build one prompt asking for a summary of every item (group or student) in the batch"""
+        
+        item_sections = []
+        for item_id, (label, responses, _) in batch:
+            item_sections.append(f"### {item_id}\nScope: {label}\nSTUDENT RESPONSES ({len(responses)} total):\n{self._format_responses(responses)}")
+        
+        return f"""You are analyzing student responses to an educational question. Please create a separate {summary_style} summary for each item below; each item is one group's or one student's responses.
+
+QUESTION CONTEXT:
+Question: {question_context.question_text}
+Type: {question_context.question_type}
+{f"Additional Context: {question_context.additional_context}" if question_context.additional_context else ""}
+
+{chr(10).join(item_sections)}
+
+INSTRUCTIONS:
+{SUMMARY_STYLE_INSTRUCTIONS.get(summary_style, SUMMARY_STYLE_INSTRUCTIONS["comprehensive"])}
+
+IMPORTANT: 
+- Summarize each item only from its own responses
+- Do NOT use generic phrases like "students showed good engagement" or "varying levels of depth"
+- Focus on the specific ideas, opinions, examples, and insights students shared
+- Keep each summary under 150 words, with 2-5 key themes
+- Return exactly one entry per item, using the item id exactly as written after '###'
+"""
+    
+    def _limiter(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; a summarizer may be used from several
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _get_llm_summary(self, prompt: str, summary_style: str, cache_key: Optional[str] = None) -> tuple[str, List[str]]:
         """Get summary from LLM and parse the response"""
         
+        if cache_key:
+            cached = get_cached_summary(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             print(f"🤖 Calling GPT-5 for advanced group response summarization...")
             
             # Create messages for GPT-5
             messages = [
-                SystemMessage(content=(
-                    "You are an advanced AI educational assistant powered by GPT-5, specialized in analyzing and "
-                    "synthesizing student responses to academic discussion questions. Your enhanced reasoning capabilities "
-                    "allow you to identify nuanced themes, subtle connections between ideas, and meaningful patterns "
-                    "in student thinking. "
-                    "\n\n"
-                    "Your objectives:\n"
-                    "- Extract and synthesize the core ideas from actual student responses\n"
-                    "- Identify sophisticated themes and intellectual connections students are making\n"
-                    "- Recognize diverse perspectives and how they complement or contrast with each other\n"
-                    "- Highlight innovative insights, creative connections, or particularly thoughtful analysis\n"
-                    "- Focus entirely on the substance of what students wrote, not their engagement level\n"
-                    "- Use your advanced reasoning to find deeper patterns that might not be immediately obvious"
-                )),
+                SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
                 HumanMessage(content=prompt)
             ]
             
             # Call the LLM using the same pattern as your existing code
-            result = await self._llm.ainvoke(messages)
+            async with self._limiter():
+                result = await self._llm.ainvoke(messages)
             response = result.content if hasattr(result, "content") else str(result)
             
             print(f"🤖 GPT-5 response received (length: {len(response)} chars)")
@@ -318,6 +526,9 @@ KEY_THEMES:
             # Parse the response to extract summary and themes
             summary_text, key_themes = self._parse_llm_response(response)
             
+            # Fallback summaries are not cached, so the next run asks the LLM again
+            if cache_key:
+                cache_summary(cache_key, summary_text, key_themes)
             return summary_text, key_themes
             
         except Exception as e:
@@ -326,6 +537,60 @@ KEY_THEMES:
             print(f"LLM error traceback:\n{traceback.format_exc()}")
             return self._create_fallback_summary(prompt), []
     
+    async def _get_llm_batch_summaries(
+        self,
+        question_context: QuestionContext,
+        batch: List[Tuple[int, SummaryItem, str]],
+        summary_style: str
+    ) -> Dict[int, Tuple[str, List[str]]]:
+        """Summarize a batch of items with one structured request; returns the items it could parse"""
+        
+        item_ids = {f"item_{position}": (index, cache_key) for position, (index, _, cache_key) in enumerate(batch, 1)}
+        prompt = self._build_batch_summarization_prompt(
+            question_context, [(f"item_{position}", item) for position, (_, item, _) in enumerate(batch, 1)], summary_style
+        )
+        try:
+            print(f"🤖 Calling LLM for a batched summary of {len(batch)} items...")
+            structured_llm = self._llm.with_structured_output(SUMMARY_BATCH_SCHEMA, method="json_schema", strict=True)
+            messages = [
+                SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+                HumanMessage(content=prompt)
+            ]
+            async with self._limiter():
+                response = await structured_llm.ainvoke(messages)
+            parsed = self._parse_batch_response(response, list(item_ids))
+        except Exception as e:
+            print(f"❌ Error getting batched LLM summary: {e}")
+            return {}
+        
+        summaries = {}
+        for item_id, (summary_text, key_themes) in parsed.items():
+            index, cache_key = item_ids[item_id]
+            summaries[index] = (summary_text, key_themes)
+            cache_summary(cache_key, summary_text, key_themes)
+        return summaries
+    
+    def _parse_batch_response(self, response: Any, item_ids: List[str]) -> Dict[str, Tuple[str, List[str]]]:
+        """Pull {item_id: (summary, themes)} for the requested items out of a structured response, skipping bad entries"""
+        
+        if hasattr(response, "content"):
+            response = response.content
+        if isinstance(response, str):
+            response = json.loads(response)
+        wanted = set(item_ids)
+        parsed = {}
+        for entry in (response or {}).get("summaries", []):
+            if not isinstance(entry, dict):
+                continue
+            item_id = str(entry.get("item_id", "")).strip()
+            summary_text = str(entry.get("summary") or "").strip()
+            themes = entry.get("key_themes")
+            if item_id not in wanted or item_id in parsed or not summary_text:
+                continue
+            key_themes = [str(theme).strip() for theme in themes if str(theme).strip()] if isinstance(themes, list) else []
+            parsed[item_id] = (summary_text, key_themes)
+        return parsed
+    
     def _parse_llm_response(self, response: str) -> tuple[str, List[str]]:
         """Parse LLM response to extract summary and themes"""
         
@@ -373,7 +638,8 @@ async def summarize_student_responses(
     responses_data: List[Dict[str, Any]],
     group_by: str = "all",
     summary_style: str = "comprehensive",
-    model_name: str = "gpt-5"
+    model_name: str = "gpt-5",
+    batched: bool = False
 ) -> Union[SummaryResult, List[SummaryResult]]:
     """
     Convenient function to summarize student responses
@@ -384,6 +650,7 @@ async def summarize_student_responses(
         group_by: How to group responses ("all", "group", "individual")
         summary_style: Style of summary ("comprehensive", "brief", "themes_only")
         llm_provider: LLM provider to use
+        batched: Pack several groups/students into each LLM request
     
     Returns:
         Summary result(s)
@@ -414,7 +681,8 @@ async def summarize_student_responses(
         question_context=question_context,
         student_responses=student_responses,
         group_by=group_by,
-        summary_style=summary_style
+        summary_style=summary_style,
+        batched=batched
     )
 
 
@@ -0,0 +1,117 @@
+"""
+Student Sessions - Resumable live presentation connections
+
+Every student connection gets a session with a resume token. Messages sent to the
+student are numbered and the most recent ones are kept in a replay buffer until the
+student acknowledges them. When the student's socket drops, the session keeps the
+connection state (group info, assigned list items, responses, the last prompt they
+were sent) in memory for a resume window. A reconnect that presents the token gets
+the missed messages replayed from memory instead of rebuilding its state from the
+database.
+"""
+
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Messages that put a prompt on the student's screen
+PROMPT_MESSAGE_TYPES = ("prompt_received", "send_prompt")
+
+
+@dataclass
+class StudentSession:
+    """One student's resumable state and numbered message history"""
+    token: str
+    user_id: str
+    student: Any  # the StudentConnection (kept while detached, reattached on resume)
+    replay_limit: int = 200
+    group_version: int = 0  # group assignment version the student's group info was computed for
+    next_seq: int = 1
+    last_acked_seq: int = 0
+    prompt_id: Optional[str] = None  # id of the last prompt the student was sent
+    detached_at: Optional[float] = None
+    outbox: Deque[Tuple[int, Dict[str, Any]]] = field(default_factory=deque)
+
+    def record(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Number an outgoing message and keep it for replay"""
+        message = {**message, "seq": self.next_seq}
+        self.next_seq += 1
+        self.outbox.append((message["seq"], message))
+        while len(self.outbox) > self.replay_limit:
+            self.outbox.popleft()
+        if message.get("type") in PROMPT_MESSAGE_TYPES and isinstance(message.get("prompt"), dict):
+            self.prompt_id = message["prompt"].get("id")
+        return message
+
+    def ack(self, seq: int):
+        """The student has everything up to seq; stop keeping it"""
+        if seq > self.last_acked_seq:
+            self.last_acked_seq = min(seq, self.next_seq - 1)
+        while self.outbox and self.outbox[0][0] <= self.last_acked_seq:
+            self.outbox.popleft()
+
+    def missed_since(self, last_seq: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """Messages after last_seq, or None if some of them are no longer buffered"""
+        if last_seq is None:
+            last_seq = self.last_acked_seq
+        first_buffered = self.outbox[0][0] if self.outbox else self.next_seq
+        if last_seq + 1 < first_buffered:
+            return None
+        return [message for seq, message in self.outbox if seq > last_seq]
+
+
+class StudentSessionStore:
+    """user_id -> session, for connected students and for those inside their resume window"""
+
+    def __init__(self, resume_window_seconds: float = 120, replay_limit: int = 200):
+        self.resume_window_seconds = resume_window_seconds
+        self.replay_limit = replay_limit
+        self._sessions: Dict[str, StudentSession] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.resume_window_seconds > 0
+
+    def open(self, student: Any, group_version: int = 0) -> StudentSession:
+        """Start a new session (a new token and message numbering) for a freshly connected student"""
+        session = StudentSession(
+            token=secrets.token_urlsafe(24),
+            user_id=student.user_id,
+            student=student,
+            replay_limit=self.replay_limit,
+            group_version=group_version
+        )
+        self._sessions[student.user_id] = session
+        return session
+
+    def get(self, user_id: str) -> Optional[StudentSession]:
+        return self._sessions.get(user_id)
+
+    def resume(self, user_id: str, token: str) -> Optional[StudentSession]:
+        """The session for a reconnecting student, if the token matches and the window hasn't passed"""
+        session = self._sessions.get(user_id)
+        if session is None or not secrets.compare_digest(session.token, token or ""):
+            return None
+        if session.detached_at is not None and time.time() - session.detached_at > self.resume_window_seconds:
+            self.drop(user_id)
+            return None
+        session.detached_at = None
+        return session
+
+    def detach(self, user_id: str) -> Optional[StudentSession]:
+        """Keep a disconnected student's session resumable; returns it, if there is one"""
+        session = self._sessions.get(user_id)
+        if session is not None:
+            session.detached_at = time.time()
+        return session
+
+    def detached(self) -> List[StudentSession]:
+        return [session for session in self._sessions.values() if session.detached_at is not None]
+
+    def drop(self, user_id: str) -> Optional[StudentSession]:
+        return self._sessions.pop(user_id, None)
+
+    def clear(self):
+        self._sessions.clear()
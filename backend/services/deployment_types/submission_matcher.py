@@ -3,15 +3,26 @@ Submission Matcher - Finds the most similar website submission to a summary
 
 This script uses AI to analyze a batch of website data submissions and identify
 which one is most similar to a summary provided by the user/instructor.
+
+Matching runs in two stages: the summary and submissions are embedded and only the
+top-k submissions by cosine similarity (k per matching strategy) are sent to the
+LLM to rank. Submission embeddings are cached in-process, so matching another
+summary against the same submissions only embeds the summary.
 """
 
 import asyncio
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import json
 import os
+import threading
 from datetime import datetime
 
+import numpy as np
+
+from scripts.config import load_config
+
 # LLM imports using existing patterns from your codebase
 try:
     from langchain_openai import ChatOpenAI
@@ -20,6 +31,27 @@ try:
 except ImportError:
     print("Warning: Could not import LangChain. Please install langchain and langchain-openai.")
 
+try:
+    from langchain_community.embeddings import FastEmbedEmbeddings
+except ImportError:
+    FastEmbedEmbeddings = None
+
+_SUBMISSION_MATCHER_CONFIG = load_config().get("submission_matcher", {}) or {}
+
+# Submissions the LLM ranks after the embedding prefilter, per matching strategy (0 = send every submission)
+PREFILTER_TOP_K = {
+    strategy: max(0, int(k))
+    for strategy, k in (_SUBMISSION_MATCHER_CONFIG.get("prefilter_top_k") or {}).items()
+}
+PREFILTER_DEFAULT_TOP_K = max(0, int(_SUBMISSION_MATCHER_CONFIG.get("prefilter_default_top_k", 20)))
+EMBEDDING_CACHE_MAX_ENTRIES = max(1, int(_SUBMISSION_MATCHER_CONFIG.get("embedding_cache_max_entries", 20000)))
+
+# Submission vectors keyed by (embedding model, text); shared by every matcher in the process
+_EMBEDDING_CACHE: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_EMBEDDING_CACHE_LOCK = threading.Lock()
+_DEFAULT_EMBEDDINGS = None
+_DEFAULT_EMBEDDINGS_LOCK = threading.Lock()
+
 
 @dataclass
 class WebsiteSubmission:
@@ -50,16 +82,89 @@ class MatchResult:
     reasoning: str
     all_scores: Dict[str, float]
     timestamp: datetime = None
+    candidate_count: int = 0  # submissions the LLM ranked (all of them when the prefilter didn't run)
+    prefilter_scores: Optional[Dict[str, float]] = None  # cosine similarity of each candidate to the summary
     
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
 
+def prefilter_top_k(matching_strategy: str) -> int:
+    return PREFILTER_TOP_K.get(matching_strategy, PREFILTER_DEFAULT_TOP_K)
+
+
+# Text compared with the summary in the prefilter, so it weighs what the strategy weighs
+def _submission_text(submission: WebsiteSubmission, matching_strategy: str) -> str:
+    if matching_strategy == "purpose_focused":
+        return f"{submission.name}. {submission.purpose}"
+    if matching_strategy == "platform_focused":
+        return f"{submission.platform}. {submission.name}"
+    return f"{submission.name}. {submission.purpose}. Platform: {submission.platform}"
+
+
+def _summary_text(summary: SummaryData, matching_strategy: str) -> str:
+    if matching_strategy == "purpose_focused":
+        return f"{summary.category}. {summary.purpose}"
+    if matching_strategy == "platform_focused":
+        return f"{summary.platform}. {summary.category}"
+    return f"{summary.category}. {summary.purpose}. Platform: {summary.platform}"
+
+
+def _default_embeddings():
+    """The process-wide FastEmbed model (loaded on first use), or None if fastembed isn't installed"""
+    global _DEFAULT_EMBEDDINGS
+    if FastEmbedEmbeddings is None:
+        return None
+    with _DEFAULT_EMBEDDINGS_LOCK:
+        if _DEFAULT_EMBEDDINGS is None:
+            _DEFAULT_EMBEDDINGS = FastEmbedEmbeddings()
+        return _DEFAULT_EMBEDDINGS
+
+
+def embed_submission_texts(embeddings: Any, texts: List[str]) -> np.ndarray:
+    """Vectors for texts (one row each), embedding only the ones not cached yet"""
+    model = getattr(embeddings, "model_name", None) or type(embeddings).__name__
+    vectors: Dict[str, np.ndarray] = {}
+    with _EMBEDDING_CACHE_LOCK:
+        for text in texts:
+            vector = _EMBEDDING_CACHE.get((model, text))
+            if vector is not None:
+                _EMBEDDING_CACHE.move_to_end((model, text))
+                vectors[text] = vector
+    missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+    if missing:
+        computed = embeddings.embed_documents(missing)
+        with _EMBEDDING_CACHE_LOCK:
+            for text, vector in zip(missing, computed):
+                vectors[text] = _EMBEDDING_CACHE[(model, text)] = np.asarray(vector, dtype=np.float32)
+            while len(_EMBEDDING_CACHE) > EMBEDDING_CACHE_MAX_ENTRIES:
+                _EMBEDDING_CACHE.popitem(last=False)
+    return np.stack([vectors[text] for text in texts])
+
+
+def clear_embedding_cache() -> None:
+    with _EMBEDDING_CACHE_LOCK:
+        _EMBEDDING_CACHE.clear()
+
+
+def cosine_similarities(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Cosine similarity of query to every row of vectors"""
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    return (vectors @ query) / np.where(norms == 0, 1.0, norms)
+
+
 class SubmissionMatcher:
     """Main class for matching summaries to website submissions"""
     
-    def __init__(self, model_name: str = "gpt-5", temperature: float = 0.3, max_tokens: int = 2000):
+    def __init__(
+        self,
+        model_name: str = "gpt-5",
+        temperature: float = 0.3,
+        max_tokens: int = 2000,
+        llm: Optional[Any] = None,
+        embeddings: Optional[Any] = None
+    ):
         """
         Initialize the submission matcher
         
@@ -67,10 +172,18 @@ class SubmissionMatcher:
             model_name: The LLM model to use for matching (defaults to GPT-5)
             temperature: Temperature for LLM responses (lower = more deterministic)
             max_tokens: Maximum tokens for LLM responses
+            llm: Chat model to use instead of creating a ChatOpenAI one
+            embeddings: Embedding model for the prefilter (defaults to the shared FastEmbed model)
         """
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self._embeddings = embeddings
+        
+        if llm is not None:
+            self._llm = llm
+            print(f"🔍 SubmissionMatcher initialized with a provided chat model")
+            return
         
         # Check if OpenAI API key is available
         api_key = os.getenv("OPENAI_API_KEY")
@@ -113,11 +226,15 @@ class SubmissionMatcher:
                 best_match_submission=submissions[0],
                 similarity_score=1.0,
                 reasoning="Only one submission available, selected by default.",
-                all_scores={submissions[0].student_name: 1.0}
+                all_scores={submissions[0].student_name: 1.0},
+                candidate_count=1
             )
         
+        # Narrow the submissions down to the most similar ones before asking the LLM
+        candidates, prefilter_scores = await self._prefilter_submissions(summary, submissions, matching_strategy)
+        
         # Build the matching prompt
-        prompt = self._build_matching_prompt(summary, submissions, matching_strategy)
+        prompt = self._build_matching_prompt(summary, candidates, matching_strategy)
         
         # Get analysis from LLM
         analysis_result = await self._get_llm_analysis(prompt)
@@ -125,13 +242,13 @@ class SubmissionMatcher:
         # Parse the result
         best_match_student, similarity_score, reasoning, all_scores = self._parse_llm_result(
             analysis_result, 
-            submissions
+            candidates
         )
         
         # Find the matching submission
         best_submission = next(
-            (s for s in submissions if s.student_name == best_match_student),
-            submissions[0]  # Fallback to first if not found
+            (s for s in candidates if s.student_name == best_match_student),
+            candidates[0]  # Fallback to first (the most similar after prefiltering) if not found
         )
         
         return MatchResult(
@@ -139,9 +256,49 @@ class SubmissionMatcher:
             best_match_submission=best_submission,
             similarity_score=similarity_score,
             reasoning=reasoning,
-            all_scores=all_scores
+            all_scores=all_scores,
+            candidate_count=len(candidates),
+            prefilter_scores=prefilter_scores
         )
     
+    async def _prefilter_submissions(
+        self,
+        summary: SummaryData,
+        submissions: List[WebsiteSubmission],
+        matching_strategy: str
+    ) -> Tuple[List[WebsiteSubmission], Optional[Dict[str, float]]]:
+        """
+        Top-k submissions by cosine similarity to the summary, most similar first.
+        Every submission is kept when there are no more than k, or when embedding isn't available.
+        """
+        top_k = prefilter_top_k(matching_strategy)
+        if top_k <= 0 or len(submissions) <= top_k:
+            return submissions, None
+        
+        embeddings = self._embeddings or _default_embeddings()
+        if embeddings is None:
+            print(f"⚠️ No embedding model available, sending all {len(submissions)} submissions to the LLM")
+            return submissions, None
+        
+        def embed():
+            vectors = embed_submission_texts(embeddings, [_submission_text(s, matching_strategy) for s in submissions])
+            query = np.asarray(embeddings.embed_query(_summary_text(summary, matching_strategy)), dtype=np.float32)
+            return vectors, query
+        
+        try:
+            # Embedding is CPU-bound; keep it off the event loop
+            vectors, query = await asyncio.to_thread(embed)
+        except Exception as e:
+            print(f"⚠️ Prefilter embedding failed ({e}), sending all {len(submissions)} submissions to the LLM")
+            return submissions, None
+        
+        similarities = cosine_similarities(query, vectors)
+        top = np.argpartition(-similarities, top_k - 1)[:top_k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        candidates = [submissions[i] for i in top]
+        print(f"🔍 Prefilter kept {len(candidates)} of {len(submissions)} submissions for {matching_strategy} matching")
+        return candidates, {submissions[i].student_name: round(float(similarities[i]), 4) for i in top}
+    
     def _build_matching_prompt(
         self,
         summary: SummaryData,
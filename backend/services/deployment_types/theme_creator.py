@@ -1,13 +1,23 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import os
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans, kmeans_plusplus
 from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
 from collections import Counter
 
 from langchain_community.embeddings import FastEmbedEmbeddings
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
+from celery.exceptions import SoftTimeLimitExceeded
+
+from scripts.config import load_config
+from services.behavior_checkpoints import checkpoint_fingerprint
 
 # Force single-threaded execution to prevent hanging
 os.environ['MKL_NUM_THREADS'] = '1'
@@ -15,18 +25,400 @@ os.environ['OMP_NUM_THREADS'] = '1'
 os.environ['OPENBLAS_NUM_THREADS'] = '1'
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 
+_THEME_CREATOR_CONFIG = load_config().get("theme_creator", {}) or {}
+
+# Phrases that mark ads, navigation, headers and footers in web/PDF content
+EXCLUDE_PATTERNS = (
+    # Common ad/promotional content
+    'advertisement', 'sponsored', 'click here', 'subscribe', 'newsletter',
+    'sign in', 'sign up', 'log in', 'login', 'register', 'create account',
+    'follow us', 'social media', 'twitter', 'facebook', 'instagram', 'linkedin',
+    'cookie policy', 'privacy policy', 'terms of service', 'contact us',
+    'navigation', 'menu', 'home page', 'about us',
+    'copyright', '© 20', 'all rights reserved', 'powered by',
+    'share this', 'print this', 'email this', 'bookmark', 'save article',
+    'prev', 'next', 'page 1', 'page 2', 'download pdf',
+
+    # News website specific patterns
+    'trending', 'featured', 'lifestyle', 'entertainment', 'sports',
+    'weather', 'horoscope', 'astrology', 'celebrity', 'gossip',
+    'tired of too many ads', 'go ad free', 'premium subscription',
+    'breaking news', 'live updates', 'just in', 'developing story',
+    'photo gallery', 'video gallery', 'slideshow',
+    'related articles', 'you may also like', 'recommended reading',
+    'popular stories', 'most read', 'trending now',
+
+    # Website navigation and metadata
+    'updated:', 'published:', 'ist', 'pst', 'est', 'gmt',
+    'etimes.in', 'indiatimes', 'toi lifestyle', 'times of india',
+    'news/', 'lifestyle/', 'sports/', 'entertainment/',
+    'breadcrumb', 'tags:', 'category:', 'section:',
+
+    # Generic website elements
+    'load more', 'read more', 'view all', 'see all', 'show more',
+    'comments', 'reactions', 'likes', 'shares', 'replies',
+    'user agreement', 'terms and conditions', 'disclaimer',
+
+    # Specific patterns from the example
+    'friendzoned', 'sweat to skin', 'infections', '5 signs your',
+    'relationship is ready', 'how to spot the fakes',
+    'aa a', 'share aa a'  # Common artifact patterns
+)
+
+# Navigation/UI words; two or more in one chunk means it is page chrome
+UI_INDICATORS = ('sign in', 'menu', 'home', 'search', 'filter', 'sort by')
+
+# Words that suggest substantive article or research content
+QUALITY_INDICATORS = (
+    # Academic/research terms
+    'research', 'study', 'analysis', 'findings', 'conclusion',
+    'evidence', 'data', 'results', 'method', 'approach',
+    'according', 'however', 'therefore', 'furthermore', 'moreover',
+    'researchers', 'scientists', 'experts', 'professor', 'university',
+
+    # News content indicators
+    'investigation', 'report', 'sources', 'officials', 'authorities',
+    'confirmed', 'revealed', 'discovered', 'announced', 'stated',
+    'interview', 'statement', 'press release', 'spokesperson',
+    'alleged', 'claimed', 'accused', 'charged', 'convicted',
+
+    # Substantial content words
+    'because', 'although', 'despite', 'meanwhile', 'subsequently',
+    'consequently', 'nevertheless', 'furthermore', 'additionally',
+    'specifically', 'particularly', 'generally', 'typically',
+    'approximately', 'estimated', 'calculated', 'determined'
+)
+
+_BMP_CHAR_TABLES: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+# Lookup tables (uppercase, special) for every Basic Multilingual Plane code point
+def _bmp_char_tables() -> Tuple[np.ndarray, np.ndarray]:
+    global _BMP_CHAR_TABLES
+    if _BMP_CHAR_TABLES is None:
+        chars = [chr(code) for code in range(0x10000)]
+        upper = np.fromiter((c.isupper() for c in chars), dtype=bool, count=0x10000)
+        special = np.fromiter((not c.isalnum() and not c.isspace() for c in chars), dtype=bool, count=0x10000)
+        _BMP_CHAR_TABLES = (upper, special)
+    return _BMP_CHAR_TABLES
+
+
+# Count uppercase and special (not alphanumeric, not whitespace) characters per text
+def count_char_classes(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    if not texts or not lengths.sum():
+        return np.zeros(len(texts), dtype=np.int64), np.zeros(len(texts), dtype=np.int64)
+
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    upper_table, special_table = _bmp_char_tables()
+    in_bmp = codes < 0x10000
+    bmp_codes = np.where(in_bmp, codes, 0)
+    is_upper = upper_table[bmp_codes] & in_bmp
+    is_special = special_table[bmp_codes] & in_bmp
+
+    # Characters outside the BMP (emoji, rare scripts) are classified individually
+    if not in_bmp.all():
+        outside = ~in_bmp
+        unique_codes, inverse = np.unique(codes[outside], return_inverse=True)
+        chars = [chr(int(code)) for code in unique_codes]
+        is_upper[outside] = np.array([c.isupper() for c in chars])[inverse]
+        is_special[outside] = np.array([not c.isalnum() and not c.isspace() for c in chars])[inverse]
+
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    upper_cumsum = np.concatenate(([0], np.cumsum(is_upper)))
+    special_cumsum = np.concatenate(([0], np.cumsum(is_special)))
+    return (upper_cumsum[bounds[1:]] - upper_cumsum[bounds[:-1]],
+            special_cumsum[bounds[1:]] - special_cumsum[bounds[:-1]])
+
+
+# Number of patterns from the list that occur in each text. Each pattern is searched
+# once over the whole batch joined into one string; after a hit the search jumps to the
+# next text, so the Python loop runs once per matching text rather than once per text.
+def count_pattern_hits(texts: List[str], patterns: Tuple[str, ...]) -> np.ndarray:
+    counts = np.zeros(len(texts), dtype=np.int64)
+    if not texts:
+        return counts
+
+    joined = '\x00'.join(texts)
+    starts = np.concatenate(([0], np.cumsum([len(text) + 1 for text in texts]))).tolist()
+    for pattern in patterns:
+        hits = []
+        position = joined.find(pattern)
+        while position != -1:
+            index = bisect_right(starts, position) - 1
+            hits.append(index)
+            position = joined.find(pattern, starts[index + 1])
+        counts[hits] += 1
+    return counts
+
+
+# Scale rows to unit L2 norm (zero rows stay zero) so dot products are cosine similarities
+def normalize_rows(vectors: np.ndarray, dtype=np.float32) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=dtype)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms).astype(dtype)
+
+
+# Greedy farthest-point sampling under cosine distance, starting from vectors[start].
+# Keeps a running min-distance to the selected set instead of a full distance matrix.
+def farthest_point_sample(vectors: np.ndarray, k: int, start: int = 0) -> List[int]:
+    unit = normalize_rows(vectors, dtype=np.float64)
+    n = unit.shape[0]
+    if n == 0 or k <= 0:
+        return []
+
+    selected = [start]
+    min_distance = 1.0 - unit @ unit[start]
+    min_distance[start] = -np.inf
+    for _ in range(min(k, n) - 1):
+        best = int(np.argmax(min_distance))
+        selected.append(best)
+        np.minimum(min_distance, 1.0 - unit @ unit[best], out=min_distance)
+        min_distance[best] = -np.inf
+    return selected
+
+
+# Clustering engine settings
+CLUSTERING_ENGINES = ("auto", "kmeans", "minibatch", "spherical")
+CLUSTERING_ENGINE = str(_THEME_CREATOR_CONFIG.get("clustering_engine", "auto"))
+MINIBATCH_MIN_VECTORS = int(_THEME_CREATOR_CONFIG.get("minibatch_min_vectors", 2000))
+CLUSTERING_THREADS = int(_THEME_CREATOR_CONFIG.get("clustering_threads", 1))
+SILHOUETTE_SAMPLE_SIZE = int(_THEME_CREATOR_CONFIG.get("silhouette_sample_size", 2000))
+
+
+# Spherical k-means: k-means++ seeding, then Lloyd iterations on the unit sphere
+# (assign by highest cosine similarity, centers are re-normalized cluster means)
+def spherical_kmeans(unit: np.ndarray, k: int, max_iter: int = 100, random_state: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    from scipy.sparse import csr_matrix
+
+    n = unit.shape[0]
+    centers, _ = kmeans_plusplus(unit, k, random_state=random_state)
+    centers = normalize_rows(centers, dtype=unit.dtype)
+    labels = np.full(n, -1)
+    for _ in range(max_iter):
+        similarities = unit @ centers.T
+        new_labels = similarities.argmax(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        membership = csr_matrix((np.ones(n, dtype=unit.dtype), (labels, np.arange(n))), shape=(k, n))
+        sums = np.asarray(membership @ unit)
+
+        # Re-seed empty clusters with the points furthest from their current center
+        empty = np.flatnonzero(np.bincount(labels, minlength=k) == 0)
+        if empty.size:
+            worst_fit = np.argsort(similarities[np.arange(n), labels])[:empty.size]
+            sums[empty] = unit[worst_fit]
+        centers = normalize_rows(sums, dtype=unit.dtype)
+    return labels, centers
+
+
+# The engine run_clustering uses for num_vectors vectors ("auto" picks by input size)
+def resolve_clustering_engine(engine: str, num_vectors: int) -> str:
+    if engine == "auto":
+        return "minibatch" if num_vectors >= MINIBATCH_MIN_VECTORS else "kmeans"
+    return engine
+
+
+# Cluster vectors into k groups with the given engine, limiting BLAS/OpenMP threads explicitly
+def run_clustering(vectors: np.ndarray, k: int, engine: str = CLUSTERING_ENGINE) -> Tuple[np.ndarray, np.ndarray]:
+    engine = resolve_clustering_engine(engine, len(vectors))
+
+    with threadpool_limits(limits=CLUSTERING_THREADS):
+        if engine == "kmeans":
+            kmeans = KMeans(
+                n_clusters=k,
+                random_state=42,
+                n_init=5,  # Reduced from 10 to 5 for speed
+                max_iter=100,  # Reduced max iterations
+                algorithm='lloyd'  # Use specific algorithm
+            )
+            labels = kmeans.fit_predict(vectors)
+            return labels, kmeans.cluster_centers_.copy()
+
+        unit = normalize_rows(vectors)
+        if engine == "minibatch":
+            kmeans = MiniBatchKMeans(
+                n_clusters=k,
+                random_state=42,
+                n_init=3,
+                max_iter=100,
+                batch_size=1024
+            )
+            labels = kmeans.fit_predict(unit)
+            return labels, kmeans.cluster_centers_.copy()
+        if engine == "spherical":
+            return spherical_kmeans(unit, k)
+
+    raise ValueError(f"Unknown clustering engine '{engine}' (available: {', '.join(CLUSTERING_ENGINES)})")
+
+
+# Cosine silhouette score estimated on a random sample of at most sample_size vectors
+def estimate_silhouette(vectors: np.ndarray, labels: np.ndarray, sample_size: int = SILHOUETTE_SAMPLE_SIZE) -> float:
+    if len(np.unique(labels)) < 2:
+        return -1.0
+    try:
+        with threadpool_limits(limits=CLUSTERING_THREADS):
+            return float(silhouette_score(
+                vectors, labels, metric='cosine',
+                sample_size=sample_size if len(vectors) > sample_size else None,
+                random_state=42
+            ))
+    except ValueError:
+        # The sample happened to contain a single cluster
+        return -1.0
+
+
+# Pick the number of clusters in [k_min, k_max] with the best sampled silhouette score.
+# Candidate clusterings are fitted on a sample too, so this stays fast for large inputs.
+def select_num_clusters(vectors: np.ndarray, k_min: int, k_max: int, engine: str = CLUSTERING_ENGINE,
+                        sample_size: int = SILHOUETTE_SAMPLE_SIZE) -> Tuple[int, Dict[int, float]]:
+    vectors = np.asarray(vectors)
+    if len(vectors) > sample_size:
+        sample = np.random.default_rng(42).choice(len(vectors), size=sample_size, replace=False)
+        vectors = vectors[sample]
+
+    k_max = min(k_max, len(vectors) - 1)
+    scores: Dict[int, float] = {}
+    for k in range(max(2, k_min), k_max + 1):
+        labels, _ = run_clustering(vectors, k, engine)
+        scores[k] = estimate_silhouette(vectors, labels, sample_size)
+    if not scores:
+        return max(1, min(k_min, len(vectors))), scores
+    return max(scores, key=scores.get), scores
+
+
+# Theme enrichment (web search + LLM polish) settings
+ENRICHMENT_MAX_CONCURRENCY = int(_THEME_CREATOR_CONFIG.get("enrichment_max_concurrency", 4))
+ENRICHMENT_DEADLINE_SECONDS = float(_THEME_CREATOR_CONFIG.get("enrichment_deadline_seconds", 60))
+SEARCH_BACKEND = str(_THEME_CREATOR_CONFIG.get("search_backend", "duckduckgo"))
+SEARCH_TIMEOUT_SECONDS = float(_THEME_CREATOR_CONFIG.get("search_timeout_seconds", 10))
+SEARCH_CACHE_TTL_SECONDS = float(_THEME_CREATOR_CONFIG.get("search_cache_ttl_seconds", 3600))
+
+# (backend name, query) -> (expires_at, result); shared by all behavior runs in the process
+_SEARCH_CACHE: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+class DuckDuckGoSearchBackend:
+    """
+    Web search through the DuckDuckGo Instant Answer API (free and doesn't require API key).
+    """
+    name = "duckduckgo"
+
+    def __init__(self, timeout: float = SEARCH_TIMEOUT_SECONDS):
+        self.timeout = timeout
+
+    def search(self, query: str) -> Optional[str]:
+        """Return a combined text summary for the query, None if nothing relevant was found."""
+        import requests
+        from urllib.parse import quote
+
+        encoded_query = quote(query)
+        url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json&no_html=1&skip_disambig=1"
+
+        # Make the request with a timeout; transport errors propagate so they are not cached
+        response = requests.get(url, timeout=self.timeout, headers={
+            'User-Agent': 'Mozilla/5.0 (compatible; ThemeCreator/1.0)'
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"Search API returned status {response.status_code}")
+
+        data = response.json()
+
+        # Extract relevant information from DuckDuckGo response
+        search_results = []
+
+        # Get abstract (main result)
+        if data.get('Abstract'):
+            search_results.append(f"Summary: {data['Abstract']}")
+
+        # Get related topics
+        if data.get('RelatedTopics'):
+            for topic in data['RelatedTopics'][:3]:  # Limit to top 3
+                if isinstance(topic, dict) and topic.get('Text'):
+                    search_results.append(f"Related: {topic['Text']}")
+
+        # Get definition if available
+        if data.get('Definition'):
+            search_results.append(f"Definition: {data['Definition']}")
+
+        if not search_results:
+            return None
+        return ' '.join(search_results)[:1000]  # Limit length
+
+
+class StubSearchBackend:
+    """
+    Offline search backend returning canned results, for local development and tests.
+    """
+    name = "stub"
+
+    def __init__(self, results: Optional[Dict[str, str]] = None, delay_seconds: float = 0.0):
+        self.results = results
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+
+    def search(self, query: str) -> Optional[str]:
+        self.calls += 1
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        if self.results is not None:
+            return self.results.get(query)
+        return f"Summary: Recent coverage and ongoing discussion related to {query}."
+
+
+SEARCH_BACKENDS: Dict[str, Callable[[], Any]] = {
+    DuckDuckGoSearchBackend.name: DuckDuckGoSearchBackend,
+    StubSearchBackend.name: StubSearchBackend,
+}
+
+
+# Register an additional search backend factory under a name usable in theme_creator.search_backend
+def register_search_backend(name: str, factory: Callable[[], Any]) -> None:
+    SEARCH_BACKENDS[name] = factory
+
+
+def get_search_backend(name: Optional[str] = None) -> Any:
+    backend_name = name or SEARCH_BACKEND
+    factory = SEARCH_BACKENDS.get(backend_name)
+    if factory is None:
+        raise ValueError(f"Unknown theme search backend '{backend_name}' (available: {', '.join(SEARCH_BACKENDS)})")
+    return factory()
+
+
+# Search through the backend, reusing results for the same query until the TTL expires
+def cached_search(backend: Any, query: str) -> Optional[str]:
+    key = (backend.name, query)
+    now = time.monotonic()
+    with _SEARCH_CACHE_LOCK:
+        cached = _SEARCH_CACHE.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    result = backend.search(query)
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (now + SEARCH_CACHE_TTL_SECONDS, result)
+    return result
+
+
+def clear_search_cache() -> None:
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE.clear()
 
 class ThemeCreatorBehavior:
     """
     Handles theme creation functionality using KMeans clustering and TF-IDF analysis.
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], search_backend: Optional[Any] = None):
         """
         Initialize the theme creator behavior with configuration.
         
         Args:
             config: Dictionary containing theme creation configuration
+            search_backend: Optional search backend; defaults to theme_creator.search_backend from config.yaml
         """
         self.num_themes = config.get('num_themes', 3)
         self.label = config.get('label', 'Theme Creator')
@@ -35,8 +427,20 @@ class ThemeCreatorBehavior:
         self.llm_polish_prompt = config.get('llm_polish_prompt', '')  # Optional teacher context for theme structuring
         self.filter_web_content = config.get('filter_web_content', True)  # Enhanced filtering for web/PDF artifacts
         self.enhance_with_web_search = config.get('enhance_with_web_search', False)  # Connect themes to recent events
+        self.clustering_engine = config.get('clustering_engine', CLUSTERING_ENGINE)  # auto, kmeans, minibatch or spherical
+        self.auto_num_themes = config.get('auto_num_themes', False)  # Pick the theme count by silhouette score
+        self.max_auto_themes = config.get('max_auto_themes', 8)
+        self._search_backend = search_backend
+        self.enrichment_max_concurrency = ENRICHMENT_MAX_CONCURRENCY
+        self.enrichment_deadline_seconds = ENRICHMENT_DEADLINE_SECONDS
 
-    def execute(self, student_data: List[Dict[str, Any]], db_session: Optional[Any] = None, prompt_context: Optional[str] = None, deployment_context: Optional[str] = None, progress_callback: Optional[callable] = None) -> Dict[str, Any]:
+    @property
+    def search_backend(self) -> Any:
+        if self._search_backend is None:
+            self._search_backend = get_search_backend()
+        return self._search_backend
+
+    def execute(self, student_data: List[Dict[str, Any]], db_session: Optional[Any] = None, prompt_context: Optional[str] = None, deployment_context: Optional[str] = None, progress_callback: Optional[callable] = None, checkpoint_store: Optional[Any] = None) -> Dict[str, Any]:
         """
         Execute theme creation with the provided student data.
         Optimized for async execution with better memory management and error handling.
@@ -46,6 +450,8 @@ class ThemeCreatorBehavior:
             db_session: Optional database session for PDF vector retrieval
             prompt_context: Optional context about the assignment prompts
             deployment_context: Optional deployment context for auto-fetching student data
+            checkpoint_store: Optional BehaviorCheckpointStore; the vectors, clustering, labels and
+                enrichment stages are reused from it when their inputs are unchanged
             
         Returns:
             Dictionary with themes, metadata, and clustering results
@@ -85,85 +491,149 @@ class ThemeCreatorBehavior:
             self._current_student_data = filtered_student_data
             self._current_db_session = db_session
             
+            # Checkpoint fingerprints: a stage is reused only if its inputs are unchanged
+            data_fingerprint = checkpoint_fingerprint(filtered_student_data)
+            clustering_fingerprint = checkpoint_fingerprint(
+                data_fingerprint, self.num_themes, self.auto_num_themes, self.max_auto_themes, self.clustering_engine
+            )
+            labels_fingerprint = checkpoint_fingerprint(clustering_fingerprint, self.filter_web_content)
+            
             # Report progress for vector building
             if progress_callback:
                 progress_callback(50, "Building vectors for clustering...")
             
-            # Build vectors for clustering (text + PDF embeddings)
-            try:
-                students_with_vectors = self._build_student_vectors(filtered_student_data, db_session)
-            except Exception as e:
-                # Fall back to text-only vectors - use the same pattern as group assignment
-                print(f"Warning: PDF vector enrichment failed, using text only. Error: {e}")
+            vectors_checkpoint = checkpoint_store.load("vectors", data_fingerprint) if checkpoint_store else None
+            if vectors_checkpoint:
+                names = vectors_checkpoint["names"]
+                vectors = np.array(vectors_checkpoint["vectors"])
+                texts = vectors_checkpoint["texts"]
+            else:
+                # Build vectors for clustering (text + PDF embeddings)
+                try:
+                    students_with_vectors = self._build_student_vectors(filtered_student_data, db_session)
+                except SoftTimeLimitExceeded:
+                    # Out of time, not a PDF problem: text-only vectors must not be checkpointed as the real ones
+                    raise
+                except Exception as e:
+                    # Fall back to text-only vectors - use the same pattern as group assignment
+                    print(f"Warning: PDF vector enrichment failed, using text only. Error: {e}")
                 
-                # Import the same function group assignment uses for fallback
-                from services.deployment_types.group_assignment import student_to_vector
+                    # Import the same function group assignment uses for fallback
+                    from services.deployment_types.group_assignment import student_to_vector
                 
-                students_with_vectors = []
-                for s in filtered_student_data:
-                    if isinstance(s, dict):
-                        name = s.get("name", "Unknown")
-                        text = s.get("text", "")
-                        students_with_vectors.append((name, student_to_vector(text)))
-                    else:
-                        # Handle case where s is not a dict (e.g., a string)
-                        print(f"Warning: Invalid student data format: {type(s)} = {s}")
-                        continue
+                    students_with_vectors = []
+                    for s in filtered_student_data:
+                        if isinstance(s, dict):
+                            name = s.get("name", "Unknown")
+                            text = s.get("text", "")
+                            students_with_vectors.append((name, student_to_vector(text)))
+                        else:
+                            # Handle case where s is not a dict (e.g., a string)
+                            print(f"Warning: Invalid student data format: {type(s)} = {s}")
+                            continue
+
+                # Memory optimization: Extract data and clear large objects
+                names = [name for name, _ in students_with_vectors]
+                vectors = np.array([vec for _, vec in students_with_vectors])
+            
+                # Free up memory from students_with_vectors
+                del students_with_vectors
+            
+                # Extract texts only from valid students (to match names/vectors arrays)
+                # For PDF-only themes, we need to extract text content from PDFs for TF-IDF analysis
+                texts = []
+                valid_student_names = set(names)  # Names from successfully processed students
+            
+                for student in filtered_student_data:
+                    if isinstance(student, dict) and student.get("name") in valid_student_names:
+                        student_text = student.get("text", "")
+                    
+                        # If no text but has PDFs, try to extract PDF text for theme analysis
+                        if not student_text and student.get("pdf_document_ids") and db_session:
+                            print(f"  Extracting PDF text for theme analysis: {student.get('name', 'Unknown')}")
+                            pdf_text = self._extract_pdf_text_for_themes(student.get("pdf_document_ids", []), db_session)
+                            if pdf_text:
+                                student_text = pdf_text
+                                print(f"    Extracted {len(pdf_text)} chars from PDFs")
+                    
+                        texts.append(student_text)
+            
+                # Ensure texts array matches the length of names/vectors
+                while len(texts) < len(names):
+                    texts.append("")
 
-            if len(students_with_vectors) < self.num_themes:
+                if checkpoint_store:
+                    checkpoint_store.save("vectors", {"names": names, "vectors": vectors.tolist(), "texts": texts}, data_fingerprint)
+
+            if len(names) < self.num_themes:
                 # Adjust number of themes if we have fewer students than requested themes
-                actual_num_themes = max(1, len(students_with_vectors) // 2)
+                actual_num_themes = max(1, len(names) // 2)
                 print(f"Warning: Reducing number of themes from {self.num_themes} to {actual_num_themes} due to limited data")
             else:
                 actual_num_themes = self.num_themes
             
             # Ensure we have at least 2 themes for meaningful analysis
             if actual_num_themes < 2:
-                actual_num_themes = min(2, len(students_with_vectors))
+                actual_num_themes = min(2, len(names))
                 print(f"📈 Forcing at least 2 themes for meaningful analysis: {actual_num_themes}")
 
             # Report progress for clustering
             if progress_callback:
                 progress_callback(60, "Performing theme clustering...")
             
-            # Memory optimization: Extract data and clear large objects
-            names = [name for name, _ in students_with_vectors]
-            vectors = np.array([vec for _, vec in students_with_vectors])
-            
-            # Free up memory from students_with_vectors
-            del students_with_vectors
-            
-            # Extract texts only from valid students (to match names/vectors arrays)
-            # For PDF-only themes, we need to extract text content from PDFs for TF-IDF analysis
-            texts = []
-            valid_student_names = set(names)  # Names from successfully processed students
-            
-            for student in filtered_student_data:
-                if isinstance(student, dict) and student.get("name") in valid_student_names:
-                    student_text = student.get("text", "")
-                    
-                    # If no text but has PDFs, try to extract PDF text for theme analysis
-                    if not student_text and student.get("pdf_document_ids") and db_session:
-                        print(f"  Extracting PDF text for theme analysis: {student.get('name', 'Unknown')}")
-                        pdf_text = self._extract_pdf_text_for_themes(student.get("pdf_document_ids", []), db_session)
-                        if pdf_text:
-                            student_text = pdf_text
-                            print(f"    Extracted {len(pdf_text)} chars from PDFs")
-                    
-                    texts.append(student_text)
-            
-            # Ensure texts array matches the length of names/vectors
-            while len(texts) < len(names):
-                texts.append("")
+            clustering_checkpoint = checkpoint_store.load("clustering", clustering_fingerprint) if checkpoint_store else None
+            if clustering_checkpoint:
+                actual_num_themes = clustering_checkpoint["num_themes"]
+                cluster_assignments = np.array(clustering_checkpoint["assignments"])
+                clustering_method = clustering_checkpoint.get(
+                    "clustering_method", resolve_clustering_engine(self.clustering_engine, len(vectors))
+                )
+                auto_selected_themes = clustering_checkpoint.get("auto_selected_themes")
+                silhouette_scores = clustering_checkpoint.get("silhouette_scores")
+            else:
+                auto_selected_themes = None
+                silhouette_scores = None
+                # Let the data pick the number of themes when requested
+                if self.auto_num_themes and len(vectors) > 2:
+                    try:
+                        actual_num_themes, scores_by_k = select_num_clusters(
+                            vectors, 2, self.max_auto_themes, self.clustering_engine
+                        )
+                        auto_selected_themes = int(actual_num_themes)
+                        silhouette_scores = {str(k): round(score, 4) for k, score in scores_by_k.items()}
+                        print(f"📈 Auto-selected {actual_num_themes} themes (silhouette by k: "
+                              f"{', '.join(f'{k}={score:.3f}' for k, score in scores_by_k.items())})")
+                    except SoftTimeLimitExceeded:
+                        raise
+                    except Exception as e:
+                        print(f"⚠️  Automatic theme count selection failed, keeping {actual_num_themes}: {e}")
 
-            # Perform KMeans clustering with enhanced error handling
-            try:
-                cluster_assignments, cluster_centers = self._perform_clustering(vectors, actual_num_themes)
-            except Exception as e:
-                print(f"⚠️  Clustering failed, falling back to simple distribution: {e}")
-                # Simple fallback: distribute students evenly across themes
-                cluster_assignments = np.array([i % actual_num_themes for i in range(len(names))])
-                cluster_centers = None
+                # Perform KMeans clustering with enhanced error handling
+                clustering_method = resolve_clustering_engine(self.clustering_engine, len(vectors))
+                try:
+                    cluster_assignments, cluster_centers = self._perform_clustering(vectors, actual_num_themes)
+                except SoftTimeLimitExceeded:
+                    # An even distribution must not be checkpointed as the clustering
+                    raise
+                except Exception as e:
+                    print(f"⚠️  Clustering failed, falling back to simple distribution: {e}")
+                    # Simple fallback: distribute students evenly across themes
+                    cluster_assignments = np.array([i % actual_num_themes for i in range(len(names))])
+                    cluster_centers = None
+                    clustering_method = "even_distribution"
+            
+                if checkpoint_store:
+                    checkpoint_store.save(
+                        "clustering",
+                        {
+                            "num_themes": int(actual_num_themes),
+                            "assignments": np.asarray(cluster_assignments).tolist(),
+                            "clustering_method": clustering_method,
+                            "auto_selected_themes": auto_selected_themes,
+                            "silhouette_scores": silhouette_scores,
+                        },
+                        clustering_fingerprint
+                    )
             
             # Memory cleanup
             del vectors
@@ -172,48 +642,61 @@ class ThemeCreatorBehavior:
             if progress_callback:
                 progress_callback(70, "Generating theme labels...")
             
-            # Auto-label clusters using TF-IDF with enhanced error handling
-            try:
-                themes_data = self._auto_label_themes(cluster_assignments, texts, names, actual_num_themes)
-            except Exception as e:
-                print(f"⚠️  Theme labeling failed, creating basic themes: {e}")
-                # Fallback: create basic themes
-                themes_data = []
-                for i in range(actual_num_themes):
-                    student_names_in_cluster = [names[j] for j, cluster_id in enumerate(cluster_assignments) if cluster_id == i]
-                    themes_data.append({
-                        "title": f"Theme {i + 1}",
-                        "description": f"Theme based on {len(student_names_in_cluster)} student responses",
-                        "keywords": [],
-                        "snippets": [],
-                        "document_count": len(student_names_in_cluster),
-                        "cluster_id": i,
-                        "student_names": student_names_in_cluster,
-                        "student_count": len(student_names_in_cluster)
-                    })
-            
-            # Enhanced features with graceful degradation
-            # Enhance themes with recent events via web search if enabled
-            if self.enhance_with_web_search and os.getenv("OPENAI_API_KEY"):
-                if progress_callback:
-                    progress_callback(80, "Enhancing themes with web search...")
+            labels_checkpoint = checkpoint_store.load("labels", labels_fingerprint) if checkpoint_store else None
+            if labels_checkpoint:
+                themes_data = labels_checkpoint["themes"]
+            else:
+                # Auto-label clusters using TF-IDF with enhanced error handling
                 try:
-                    print("🌐 Enhancing themes with recent events via web search...")
-                    themes_data = self._enhance_themes_with_web_search(themes_data, prompt_context)
+                    themes_data = self._auto_label_themes(cluster_assignments, texts, names, actual_num_themes)
+                except SoftTimeLimitExceeded:
+                    # Placeholder labels must not be checkpointed as the real ones
+                    raise
                 except Exception as e:
-                    print(f"⚠️  Web search enhancement failed, continuing without: {e}")
-                    # Continue with the existing themes_data
+                    print(f"⚠️  Theme labeling failed, creating basic themes: {e}")
+                    # Fallback: create basic themes
+                    themes_data = []
+                    for i in range(actual_num_themes):
+                        student_names_in_cluster = [names[j] for j, cluster_id in enumerate(cluster_assignments) if cluster_id == i]
+                        themes_data.append({
+                            "title": f"Theme {i + 1}",
+                            "description": f"Theme based on {len(student_names_in_cluster)} student responses",
+                            "keywords": [],
+                            "snippets": [],
+                            "document_count": len(student_names_in_cluster),
+                            "cluster_id": i,
+                            "student_names": student_names_in_cluster,
+                            "student_count": len(student_names_in_cluster)
+                        })
+            
+                if checkpoint_store:
+                    checkpoint_store.save("labels", {"themes": themes_data}, labels_fingerprint)
             
-            # Polish theme names with LLM if enabled (skip if likely to hang)
-            if self.use_llm_polish and os.getenv("OPENAI_API_KEY"):
+            # Enhanced features with graceful degradation
+            # Web search enrichment (connect themes to recent events) and LLM polishing
+            # run concurrently per theme under one overall deadline
+            with_web_search = bool(self.enhance_with_web_search and os.getenv("OPENAI_API_KEY"))
+            with_polish = bool(self.use_llm_polish and os.getenv("OPENAI_API_KEY"))
+            if with_web_search or with_polish:
                 if progress_callback:
-                    progress_callback(85, "Polishing theme names with LLM...")
-                try:
-                    print("🎨 Attempting LLM theme polishing...")
-                    themes_data = self._polish_theme_names(themes_data, prompt_context)
-                except Exception as e:
-                    print(f"⚠️  LLM polishing failed, continuing with auto-generated names: {e}")
-                    # Continue with the existing themes_data (auto-generated names)
+                    progress_callback(80, "Enriching themes with web search and LLM polishing...")
+                enrichment_fingerprint = checkpoint_fingerprint(
+                    labels_fingerprint, prompt_context, with_web_search, with_polish, self.llm_polish_prompt
+                )
+                enrichment_checkpoint = checkpoint_store.load("enrichment", enrichment_fingerprint) if checkpoint_store else None
+                if enrichment_checkpoint:
+                    themes_data = enrichment_checkpoint["themes"]
+                else:
+                    try:
+                        themes_data = self._enrich_themes(themes_data, prompt_context, with_web_search, with_polish)
+                        if checkpoint_store:
+                            checkpoint_store.save("enrichment", {"themes": themes_data}, enrichment_fingerprint)
+                    except SoftTimeLimitExceeded:
+                        # Out of time: retry rather than finish with unenriched themes
+                        raise
+                    except Exception as e:
+                        print(f"⚠️  Theme enrichment failed, continuing with auto-generated themes: {e}")
+                        # Continue with the existing themes_data (auto-generated names)
             
             # Final cleanup
             del texts, names, cluster_assignments, filtered_student_data
@@ -234,7 +717,11 @@ class ThemeCreatorBehavior:
                     "total_students": original_student_count,
                     "total_themes": actual_num_themes,
                     "requested_themes": self.num_themes,
-                    "clustering_method": "kmeans",
+                    "clustering_method": clustering_method,  # Engine actually used ("auto" resolved)
+                    "clustering_engine": self.clustering_engine,  # As configured
+                    "auto_num_themes": self.auto_num_themes,
+                    "auto_selected_themes": auto_selected_themes,  # k picked by silhouette score, if it ran
+                    "silhouette_scores": silhouette_scores,
                     "includes_llm_polish": self.use_llm_polish and os.getenv("OPENAI_API_KEY") is not None,
                     "llm_polish_prompt": self.llm_polish_prompt,
                     "enhance_with_web_search": self.enhance_with_web_search,
@@ -243,6 +730,8 @@ class ThemeCreatorBehavior:
                     "selected_prompts_count": len(self.selected_submission_prompts)
                 }
             }
+            if checkpoint_store:
+                result["metadata"]["checkpoints"] = checkpoint_store.summary()
             
             print(f"🚀 THEME CREATOR RETURNING RESULT WITH:")
             print(f"   Success: {result['success']}")
@@ -252,6 +741,9 @@ class ThemeCreatorBehavior:
             
             return result
                 
+        except SoftTimeLimitExceeded:
+            # Re-raised as is, so the task can retry and resume from the saved stages
+            raise
         except Exception as e:
             # Enhanced error logging for async debugging
             import traceback
@@ -529,6 +1021,8 @@ class ThemeCreatorBehavior:
                                     vec = rec.vectors[first_key]
                             if vec is not None:
                                 pdf_vectors.append(vec)
+                    except SoftTimeLimitExceeded:
+                        raise
                     except Exception as e:
                         # Suppress detailed error logging to reduce noise
                         continue
@@ -600,6 +1094,8 @@ class ThemeCreatorBehavior:
                         if isinstance(fallback_snippets, list):
                             extracted_texts.extend(fallback_snippets[:10])
                     
+                except SoftTimeLimitExceeded:
+                    raise
                 except Exception as e:
                     print(f"    Error extracting from PDF {doc_id}: {e}")
                     continue
@@ -613,6 +1109,8 @@ class ThemeCreatorBehavior:
             
             return combined_text
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"  Error in PDF text extraction: {e}")
             return ""
@@ -662,6 +1160,8 @@ class ThemeCreatorBehavior:
                         if len(chunk_data) >= 50:
                             break
                     
+                except SoftTimeLimitExceeded:
+                    raise
                 except Exception as e:
                     print(f"    Error extracting chunks from PDF {doc_id}: {e}")
                     continue
@@ -669,13 +1169,15 @@ class ThemeCreatorBehavior:
             print(f"    Extracted {len(chunk_data)} PDF chunks with vectors")
             return chunk_data
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"  Error in PDF chunk extraction: {e}")
             return []
 
     def _perform_clustering(self, vectors: np.ndarray, num_themes: int) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Perform KMeans clustering on the student vectors.
+        Cluster the student vectors with the configured clustering engine.
         
         Args:
             vectors: Array of student vectors
@@ -684,70 +1186,27 @@ class ThemeCreatorBehavior:
         Returns:
             Tuple of (cluster_assignments, cluster_centers)
         """
-        print(f"🔄 Starting KMeans clustering with {num_themes} clusters...")
-        
-        # Force single-threaded execution to avoid hanging issues
-        import os
-        old_mkl_threading = os.environ.get('MKL_NUM_THREADS')
-        old_omp_threads = os.environ.get('OMP_NUM_THREADS')
-        old_openblas_threads = os.environ.get('OPENBLAS_NUM_THREADS')
+        engine = resolve_clustering_engine(self.clustering_engine, len(vectors))
+        print(f"🔄 Starting {engine} clustering with {num_themes} clusters...")
+        print(f"  Fitting with {len(vectors)} vectors ({CLUSTERING_THREADS} thread(s))...")
+
+        # Thread counts are limited with threadpoolctl inside run_clustering to avoid hanging issues
+        cluster_assignments, cluster_centers = run_clustering(vectors, num_themes, engine)
         
-        try:
-            # Set environment variables to force single-threading
-            os.environ['MKL_NUM_THREADS'] = '1'
-            os.environ['OMP_NUM_THREADS'] = '1' 
-            os.environ['OPENBLAS_NUM_THREADS'] = '1'
-            
-            # Use minimal settings to avoid hanging
-            kmeans = KMeans(
-                n_clusters=num_themes, 
-                random_state=42, 
-                n_init=5,  # Reduced from 10 to 5 for speed
-                max_iter=100,  # Reduced max iterations
-                algorithm='lloyd'  # Use specific algorithm
-            )
-            
-            print(f"  Fitting KMeans with {len(vectors)} vectors...")
-            cluster_assignments = kmeans.fit_predict(vectors)
-            cluster_centers = kmeans.cluster_centers_.copy()
+        # Check if we got fewer clusters than requested
+        unique_clusters = len(np.unique(cluster_assignments))
+        if unique_clusters < num_themes:
+            print(f"  ⚠️  Clustering found only {unique_clusters} distinct clusters out of {num_themes} requested")
+            print(f"  📊 This suggests PDF content is very similar - using force distribution")
             
-            # Check if we got fewer clusters than requested
+            # Force distribute students across requested number of themes
+            cluster_assignments = self._force_distribute_clusters(cluster_assignments, vectors, num_themes)
             unique_clusters = len(np.unique(cluster_assignments))
-            if unique_clusters < num_themes:
-                print(f"  ⚠️  KMeans found only {unique_clusters} distinct clusters out of {num_themes} requested")
-                print(f"  📊 This suggests PDF content is very similar - using force distribution")
-                
-                # Force distribute students across requested number of themes
-                cluster_assignments = self._force_distribute_clusters(cluster_assignments, vectors, num_themes)
-                unique_clusters = len(np.unique(cluster_assignments))
-                print(f"  ✅ Forced distribution resulted in {unique_clusters} clusters")
-            
-            print(f"✅ KMeans clustering completed successfully")
-            
-            return cluster_assignments, cluster_centers
-            
-        finally:
-            # Restore original threading settings
-            if old_mkl_threading is not None:
-                os.environ['MKL_NUM_THREADS'] = old_mkl_threading
-            elif 'MKL_NUM_THREADS' in os.environ:
-                del os.environ['MKL_NUM_THREADS']
-                
-            if old_omp_threads is not None:
-                os.environ['OMP_NUM_THREADS'] = old_omp_threads
-            elif 'OMP_NUM_THREADS' in os.environ:
-                del os.environ['OMP_NUM_THREADS']
-                
-            if old_openblas_threads is not None:
-                os.environ['OPENBLAS_NUM_THREADS'] = old_openblas_threads
-            elif 'OPENBLAS_NUM_THREADS' in os.environ:
-                del os.environ['OPENBLAS_NUM_THREADS']
-                
-            # Clean up kmeans object
-            try:
-                del kmeans
-            except:
-                pass
+            print(f"  ✅ Forced distribution resulted in {unique_clusters} clusters")
+        
+        print(f"✅ Clustering completed successfully")
+        
+        return cluster_assignments, cluster_centers
 
     def _force_distribute_clusters(self, original_assignments: np.ndarray, vectors: np.ndarray, target_num_themes: int) -> np.ndarray:
         """
@@ -755,9 +1214,6 @@ class ThemeCreatorBehavior:
         Uses balanced k-means++ style initialization to create more evenly distributed and coherent themes.
         """
         try:
-            from scipy.spatial.distance import pdist, squareform
-            import numpy as np
-            
             total_students = len(vectors)
             target_size = total_students // target_num_themes
             remainder = total_students % target_num_themes
@@ -765,92 +1221,49 @@ class ThemeCreatorBehavior:
             print(f"    Redistributing {total_students} students into {target_num_themes} balanced themes")
             print(f"    Target sizes: {target_size} per theme, with {remainder} themes getting +1 student")
             
-            # Calculate pairwise distances between all vectors
-            distances = pdist(vectors, metric='cosine')
-            distance_matrix = squareform(distances)
-            
-            # Start fresh with balanced K-means++ style initialization
-            new_assignments = np.full(total_students, -1)
-            cluster_centers = []
-            
-            # Step 1: Select diverse seed points using k-means++ approach
-            seed_indices = []
-            
-            # Pick first seed randomly from all students
+            # Step 1: Select diverse seed points: a random first seed, then each next seed
+            # as far as possible (cosine distance) from the seeds picked so far
             first_seed = np.random.randint(0, total_students)
-            seed_indices.append(first_seed)
-            cluster_centers.append(vectors[first_seed])
-            
-            # Pick remaining seeds with probability proportional to distance from existing seeds
-            for _ in range(1, target_num_themes):
-                max_min_distance = -1
-                best_candidate = None
-                
-                for candidate_idx in range(total_students):
-                    if candidate_idx in seed_indices:
-                        continue
-                    
-                    # Find minimum distance to any existing seed
-                    min_distance = min(distance_matrix[candidate_idx][seed_idx] 
-                                     for seed_idx in seed_indices)
-                    
-                    if min_distance > max_min_distance:
-                        max_min_distance = min_distance
-                        best_candidate = candidate_idx
-                
-                if best_candidate is not None:
-                    seed_indices.append(best_candidate)
-                    cluster_centers.append(vectors[best_candidate])
+            seed_indices = farthest_point_sample(vectors, target_num_themes, start=first_seed)
             
             # Step 2: Assign initial cluster IDs to seeds
-            for i, seed_idx in enumerate(seed_indices):
-                new_assignments[seed_idx] = i
+            new_assignments = np.full(total_students, -1)
+            new_assignments[seed_indices] = np.arange(len(seed_indices))
             
-            # Step 3: Balanced assignment of remaining students
-            remaining_students = [i for i in range(total_students) if i not in seed_indices]
+            # Cosine distance from every student to every seed (students x seeds, no full matrix)
+            unit = normalize_rows(vectors, dtype=np.float64)
+            seed_distances = 1.0 - unit @ unit[seed_indices].T
             
             # Calculate target size for each cluster (some get +1 if remainder > 0)
-            cluster_target_sizes = []
-            for i in range(target_num_themes):
-                size = target_size + (1 if i < remainder else 0)
-                cluster_target_sizes.append(size)
-            
-            cluster_current_sizes = [1] * target_num_themes  # Each cluster has 1 seed
-            
-            # Assign remaining students to balance clusters while maintaining coherence
-            for student_idx in remaining_students:
-                best_cluster = None
-                best_score = float('inf')
+            cluster_target_sizes = target_size + (np.arange(target_num_themes) < remainder)
+            cluster_current_sizes = np.zeros(target_num_themes, dtype=np.int64)
+            cluster_current_sizes[:len(seed_indices)] = 1  # Each cluster has 1 seed
+            
+            # Step 3: Balanced assignment of remaining students while maintaining coherence
+            for student_idx in np.flatnonzero(new_assignments == -1):
+                # Distance to cluster center (seed) plus a penalty for oversized clusters to encourage balance
+                scores = np.full(target_num_themes, np.inf)
+                scores[:len(seed_indices)] = seed_distances[student_idx] + cluster_current_sizes[:len(seed_indices)] * 0.1
+                # Skip clusters that are already full
+                scores[cluster_current_sizes >= cluster_target_sizes] = np.inf
                 
-                for cluster_id in range(target_num_themes):
-                    # Skip if cluster is already full
-                    if cluster_current_sizes[cluster_id] >= cluster_target_sizes[cluster_id]:
-                        continue
-                    
-                    # Calculate distance to cluster center (seed)
-                    distance_to_center = distance_matrix[student_idx][seed_indices[cluster_id]]
-                    
-                    # Add penalty for oversized clusters to encourage balance
-                    size_penalty = cluster_current_sizes[cluster_id] * 0.1
-                    total_score = distance_to_center + size_penalty
-                    
-                    if total_score < best_score:
-                        best_score = total_score
-                        best_cluster = cluster_id
-                
-                # If no cluster has space, assign to the cluster with minimum size
-                if best_cluster is None:
-                    best_cluster = np.argmin(cluster_current_sizes)
+                if np.isfinite(scores).any():
+                    best_cluster = int(np.argmin(scores))
+                else:
+                    # If no cluster has space, assign to the cluster with minimum size
+                    best_cluster = int(np.argmin(cluster_current_sizes))
                 
                 new_assignments[student_idx] = best_cluster
                 cluster_current_sizes[best_cluster] += 1
             
             # Verify the distribution
-            final_counts = [np.sum(new_assignments == i) for i in range(target_num_themes)]
+            final_counts = [int(np.sum(new_assignments == i)) for i in range(target_num_themes)]
             print(f"    Final distribution: {final_counts}")
             
             return new_assignments
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"    Error in balanced force distribution: {e}")
             return original_assignments
@@ -974,6 +1387,8 @@ class ThemeCreatorBehavior:
                 # Clean up to prevent memory leaks
                 del vectorizer, tfidf_matrix, feature_names, mean_scores
                 
+            except SoftTimeLimitExceeded:
+                raise
             except Exception as e:
                 print(f"    TF-IDF failed for cluster {cluster_id}: {e}")
                 filtered_keywords = []
@@ -999,6 +1414,8 @@ class ThemeCreatorBehavior:
                 "student_count": len(student_names)
             }
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"    Error in chunk-based analysis for cluster {cluster_id}: {e}")
             return {}
@@ -1011,16 +1428,13 @@ class ThemeCreatorBehavior:
             return []
         
         # Step 1: Content filtering - remove ads, headers, footers, navigation
-        filtered_chunks = []
-        for text, vector in raw_chunks:
-            # Apply enhanced filtering if enabled, otherwise use basic length filter
-            if self.filter_web_content:
-                if self._is_relevant_content(text):
-                    filtered_chunks.append((text, vector))
-            else:
-                # Basic filtering - just length and basic quality
-                if 30 <= len(text.strip()) <= 1000 and '.' in text:
-                    filtered_chunks.append((text, vector))
+        texts = [text for text, _ in raw_chunks]
+        if self.filter_web_content:
+            keep = self._relevant_content_mask(texts)
+        else:
+            # Basic filtering - just length and basic quality
+            keep = [30 <= len(text.strip()) <= 1000 and '.' in text for text in texts]
+        filtered_chunks = [chunk for chunk, relevant in zip(raw_chunks, keep) if relevant]
         
         if not filtered_chunks:
             # If all filtered out, take the longest chunks as likely content
@@ -1038,110 +1452,68 @@ class ThemeCreatorBehavior:
         Enhanced filter to remove irrelevant content like ads, navigation, headers, footers.
         Specifically designed to handle news website content and PDF artifacts.
         """
-        text_lower = text.lower().strip()
-        original_text = text.strip()
-        
+        return bool(self._relevant_content_mask([text])[0])
+
+    def _relevant_content_mask(self, texts: List[str]) -> np.ndarray:
+        """
+        Batch version of _is_relevant_content: returns a boolean mask over texts.
+        Checks run in stages over the whole batch, each stage only on chunks that survived the previous one.
+        """
+        keep = np.zeros(len(texts), dtype=bool)
+        lowered = [text.lower().strip() for text in texts]
+
         # Skip very short or very long chunks
-        if len(text_lower) < 40 or len(text_lower) > 1000:
-            return False
-        
-        # Enhanced patterns for news websites and web content
-        exclude_patterns = [
-            # Common ad/promotional content
-            'advertisement', 'sponsored', 'click here', 'subscribe', 'newsletter',
-            'sign in', 'sign up', 'log in', 'login', 'register', 'create account',
-            'follow us', 'social media', 'twitter', 'facebook', 'instagram', 'linkedin',
-            'cookie policy', 'privacy policy', 'terms of service', 'contact us',
-            'navigation', 'menu', 'home page', 'about us',
-            'copyright', '© 20', 'all rights reserved', 'powered by',
-            'share this', 'print this', 'email this', 'bookmark', 'save article',
-            'prev', 'next', 'page 1', 'page 2', 'download pdf',
-            
-            # News website specific patterns
-            'trending', 'featured', 'lifestyle', 'entertainment', 'sports',
-            'weather', 'horoscope', 'astrology', 'celebrity', 'gossip',
-            'tired of too many ads', 'go ad free', 'premium subscription',
-            'breaking news', 'live updates', 'just in', 'developing story',
-            'photo gallery', 'video gallery', 'slideshow',
-            'related articles', 'you may also like', 'recommended reading',
-            'popular stories', 'most read', 'trending now',
-            
-            # Website navigation and metadata
-            'updated:', 'published:', 'ist', 'pst', 'est', 'gmt',
-            'etimes.in', 'indiatimes', 'toi lifestyle', 'times of india',
-            'news/', 'lifestyle/', 'sports/', 'entertainment/',
-            'breadcrumb', 'tags:', 'category:', 'section:',
-            
-            # Generic website elements
-            'load more', 'read more', 'view all', 'see all', 'show more',
-            'comments', 'reactions', 'likes', 'shares', 'replies',
-            'user agreement', 'terms and conditions', 'disclaimer',
-            
-            # Specific patterns from the example
-            'friendzoned', 'sweat to skin', 'infections', '5 signs your',
-            'relationship is ready', 'how to spot the fakes',
-            'aa a', 'share aa a'  # Common artifact patterns
-        ]
-        
-        # Check for exclude patterns (more sensitive threshold)
-        exclude_count = sum(1 for pattern in exclude_patterns if pattern in text_lower)
-        if exclude_count >= 2:
-            return False
-        
-        # Filter out chunks with excessive navigation/UI elements
-        ui_indicators = ['sign in', 'menu', 'home', 'search', 'filter', 'sort by']
-        ui_count = sum(1 for indicator in ui_indicators if indicator in text_lower)
-        if ui_count >= 2:
-            return False
-        
+        candidates = np.array([i for i, text_lower in enumerate(lowered) if 40 <= len(text_lower) <= 1000], dtype=np.int64)
+        if not candidates.size:
+            return keep
+
+        # Check for exclude patterns (more sensitive threshold) and
+        # filter out chunks with excessive navigation/UI elements
+        candidate_lower = [lowered[i] for i in candidates]
+        exclude_count = count_pattern_hits(candidate_lower, EXCLUDE_PATTERNS)
+        ui_count = count_pattern_hits(candidate_lower, UI_INDICATORS)
+        word_count = np.array([len(text_lower.split()) for text_lower in candidate_lower])
+
         # Filter chunks that are mostly punctuation or repeated characters
-        words = text_lower.split()
-        if len(words) < 8:  # Increased minimum word count
-            return False
-        
-        # Check for excessive capitalization (often indicates titles/headers)
-        capital_ratio = sum(1 for c in original_text if c.isupper()) / len(original_text)
-        if capital_ratio > 0.3:  # More than 30% capitals suggests header/title
-            return False
-        
-        # Filter out chunks with too many special characters
-        special_chars = sum(1 for c in text if not c.isalnum() and not c.isspace())
-        if special_chars > len(text) * 0.2:  # More than 20% special characters
-            return False
-        
+        passed = (exclude_count < 2) & (ui_count < 2) & (word_count >= 8)  # Increased minimum word count
+        candidates, exclude_count, ui_count, word_count = (
+            candidates[passed], exclude_count[passed], ui_count[passed], word_count[passed]
+        )
+        if not candidates.size:
+            return keep
+
+        # Check for excessive capitalization (often indicates titles/headers) and
+        # chunks with too many special characters
+        candidate_texts = [texts[i] for i in candidates]
+        upper_count, special_count = count_char_classes(candidate_texts)
+        capital_ratio = upper_count / np.array([len(text.strip()) for text in candidate_texts])
+        text_length = np.array([len(text) for text in candidate_texts])
+        passed = (
+            (capital_ratio <= 0.3)  # More than 30% capitals suggests header/title
+            & (special_count <= text_length * 0.2)  # More than 20% special characters
+        )
+        candidates, exclude_count, ui_count, word_count = (
+            candidates[passed], exclude_count[passed], ui_count[passed], word_count[passed]
+        )
+        if not candidates.size:
+            return keep
+
         # Enhanced content quality indicators
-        quality_indicators = [
-            # Academic/research terms
-            'research', 'study', 'analysis', 'findings', 'conclusion',
-            'evidence', 'data', 'results', 'method', 'approach',
-            'according', 'however', 'therefore', 'furthermore', 'moreover',
-            'researchers', 'scientists', 'experts', 'professor', 'university',
-            
-            # News content indicators
-            'investigation', 'report', 'sources', 'officials', 'authorities',
-            'confirmed', 'revealed', 'discovered', 'announced', 'stated',
-            'interview', 'statement', 'press release', 'spokesperson',
-            'alleged', 'claimed', 'accused', 'charged', 'convicted',
-            
-            # Substantial content words
-            'because', 'although', 'despite', 'meanwhile', 'subsequently',
-            'consequently', 'nevertheless', 'furthermore', 'additionally',
-            'specifically', 'particularly', 'generally', 'typically',
-            'approximately', 'estimated', 'calculated', 'determined'
-        ]
-        
-        quality_count = sum(1 for indicator in quality_indicators if indicator in text_lower)
-        
-        # Balanced quality requirements - not too strict
-        has_quality_content = quality_count >= 1 or len(words) >= 15
-        
+        quality_count = count_pattern_hits([lowered[i] for i in candidates], QUALITY_INDICATORS)
+
         # Additional check: does it look like actual article content?
-        has_sentences = '.' in text and len([s for s in text.split('.') if len(s.strip()) > 8]) >= 1
-        
+        has_sentences = np.array([
+            '.' in texts[i] and any(len(part.strip()) > 8 for part in texts[i].split('.'))
+            for i in candidates
+        ], dtype=bool)
+
+        # Balanced quality requirements - not too strict
+        has_quality_content = (quality_count >= 1) | (word_count >= 15)
         # Allow content that doesn't have obvious exclusion patterns even if it lacks quality indicators
-        has_no_major_exclusions = exclude_count == 0 and ui_count == 0
-        
-        return (has_quality_content and has_sentences) or (has_no_major_exclusions and len(words) >= 12 and has_sentences)
+        has_no_major_exclusions = (exclude_count == 0) & (ui_count == 0)
+
+        keep[candidates] = has_sentences & (has_quality_content | (has_no_major_exclusions & (word_count >= 12)))
+        return keep
 
     def _sample_diverse_chunks(self, chunks: List[Tuple[str, List[float]]], max_chunks: int) -> List[Tuple[str, List[float]]]:
         """
@@ -1151,47 +1523,13 @@ class ThemeCreatorBehavior:
             return chunks
         
         try:
-            from scipy.spatial.distance import pdist, squareform
-            
-            # Extract vectors
-            vectors = np.array([chunk[1] for chunk in chunks])
-            
-            # Calculate pairwise distances
-            distances = pdist(vectors, metric='cosine')
-            distance_matrix = squareform(distances)
-            
-            # Greedy selection for maximum diversity
-            selected_indices = []
-            remaining_indices = list(range(len(chunks)))
-            
-            # Start with a random chunk
-            first_idx = remaining_indices[0]
-            selected_indices.append(first_idx)
-            remaining_indices.remove(first_idx)
-            
-            # Select subsequent chunks that are maximally distant
-            for _ in range(max_chunks - 1):
-                if not remaining_indices:
-                    break
-                
-                max_min_distance = -1
-                best_candidate = None
-                
-                for candidate_idx in remaining_indices:
-                    # Find minimum distance to any selected chunk
-                    min_distance = min(distance_matrix[candidate_idx][selected_idx] 
-                                     for selected_idx in selected_indices)
-                    
-                    if min_distance > max_min_distance:
-                        max_min_distance = min_distance
-                        best_candidate = candidate_idx
-                
-                if best_candidate is not None:
-                    selected_indices.append(best_candidate)
-                    remaining_indices.remove(best_candidate)
-            
+            # Greedy selection for maximum diversity, starting from the first chunk
+            vectors = np.array([chunk[1] for chunk in chunks], dtype=np.float64)
+            selected_indices = farthest_point_sample(vectors, max_chunks)
             return [chunks[i] for i in selected_indices]
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"      Error in diverse sampling: {e}")
             # Fallback: take evenly spaced chunks
@@ -1294,10 +1632,8 @@ class ThemeCreatorBehavior:
             return []
         
         # Filter out chunks that look like web content artifacts
-        clean_chunks = []
-        for text in chunk_texts:
-            if self._is_relevant_content(text):  # Reuse our content filter
-                clean_chunks.append(text)
+        relevant = self._relevant_content_mask(chunk_texts)  # Reuse our content filter
+        clean_chunks = [text for text, keep in zip(chunk_texts, relevant) if keep]
         
         if not clean_chunks:
             clean_chunks = chunk_texts  # Fallback if all filtered out
@@ -1437,6 +1773,8 @@ class ThemeCreatorBehavior:
             # Clean up vectorizer and matrix to prevent memory leaks
             del vectorizer, tfidf_matrix, feature_names, mean_scores
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"    TF-IDF analysis failed for cluster {cluster_id}: {e}")
             # Fallback to simple word frequency
@@ -1477,71 +1815,128 @@ class ThemeCreatorBehavior:
             "student_count": len(student_names)
         }
 
-    def _polish_theme_names(self, themes_data: List[Dict[str, Any]], prompt_context: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _create_enrichment_llm(self, model: str) -> Any:
+        """Create the chat model used for theme enrichment; requests are bounded by the enrichment deadline."""
+        return ChatOpenAI(
+            model=model,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=self.enrichment_deadline_seconds
+        )
+
+    def _enrich_themes(self, themes_data: List[Dict[str, Any]], prompt_context: Optional[str] = None,
+                       with_web_search: bool = False, with_polish: bool = False) -> List[Dict[str, Any]]:
         """
-        Use LLM to polish and improve theme names based on keywords and snippets.
-        Incorporates teacher-provided context for better theme structuring.
+        Enhance themes with recent events (web search + ChatOpenAI) and polish their names with an LLM.
+        
+        Every theme's web lookup and name polish is an independent job on a bounded thread pool.
+        Jobs still running when the enrichment deadline passes are abandoned and their themes
+        are returned as-is.
         
         Args:
             themes_data: List of theme dictionaries
             prompt_context: Optional context about the assignment
+            with_web_search: Connect themes to recent events via web search
+            with_polish: Polish theme names with the LLM
             
         Returns:
-            Updated themes_data with polished titles
+            New list of theme dictionaries with enrichments applied
         """
-        if not os.getenv("OPENAI_API_KEY"):
-            print("No OpenAI API key found, skipping theme name polishing")
-            return themes_data
-        
-        try:
-            # Initialize LLM with same settings as group assignment
-            llm = ChatOpenAI(
-                model="gpt-5-mini", 
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
-            
+        deadline = time.monotonic() + self.enrichment_deadline_seconds
+        enriched_themes = [dict(theme) for theme in themes_data]
+
+        jobs = []
+        if with_web_search:
+            print(f"🌐 Enhancing {len(themes_data)} themes with recent events (search backend: {self.search_backend.name})...")
+            search_llm = self._create_enrichment_llm("gpt-4o-mini")
+            for i, theme in enumerate(themes_data):
+                if not theme.get('title') or not theme.get('keywords'):
+                    print(f"  Theme {i+1}: Skipping web search (insufficient data)")
+                    continue
+                jobs.append(("search", i, self._enhance_single_theme, (i, theme, prompt_context, search_llm)))
+        if with_polish:
             print(f"🎨 Polishing {len(themes_data)} theme names with LLM...")
             if self.llm_polish_prompt:
                 print(f"  Using teacher context: {self.llm_polish_prompt[:100]}...")
-            
+            polish_llm = self._create_enrichment_llm("gpt-5-mini")
             for i, theme in enumerate(themes_data):
-                keywords = theme.get('keywords', [])
-                snippets = theme.get('snippets', [])
-                current_title = theme.get('title', '')
-                
-                if not keywords and not snippets:
-                    print(f"  Theme {i+1}: Skipping (no keywords/snippets)")
+                if not theme.get('keywords') and not theme.get('snippets'):
+                    print(f"  Theme {i+1}: Skipping polish (no keywords/snippets)")
                     continue
-                
-                try:
-                    # Create context for LLM with teacher guidance
-                    context_parts = []
-                    
-                    # Add teacher's custom structuring guidance if provided
-                    if self.llm_polish_prompt:
-                        context_parts.append(f"Teacher guidance: {self.llm_polish_prompt}")
-                    
-                    if prompt_context:
-                        context_parts.append(f"Assignment context: {prompt_context}")
-                    
-                    if keywords:
-                        context_parts.append(f"Key terms: {', '.join(keywords[:5])}")
-                    
-                    if snippets:
-                        context_parts.append(f"Representative responses: {' | '.join(snippets[:2])}")
-                    
-                    context = '\n'.join(context_parts)
-                    
-                    # Enhanced prompt that incorporates teacher guidance
-                    base_requirements = [
-                        "- Professional but engaging",
-                        "- Specific enough to distinguish from other themes", 
-                        "- Accessible to students and educators",
-                        "- Based on the key terms and response content"
-                    ]
-                    
-                    if self.llm_polish_prompt:
-                        prompt = f"""You are helping to create clear, engaging theme names for student response analysis.
+                jobs.append(("polish", i, self._polish_single_theme_name, (i, theme, prompt_context, polish_llm)))
+
+        if not jobs:
+            return enriched_themes
+
+        max_workers = max(1, min(self.enrichment_max_concurrency, len(jobs)))
+        print(f"🚀 Running {len(jobs)} enrichment jobs on {max_workers} workers ({self.enrichment_deadline_seconds:g}s deadline)")
+
+        # Not a context manager: leaving it would block on jobs that overran the deadline
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="theme-enrichment")
+        try:
+            future_to_job = {executor.submit(func, *args): (kind, i) for kind, i, func, args in jobs}
+            done, not_done = wait(future_to_job, timeout=max(0.0, deadline - time.monotonic()))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            kind, i = future_to_job[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  Theme {i+1}: {kind} enrichment failed: {e}")
+                continue
+            if result is None:
+                continue
+            if kind == "search":
+                enriched_themes[i]['description'] = result.get('description', enriched_themes[i].get('description'))
+                enriched_themes[i]['enhanced_with_web_search'] = result.get('enhanced_with_web_search', False)
+            else:
+                enriched_themes[i]['title'] = result
+
+        if not_done:
+            print(f"⏱️  Enrichment deadline reached: {len(not_done)} of {len(jobs)} jobs unfinished, those themes are returned as-is")
+        return enriched_themes
+
+    def _polish_single_theme_name(self, index: int, theme: Dict[str, Any], prompt_context: Optional[str], llm: Any) -> Optional[str]:
+        """
+        Use LLM to polish one theme name based on its keywords and snippets.
+        Incorporates teacher-provided context for better theme structuring.
+        
+        Returns:
+            The polished title, or None to keep the current one
+        """
+        keywords = theme.get('keywords', [])
+        snippets = theme.get('snippets', [])
+        current_title = theme.get('title', '')
+
+        # Create context for LLM with teacher guidance
+        context_parts = []
+        
+        # Add teacher's custom structuring guidance if provided
+        if self.llm_polish_prompt:
+            context_parts.append(f"Teacher guidance: {self.llm_polish_prompt}")
+        
+        if prompt_context:
+            context_parts.append(f"Assignment context: {prompt_context}")
+        
+        if keywords:
+            context_parts.append(f"Key terms: {', '.join(keywords[:5])}")
+        
+        if snippets:
+            context_parts.append(f"Representative responses: {' | '.join(snippets[:2])}")
+        
+        context = '\n'.join(context_parts)
+        
+        # Enhanced prompt that incorporates teacher guidance
+        base_requirements = [
+            "- Professional but engaging",
+            "- Specific enough to distinguish from other themes", 
+            "- Accessible to students and educators",
+            "- Based on the key terms and response content"
+        ]
+        
+        if self.llm_polish_prompt:
+            prompt = f"""You are helping to create clear, engaging theme names for student response analysis.
 
 Current theme: "{current_title}"
 
@@ -1553,8 +1948,8 @@ Create a concise, clear theme name (2-4 words) that captures the essence of this
 - Aligned with the teacher's guidance about theme structure
 
 Return only the theme name, nothing else."""
-                    else:
-                        prompt = f"""You are helping to create clear, engaging theme names for student response analysis.
+        else:
+            prompt = f"""You are helping to create clear, engaging theme names for student response analysis.
 
 Current theme: "{current_title}"
 
@@ -1566,111 +1961,46 @@ Create a concise, clear theme name (2-4 words) that captures the essence of this
 
 Return only the theme name, nothing else."""
 
-                    # Use same invocation pattern as group assignment
-                    response = llm.invoke([
-                        SystemMessage(content="You are a helpful educational content assistant."),
-                        HumanMessage(content=prompt)
-                    ])
-                    
-                    polished_title = response.content.strip().strip('"').strip("'")
-                    
-                    # Validate and apply the polished title
-                    if polished_title and len(polished_title) < 50 and polished_title != current_title:
-                        theme['title'] = polished_title
-                        print(f"  Theme {i+1}: '{current_title}' -> '{polished_title}'")
-                    else:
-                        print(f"  Theme {i+1}: Keeping original title '{current_title}'")
-                    
-                except Exception as e:
-                    print(f"  Theme {i+1}: Error polishing '{current_title}': {e}")
-                    # Keep original title and continue
-                    continue
-                    
-        except Exception as e:
-            print(f"Error with LLM theme polishing: {e}")
-            print("Continuing with auto-generated theme names...")
-        
-        return themes_data
+        # Use same invocation pattern as group assignment
+        response = llm.invoke([
+            SystemMessage(content="You are a helpful educational content assistant."),
+            HumanMessage(content=prompt)
+        ])
+        
+        polished_title = response.content.strip().strip('"').strip("'")
+        
+        # Validate the polished title
+        if polished_title and len(polished_title) < 50 and polished_title != current_title:
+            print(f"  Theme {index+1}: '{current_title}' -> '{polished_title}'")
+            return polished_title
+
+        print(f"  Theme {index+1}: Keeping original title '{current_title}'")
+        return None
 
-    def _enhance_themes_with_web_search(self, themes_data: List[Dict[str, Any]], prompt_context: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _enhance_single_theme(self, index: int, theme: Dict[str, Any], prompt_context: Optional[str], llm: Any) -> Optional[Dict[str, Any]]:
         """
-        Enhance themes by connecting them to recent events using web search and ChatOpenAI.
+        Connect one theme to recent events: build a search query, search, and let the LLM summarize.
         
-        Args:
-            themes_data: List of theme dictionaries
-            prompt_context: Optional context about the assignment
-            
         Returns:
-            Enhanced themes_data with recent event connections
+            An enhanced copy of the theme, or None if nothing relevant was found
         """
-        if not os.getenv("OPENAI_API_KEY"):
-            print("No OpenAI API key found, skipping web search enhancement")
-            return themes_data
-        
-        try:
-            from langchain_openai import ChatOpenAI
-            from langchain.schema import SystemMessage, HumanMessage
-            
-            # Initialize LLM for web search queries and analysis
-            llm = ChatOpenAI(
-                model="gpt-4o-mini", 
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
-            
-            print(f"🌐 Enhancing {len(themes_data)} themes with recent events...")
-            
-            enhanced_themes = []
-            
-            for i, theme in enumerate(themes_data):
-                theme_title = theme.get('title', '')
-                keywords = theme.get('keywords', [])
-                snippets = theme.get('snippets', [])
-                
-                if not theme_title or not keywords:
-                    print(f"  Theme {i+1}: Skipping (insufficient data)")
-                    enhanced_themes.append(theme)
-                    continue
-                
-                try:
-                    # Generate web search query based on theme
-                    search_query = self._generate_search_query(theme_title, keywords, prompt_context)
-                    
-                    if not search_query:
-                        enhanced_themes.append(theme)
-                        continue
-                    
-                    print(f"  Theme {i+1} '{theme_title}': Searching for '{search_query}'")
-                    
-                    # Perform web search using the web_search tool available in the environment
-                    try:
-                        search_results = self._perform_web_search(search_query)
-                        
-                        if search_results:
-                            # Analyze search results and enhance theme
-                            enhanced_theme = self._analyze_search_results_for_theme(
-                                theme.copy(), search_results, search_query, llm
-                            )
-                            enhanced_themes.append(enhanced_theme)
-                            print(f"    ✅ Enhanced with recent events")
-                        else:
-                            enhanced_themes.append(theme)
-                            print(f"    ⚠️  No relevant search results found")
-                    
-                    except Exception as search_error:
-                        print(f"    ⚠️  Search failed: {search_error}")
-                        enhanced_themes.append(theme)
-                        
-                except Exception as e:
-                    print(f"  Theme {i+1}: Error enhancing '{theme_title}': {e}")
-                    enhanced_themes.append(theme)
-                    continue
-            
-            return enhanced_themes
-            
-        except Exception as e:
-            print(f"Error with web search enhancement: {e}")
-            print("Continuing with original themes...")
-            return themes_data
+        theme_title = theme.get('title', '')
+
+        # Generate web search query based on theme
+        search_query = self._generate_search_query(theme_title, theme.get('keywords', []), prompt_context)
+        if not search_query:
+            return None
+
+        print(f"  Theme {index+1} '{theme_title}': Searching for '{search_query}'")
+        search_results = self._perform_web_search(search_query)
+        if not search_results:
+            print(f"    ⚠️  No relevant search results found")
+            return None
+
+        # Analyze search results and enhance theme
+        enhanced_theme = self._analyze_search_results_for_theme(theme.copy(), search_results, search_query, llm)
+        print(f"    ✅ Enhanced with recent events")
+        return enhanced_theme
 
     def _generate_search_query(self, theme_title: str, keywords: List[str], prompt_context: Optional[str] = None) -> str:
         """
@@ -1707,58 +2037,17 @@ Return only the theme name, nothing else."""
 
     def _perform_web_search(self, query: str) -> Optional[str]:
         """
-        Perform web search using DuckDuckGo API for recent information.
+        Perform web search for recent information through the configured search backend.
+        Results are cached per query for theme_creator.search_cache_ttl_seconds.
         """
         try:
-            import requests
-            import json
-            from urllib.parse import quote
-            
             print(f"    Searching web for: {query}")
-            
-            # Use DuckDuckGo Instant Answer API (free and doesn't require API key)
-            encoded_query = quote(query)
-            url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json&no_html=1&skip_disambig=1"
-            
-            # Make the request with a timeout
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (compatible; ThemeCreator/1.0)'
-            })
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Extract relevant information from DuckDuckGo response
-                search_results = []
-                
-                # Get abstract (main result)
-                if data.get('Abstract'):
-                    search_results.append(f"Summary: {data['Abstract']}")
-                
-                # Get related topics
-                if data.get('RelatedTopics'):
-                    for topic in data['RelatedTopics'][:3]:  # Limit to top 3
-                        if isinstance(topic, dict) and topic.get('Text'):
-                            search_results.append(f"Related: {topic['Text']}")
-                
-                # Get definition if available
-                if data.get('Definition'):
-                    search_results.append(f"Definition: {data['Definition']}")
-                
-                if search_results:
-                    combined_results = ' '.join(search_results)
-                    print(f"    Found {len(search_results)} search results")
-                    return combined_results[:1000]  # Limit length
-                else:
-                    print(f"    No relevant results found")
-                    return None
+            search_results = cached_search(self.search_backend, query)
+            if search_results:
+                print(f"    Found search results ({len(search_results)} chars)")
             else:
-                print(f"    Search API returned status {response.status_code}")
-                return None
-                
-        except requests.RequestException as e:
-            print(f"    Web search request failed: {e}")
-            return None
+                print(f"    No relevant results found")
+            return search_results
         except Exception as e:
             print(f"    Web search error: {e}")
             return None
@@ -1834,7 +2123,10 @@ ENHANCED DESCRIPTION:"""
             "use_llm_polish": self.use_llm_polish,
             "llm_polish_prompt": self.llm_polish_prompt,
             "filter_web_content": self.filter_web_content,
-            "enhance_with_web_search": self.enhance_with_web_search
+            "enhance_with_web_search": self.enhance_with_web_search,
+            "clustering_engine": self.clustering_engine,
+            "auto_num_themes": self.auto_num_themes,
+            "max_auto_themes": self.max_auto_themes
         }
     
     def _auto_fetch_student_data_from_prompts(self, db_session: Optional[Any] = None, deployment_context: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
@@ -1925,6 +2217,8 @@ ENHANCED DESCRIPTION:"""
                                 print(f"🔍 THEME AUTO-FETCH: Successfully auto-fetched {len(valid_students)} valid students")
                                 return valid_students
                     
+                except SoftTimeLimitExceeded:
+                    raise
                 except Exception as e:
                     print(f"🔍 THEME AUTO-FETCH: Error checking deployment {deployment.deployment_id}: {e}")
                     continue
@@ -1932,6 +2226,8 @@ ENHANCED DESCRIPTION:"""
             print(f"🔍 THEME AUTO-FETCH: No student submissions found in any page deployment")
             return None
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             print(f"🔍 THEME AUTO-FETCH: Error during auto-fetch: {e}")
             import traceback
@@ -1954,6 +2250,12 @@ ENHANCED DESCRIPTION:"""
             self.filter_web_content = config['filter_web_content']
         if 'enhance_with_web_search' in config:
             self.enhance_with_web_search = config['enhance_with_web_search']
+        if 'clustering_engine' in config:
+            self.clustering_engine = config['clustering_engine']
+        if 'auto_num_themes' in config:
+            self.auto_num_themes = config['auto_num_themes']
+        if 'max_auto_themes' in config:
+            self.max_auto_themes = config['max_auto_themes']
 
 # Database persistence is handled by pages_manager.save_behavior_execution
 # Theme creator only focuses on theme generation, not persistence
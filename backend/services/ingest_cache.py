@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import json
+import os
+import uuid
+
+from langchain.docstore.document import Document
+from langchain_core.embeddings import Embeddings
+
+from api.file_storage import blob_path
+
+# Parsed chunks and their embedding vectors, cached per stored blob: the same reading
+# packet uploaded to twelve workflows (or resubmitted as a student PDF) is parsed and
+# embedded once, and only upserted into each collection. Cache files sit next to the
+# blob (blobs/ab/cd/<sha256>.ingest.<fingerprint>.json) and are deleted with it.
+
+
+def ingest_fingerprint(chunk_settings: Optional[Dict[str, Any]], embeddings: Any) -> str:
+    """Identifies everything that changes the chunks or vectors of a file."""
+    payload = json.dumps({
+        "chunk_settings": chunk_settings or {},
+        "embedding_model": getattr(embeddings, "model_name", None) or type(embeddings).__name__,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _cache_path(sha256: str, fingerprint: str) -> Path:
+    return blob_path(sha256).with_name(f"{sha256}.ingest.{fingerprint}.json")
+
+
+def load_ingest_cache(sha256: Optional[str], fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Cached {"chunks": [Document], "vectors": {text: vector}} for a blob, or None."""
+    if not sha256:
+        return None
+    try:
+        data = json.loads(_cache_path(sha256, fingerprint).read_text())
+    except (OSError, ValueError):
+        return None
+    chunks = [Document(page_content=chunk["page_content"], metadata=chunk.get("metadata") or {}) for chunk in data.get("chunks", [])]
+    return {"chunks": chunks, "vectors": data.get("vectors") or {}}
+
+
+def save_ingest_cache(sha256: str, fingerprint: str, chunks: Sequence[Document], vectors: Dict[str, List[float]]) -> bool:
+    """
+    Cache a blob's chunks (with their file-level metadata only) and vectors.
+    Skipped when the blob isn't stored, so no cache outlives its blob.
+    """
+    if not blob_path(sha256).exists():
+        return False
+    data = {
+        "chunks": [{"page_content": chunk.page_content, "metadata": chunk.metadata} for chunk in chunks],
+        "vectors": {chunk.page_content: vectors[chunk.page_content] for chunk in chunks if chunk.page_content in vectors},
+    }
+    path = _cache_path(sha256, fingerprint)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(data, default=str))
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"⚠️  Failed to cache ingest data for blob {sha256[:12]}: {e}")
+        return False
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class CachedEmbeddings(Embeddings):
+    """Serves texts with a known vector from the cache and remembers the ones it computes."""
+
+    def __init__(self, embeddings: Embeddings, vectors: Optional[Dict[str, List[float]]] = None):
+        self.embeddings = embeddings
+        self.vectors: Dict[str, List[float]] = dict(vectors or {})
+        self.model_name = getattr(embeddings, "model_name", None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing = [text for text in dict.fromkeys(texts) if text not in self.vectors]
+        if missing:
+            for text, vector in zip(missing, self.embeddings.embed_documents(missing)):
+                self.vectors[text] = [float(value) for value in vector]
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
@@ -6,6 +6,14 @@ import pprint
 from enum import Enum
 from sqlmodel import Session as DBSession
 
+# Behavior types whose handlers report partial results into their execution history record
+STREAMED_RESULT_BEHAVIOR_TYPES = {"group"}
+
+# Behavior types that run in checkpointed stages and can resume by execution_id
+CHECKPOINTED_BEHAVIOR_TYPES = {"group", "themeCreator"}
+
+_UNSET = object()
+
 class VariableType(str, Enum):
     TEXT = "text"
     PDF = "pdf"
@@ -424,7 +432,9 @@ class Behavior:
         # Pass DB session if available for behaviors that require database/Qdrant access
         db_session = getattr(self._page_deployment, '_db_session', None)
         prompt_context = getattr(self._page_deployment, '_prompt_context', None)
-        result = self.behavior_deployment.execute_behavior(input_data, db_session=db_session, prompt_context=prompt_context, progress_callback=progress_callback)
+        partial_result_callback = getattr(self._page_deployment, '_partial_result_callback', None)
+        checkpoint_store = getattr(self._page_deployment, '_checkpoint_store', None)
+        result = self.behavior_deployment.execute_behavior(input_data, db_session=db_session, prompt_context=prompt_context, progress_callback=progress_callback, partial_result_callback=partial_result_callback, checkpoint_store=checkpoint_store)
         
         # Handle output if behavior produces output
         print(f"🔍 BEHAVIOR OUTPUT CHECK: success={result.get('success')}, has_output={self.has_output()}")
@@ -1259,10 +1269,25 @@ class PageDeployment:
         # Execute the behavior using the new method
         return behavior.execute_with_input(input_data)
     
-    def execute_behavior_with_resolved_input(self, behavior_number: str, executed_by_user_id: Optional[int] = None, progress_callback: Optional[callable] = None) -> Dict[str, Any]:
+    def execute_behavior_with_resolved_input(
+        self,
+        behavior_number: str,
+        executed_by_user_id: Optional[int] = None,
+        progress_callback: Optional[callable] = None,
+        execution_id: Optional[str] = None,
+        resume_from_execution_id: Optional[str] = None,
+        rerun_stages: Optional[List[str]] = None,
+        prompt_context: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute a behavior with automatically resolved input data.
         This is the main method for instructor-triggered behavior execution.
+        
+        Staged behaviors (group, themeCreator) checkpoint their intermediate artifacts under
+        execution_id, so running again with the same execution_id resumes from the last
+        completed stage. resume_from_execution_id reuses the stages of an earlier execution,
+        rerun_stages forces stages to be recomputed and prompt_context overrides the
+        assignment context for this run (e.g. to re-run only group explanations).
         """
         behavior = self.get_behavior_by_number(behavior_number)
         if not behavior:
@@ -1276,12 +1301,41 @@ class PageDeployment:
         captured_input_data = None
         behavior_type = behavior.get_behavior_deployment().get_behavior_type()
         
+        # Behaviors that report partial results or resume from checkpoints get their history
+        # record up front, so results (e.g. group explanations) are visible while they run
+        tracked = bool(getattr(self, '_db_session', None) and executed_by_user_id)
+        if tracked and (execution_id or behavior_type in STREAMED_RESULT_BEHAVIOR_TYPES):
+            execution_id = self._start_behavior_execution(behavior_number, behavior_type, executed_by_user_id, execution_id) or execution_id
+        if execution_id and tracked and behavior_type in STREAMED_RESULT_BEHAVIOR_TYPES:
+            self._partial_result_callback = lambda partial_result: self._record_partial_behavior_result(execution_id, partial_result)
+        if execution_id and tracked and behavior_type in CHECKPOINTED_BEHAVIOR_TYPES:
+            from services.behavior_checkpoints import BehaviorCheckpointStore
+            self._checkpoint_store = BehaviorCheckpointStore(
+                self._db_session, execution_id,
+                source_execution_id=resume_from_execution_id,
+                rerun_stages=rerun_stages
+            )
+        
+        # Override the assignment context for this run only
+        saved_prompt_context = self.__dict__.get('_prompt_context', _UNSET)
+        if prompt_context is not None:
+            self._prompt_context = prompt_context
+        
         try:
             # Capture the input data before execution
             if behavior.has_input():
                 captured_input_data = behavior.resolve_input_source()
             
-            result = behavior.execute_with_resolved_input(progress_callback)
+            try:
+                result = behavior.execute_with_resolved_input(progress_callback)
+            finally:
+                self._partial_result_callback = None
+                self._checkpoint_store = None
+                if prompt_context is not None:
+                    if saved_prompt_context is _UNSET:
+                        del self._prompt_context
+                    else:
+                        self._prompt_context = saved_prompt_context
             execution_time = time.time() - start_time
             
             # Save execution to database if we have a session and user ID
@@ -1317,7 +1371,8 @@ class PageDeployment:
                             execution_time_seconds=execution_time,
                             execution_result=result,
                             error_message=result.get("error") if not result.get("success", False) else None,
-                            student_data=captured_input_data if behavior_type in ["group", "themeCreator"] else None
+                            student_data=captured_input_data if behavior_type in ["group", "themeCreator"] else None,
+                            execution_id=execution_id
                         ))
                         print(f"✅ Scheduled {behavior_type} behavior save task")
                     except RuntimeError:
@@ -1331,7 +1386,8 @@ class PageDeployment:
                             execution_time_seconds=execution_time,
                             execution_result=result,
                             error_message=result.get("error") if not result.get("success", False) else None,
-                            student_data=captured_input_data if behavior_type in ["group", "themeCreator"] else None
+                            student_data=captured_input_data if behavior_type in ["group", "themeCreator"] else None,
+                            execution_id=execution_id
                         ))
                         print(f"✅ Completed synchronous {behavior_type} behavior save")
                         
@@ -1351,7 +1407,9 @@ class PageDeployment:
             }
             
             # Save failed execution to database
-            if hasattr(self, '_db_session') and self._db_session and executed_by_user_id:
+            if execution_id:
+                self._record_partial_behavior_result(execution_id, error_result, status="failed", error_message=str(e))
+            elif hasattr(self, '_db_session') and self._db_session and executed_by_user_id:
                 import asyncio
                 try:
                     loop = asyncio.get_event_loop()
@@ -1804,7 +1862,8 @@ class PageDeployment:
         execution_time_seconds: float,
         execution_result: Dict[str, Any],
         error_message: Optional[str] = None,
-        student_data: Optional[Any] = None
+        student_data: Optional[Any] = None,
+        execution_id: Optional[str] = None
     ):
         """Save behavior execution to database via pages_manager"""
         try:
@@ -1819,8 +1878,26 @@ class PageDeployment:
                 execution_time_seconds=execution_time_seconds,
                 execution_result=execution_result,
                 error_message=error_message,
-                student_data=student_data
+                student_data=student_data,
+                execution_id=execution_id
             )
         except Exception as e:
             print(f"Error saving behavior execution: {e}")
+    
+    def _start_behavior_execution(self, behavior_number: str, behavior_type: str, executed_by_user_id: int, execution_id: Optional[str] = None) -> Optional[str]:
+        """Create (or, when resuming, reopen) a running execution history record, returning its execution_id"""
+        try:
+            from services.pages_manager import start_behavior_execution
+            return start_behavior_execution(self, self._db_session, behavior_number, behavior_type, executed_by_user_id, execution_id)
+        except Exception as e:
+            print(f"Error starting behavior execution record: {e}")
+            return None
+    
+    def _record_partial_behavior_result(self, execution_id: str, partial_result: Dict[str, Any], status: str = "running", error_message: Optional[str] = None):
+        """Merge partial results into a running execution history record"""
+        try:
+            from services.pages_manager import record_partial_behavior_result
+            record_partial_behavior_result(self._db_session, execution_id, partial_result, status=status, error_message=error_message)
+        except Exception as e:
+            print(f"Error recording partial behavior result: {e}")
     
\ No newline at end of file
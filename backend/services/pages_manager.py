@@ -303,6 +303,93 @@ async def save_page_deployment_state(page_deployment: PageDeployment, db: DBSess
         print(f"Error saving page deployment state: {e}")
         db.rollback()
 
+def start_behavior_execution(
+    page_deployment: PageDeployment,
+    db: DBSession,
+    behavior_number: str,
+    behavior_type: str,
+    executed_by_user_id: int,
+    execution_id: Optional[str] = None
+) -> Optional[str]:
+    """Create a running behavior execution record that partial results can be written into.
+    An existing record with the given execution_id (a resumed execution) is reopened instead."""
+    try:
+        page_state = _get_page_state(page_deployment.deployment_id, db)
+        if not page_state:
+            return None
+
+        if execution_id:
+            execution_record = db.exec(
+                select(BehaviorExecutionHistory).where(BehaviorExecutionHistory.execution_id == execution_id)
+            ).first()
+            if execution_record:
+                execution_record.success = False
+                execution_record.error_message = None
+                previous_result = execution_record.execution_result or {}
+                execution_record.execution_result = {
+                    **previous_result, "status": "running", "attempts": previous_result.get("attempts", 1) + 1
+                }
+                db.add(execution_record)
+                db.commit()
+                return execution_id
+
+        execution_id = execution_id or str(uuid.uuid4())
+        db.add(BehaviorExecutionHistory(
+            page_deployment_id=page_state.id,
+            execution_id=execution_id,
+            behavior_number=behavior_number,
+            behavior_type=behavior_type,
+            executed_by_user_id=executed_by_user_id,
+            success=False,
+            execution_result={"status": "running", "attempts": 1}
+        ))
+        db.commit()
+        return execution_id
+    except Exception as e:
+        print(f"Error starting behavior execution record: {e}")
+        db.rollback()
+        return None
+
+
+def record_partial_behavior_result(
+    db: DBSession,
+    execution_id: str,
+    partial_result: Dict[str, Any],
+    status: str = "running",
+    error_message: Optional[str] = None
+) -> None:
+    """Merge partial results into a behavior execution record while the behavior runs"""
+    try:
+        execution_record = db.exec(
+            select(BehaviorExecutionHistory).where(BehaviorExecutionHistory.execution_id == execution_id)
+        ).first()
+        if not execution_record:
+            return
+
+        # Assign a new dict so the JSON column is marked as changed
+        execution_record.execution_result = {**(execution_record.execution_result or {}), **partial_result, "status": status}
+        if error_message:
+            execution_record.error_message = error_message
+        db.add(execution_record)
+        db.commit()
+    except Exception as e:
+        print(f"Error recording partial behavior result: {e}")
+        db.rollback()
+
+
+def get_behavior_execution(deployment_id: str, execution_id: str, db: DBSession) -> Optional[BehaviorExecutionHistory]:
+    """Get a behavior execution record, only if it belongs to the given page deployment"""
+    page_state = _get_page_state(deployment_id, db)
+    if not page_state:
+        return None
+    return db.exec(
+        select(BehaviorExecutionHistory).where(
+            BehaviorExecutionHistory.execution_id == execution_id,
+            BehaviorExecutionHistory.page_deployment_id == page_state.id
+        )
+    ).first()
+
+
 async def save_behavior_execution(
     page_deployment: PageDeployment, 
     db: DBSession,
@@ -313,9 +400,10 @@ async def save_behavior_execution(
     execution_time_seconds: float,
     execution_result: Dict[str, Any],
     error_message: Optional[str] = None,
-    student_data: Optional[List[Dict[str, Any]]] = None
+    student_data: Optional[List[Dict[str, Any]]] = None,
+    execution_id: Optional[str] = None
 ) -> str:
-    """Save behavior execution history to database"""
+    """Save behavior execution history to database, completing the running record when execution_id is given"""
     try:
         # Get page deployment state
         page_state = db.exec(
@@ -335,7 +423,13 @@ async def save_behavior_execution(
                 )
             ).first()
         
-        execution_id = str(uuid.uuid4())
+        execution_record = None
+        if execution_id:
+            execution_record = db.exec(
+                select(BehaviorExecutionHistory).where(BehaviorExecutionHistory.execution_id == execution_id)
+            ).first()
+        if not execution_record:
+            execution_id = execution_id or str(uuid.uuid4())
         
         # Calculate themes created for theme creator behaviors
         themes_created = None
@@ -343,13 +437,7 @@ async def save_behavior_execution(
             themes_created = len(execution_result["themes"])
             print(f"🎯 Setting output_themes_created to {themes_created}")
         
-        # Create behavior execution record
-        execution_record = BehaviorExecutionHistory(
-            page_deployment_id=page_state.id,
-            execution_id=execution_id,
-            behavior_number=behavior_number,
-            behavior_type=behavior_type,
-            executed_by_user_id=executed_by_user_id,
+        record_fields = dict(
             success=success,
             execution_time_seconds=execution_time_seconds,
             input_student_count=execution_result.get("input_student_count"),
@@ -360,6 +448,21 @@ async def save_behavior_execution(
             execution_result=execution_result
         )
         
+        if execution_record:
+            # Complete the record created when the behavior started
+            for field_name, value in record_fields.items():
+                setattr(execution_record, field_name, value)
+        else:
+            # Create behavior execution record
+            execution_record = BehaviorExecutionHistory(
+                page_deployment_id=page_state.id,
+                execution_id=execution_id,
+                behavior_number=behavior_number,
+                behavior_type=behavior_type,
+                executed_by_user_id=executed_by_user_id,
+                **record_fields
+            )
+        
         db.add(execution_record)
         db.commit()
         
@@ -0,0 +1,121 @@
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import asyncio
+import json
+import os
+
+from celery import Task
+from celery.signals import task_postrun
+
+from scripts.config import load_config
+from services.task_queues import get_broker_redis
+
+# Task progress is pushed over Redis pub/sub (one channel per task) and relayed to
+# the browser as server-sent events, instead of the UI polling AsyncResult every second.
+_CELERY_CONFIG = load_config().get("celery", {}) or {}
+
+PROGRESS_CHANNEL_PREFIX = "task_progress:"
+PROGRESS_HEARTBEAT_SECONDS = float(_CELERY_CONFIG.get("progress_heartbeat_seconds", 15))
+TERMINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+_async_redis_client = None
+
+
+def progress_channel(task_id: str) -> str:
+    return f"{PROGRESS_CHANNEL_PREFIX}{task_id}"
+
+
+def publish_task_event(task_id: str, state: str, meta: Optional[Dict[str, Any]] = None) -> None:
+    """Publish a task state change to the task's progress channel (best-effort)."""
+    event = {"task_id": task_id, "state": state}
+    if isinstance(meta, dict):
+        event.update({key: meta[key] for key in ("status", "progress", "stage", "error") if key in meta})
+    try:
+        get_broker_redis().publish(progress_channel(task_id), json.dumps(event, default=str))
+    except Exception as e:
+        print(f"⚠️  Failed to publish progress for task {task_id}: {e}")
+
+
+class ProgressTask(Task):
+    """Celery task base whose update_state calls are also pushed to subscribers."""
+
+    def update_state(self, task_id=None, state=None, meta=None, **kwargs):
+        super().update_state(task_id=task_id, state=state, meta=meta, **kwargs)
+        task_id = task_id or self.request.id
+        if task_id:
+            publish_task_event(task_id, state, meta)
+
+
+@task_postrun.connect
+def _publish_final_state(task_id=None, state=None, **kwargs):
+    # The final SUCCESS/FAILURE (or RETRY) is stored by Celery itself, not through update_state
+    if task_id and state:
+        publish_task_event(task_id, state)
+
+
+# Async Redis client for the API process, created on first subscription
+def _get_async_redis():
+    global _async_redis_client
+    if _async_redis_client is None:
+        import redis.asyncio as aioredis
+        broker_url = os.getenv("CELERY_BROKER_URL", _CELERY_CONFIG.get("broker_url", "redis://localhost:6379/0"))
+        _async_redis_client = aioredis.Redis.from_url(broker_url)
+    return _async_redis_client
+
+
+def _format_sse(payload: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(payload, default=str)}\n\n"
+
+
+async def task_event_stream(
+    task_id: str,
+    get_status: Callable[[str], Dict[str, Any]],
+    heartbeat_seconds: Optional[float] = None,
+    redis_client: Any = None
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for one task: the current status first, then every progress
+    event published by the worker, and the full final status once the task finishes.
+
+    get_status(task_id) builds the same payload the polling endpoint returns; it is
+    only called at the start, at the end, and on heartbeats without any event (which
+    also catches workers that died without publishing a final state).
+    """
+    heartbeat_seconds = heartbeat_seconds or PROGRESS_HEARTBEAT_SECONDS
+    client = redis_client or _get_async_redis()
+    pubsub = client.pubsub()
+    # Subscribe before reading the status, so no event falls between the two
+    await pubsub.subscribe(progress_channel(task_id))
+    try:
+        status = await asyncio.to_thread(get_status, task_id)
+        yield _format_sse(status)
+        if status.get("state") in TERMINAL_STATES:
+            return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat_seconds)
+            if message is None:
+                status = await asyncio.to_thread(get_status, task_id)
+                if status.get("state") in TERMINAL_STATES:
+                    yield _format_sse(status)
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            try:
+                event = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            if event.get("state") in TERMINAL_STATES:
+                yield _format_sse(await asyncio.to_thread(get_status, task_id))
+                return
+            yield _format_sse(event)
+    finally:
+        try:
+            await pubsub.unsubscribe(progress_channel(task_id))
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+
+# Headers so proxies (nginx, Cloud Run) pass events through unbuffered
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
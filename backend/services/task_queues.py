@@ -0,0 +1,269 @@
+from typing import Any, Dict, List, Optional
+import json
+import os
+import threading
+import time
+
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from kombu import Queue
+
+from scripts.config import load_config
+
+# Celery queues by workload class, so a long theme creation never sits in front of
+# a PDF submission made during class. Each queue gets its own worker(s) with their
+# own concurrency and time limits (see scripts/celery_worker.py).
+_CELERY_CONFIG = load_config().get("celery", {}) or {}
+
+DEFAULT_SOFT_TIME_LIMIT = int(_CELERY_CONFIG.get("task_soft_time_limit", 300))
+DEFAULT_TIME_LIMIT = int(_CELERY_CONFIG.get("task_time_limit", 600))
+DEFAULT_QUEUE = _CELERY_CONFIG.get("default_queue", "light")
+METRICS_SAMPLE_SIZE = int(_CELERY_CONFIG.get("metrics_sample_size", 200))
+METRICS_KEY_PREFIX = "celery:queue_metrics:"
+
+# Redis priorities: 0 is taken first, 9 last
+PRIORITY_STEPS = list(range(10))
+PRIORITY_SEPARATOR = ":"
+
+# Queues, task routes and priorities are defined in config.yaml (celery.queues) only.
+# supervisord.conf and docker-compose.yml start one worker per queue name listed there.
+TASK_QUEUES: Dict[str, Dict[str, Any]] = _CELERY_CONFIG.get("queues") or {}
+
+
+def _task_priorities(queue_config: Dict[str, Any]) -> Dict[str, int]:
+    # tasks may be a list of names (queue priority) or a name -> priority mapping
+    tasks = queue_config.get("tasks") or {}
+    if isinstance(tasks, dict):
+        return {name: int(priority if priority is not None else queue_config.get("priority", 5)) for name, priority in tasks.items()}
+    return {name: int(queue_config.get("priority", 5)) for name in tasks}
+
+
+def validate_task_queues(task_queues: Dict[str, Dict[str, Any]], default_queue: str,
+                         task_names: Optional[List[str]] = None) -> None:
+    """
+    Check that every task is routed to a queue that workers consume.
+
+    Raises ValueError if no queues are configured, if the default queue (where unlisted
+    tasks go) is not one of them, or if a task is listed on more than one queue. When
+    task_names (the registered tasks) is given, every listed task must be one of them.
+    """
+    if not task_queues:
+        raise ValueError("No Celery queues configured (celery.queues in config.yaml)")
+    if default_queue not in task_queues:
+        raise ValueError(
+            f"Celery default queue '{default_queue}' is not one of celery.queues ({', '.join(task_queues)}), "
+            "so no worker would consume it"
+        )
+
+    routed: Dict[str, str] = {}
+    for queue_name, queue_config in task_queues.items():
+        for task_name in _task_priorities(queue_config or {}):
+            if task_name in routed:
+                raise ValueError(f"Celery task '{task_name}' is listed on both queue '{routed[task_name]}' and '{queue_name}'")
+            routed[task_name] = queue_name
+
+    if task_names is not None:
+        unknown = sorted(set(routed) - set(task_names))
+        if unknown:
+            raise ValueError(f"celery.queues lists unknown task(s): {', '.join(unknown)}")
+
+
+validate_task_queues(TASK_QUEUES, DEFAULT_QUEUE)
+
+
+def queue_for_task(task_name: str) -> str:
+    """The queue a task is routed to."""
+    for queue_name, queue_config in TASK_QUEUES.items():
+        if task_name in _task_priorities(queue_config):
+            return queue_name
+    return DEFAULT_QUEUE
+
+
+def celery_queue_settings() -> Dict[str, Any]:
+    """Celery configuration for the workload queues: declarations, routes and per-task time limits."""
+    routes: Dict[str, Dict[str, Any]] = {}
+    annotations: Dict[str, Dict[str, Any]] = {}
+    for queue_name, queue_config in TASK_QUEUES.items():
+        for task_name, priority in _task_priorities(queue_config).items():
+            routes[task_name] = {"queue": queue_name, "routing_key": queue_name, "priority": priority}
+            annotations[task_name] = {
+                "soft_time_limit": int(queue_config.get("soft_time_limit", DEFAULT_SOFT_TIME_LIMIT)),
+                "time_limit": int(queue_config.get("time_limit", DEFAULT_TIME_LIMIT)),
+            }
+
+    return {
+        "task_queues": [Queue(name, routing_key=name) for name in TASK_QUEUES],
+        "task_default_queue": DEFAULT_QUEUE,
+        "task_default_routing_key": DEFAULT_QUEUE,
+        "task_routes": routes,
+        "task_annotations": annotations,
+        "task_default_priority": 5,
+        "broker_transport_options": {
+            "priority_steps": PRIORITY_STEPS,
+            "sep": PRIORITY_SEPARATOR,
+            "queue_order_strategy": "priority",
+        },
+    }
+
+
+def worker_argv(queue_name: str, app_path: str = "services.celery_tasks.celery_app") -> List[str]:
+    """
+    Command line for a worker serving one queue, or every queue with "all"
+    (single-process deployments; concurrency is then the sum of the queues').
+    """
+    if queue_name == "all":
+        queue_names = list(TASK_QUEUES)
+        concurrency = sum(int(config.get("concurrency", 1)) for config in TASK_QUEUES.values())
+        prefetch_multiplier = 1
+    elif queue_name in TASK_QUEUES:
+        queue_names = [queue_name]
+        concurrency = int(TASK_QUEUES[queue_name].get("concurrency", 1))
+        prefetch_multiplier = int(TASK_QUEUES[queue_name].get("prefetch_multiplier", 1))
+    else:
+        raise ValueError(f"Unknown Celery queue '{queue_name}'. Available: {', '.join(TASK_QUEUES)}, all")
+
+    return [
+        "celery", "-A", app_path, "worker",
+        "--loglevel=info",
+        "-Q", ",".join(queue_names),
+        "--concurrency", str(concurrency),
+        "--prefetch-multiplier", str(prefetch_multiplier),
+        "-n", f"{queue_name}@%h",
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Queue metrics: enqueue time travels as a message header; the worker records
+# wait (queue latency) and runtime per task into a capped Redis list per queue.
+# ---------------------------------------------------------------------------
+
+_redis_client = None
+_redis_lock = threading.Lock()
+_task_starts: Dict[str, Dict[str, Any]] = {}
+
+
+# Shared Redis client on the Celery broker (queue metrics, task progress events)
+def get_broker_redis():
+    global _redis_client
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                import redis
+                broker_url = os.getenv("CELERY_BROKER_URL", _CELERY_CONFIG.get("broker_url", "redis://localhost:6379/0"))
+                _redis_client = redis.Redis.from_url(broker_url, socket_timeout=2)
+    return _redis_client
+
+
+@before_task_publish.connect
+def _stamp_enqueue_time(headers=None, **kwargs):
+    if headers is not None and "enqueued_at" not in headers:
+        headers["enqueued_at"] = time.time()
+
+
+@task_prerun.connect
+def _record_task_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    enqueued_at = getattr(task.request, "enqueued_at", None) if task else None
+    delivery_info = (task.request.delivery_info or {}) if task else {}
+    _task_starts[task_id] = {
+        "queue": delivery_info.get("routing_key") or queue_for_task(task.name if task else ""),
+        "started": now,
+        "wait": max(0.0, now - float(enqueued_at)) if enqueued_at else None,
+    }
+
+
+@task_postrun.connect
+def _record_task_finish(task_id=None, task=None, state=None, **kwargs):
+    start = _task_starts.pop(task_id, None)
+    if not start:
+        return
+    sample = {
+        "task": task.name if task else None,
+        "state": state,
+        "wait": start["wait"],
+        "runtime": time.time() - start["started"],
+        "finished_at": time.time(),
+    }
+    try:
+        key = f"{METRICS_KEY_PREFIX}{start['queue']}"
+        pipe = get_broker_redis().pipeline()
+        pipe.lpush(key, json.dumps(sample))
+        pipe.ltrim(key, 0, METRICS_SAMPLE_SIZE - 1)
+        pipe.execute()
+    except Exception as e:
+        # Metrics are best-effort, never fail a task over them
+        print(f"⚠️  Failed to record queue metrics for task {task_id}: {e}")
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return round(ordered[index], 3)
+
+
+def _priority_keys(queue_name: str) -> List[str]:
+    # kombu keeps one Redis list per priority step: "queue", "queue:1", ... "queue:9"
+    return [queue_name if step == 0 else f"{queue_name}{PRIORITY_SEPARATOR}{step}" for step in PRIORITY_STEPS]
+
+
+def _oldest_enqueued_at(client, keys: List[str]) -> Optional[float]:
+    # Messages are LPUSHed and consumed from the right, so the oldest of each list is at -1
+    oldest = None
+    for key in keys:
+        raw = client.lindex(key, -1)
+        if not raw:
+            continue
+        try:
+            enqueued_at = json.loads(raw).get("headers", {}).get("enqueued_at")
+        except (ValueError, AttributeError):
+            continue
+        if enqueued_at and (oldest is None or enqueued_at < oldest):
+            oldest = enqueued_at
+    return oldest
+
+
+def get_queue_metrics(client=None) -> Dict[str, Any]:
+    """Depth, oldest waiting message and recent wait/runtime percentiles for every queue."""
+    client = client or get_broker_redis()
+    now = time.time()
+    queues = {}
+    for queue_name, queue_config in TASK_QUEUES.items():
+        keys = _priority_keys(queue_name)
+        pipe = client.pipeline()
+        for key in keys:
+            pipe.llen(key)
+        depths = pipe.execute()
+        oldest = _oldest_enqueued_at(client, [key for key, depth in zip(keys, depths) if depth])
+
+        samples = []
+        for raw in client.lrange(f"{METRICS_KEY_PREFIX}{queue_name}", 0, -1):
+            try:
+                samples.append(json.loads(raw))
+            except ValueError:
+                continue
+        waits = [sample["wait"] for sample in samples if sample.get("wait") is not None]
+        runtimes = [sample["runtime"] for sample in samples if sample.get("runtime") is not None]
+        states: Dict[str, int] = {}
+        for sample in samples:
+            states[sample.get("state") or "UNKNOWN"] = states.get(sample.get("state") or "UNKNOWN", 0) + 1
+
+        queues[queue_name] = {
+            "depth": sum(depths),
+            "depth_by_priority": {str(step): depth for step, depth in zip(PRIORITY_STEPS, depths) if depth},
+            "oldest_wait_seconds": round(now - oldest, 3) if oldest else None,
+            "concurrency": int(queue_config.get("concurrency", 1)),
+            "soft_time_limit": int(queue_config.get("soft_time_limit", DEFAULT_SOFT_TIME_LIMIT)),
+            "time_limit": int(queue_config.get("time_limit", DEFAULT_TIME_LIMIT)),
+            "tasks": _task_priorities(queue_config),
+            "recent": {
+                "samples": len(samples),
+                "wait_p50": _percentile(waits, 0.5),
+                "wait_p95": _percentile(waits, 0.95),
+                "wait_max": round(max(waits), 3) if waits else None,
+                "runtime_p50": _percentile(runtimes, 0.5),
+                "runtime_p95": _percentile(runtimes, 0.95),
+                "states": states,
+            },
+        }
+    return {"queues": queues, "generated_at": now}
@@ -0,0 +1,294 @@
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import subprocess
+import time
+import uuid
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from api.file_storage import STORAGE_BASE_DIR, rendition_dir, stored_blob_sha256
+from scripts.config import load_config
+
+# Video delivery: signed short-lived stream tokens (so the many range requests of a
+# seeking <video> skip the session and permission lookups), conditional responses
+# from ETag/Last-Modified, optional X-Accel-Redirect offload to nginx (sendfile), and
+# HLS renditions pre-segmented by ffmpeg and served as static files.
+_config = load_config()
+_VIDEO_CONFIG = _config.get("video_processing", {}) or {}
+_STREAMING_CONFIG = _VIDEO_CONFIG.get("streaming", {}) or {}
+_HLS_CONFIG = _VIDEO_CONFIG.get("hls", {}) or {}
+
+STREAM_TOKEN_TTL_SECONDS = int(_STREAMING_CONFIG.get("token_ttl_seconds", 3600))
+ACCEL_REDIRECT_PREFIX = _STREAMING_CONFIG.get("accel_redirect_prefix") or ""
+STREAM_CACHE_CONTROL = "private, max-age=3600"
+
+HLS_ENABLED = bool(_HLS_CONFIG.get("enabled", False))
+FFMPEG_PATH = _HLS_CONFIG.get("ffmpeg_path") or "ffmpeg"
+FFPROBE_PATH = _HLS_CONFIG.get("ffprobe_path") or "ffprobe"
+HLS_SEGMENT_SECONDS = int(_HLS_CONFIG.get("segment_seconds", 6))
+HLS_RENDITIONS: List[Dict[str, Any]] = _HLS_CONFIG.get("renditions") or [
+    {"name": "360p", "height": 360, "video_bitrate": "800k", "audio_bitrate": "96k"},
+    {"name": "720p", "height": 720, "video_bitrate": "2800k", "audio_bitrate": "128k"},
+]
+HLS_MASTER_PLAYLIST = "master.m3u8"
+
+_token_secret: Optional[bytes] = None
+
+
+def _stream_secret() -> bytes:
+    global _token_secret
+    if _token_secret is None:
+        secret = _STREAMING_CONFIG.get("token_secret") or _config.get("auth", {}).get("secret_key")
+        if not secret:
+            # Tokens then only verify in this process; cookie auth still works everywhere
+            print("⚠️  No auth.secret_key configured; video stream tokens are per-process")
+            secret = secrets.token_hex(32)
+        _token_secret = hashlib.sha256(f"video-stream:{secret}".encode()).digest()
+    return _token_secret
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(_stream_secret(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:24]).decode().rstrip("=")
+
+
+def create_stream_token(video_id: int, user_id: int, ttl_seconds: Optional[int] = None) -> Tuple[str, int]:
+    """Token granting user_id access to one video's stream and HLS files until it expires."""
+    expires_at = int(time.time()) + (ttl_seconds or STREAM_TOKEN_TTL_SECONDS)
+    payload = f"{video_id}.{user_id}.{expires_at}"
+    return f"{payload}.{_sign(payload)}", expires_at
+
+
+def verify_stream_token(token: Optional[str], video_id: int) -> Optional[int]:
+    """The user id a valid, unexpired token for this video was issued to, else None."""
+    if not token:
+        return None
+    parts = token.split(".")
+    if len(parts) != 4:
+        return None
+    token_video_id, user_id, expires_at, signature = parts
+    if token_video_id != str(video_id) or not expires_at.isdigit() or not user_id.isdigit():
+        return None
+    if int(expires_at) < time.time():
+        return None
+    if not hmac.compare_digest(signature, _sign(f"{token_video_id}.{user_id}.{expires_at}")):
+        return None
+    return int(user_id)
+
+
+def hls_key(video: Any) -> str:
+    """Renditions are keyed by content, so identical uploads share them."""
+    return stored_blob_sha256(video.storage_path) or f"video-{video.id}"
+
+
+def hls_master_path(video: Any) -> Path:
+    return rendition_dir(hls_key(video)) / "hls" / HLS_MASTER_PLAYLIST
+
+
+def signed_video_urls(video: Any, user_id: Optional[int]) -> Dict[str, Optional[str]]:
+    """stream_url (signed when a user is given) and hls_url once renditions exist."""
+    if user_id is None:
+        return {"stream_url": f"/api/videos/{video.id}/stream", "hls_url": None}
+    token, _ = create_stream_token(video.id, user_id)
+    hls_url = None
+    if video.storage_path and hls_master_path(video).exists():
+        hls_url = f"/api/videos/{video.id}/hls/{token}/{HLS_MASTER_PLAYLIST}"
+    return {"stream_url": f"/api/videos/{video.id}/stream?token={token}", "hls_url": hls_url}
+
+
+# ---------------------------------------------------------------------------
+# Conditional, range-aware file responses
+# ---------------------------------------------------------------------------
+
+def file_validators(full_path: Path, sha256: Optional[str] = None) -> Tuple[str, str, os.stat_result]:
+    """ETag (the content hash when known) and Last-Modified for a stored file."""
+    stat = os.stat(full_path)
+    if sha256:
+        etag = f'"{sha256}"'
+    else:
+        etag = '"' + hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode(), usedforsecurity=False).hexdigest() + '"'
+    return etag, formatdate(stat.st_mtime, usegmt=True), stat
+
+
+def is_not_modified(request: Request, etag: str, stat: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def stored_file_response(
+    request: Request,
+    full_path: Path,
+    media_type: str,
+    filename: Optional[str] = None,
+    sha256: Optional[str] = None,
+    cache_control: str = STREAM_CACHE_CONTROL,
+    content_disposition_type: str = "inline",
+) -> Response:
+    """
+    Serve a stored file with ETag/Last-Modified validation (304s) and byte ranges
+    (206s, multi-range, If-Range). With an accel_redirect_prefix configured, nginx
+    sends the file itself (sendfile, ranges) and this process only authorizes it.
+    """
+    etag, last_modified, stat = file_validators(full_path, sha256)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if is_not_modified(request, etag, stat):
+        return Response(status_code=304, headers=headers)
+
+    if ACCEL_REDIRECT_PREFIX:
+        relative = Path(os.path.realpath(full_path)).relative_to(os.path.realpath(STORAGE_BASE_DIR))
+        headers["X-Accel-Redirect"] = ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative.as_posix())
+        if filename:
+            headers["Content-Disposition"] = f"{content_disposition_type}; filename*=utf-8''{quote(filename)}"
+        return Response(headers=headers, media_type=media_type)
+
+    return FileResponse(
+        path=str(full_path),
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat,
+        content_disposition_type=content_disposition_type,
+    )
+
+
+def hls_file_path(video: Any, relative_path: str) -> Optional[Path]:
+    """A file inside the video's HLS directory (None for anything outside it)."""
+    base = (rendition_dir(hls_key(video)) / "hls").resolve()
+    candidate = (base / relative_path).resolve()
+    if base not in candidate.parents or not candidate.is_file():
+        return None
+    return candidate
+
+
+def hls_media_type(path: Path) -> str:
+    return "application/vnd.apple.mpegurl" if path.suffix == ".m3u8" else "video/mp2t"
+
+
+# ---------------------------------------------------------------------------
+# HLS renditions (ffmpeg)
+# ---------------------------------------------------------------------------
+
+def probe_video(source: Path) -> Dict[str, Any]:
+    """Width, height and duration of the first video stream, via ffprobe."""
+    output = subprocess.run(
+        [FFPROBE_PATH, "-v", "error", "-select_streams", "v:0", "-show_entries",
+         "stream=width,height:format=duration", "-of", "json", str(source)],
+        capture_output=True, text=True, check=True, timeout=120,
+    ).stdout
+    data = json.loads(output or "{}")
+    stream = (data.get("streams") or [{}])[0]
+    duration = (data.get("format") or {}).get("duration")
+    return {
+        "width": int(stream.get("width") or 0),
+        "height": int(stream.get("height") or 0),
+        "duration": float(duration) if duration else None,
+    }
+
+
+def _bitrate_bps(value: str) -> int:
+    value = str(value).strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def plan_renditions(source_width: int, source_height: int) -> List[Dict[str, Any]]:
+    """Configured renditions no taller than the source (at least the smallest one)."""
+    renditions = sorted(HLS_RENDITIONS, key=lambda rendition: int(rendition["height"]))
+    planned = [rendition for rendition in renditions if not source_height or int(rendition["height"]) <= source_height]
+    planned = planned or renditions[:1]
+    result = []
+    for rendition in planned:
+        height = int(rendition["height"])
+        width = int(round(source_width * height / source_height / 2) * 2) if source_width and source_height else 0
+        result.append({**rendition, "height": height, "width": width})
+    return result
+
+
+def ffmpeg_rendition_command(source: Path, output_dir: Path, rendition: Dict[str, Any], segment_seconds: int = HLS_SEGMENT_SECONDS) -> List[str]:
+    video_bitrate = str(rendition.get("video_bitrate", "1500k"))
+    return [
+        FFMPEG_PATH, "-y", "-hide_banner", "-loglevel", "error",
+        "-i", str(source),
+        "-vf", f"scale=-2:{rendition['height']}",
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+        "-b:v", video_bitrate,
+        "-maxrate", str(int(_bitrate_bps(video_bitrate) * 1.07)),
+        "-bufsize", str(_bitrate_bps(video_bitrate) * 2),
+        # Keyframes on segment boundaries, so every rendition switches cleanly
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})",
+        "-sc_threshold", "0",
+        "-c:a", "aac", "-b:a", str(rendition.get("audio_bitrate", "128k")), "-ac", "2",
+        "-hls_time", str(segment_seconds),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(output_dir / "seg_%05d.ts"),
+        str(output_dir / "index.m3u8"),
+    ]
+
+
+def master_playlist(renditions: List[Dict[str, Any]]) -> str:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for rendition in renditions:
+        bandwidth = _bitrate_bps(rendition.get("video_bitrate", "1500k")) + _bitrate_bps(rendition.get("audio_bitrate", "128k"))
+        resolution = f",RESOLUTION={rendition['width']}x{rendition['height']}" if rendition.get("width") else ""
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth}{resolution}")
+        lines.append(f"{rendition['name']}/index.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def generate_hls_renditions(source: Path, key: str) -> Dict[str, Any]:
+    """
+    Segment a video into the configured HLS renditions under renditions/<key>/hls.
+    Built in a scratch directory and renamed into place, so players never see a
+    half-written playlist. Returns the probe result and rendition names.
+    """
+    target = rendition_dir(key) / "hls"
+    if (target / HLS_MASTER_PLAYLIST).exists():
+        return {"skipped": True, "path": str(target)}
+
+    info = probe_video(source)
+    renditions = plan_renditions(info["width"], info["height"])
+    scratch = rendition_dir(key) / f".hls-{uuid.uuid4().hex[:8]}"
+    try:
+        for rendition in renditions:
+            output_dir = scratch / rendition["name"]
+            output_dir.mkdir(parents=True, exist_ok=True)
+            subprocess.run(ffmpeg_rendition_command(source, output_dir, rendition), check=True, capture_output=True)
+        (scratch / HLS_MASTER_PLAYLIST).write_text(master_playlist(renditions))
+        try:
+            os.replace(scratch, target)
+        except OSError:
+            if not (target / HLS_MASTER_PLAYLIST).exists():
+                raise  # Otherwise another worker finished the same content first
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {
+        "skipped": False,
+        "path": str(target),
+        "duration": info["duration"],
+        "renditions": [rendition["name"] for rendition in renditions],
+    }
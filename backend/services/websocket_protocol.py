@@ -0,0 +1,164 @@
+"""
+WebSocket Protocol - Negotiated message encoding for live presentation and chat sockets
+
+Clients pick an encoding with the WebSocket subprotocol they offer when connecting:
+
+    json.v1      JSON text frames (the default, also used when no subprotocol is offered)
+    msgpack.v1   binary frames holding a msgpack array [version, message]
+
+The server answers with the first subprotocol it supports, remembers the encoding
+for the socket, and every message sent with send_encoded() goes out in it. JSON is
+serialized with orjson when it is installed. A message broadcast to many sockets can
+be wrapped in an EncodedMessage so it is serialized once per encoding rather than
+once per socket. Clients send JSON text frames whatever encoding they receive.
+
+permessage-deflate is negotiated by the ASGI server (uvicorn's ws_per_message_deflate)
+and compresses frames of either encoding.
+"""
+
+import json
+import weakref
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Union
+
+from scripts.config import load_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_WEBSOCKET_CONFIG = load_config().get("websocket", {}) or {}
+
+PROTOCOL_VERSION = 1
+JSON_SUBPROTOCOL = f"json.v{PROTOCOL_VERSION}"
+MSGPACK_SUBPROTOCOL = f"msgpack.v{PROTOCOL_VERSION}"
+MSGPACK_ENABLED = bool(_WEBSOCKET_CONFIG.get("msgpack_enabled", True)) and msgpack is not None
+PER_MESSAGE_DEFLATE = bool(_WEBSOCKET_CONFIG.get("per_message_deflate", True))
+
+Frame = Union[str, bytes]
+
+
+def _encode_default(value: Any) -> Any:
+    # Datetimes as ISO strings in both encodings; anything else unknown as its str()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _map_key(key: Any) -> str:
+    # Non-string map keys as JSON text has them (orjson OPT_NON_STR_KEYS / json.dumps)
+    if isinstance(key, str):
+        return key
+    if isinstance(key, bool) or key is None:
+        return json.dumps(key)
+    if isinstance(key, (datetime, date)):
+        return key.isoformat()
+    return str(key)
+
+
+def _str_keys(value: Any) -> Any:
+    """Copy of value whose map keys are all strings, so msgpack carries the same message as JSON"""
+    if isinstance(value, dict):
+        return {_map_key(key): _str_keys(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_str_keys(item) for item in value]
+    return value
+
+
+def dumps_text(message: Any) -> str:
+    """JSON text for a message (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(message, default=_encode_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message, default=_encode_default, separators=(",", ":"))
+
+
+class WireCodec:
+    """One negotiated encoding: how a message becomes a frame and how the frame is sent"""
+
+    def __init__(self, name: str, subprotocol: str, binary: bool):
+        self.name = name
+        self.subprotocol = subprotocol
+        self.binary = binary
+
+    def encode(self, message: Dict[str, Any]) -> Frame:
+        if self.binary:
+            return msgpack.packb([PROTOCOL_VERSION, _str_keys(message)], default=_encode_default, use_bin_type=True)
+        return dumps_text(message)
+
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        if isinstance(frame, (bytes, bytearray)):
+            version, message = msgpack.unpackb(frame, raw=False)
+            if version != PROTOCOL_VERSION:
+                raise ValueError(f"unsupported protocol version {version}")
+            return message
+        return json.loads(frame)
+
+    async def send_frame(self, websocket: Any, frame: Frame):
+        if self.binary:
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+
+
+JSON_CODEC = WireCodec("json", JSON_SUBPROTOCOL, binary=False)
+MSGPACK_CODEC = WireCodec("msgpack", MSGPACK_SUBPROTOCOL, binary=True)
+
+SUPPORTED_CODECS: Dict[str, WireCodec] = {JSON_SUBPROTOCOL: JSON_CODEC}
+if MSGPACK_ENABLED:
+    SUPPORTED_CODECS[MSGPACK_SUBPROTOCOL] = MSGPACK_CODEC
+
+# Negotiated codec per socket; sockets that never negotiated use JSON text
+_socket_codecs: "weakref.WeakKeyDictionary[Any, WireCodec]" = weakref.WeakKeyDictionary()
+
+
+def negotiate_protocol(websocket: Any) -> Optional[str]:
+    """
+    Choose the encoding for a socket from the subprotocols its client offered.
+    Returns the subprotocol to pass to websocket.accept() (None if none was offered
+    or none is supported).
+    """
+    scope = getattr(websocket, "scope", None) or {}
+    for subprotocol in scope.get("subprotocols") or []:
+        codec = SUPPORTED_CODECS.get(subprotocol)
+        if codec is not None:
+            _socket_codecs[websocket] = codec
+            return subprotocol
+    return None
+
+
+def set_codec(websocket: Any, codec: WireCodec):
+    _socket_codecs[websocket] = codec
+
+
+def codec_for(websocket: Any) -> WireCodec:
+    return _socket_codecs.get(websocket, JSON_CODEC)
+
+
+async def send_encoded(websocket: Any, message: Dict[str, Any]):
+    """Send one message in the socket's negotiated encoding"""
+    codec = codec_for(websocket)
+    await codec.send_frame(websocket, codec.encode(message))
+
+
+class EncodedMessage:
+    """A message sent to many sockets, serialized at most once per encoding"""
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        self._frames: Dict[str, Frame] = {}
+
+    def frame(self, codec: WireCodec) -> Frame:
+        frame = self._frames.get(codec.name)
+        if frame is None:
+            frame = self._frames[codec.name] = codec.encode(self.message)
+        return frame
+
+    async def send(self, websocket: Any):
+        codec = codec_for(websocket)
+        await codec.send_frame(websocket, self.frame(codec))
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Tests for checkpointed, resumable group/theme behavior executions.
+
+Runs against a temporary SQLite database with fake vector building and
+explanation generation, so no embedding model or OpenAI key is needed. Checks
+that stage artifacts are reused when their inputs are unchanged, that a stale
+or re-run stage invalidates every stage after it, that a rerun can reuse the
+checkpoints of an earlier execution, and that a Celery soft time limit hit while
+building vectors or explaining groups propagates (so the task is retried) and the
+resumed execution only explains the groups it had not finished. Theme stages hit
+by the soft time limit are not checkpointed with their fallback results either.
+"""
+
+import sys
+import os
+import tempfile
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from models.database.db_models import BehaviorExecutionCheckpoint
+from services.behavior_checkpoints import BEHAVIOR_STAGES, BehaviorCheckpointStore, checkpoint_fingerprint, validate_rerun_stages
+from services.deployment_types import group_assignment
+from services.deployment_types.group_assignment import GroupAssignmentBehavior, clear_explanation_cache
+from services.deployment_types.theme_creator import ThemeCreatorBehavior
+
+
+def create_session():
+    fd, sqlite_path = tempfile.mkstemp(suffix=".db", prefix="test_checkpoints_")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    SQLModel.metadata.create_all(engine)
+    return engine, Session(engine), sqlite_path
+
+
+def close_session(engine, db, sqlite_path):
+    db.close()
+    engine.dispose()
+    os.remove(sqlite_path)
+
+
+class CountingGroupBehavior(GroupAssignmentBehavior):
+    """Builds deterministic vectors from the student names and counts how often it is asked to."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.vector_builds = 0
+
+    def _build_student_vectors(self, student_data, db_session):
+        self.vector_builds += 1
+        return [(s["name"], [float(i % 3), float(i % 5), 1.0]) for i, s in enumerate(student_data)]
+
+
+class OutOfTimeGroupBehavior(CountingGroupBehavior):
+    """Hits the soft time limit while building vectors."""
+
+    def _build_student_vectors(self, student_data, db_session):
+        raise SoftTimeLimitExceeded()
+
+
+class FakeExplanations:
+    """Stands in for _generate_group_explanations."""
+
+    def __init__(self):
+        self.explained = []
+
+    def __call__(self, groups, student_data, strategy, db_session=None, prompt_context=None, selected_prompts=None, on_explanations=None):
+        explanations = {}
+        for group_name in groups:
+            explanations[group_name] = f"{group_name} explained for {prompt_context}."
+            self.explained.append(group_name)
+            if on_explanations:
+                on_explanations(dict(explanations))
+        return explanations
+
+
+class FakeStructuredLLM:
+    """Stands in for the explanation ChatOpenAI; hits the soft time limit on request number fail_on_call."""
+
+    def __init__(self, fail_on_call=None):
+        self.fail_on_call = fail_on_call
+        self.explained = []
+        self.calls = 0
+
+    def with_structured_output(self, schema, method=None, strict=None):
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise SoftTimeLimitExceeded()
+        group_ids = [line[4:].strip() for line in messages[-1].content.splitlines() if line.startswith("### ")]
+        self.explained.extend(group_ids)
+        return {"explanations": [{"group_id": group_id, "explanation": f"{group_id} shares topic interests."} for group_id in group_ids]}
+
+
+def create_students(count=12):
+    return [{"name": f"Student_{i + 1}", "text": f"I am interested in topic {i % 4}."} for i in range(count)]
+
+
+def run_group(db, execution_id, explanations, source_execution_id=None, rerun_stages=None, prompt_context="Project A", behavior_class=CountingGroupBehavior):
+    behavior = behavior_class({"group_size": 3, "grouping_method": "homogeneous"})
+    store = BehaviorCheckpointStore(db, execution_id, source_execution_id=source_execution_id, rerun_stages=rerun_stages)
+    generate = group_assignment._generate_group_explanations
+    group_assignment._generate_group_explanations = explanations
+    try:
+        result = behavior.execute(create_students(), db_session=db, prompt_context=prompt_context, checkpoint_store=store)
+    finally:
+        group_assignment._generate_group_explanations = generate
+    return behavior, result
+
+
+def test_store_reuses_and_invalidates_later_stages():
+    engine, db, sqlite_path = create_session()
+    try:
+        store = BehaviorCheckpointStore(db, "exec-1")
+        store.save("vectors", {"vectors": [[1.0, 2.0]]}, "fp-vectors")
+        store.save("clustering", {"groups": {"Group1": ["A"]}}, "fp-clustering")
+
+        store = BehaviorCheckpointStore(db, "exec-1")
+        assert store.load("vectors", "fp-vectors") == {"vectors": [[1.0, 2.0]]}
+        assert store.load("clustering", "fp-clustering") == {"groups": {"Group1": ["A"]}}
+        assert store.summary()["resumed_stages"] == ["vectors", "clustering"]
+
+        # Changed vector inputs make the (still matching) clustering checkpoint stale too
+        store = BehaviorCheckpointStore(db, "exec-1")
+        assert store.load("vectors", "fp-other") is None
+        assert store.load("clustering", "fp-clustering") is None
+
+        # So does re-running a stage explicitly
+        store = BehaviorCheckpointStore(db, "exec-1", rerun_stages=["vectors"])
+        assert store.load("vectors", "fp-vectors") is None
+        assert store.load("clustering", "fp-clustering") is None
+    finally:
+        close_session(engine, db, sqlite_path)
+
+
+def test_store_copies_source_execution_checkpoints():
+    engine, db, sqlite_path = create_session()
+    try:
+        BehaviorCheckpointStore(db, "original").save("vectors", {"vectors": [[0.5]]}, "fp")
+        BehaviorCheckpointStore(db, "original").save("explanations", {"explanations": {"Group1": "x"}}, "fp", complete=False)
+
+        store = BehaviorCheckpointStore(db, "rerun", source_execution_id="original")
+        assert store.load("vectors", "fp") == {"vectors": [[0.5]]}
+        # Unfinished stages of another execution are never reused
+        assert store.load("explanations", "fp", include_partial=True) is None
+
+        copied = db.exec(select(BehaviorExecutionCheckpoint).where(BehaviorExecutionCheckpoint.execution_id == "rerun")).all()
+        assert [checkpoint.stage for checkpoint in copied] == ["vectors"]
+        assert checkpoint_fingerprint({"a": 1, "b": 2}) == checkpoint_fingerprint({"b": 2, "a": 1})
+    finally:
+        close_session(engine, db, sqlite_path)
+
+
+def run_group_with_llm(db, execution_id, llm, behavior_class=CountingGroupBehavior):
+    """Runs the real explanation engine, one group per request, with llm standing in for ChatOpenAI."""
+    settings = {name: getattr(group_assignment, name) for name in (
+        "EXPLANATION_GROUPS_PER_REQUEST", "EXPLANATION_MAX_CONCURRENT_REQUESTS", "EXPLANATION_REQUESTS_PER_MINUTE", "_create_explanation_llm")}
+    api_key = os.environ.get("OPENAI_API_KEY")
+    group_assignment.EXPLANATION_GROUPS_PER_REQUEST = 1
+    group_assignment.EXPLANATION_MAX_CONCURRENT_REQUESTS = 1
+    group_assignment.EXPLANATION_REQUESTS_PER_MINUTE = 0
+    group_assignment._create_explanation_llm = lambda: llm
+    os.environ["OPENAI_API_KEY"] = "test-key"
+    clear_explanation_cache()
+    try:
+        behavior = behavior_class({"group_size": 3, "grouping_method": "homogeneous"})
+        return behavior, behavior.execute(create_students(), db_session=db, prompt_context="Project A",
+                                          checkpoint_store=BehaviorCheckpointStore(db, execution_id))
+    finally:
+        for name, value in settings.items():
+            setattr(group_assignment, name, value)
+        if api_key is None:
+            os.environ.pop("OPENAI_API_KEY", None)
+        else:
+            os.environ["OPENAI_API_KEY"] = api_key
+
+
+def raised_soft_time_limit(error):
+    while error is not None:
+        if isinstance(error, SoftTimeLimitExceeded):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def test_interrupted_group_execution_resumes_remaining_explanations():
+    engine, db, sqlite_path = create_session()
+    try:
+        # The soft time limit hits during the third LLM request
+        llm = FakeStructuredLLM(fail_on_call=3)
+        with pytest.raises(Exception) as raised:
+            run_group_with_llm(db, "exec-1", llm)
+        # It reaches the Celery task (which retries), instead of falling back to rule-based explanations
+        assert raised_soft_time_limit(raised.value)
+        stored = db.exec(select(BehaviorExecutionCheckpoint).where(BehaviorExecutionCheckpoint.stage == "explanations")).one()
+        saved = set(stored.artifact["explanations"])
+        assert not stored.is_complete
+        assert len(saved) >= 2 and saved <= set(llm.explained)
+
+        # The redelivered task runs with the same execution id
+        llm_after_retry = FakeStructuredLLM()
+        behavior, result = run_group_with_llm(db, "exec-1", llm_after_retry)
+        assert behavior.vector_builds == 0
+        assert result["metadata"]["checkpoints"]["resumed_stages"] == ["vectors", "clustering"]
+        # Only the groups without a saved explanation are asked for again
+        assert sorted(llm_after_retry.explained) == sorted(set(result["groups"]) - saved)
+        assert set(result["explanations"]) == set(result["groups"])
+        assert all("shares topic interests" in text for text in result["explanations"].values())
+    finally:
+        close_session(engine, db, sqlite_path)
+
+
+def test_soft_time_limit_while_building_vectors_is_not_checkpointed():
+    engine, db, sqlite_path = create_session()
+    try:
+        # The text-only fallback would work, so only the time limit can stop the stage
+        student_to_vector = group_assignment.student_to_vector
+        group_assignment.student_to_vector = lambda text: [1.0, float(len(text)), 0.0]
+        try:
+            with pytest.raises(Exception) as raised:
+                run_group(db, "exec-1", FakeExplanations(), behavior_class=OutOfTimeGroupBehavior)
+        finally:
+            group_assignment.student_to_vector = student_to_vector
+        assert raised_soft_time_limit(raised.value)
+        # No text-only fallback vectors were saved under the real data fingerprint
+        assert db.exec(select(BehaviorExecutionCheckpoint)).all() == []
+
+        behavior, _ = run_group(db, "exec-1", FakeExplanations())
+        assert behavior.vector_builds == 1
+    finally:
+        close_session(engine, db, sqlite_path)
+
+
+class OutOfTimeThemeBehavior(ThemeCreatorBehavior):
+    """Fake vectors (four topics); the soft time limit hits in the stage named by out_of_time_in"""
+
+    out_of_time_in = None
+
+    def _build_student_vectors(self, student_data, db_session):
+        return [(s["name"], [1.0 if int(s["text"][-2]) == topic else 0.05 for topic in range(4)]) for s in student_data]
+
+    def _perform_clustering(self, vectors, num_themes):
+        if self.out_of_time_in == "clustering":
+            raise SoftTimeLimitExceeded()
+        return super()._perform_clustering(vectors, num_themes)
+
+    def _analyze_cluster_traditional(self, cluster_id, student_names, student_texts):
+        if self.out_of_time_in == "labels":
+            raise SoftTimeLimitExceeded()
+        return super()._analyze_cluster_traditional(cluster_id, student_names, student_texts)
+
+
+def run_theme(db, execution_id, out_of_time_in=None):
+    behavior = OutOfTimeThemeBehavior({"num_themes": 4, "use_llm_polish": False, "enhance_with_web_search": False})
+    behavior.out_of_time_in = out_of_time_in
+    return behavior.execute(create_students(), db_session=db, checkpoint_store=BehaviorCheckpointStore(db, execution_id))
+
+
+def test_soft_time_limit_in_theme_stages_is_not_checkpointed():
+    for stage, saved_stages in (("clustering", {"vectors"}), ("labels", {"vectors", "clustering"})):
+        engine, db, sqlite_path = create_session()
+        try:
+            with pytest.raises(SoftTimeLimitExceeded):
+                # Unchanged, not wrapped in "Theme creation failed", and without falling back
+                run_theme(db, "exec-1", out_of_time_in=stage)
+            # Neither an even distribution nor "Theme N" placeholders were saved as the stage's result
+            assert {checkpoint.stage for checkpoint in db.exec(select(BehaviorExecutionCheckpoint)).all()} == saved_stages
+
+            result = run_theme(db, "exec-1")
+            assert set(result["metadata"]["checkpoints"]["resumed_stages"]) == saved_stages
+            assert result["metadata"]["clustering_method"] != "even_distribution"
+            assert not any(theme["title"].startswith("Theme ") for theme in result["themes"])
+        finally:
+            close_session(engine, db, sqlite_path)
+
+
+def test_rerun_with_new_prompt_only_regenerates_explanations():
+    engine, db, sqlite_path = create_session()
+    try:
+        _, first = run_group(db, "exec-1", FakeExplanations())
+
+        explanations = FakeExplanations()
+        behavior, rerun = run_group(db, "exec-2", explanations, source_execution_id="exec-1", prompt_context="Project B")
+        assert behavior.vector_builds == 0
+        assert rerun["groups"] == first["groups"]
+        assert rerun["metadata"]["checkpoints"]["computed_stages"] == ["explanations"]
+        assert len(explanations.explained) == len(first["groups"])
+        assert all("Project B" in text for text in rerun["explanations"].values())
+
+        # Forcing the clustering stage re-clusters but still reuses the vectors
+        behavior, _ = run_group(db, "exec-3", FakeExplanations(), source_execution_id="exec-1", rerun_stages=["clustering"])
+        assert behavior.vector_builds == 0
+    finally:
+        close_session(engine, db, sqlite_path)
+
+
+def test_rerun_stages_are_checked_against_the_behavior():
+    assert validate_rerun_stages("group", ["explanations"]) == ["explanations"]
+    assert validate_rerun_stages("themeCreator", ("labels", "enrichment")) == ["labels", "enrichment"]
+    # A misspelled stage would match no checkpoint and silently reuse everything
+    with pytest.raises(ValueError, match="explanation"):
+        validate_rerun_stages("group", ["explanation"])
+    with pytest.raises(ValueError, match="explanations"):
+        validate_rerun_stages("themeCreator", ["labels", "explanations"])
+    with pytest.raises(ValueError, match="cannot be re-run"):
+        validate_rerun_stages("unknownBehavior", ["vectors"])
+
+    # The lists name the stages the behaviors actually checkpoint
+    engine, db, sqlite_path = create_session()
+    try:
+        run_group(db, "exec-group", FakeExplanations())
+        run_theme(db, "exec-theme")
+        for execution_id, behavior_type in (("exec-group", "group"), ("exec-theme", "themeCreator")):
+            stages = {checkpoint.stage for checkpoint in db.exec(
+                select(BehaviorExecutionCheckpoint).where(BehaviorExecutionCheckpoint.execution_id == execution_id)
+            ).all()}
+            assert stages and stages <= set(BEHAVIOR_STAGES[behavior_type])
+    finally:
+        close_session(engine, db, sqlite_path)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing behavior execution checkpoints")
+
+    try:
+        test_store_reuses_and_invalidates_later_stages()
+        test_store_copies_source_execution_checkpoints()
+        test_interrupted_group_execution_resumes_remaining_explanations()
+        test_soft_time_limit_while_building_vectors_is_not_checkpointed()
+        test_soft_time_limit_in_theme_stages_is_not_checkpointed()
+        test_rerun_with_new_prompt_only_regenerates_explanations()
+        test_rerun_stages_are_checked_against_the_behavior()
+        print("\n🎉 All behavior checkpoint tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
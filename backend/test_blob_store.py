@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed blob store behind store_file: identical uploads
+are stored once and reference counted, deletes release references, and cached
+ingest data (chunks and vectors) is reused by blob hash and removed with the blob.
+
+Storage goes to a temporary directory and blob reference counts to an in-memory
+SQLite database (see TemporaryStorage in test_streaming_uploads.py).
+"""
+
+import sys
+import os
+import hashlib
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api import file_storage
+from api.file_storage import blob_path, delete_stored_file, delete_workflow_files, store_file
+from test_streaming_uploads import TemporaryStorage
+
+PACKET = b"%PDF-1.4 reading packet " * 200
+PACKET_SHA256 = hashlib.sha256(PACKET).hexdigest()
+
+
+def ref_count(sha256):
+    def read(db):
+        from models.database.db_models import StoredBlob
+        blob = db.get(StoredBlob, sha256)
+        return blob.ref_count if blob else None
+    return file_storage.run_serialized_write(read)
+
+
+def test_identical_uploads_share_one_blob():
+    with TemporaryStorage() as root:
+        paths = [store_file(PACKET, workflow_id, f"u{workflow_id}", "packet.pdf") for workflow_id in range(1, 13)]
+
+        blob = blob_path(PACKET_SHA256)
+        assert blob == root / "uploads" / "blobs" / PACKET_SHA256[:2] / PACKET_SHA256[2:4] / PACKET_SHA256
+        assert blob.read_bytes() == PACKET
+        assert ref_count(PACKET_SHA256) == 12
+        # Stored once: every storage path is a link to the blob, readable as before
+        assert len([p for p in (root / "uploads" / "blobs").rglob("*") if p.is_file()]) == 1
+        for path in paths:
+            full_path = root / "uploads" / path
+            assert full_path.is_symlink() and full_path.read_bytes() == PACKET
+
+        # A caller that already hashed the content (staged uploads) skips the re-hash
+        staged = root / "staged.pdf"
+        staged.write_bytes(PACKET)
+        store_file(staged, 13, "u13", "packet.pdf", move=True, sha256=PACKET_SHA256)
+        assert not staged.exists() and ref_count(PACKET_SHA256) == 13
+        assert not list((root / "uploads" / "blobs" / "incoming").iterdir())
+
+
+def test_blob_is_deleted_with_its_last_reference():
+    with TemporaryStorage() as root:
+        first = store_file(PACKET, 1, "a", "packet.pdf")
+        second = store_file(PACKET, 2, "b", "packet.pdf")
+        sidecar = blob_path(PACKET_SHA256).with_name(f"{PACKET_SHA256}.ingest.abc.json")
+        sidecar.write_text("{}")
+
+        assert delete_stored_file(first)
+        assert not (root / "uploads" / first).exists()
+        assert blob_path(PACKET_SHA256).exists() and ref_count(PACKET_SHA256) == 1
+
+        assert delete_stored_file(second)
+        assert ref_count(PACKET_SHA256) is None
+        assert not blob_path(PACKET_SHA256).exists() and not sidecar.exists()
+        assert not delete_stored_file(second)
+
+
+def test_delete_workflow_files_releases_only_that_workflow():
+    with TemporaryStorage() as root:
+        store_file(PACKET, 1, "a", "packet.pdf")
+        store_file(b"other notes", 1, "b", "notes.pdf")
+        kept = store_file(PACKET, 2, "c", "packet.pdf")
+
+        assert delete_workflow_files(1) == 2
+        assert not (root / "uploads" / "1").exists()
+        assert ref_count(PACKET_SHA256) == 1
+        assert ref_count(hashlib.sha256(b"other notes").hexdigest()) is None
+        assert (root / "uploads" / kept).read_bytes() == PACKET
+
+
+def test_restoring_a_path_releases_the_replaced_blob():
+    with TemporaryStorage() as root:
+        store_file(b"draft", 1, "a", "essay.pdf")
+        path = store_file(b"final", 1, "a", "essay.pdf")
+        assert (root / "uploads" / path).read_bytes() == b"final"
+        assert ref_count(hashlib.sha256(b"draft").hexdigest()) is None
+        assert ref_count(hashlib.sha256(b"final").hexdigest()) == 1
+
+
+def test_files_stored_before_the_blob_store_still_delete():
+    with TemporaryStorage() as root:
+        legacy = root / "uploads" / "5" / "old" / "legacy.pdf"
+        legacy.parent.mkdir(parents=True)
+        legacy.write_bytes(b"legacy")
+        assert delete_stored_file(os.path.join("5", "old", "legacy.pdf"))
+        assert not legacy.exists()
+
+
+def test_ingest_cache_reuses_chunks_and_vectors_by_blob_hash():
+    from langchain.docstore.document import Document
+    from services.ingest_cache import CachedEmbeddings, ingest_fingerprint, load_ingest_cache, save_ingest_cache
+
+    class CountingEmbeddings:
+        model_name = "test-model"
+
+        def __init__(self):
+            self.embedded = []
+
+        def embed_documents(self, texts):
+            self.embedded.extend(texts)
+            return [[float(len(text)), 1.0] for text in texts]
+
+        def embed_query(self, text):
+            return [0.0, 0.0]
+
+    with TemporaryStorage():
+        chunks = [Document(page_content="alpha", metadata={"page": 0}), Document(page_content="beta", metadata={"page": 1})]
+        base = CountingEmbeddings()
+        embeddings = CachedEmbeddings(base)
+        fingerprint = ingest_fingerprint({"chunk_size": 800}, embeddings)
+        assert fingerprint != ingest_fingerprint({"chunk_size": 400}, embeddings)
+
+        assert embeddings.embed_documents(["alpha", "beta", "alpha"]) == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+        assert base.embedded == ["alpha", "beta"]
+
+        # No cache is written for a blob that isn't stored
+        assert not save_ingest_cache(PACKET_SHA256, fingerprint, chunks, embeddings.vectors)
+        store_file(PACKET, 1, "a", "packet.pdf")
+        assert save_ingest_cache(PACKET_SHA256, fingerprint, chunks, embeddings.vectors)
+
+        cached = load_ingest_cache(PACKET_SHA256, fingerprint)
+        assert [(c.page_content, c.metadata) for c in cached["chunks"]] == [("alpha", {"page": 0}), ("beta", {"page": 1})]
+        assert load_ingest_cache(PACKET_SHA256, "other-settings") is None
+
+        # A second ingestion of the same blob embeds nothing
+        second_base = CountingEmbeddings()
+        reused = CachedEmbeddings(second_base, cached["vectors"])
+        assert reused.embed_documents(["alpha", "beta"]) == [[5.0, 1.0], [4.0, 1.0]]
+        assert second_base.embedded == []
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the content-addressed blob store")
+
+    try:
+        test_identical_uploads_share_one_blob()
+        test_blob_is_deleted_with_its_last_reference()
+        test_delete_workflow_files_releases_only_that_workflow()
+        test_restoring_a_path_releases_the_replaced_blob()
+        test_files_stored_before_the_blob_store_still_delete()
+        test_ingest_cache_reuses_chunks_and_vectors_by_blob_hash()
+        print("\n🎉 All blob store tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
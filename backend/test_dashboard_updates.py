@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for coalesced teacher dashboard updates in live presentations: a burst of
+student connects and responses reaches teachers as a few delta messages instead
+of one full stats message per event, the deltas merged into the connect snapshot
+match a fresh snapshot, and reconnecting teachers get a full snapshot.
+
+Students and teachers connect over fake websockets; no database is used.
+"""
+
+import sys
+import os
+import json
+import asyncio
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types.live_presentation import LivePresentationDeployment
+
+STUDENTS = [f"Student {i}" for i in range(300)]
+GROUPS = {f"Group{g + 1}": STUDENTS[g * 5:(g + 1) * 5] for g in range(60)}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def of_type(self, message_type):
+        return [message for message in self.sent if message["type"] == message_type]
+
+
+def make_presentation():
+    presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-1")
+    presentation.input_variable_data = GROUPS
+    presentation._dashboard_updates.interval_seconds = 0.05
+    presentation._response_summarizer = None
+    return presentation
+
+
+def apply_delta(stats, delta):
+    """The same merge the teacher dashboard does (applyDashboardDelta)"""
+    students = {student["user_id"]: student for student in stats["students"]}
+    for user_id in delta["removed"]:
+        students.pop(user_id, None)
+    for student in delta["added"] + delta["updated"]:
+        students[student["user_id"]] = student
+    stats = {**stats, **delta["counts"], "students": list(students.values()), "dashboard_seq": delta["seq"]}
+    stats["response_counts"] = {**stats.get("response_counts", {}), **delta["response_counts"]}
+    for group_name, connected in delta["group_connected"].items():
+        if group_name in stats["group_stats"]:
+            stats["group_stats"][group_name]["connected_members"] = connected
+    return stats
+
+
+def test_bursts_are_coalesced_into_deltas():
+    async def scenario():
+        presentation = make_presentation()
+        teacher = FakeWebSocket()
+        await presentation.connect_teacher(teacher)
+        stats = teacher.of_type("teacher_connected")[0]["stats"]
+        assert stats["dashboard_seq"] == 0 and stats["total_students"] == 0
+
+        await asyncio.gather(*(presentation.connect_student(f"id-{i}", name, FakeWebSocket()) for i, name in enumerate(STUDENTS)))
+        presentation.current_prompt = {"id": "p1", "statement": "Why?"}
+        await asyncio.gather(*(
+            presentation.handle_student_message(f"id-{i}", {"type": "student_response", "prompt_id": "p1", "response": f"answer {i}"})
+            for i in range(0, 300, 2)
+        ))
+        await presentation.disconnect_student("id-299")
+        await asyncio.sleep(0.15)
+
+        deltas = teacher.of_type("dashboard_delta")
+        assert 1 <= len(deltas) <= 4, f"{len(deltas)} deltas for 600 events"
+        assert [delta["seq"] for delta in deltas] == list(range(1, len(deltas) + 1))
+        assert not teacher.of_type("connection_update") and not teacher.of_type("student_response_received")
+        assert sum(len(delta["responses"]) for delta in deltas) == 150
+        assert deltas[-1]["response_counts"]["p1"] == 150
+
+        for delta in deltas:
+            stats = apply_delta(stats, delta)
+        snapshot = json.loads(json.dumps(presentation.get_presentation_stats(), default=str))
+        by_id = lambda students: sorted(students, key=lambda student: student["user_id"])
+        assert by_id(stats["students"]) == by_id(snapshot["students"])
+        for key in ("total_students", "connected_students", "ready_students", "response_counts", "group_stats", "dashboard_seq"):
+            assert stats[key] == snapshot[key], key
+        assert snapshot["total_students"] == 299 and snapshot["group_stats"]["Group60"]["connected_members"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_unchanged_students_are_left_out_and_reconnects_get_snapshots():
+    async def scenario():
+        presentation = make_presentation()
+        teacher = FakeWebSocket()
+        await presentation.connect_teacher(teacher)
+        await presentation.connect_student("id-0", STUDENTS[0], FakeWebSocket())
+        await presentation.connect_student("id-1", STUDENTS[1], FakeWebSocket())
+        await presentation._dashboard_updates.flush_now()
+        assert [len(delta["added"]) for delta in teacher.of_type("dashboard_delta")] == [2]
+
+        # A ready click updates one student, even when all students are marked as changed
+        await presentation.handle_student_message("id-1", {"type": "student_ready"})
+        await presentation._notify_teachers_connection_update()
+        await presentation._dashboard_updates.flush_now()
+        delta = teacher.of_type("dashboard_delta")[-1]
+        assert [student["user_id"] for student in delta["updated"]] == ["id-1"]
+        assert delta["counts"]["ready_students"] == 1
+
+        # Nothing changed: no message at all
+        presentation._dashboard_updates.all_students_changed()
+        await presentation._dashboard_updates.flush_now()
+        assert len(teacher.of_type("dashboard_delta")) == 2
+
+        # A reconnecting teacher starts from a full snapshot at the current sequence number
+        await presentation.disconnect_teacher(teacher)
+        await presentation.connect_student("id-2", STUDENTS[2], FakeWebSocket())
+        await presentation._dashboard_updates.flush_now()
+        returning = FakeWebSocket()
+        await presentation.connect_teacher(returning)
+        stats = returning.of_type("teacher_connected")[0]["stats"]
+        assert stats["total_students"] == 3 and stats["dashboard_seq"] == presentation._dashboard_updates.seq
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing coalesced dashboard updates")
+
+    try:
+        test_bursts_are_coalesced_into_deltas()
+        test_unchanged_students_are_left_out_and_reconnects_get_snapshots()
+        print("\n🎉 All dashboard update tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
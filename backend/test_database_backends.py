@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Database backend tests for the API's persistence layer.
+
+Runs schema creation, the startup migrations and the hot read/write paths
+against a throwaway database. By default a temporary SQLite file is used; set
+TEST_DATABASE_URL to run the same suite against PostgreSQL, e.g.
+
+    TEST_DATABASE_URL=postgresql+psycopg://postgres@127.0.0.1:55432/postgres python test_database_backends.py
+
+run_db_test_matrix.sh runs it against both backends, starting a disposable
+PostgreSQL instance with pg_tmp or Docker.
+"""
+
+import sys
+import os
+import contextlib
+import tempfile
+import datetime as dt
+
+import pytest
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, Session, select
+
+import database.database as database_module
+import run_migration_now as run_migration_now_module
+from database.database import init_db, run_serialized_write
+from models.database.db_models import (
+    User, Class, ClassMembership, ClassRole, Workflow, Deployment, PromptSession, PromptSubmission,
+)
+from scripts import permission_helpers
+
+EXPECTED_INDEXES = {
+    "submission": "ix_submission_problem_user_submitted",
+    "promptsession": "ix_promptsession_deployment_active_completed",
+    "classmembership": "ix_classmembership_user_class_active",
+    "livepresentationresponse": "ix_livepresentationresponse_session_prompt",
+    "chatmessage": "ix_chatmessage_conversation_created",
+}
+
+
+@contextlib.contextmanager
+def backend_database():
+    """Point the app's engine at a throwaway database (TEST_DATABASE_URL or a temporary SQLite file).
+
+    The engine is built by the app's own factory, so pool and connection settings
+    match production; the module globals are restored and the engine disposed on exit.
+    """
+    database_url = os.environ.get("TEST_DATABASE_URL")
+    sqlite_path = None
+    if not database_url:
+        fd, sqlite_path = tempfile.mkstemp(suffix=".db", prefix="test_backend_")
+        os.close(fd)
+        database_url = f"sqlite:///{sqlite_path}"
+
+    db_engine = database_module._create_engine(database_url)
+    try:
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(database_module, "DATABASE_URL", database_url)
+            patch.setattr(database_module, "IS_SQLITE", database_url.startswith("sqlite"))
+            patch.setattr(database_module, "engine", db_engine)
+            # Writes run inline on the test engine instead of the app's writer thread
+            patch.setattr(database_module, "_serialized_writer", None)
+            patch.setattr(run_migration_now_module, "engine", db_engine)
+            yield db_engine
+    finally:
+        db_engine.dispose()
+        if sqlite_path:
+            os.remove(sqlite_path)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    with backend_database() as db_engine:
+        yield db_engine
+
+
+def _reset_schema(engine):
+    SQLModel.metadata.drop_all(engine)
+    init_db()
+
+
+def test_init_db_is_idempotent(engine):
+    _reset_schema(engine)
+    init_db()
+
+    inspector = inspect(engine)
+    for table_name, index_name in EXPECTED_INDEXES.items():
+        index_names = {index["name"] for index in inspector.get_indexes(table_name)}
+        assert index_name in index_names, f"{index_name} missing on {table_name} ({engine.dialect.name})"
+
+
+def test_migrations_restore_missing_columns(engine):
+    _reset_schema(engine)
+
+    # Simulate a database created before these columns/indexes existed
+    with engine.begin() as conn:
+        user_table = conn.dialect.identifier_preparer.quote("user")
+        conn.execute(text(f"ALTER TABLE {user_table} DROP COLUMN about_me"))
+        conn.execute(text("DROP INDEX ix_submission_problem_user_submitted"))
+
+    database_module._apply_schema_migrations()
+
+    inspector = inspect(engine)
+    assert "about_me" in {column["name"] for column in inspector.get_columns("user")}
+    assert "ix_submission_problem_user_submitted" in {
+        index["name"] for index in inspector.get_indexes("submission")
+    }
+
+    run_migration_now_module.run_migration_now()
+    run_migration_now_module.run_migration_now()
+
+
+def test_membership_and_prompt_submission_paths(engine):
+    _reset_schema(engine)
+
+    with Session(engine) as db:
+        instructor = User(email="instructor@example.com", hashed_password="x")
+        student = User(email="student@example.com", hashed_password="x")
+        class_obj = Class(code="BACKEND1", name="Backends")
+        db.add_all([instructor, student, class_obj])
+        db.commit()
+
+        db.add_all([
+            ClassMembership(class_id=class_obj.id, user_id=instructor.id, role=ClassRole.INSTRUCTOR),
+            ClassMembership(class_id=class_obj.id, user_id=student.id, role=ClassRole.STUDENT),
+        ])
+        workflow = Workflow(name="Backends", class_id=class_obj.id, created_by_id=instructor.id, workflow_data={})
+        db.add(workflow)
+        db.commit()
+        deployment = Deployment(
+            deployment_id="backend-deployment",
+            user_id=instructor.id,
+            workflow_id=workflow.id,
+            class_id=class_obj.id,
+            workflow_name="Backends",
+            config={"nodes": {}},
+            collection_name="backends",
+        )
+        db.add(deployment)
+        db.commit()
+
+        permission_helpers.clear_membership_cache()
+        assert permission_helpers.user_is_instructor(instructor, db)
+        assert not permission_helpers.user_is_instructor(student, db)
+        assert permission_helpers.user_can_access_deployment(student, deployment, db)
+        assert permission_helpers.get_user_role_in_class(student, class_obj.id, db) == ClassRole.STUDENT
+
+        prompt_session = PromptSession(
+            user_id=student.id,
+            deployment_id=deployment.id,
+            main_question="What did you learn?",
+            submission_requirements=[{"prompt": "Q1", "mediaType": "textarea"}],
+        )
+        db.add(prompt_session)
+        db.commit()
+        session_id = prompt_session.id
+        deployment_db_id = deployment.id
+
+    def write_submission(write_db: Session) -> int:
+        submission = PromptSubmission(
+            session_id=session_id,
+            submission_index=0,
+            prompt_text="Q1",
+            media_type="textarea",
+            user_response="Indexes matter",
+        )
+        write_db.add(submission)
+        write_session = write_db.get(PromptSession, session_id)
+        write_session.completed_at = dt.datetime.now(dt.timezone.utc)
+        write_db.add(write_session)
+        write_db.commit()
+        return submission.id
+
+    assert run_serialized_write(write_submission) is not None
+
+    with Session(engine) as db:
+        rows = db.exec(
+            select(PromptSession, User.email, PromptSubmission)
+            .join(User, PromptSession.user_id == User.id)
+            .join(PromptSubmission, PromptSubmission.session_id == PromptSession.id)
+            .where(
+                PromptSession.deployment_id == deployment_db_id,
+                PromptSession.is_active == True,
+                PromptSession.completed_at.isnot(None),
+            )
+            .order_by(PromptSession.id, PromptSubmission.submission_index)
+        ).all()
+        assert [(email, sub.user_response) for _, email, sub in rows] == [("student@example.com", "Indexes matter")]
+
+
+def test_pool_configuration(engine):
+    if engine.dialect.name == "sqlite":
+        return
+
+    assert engine.pool.__class__.__name__ == "QueuePool"
+    assert engine.pool._pre_ping
+    with engine.connect() as conn:
+        timeout = conn.execute(text("SHOW statement_timeout")).scalar()
+    assert timeout not in (None, "0"), f"statement_timeout not applied: {timeout}"
+
+
+if __name__ == "__main__":
+    with backend_database() as engine:
+        print(f"🧪 Testing database backend: {engine.dialect.name}")
+
+        try:
+            test_init_db_is_idempotent(engine)
+            test_migrations_restore_missing_columns(engine)
+            test_membership_and_prompt_submission_paths(engine)
+            test_pool_configuration(engine)
+            print(f"\n🎉 All {engine.dialect.name} backend tests passed!")
+        except Exception as e:
+            print(f"\n❌ Test failed with error: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental group completion tracking in live presentations: the
+completion index follows connects, disconnects, regrouping and responses, each
+completed group is summarized exactly once, and responses saved before a restart
+count again once their students reconnect.
+
+Students connect over fake websockets; summary generation is replaced by a
+recorder so no LLM is needed.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from services.deployment_types.group_completion import GroupCompletionIndex
+from services.deployment_types.live_presentation import GROUP_SUMMARY_QUEUE, LivePresentationDeployment
+
+GROUPS = {"Group1": ["Ada", "Grace", "Alan"], "Group2": ["Edsger", "Barbara"]}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+def make_presentation():
+    presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-1")
+    presentation.input_variable_data = GROUPS
+    presentation.summaries = []
+
+    async def record_summary(prompt_id, group_name, students):
+        await asyncio.sleep(0)
+        presentation.summaries.append((prompt_id, group_name, sorted(s.user_name for s in students)))
+
+    presentation._generate_and_send_group_summary = record_summary
+    return presentation
+
+
+async def connect(presentation, *names):
+    for name in names:
+        assert await presentation.connect_student(f"id-{name}", name, FakeWebSocket())
+
+
+async def respond(presentation, name, prompt_id="p1"):
+    await presentation.handle_student_message(f"id-{name}", {"type": "student_response", "prompt_id": prompt_id, "response": f"{name} says hi"})
+    # Summaries are generated in the background
+    await GROUP_SUMMARY_QUEUE.wait(presentation.deployment_id)
+
+
+def test_index_tracks_membership_and_responses():
+    index = GroupCompletionIndex()
+    index.add_student("a", "G1")
+    index.add_student("b", "G1")
+    index.add_student("c", None)
+
+    assert index.record_response("a", "p1") is None
+    assert index.progress("p1", "G1") == (1, 2)
+    # Students without a group never complete anything
+    assert index.record_response("c", "p1") is None
+
+    # A regrouped student takes their responses along
+    index.set_group("a", "G2")
+    assert index.progress("p1", "G1") == (0, 1) and index.is_complete("p1", "G2")
+
+    assert index.record_response("b", "p1") == "G1"
+    assert index.record_response("b", "p1") is None, "a group is claimed once"
+    index.release_summary("p1", "G1")
+    assert index.record_response("b", "p1") == "G1"
+
+    index.remove_student("b")
+    assert index.groups() == {"G2": ["a"], None: ["c"]}
+    index.clear_responses()
+    assert index.progress("p1", "G2") == (0, 1)
+
+
+def test_each_completed_group_is_summarized_once():
+    async def scenario():
+        presentation = make_presentation()
+        await connect(presentation, "Ada", "Grace", "Alan", "Edsger", "Barbara")
+
+        await respond(presentation, "Ada")
+        await respond(presentation, "Edsger")
+        assert presentation.summaries == []
+
+        # The last two members of Group1 answer at the same moment
+        await asyncio.gather(respond(presentation, "Grace"), respond(presentation, "Alan"))
+        assert presentation.summaries == [("p1", "Group1", ["Ada", "Alan", "Grace"])]
+
+        # Editing an answer after the summary does not summarize again
+        await respond(presentation, "Ada")
+        assert len(presentation.summaries) == 1
+
+        # A disconnected member no longer holds the group back
+        await presentation.disconnect_student("id-Barbara")
+        await respond(presentation, "Edsger")
+        assert presentation.summaries[-1] == ("p1", "Group2", ["Edsger"])
+
+        groups = presentation._group_students_by_assignment()
+        assert {name: len(students) for name, students in groups.items()} == {"Group1": 3, "Group2": 1}
+
+        # Ending the presentation starts the next run with a clean slate
+        await presentation.end_presentation()
+        await respond(presentation, "Edsger")
+        assert presentation.summaries[-1] == ("p1", "Group2", ["Edsger"]) and len(presentation.summaries) == 3
+
+    asyncio.run(scenario())
+
+
+def test_regrouping_moves_students_between_groups():
+    async def scenario():
+        presentation = make_presentation()
+        await connect(presentation, "Ada", "Grace", "Alan", "Edsger", "Barbara")
+        await respond(presentation, "Ada")
+        await respond(presentation, "Grace")
+
+        # Alan moves to Group2, which leaves Group1 complete on the next response
+        presentation.input_variable_data = {"Group1": ["Ada", "Grace"], "Group2": ["Edsger", "Barbara", "Alan"]}
+        for student in presentation.students.values():
+            presentation._assign_group_info_to_student(student)
+        assert presentation._completion_index.progress("p1", "Group1") == (2, 2)
+
+        await respond(presentation, "Grace")
+        assert presentation.summaries == [("p1", "Group1", ["Ada", "Grace"])]
+
+    asyncio.run(scenario())
+
+
+def test_responses_survive_a_restart():
+    from models.database.live_presentation_models import (
+        LivePresentationResponse, LivePresentationSession, LivePresentationStudentConnection
+    )
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[
+        LivePresentationSession.__table__, LivePresentationStudentConnection.__table__, LivePresentationResponse.__table__
+    ])
+    with Session(engine) as db:
+        session = LivePresentationSession(deployment_id="deploy-1", session_active=True, presentation_active=False, input_variable_data=GROUPS)
+        db.add(session)
+        db.commit()
+        for name in ("Edsger", "Barbara"):
+            connection = LivePresentationStudentConnection(session_id=session.id, user_id=f"id-{name}", user_name=name)
+            db.add(connection)
+            db.commit()
+            if name == "Edsger":
+                db.add(LivePresentationResponse(session_id=session.id, student_connection_id=connection.id, prompt_id="p1",
+                                                response_text="before restart", response_data={"user_name": name}))
+                db.commit()
+
+        async def scenario():
+            presentation = make_presentation()
+            presentation._db_session = db
+            await presentation.restore_from_database()
+            await connect(presentation, "Edsger", "Barbara")
+
+            assert presentation.students["id-Edsger"].responses["p1"]["response"] == "before restart"
+            assert presentation._completion_index.progress("p1", "Group2") == (1, 2)
+            await respond(presentation, "Barbara")
+            assert presentation.summaries == [("p1", "Group2", ["Barbara", "Edsger"])]
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing group completion tracking")
+
+    try:
+        test_index_tracks_membership_and_responses()
+        test_each_completed_group_is_summarized_once()
+        test_regrouping_moves_students_between_groups()
+        test_responses_survive_a_restart()
+        print("\n🎉 All group completion tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
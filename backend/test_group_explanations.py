@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Tests for batched, cached LLM group explanations.
+
+Uses a fake structured-output chat model, so no OpenAI key or network access
+is needed. Checks that several groups are explained per request, that request
+concurrency stays bounded, that rate-limited requests are retried, that
+unchanged groups are served from the cache, and that partial explanations are
+streamed into the behavior execution history record.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types import group_assignment
+from services.deployment_types.group_assignment import (
+    _generate_group_explanations, _generate_llm_explanations_async, clear_explanation_cache,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeStructuredLLM:
+    """Stands in for ChatOpenAI.with_structured_output(): explains every group named in the prompt."""
+
+    def __init__(self, delay_seconds: float = 0.05, rate_limited_calls: int = 0, skip_groups=()):
+        self.delay_seconds = delay_seconds
+        self.rate_limited_calls = rate_limited_calls
+        self.skip_groups = set(skip_groups)
+        self.calls = 0
+        self.active = 0
+        self.peak_active = 0
+        self.schemas = []
+
+    def with_structured_output(self, schema, method=None, strict=None):
+        self.schemas.append((schema, method))
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if self.rate_limited_calls > 0:
+            self.rate_limited_calls -= 1
+            raise RateLimitError("Rate limit reached for requests")
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.delay_seconds)
+        finally:
+            self.active -= 1
+        prompt = messages[-1].content
+        group_ids = [line[4:].strip() for line in prompt.splitlines() if line.startswith("### ")]
+        return {"explanations": [
+            {"group_id": group_id, "explanation": f"{group_id} shares an interest in renewable energy."}
+            for group_id in group_ids if group_id not in self.skip_groups
+        ]}
+
+
+def create_groups(count: int, group_size: int = 4):
+    students = [{"name": f"Student_{i + 1}", "text": f"I am interested in topic {i % 7}."} for i in range(count * group_size)]
+    groups = {
+        f"Group{g + 1}": [student["name"] for student in students[g * group_size:(g + 1) * group_size]]
+        for g in range(count)
+    }
+    profiles = {student["name"]: student["text"] for student in students}
+    return groups, students, profiles
+
+
+def explain(groups, profiles, llm, on_explanations=None, strategy="mixed"):
+    return asyncio.run(_generate_llm_explanations_async(
+        groups, profiles, strategy, "Energy policy project", None, llm, on_explanations=on_explanations
+    ))
+
+
+def requests_for(group_count: int) -> int:
+    return -(-group_count // group_assignment.EXPLANATION_GROUPS_PER_REQUEST)
+
+
+def test_groups_are_batched_and_streamed():
+    clear_explanation_cache()
+    groups, _, profiles = create_groups(12)
+    llm = FakeStructuredLLM()
+    snapshots = []
+
+    explanations = explain(groups, profiles, llm, on_explanations=snapshots.append)
+
+    assert llm.calls == requests_for(len(groups)), f"Expected {requests_for(len(groups))} requests, got {llm.calls}"
+    assert llm.peak_active <= group_assignment.EXPLANATION_MAX_CONCURRENT_REQUESTS
+    assert llm.schemas[0] == (group_assignment.EXPLANATION_BATCH_SCHEMA, "json_schema")
+    assert set(explanations) == set(groups)
+    assert explanations["Group3"] == "Group3 shares an interest in renewable energy."
+    # One snapshot per completed batch, each adding to the previous one
+    assert len(snapshots) == llm.calls
+    assert [len(snapshot) for snapshot in snapshots] == sorted(len(snapshot) for snapshot in snapshots)
+    assert snapshots[-1] == explanations
+
+
+def test_unchanged_groups_come_from_cache():
+    clear_explanation_cache()
+    groups, _, profiles = create_groups(6)
+    explain(groups, profiles, FakeStructuredLLM())
+
+    llm = FakeStructuredLLM()
+    explanations = explain(groups, profiles, llm)
+    assert llm.calls == 0 and set(explanations) == set(groups)
+
+    # Editing one student's profile only invalidates that student's group
+    profiles = dict(profiles, Student_1="I now care about urban farming.")
+    llm = FakeStructuredLLM()
+    explain(groups, profiles, llm)
+    assert llm.calls == 1
+
+    # A different strategy is a different prompt context
+    llm = FakeStructuredLLM()
+    explain(groups, profiles, llm, strategy="diverse")
+    assert llm.calls == requests_for(len(groups))
+
+
+def test_rate_limited_requests_are_retried():
+    clear_explanation_cache()
+    base_seconds = group_assignment.EXPLANATION_RETRY_BASE_SECONDS
+    group_assignment.EXPLANATION_RETRY_BASE_SECONDS = 0.01
+    try:
+        groups, _, profiles = create_groups(3)
+        llm = FakeStructuredLLM(rate_limited_calls=2)
+        explanations = explain(groups, profiles, llm)
+    finally:
+        group_assignment.EXPLANATION_RETRY_BASE_SECONDS = base_seconds
+
+    assert llm.calls == 3
+    assert all("renewable energy" in text for text in explanations.values())
+
+
+def test_missing_groups_fall_back_and_are_not_cached():
+    clear_explanation_cache()
+    groups, _, profiles = create_groups(3)
+    explanations = explain(groups, profiles, FakeStructuredLLM(skip_groups={"Group2"}))
+    assert explanations["Group2"] == group_assignment._fallback_explanation("mixed")
+    assert "renewable energy" in explanations["Group1"]
+
+    llm = FakeStructuredLLM()
+    explanations = explain(groups, profiles, llm)
+    assert llm.calls == 1
+    assert "renewable energy" in explanations["Group2"]
+
+
+def test_generate_group_explanations_uses_batched_engine():
+    clear_explanation_cache()
+    groups, students, _ = create_groups(4)
+    llm = FakeStructuredLLM()
+    create_llm = group_assignment._create_explanation_llm
+    api_key = os.environ.get("OPENAI_API_KEY")
+    group_assignment._create_explanation_llm = lambda: llm
+    os.environ["OPENAI_API_KEY"] = "test-key"
+    try:
+        explanations = _generate_group_explanations(groups, students, "mixed")
+    finally:
+        group_assignment._create_explanation_llm = create_llm
+        if api_key is None:
+            os.environ.pop("OPENAI_API_KEY", None)
+        else:
+            os.environ["OPENAI_API_KEY"] = api_key
+
+    assert llm.calls == requests_for(len(groups))
+    assert set(explanations) == set(groups)
+
+
+def test_partial_results_stream_into_execution_history():
+    fd, sqlite_path = tempfile.mkstemp(suffix=".db", prefix="test_explanations_")
+    os.close(fd)
+    from sqlmodel import SQLModel, Session, create_engine, select
+    from models.database.db_models import User, PageDeploymentState, BehaviorExecutionHistory
+    from services import pages_manager
+
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    SQLModel.metadata.create_all(engine)
+    page_deployment = type("FakePageDeployment", (), {"deployment_id": "explanations-deployment"})()
+
+    try:
+        with Session(engine) as db:
+            user = User(email="instructor@example.com", hashed_password="x")
+            db.add(user)
+            db.commit()
+            db.add(PageDeploymentState(deployment_id=page_deployment.deployment_id, state_data={}))
+            db.commit()
+
+            execution_id = pages_manager.start_behavior_execution(page_deployment, db, "1", "group", user.id)
+            assert execution_id
+
+            groups = {"Group1": ["A", "B"], "Group2": ["C", "D"]}
+            pages_manager.record_partial_behavior_result(db, execution_id, {"groups": groups, "explanations": {"Group1": "First."}})
+            record = db.exec(select(BehaviorExecutionHistory).where(BehaviorExecutionHistory.execution_id == execution_id)).one()
+            assert record.execution_result["status"] == "running"
+            assert record.execution_result["explanations"] == {"Group1": "First."}
+
+            pages_manager.record_partial_behavior_result(db, execution_id, {"explanations": {"Group1": "First.", "Group2": "Second."}})
+            db.refresh(record)
+            assert len(record.execution_result["explanations"]) == 2
+            assert record.execution_result["groups"] == groups
+
+            # The final save completes the same record instead of inserting a second one
+            saved_id = asyncio.run(pages_manager.save_behavior_execution(
+                page_deployment, db, "1", "themeCreator", user.id, True, 1.5,
+                {"success": True, "themes": []}, execution_id=execution_id,
+            ))
+            assert saved_id == execution_id
+            records = db.exec(select(BehaviorExecutionHistory)).all()
+            assert len(records) == 1 and records[0].success and "status" not in records[0].execution_result
+    finally:
+        engine.dispose()
+        os.remove(sqlite_path)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing batched group explanations")
+
+    try:
+        test_groups_are_batched_and_streamed()
+        test_unchanged_groups_come_from_cache()
+        test_rate_limited_requests_are_retried()
+        test_missing_groups_fall_back_and_are_not_cached()
+        test_generate_group_explanations_uses_batched_engine()
+        test_partial_results_stream_into_execution_history()
+        print("\n🎉 All group explanation tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
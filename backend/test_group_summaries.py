@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests for background group summaries in live presentations: the response that
+completes a group returns before its summary is generated, summary LLM calls never
+exceed the shared concurrency limit, a group is summarized once while its job is
+in flight, and a summary that times out is replaced by a fallback sent to the
+group and the teachers.
+
+Students connect over fake websockets; the response summarizer is a fake with a
+configurable delay, so no LLM is needed.
+"""
+
+import sys
+import os
+import json
+import asyncio
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types.group_summaries import GroupSummaryQueue
+from services.deployment_types.live_presentation import GROUP_SUMMARY_QUEUE, LivePresentationDeployment
+from services.deployment_types.response_summarizer import SummaryResult
+
+STUDENTS = [f"Student {i}" for i in range(24)]
+GROUPS = {f"Group{g + 1}": STUDENTS[g * 3:(g + 1) * 3] for g in range(8)}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def of_type(self, message_type):
+        return [message for message in self.sent if message["type"] == message_type]
+
+
+class SlowSummarizer:
+    """Stands in for ResponseSummarizer; records how many calls overlap"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def summarize_responses(self, question_context, student_responses, group_by="all", summary_style="comprehensive"):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return SummaryResult(summary_text=f"{len(student_responses)} answers", key_themes=["rivers"],
+                             student_count=len(student_responses))
+
+
+def use_queue(max_concurrent, timeout_seconds):
+    """Point the shared queue at test limits; returns a function restoring the originals"""
+    original = (GROUP_SUMMARY_QUEUE.max_concurrent, GROUP_SUMMARY_QUEUE.timeout_seconds)
+    GROUP_SUMMARY_QUEUE.max_concurrent, GROUP_SUMMARY_QUEUE.timeout_seconds = max_concurrent, timeout_seconds
+    GROUP_SUMMARY_QUEUE._semaphore = None
+
+    def restore():
+        GROUP_SUMMARY_QUEUE.max_concurrent, GROUP_SUMMARY_QUEUE.timeout_seconds = original
+        GROUP_SUMMARY_QUEUE._semaphore = None
+    return restore
+
+
+async def make_presentation(deployment_id, summarizer):
+    presentation = LivePresentationDeployment({"title": "Lecture"}, deployment_id)
+    presentation.input_variable_data = GROUPS
+    presentation._response_summarizer = summarizer
+    presentation.presentation_active = True
+    presentation.current_prompt = {"id": "p1", "statement": "What did you notice?"}
+
+    sockets = {}
+    for name in STUDENTS:
+        sockets[name] = FakeWebSocket()
+        assert await presentation.connect_student(f"id-{name}", name, sockets[name])
+    teacher = FakeWebSocket()
+    presentation.teacher_websockets.add(teacher)
+    return presentation, sockets, teacher
+
+
+async def respond(presentation, name, prompt_id="p1"):
+    await presentation.handle_student_message(f"id-{name}", {"type": "student_response", "prompt_id": prompt_id, "response": f"{name} saw rivers"})
+
+
+def test_response_returns_before_summary_is_generated():
+    async def scenario():
+        restore = use_queue(max_concurrent=4, timeout_seconds=5)
+        summarizer = SlowSummarizer(delay=0.3)
+        presentation, sockets, teacher = await make_presentation("deploy-summaries-1", summarizer)
+        try:
+            for name in GROUPS["Group1"][:-1]:
+                await respond(presentation, name)
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await respond(presentation, GROUPS["Group1"][-1])
+            assert loop.time() - start < 0.2
+            assert GROUP_SUMMARY_QUEUE.pending_count("deploy-summaries-1") == 1
+
+            await GROUP_SUMMARY_QUEUE.wait("deploy-summaries-1")
+            for name in GROUPS["Group1"]:
+                summary = sockets[name].of_type("group_summary")[-1]
+                assert summary["summary"]["text"] == "3 answers" and summary["summary"]["fallback"] is False
+            assert teacher.of_type("group_summary_generated")[-1]["sent_to_students"] == 3
+        finally:
+            presentation.cleanup()
+            restore()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_summaries_respect_the_shared_limit():
+    async def scenario():
+        restore = use_queue(max_concurrent=3, timeout_seconds=5)
+        summarizer = SlowSummarizer(delay=0.05)
+        # Two presentations share the one limit
+        first, first_sockets, _ = await make_presentation("deploy-summaries-2a", summarizer)
+        second, second_sockets, _ = await make_presentation("deploy-summaries-2b", summarizer)
+        try:
+            await asyncio.gather(*[respond(presentation, name) for presentation in (first, second) for name in STUDENTS])
+            await GROUP_SUMMARY_QUEUE.wait()
+
+            assert summarizer.calls == 16
+            assert summarizer.max_running == 3
+            assert GROUP_SUMMARY_QUEUE.running == 0
+            for sockets in (first_sockets, second_sockets):
+                assert all(len(ws.of_type("group_summary")) == 1 for ws in sockets.values())
+        finally:
+            first.cleanup()
+            second.cleanup()
+            restore()
+
+    asyncio.run(scenario())
+
+
+def test_jobs_are_deduplicated_while_in_flight():
+    async def scenario():
+        queue = GroupSummaryQueue(max_concurrent=2, timeout_seconds=5)
+        runs = []
+
+        async def job():
+            runs.append("Group1")
+            await asyncio.sleep(0.05)
+
+        key = ("deploy-dedup", "p1", "Group1")
+        assert queue.submit(key, job) is True
+        assert queue.submit(key, job) is False
+        assert queue.submit(("deploy-dedup", "p2", "Group1"), job) is True
+        await queue.wait()
+        assert runs == ["Group1", "Group1"]
+
+        # Once a job finished the group can be summarized again (e.g. a re-asked prompt)
+        assert queue.submit(key, job) is True
+        assert queue.cancel("deploy-dedup") == 1
+        await asyncio.sleep(0)
+        assert queue.pending_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_summary_sends_fallback():
+    async def scenario():
+        restore = use_queue(max_concurrent=2, timeout_seconds=0.1)
+        summarizer = SlowSummarizer(delay=5)
+        presentation, sockets, teacher = await make_presentation("deploy-summaries-3", summarizer)
+        try:
+            for name in GROUPS["Group2"]:
+                await respond(presentation, name)
+            await GROUP_SUMMARY_QUEUE.wait("deploy-summaries-3")
+
+            for name in GROUPS["Group2"]:
+                summary = sockets[name].of_type("group_summary")[-1]["summary"]
+                assert summary["fallback"] is True and summary["response_count"] == 3
+                assert f"{GROUPS['Group2'][0]}: {GROUPS['Group2'][0]} saw rivers" in summary["text"]
+            assert teacher.of_type("group_summary_generated")[-1]["summary"]["fallback"] is True
+            # The abandoned LLM call gave its slot back
+            assert GROUP_SUMMARY_QUEUE.running == 0 and summarizer.running == 0
+        finally:
+            presentation.cleanup()
+            restore()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing background group summaries")
+
+    try:
+        test_response_returns_before_summary_is_generated()
+        test_concurrent_summaries_respect_the_shared_limit()
+        test_jobs_are_deduplicated_while_in_flight()
+        test_timed_out_summary_sends_fallback()
+        print("\n🎉 All group summary tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
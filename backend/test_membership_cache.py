@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Tests for the class membership cache in scripts/permission_helpers.py.
+
+Runs against an in-memory SQLite database and counts membership queries. Checks
+that memberships are shared across sessions until the TTL runs out, that the
+create/join/leave/kick routes invalidate them (also for a long-lived session,
+like a websocket's), and that a load racing an invalidation doesn't put its
+stale snapshot back into the cache.
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from api import classes
+from models.database.db_models import User, Class, ClassMembership, ClassRole
+from scripts import permission_helpers
+from scripts.permission_helpers import clear_membership_cache, get_user_memberships, invalidate_user_memberships
+
+
+class MembershipDatabase:
+    """In-memory database that counts the membership snapshot queries it receives"""
+
+    def __enter__(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(self.engine)
+        self.queries = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def count_membership_queries(conn, cursor, statement, parameters, context, executemany):
+            if " ".join(statement.split()).startswith("SELECT classmembership.class_id, classmembership.role FROM"):
+                self.queries += 1
+
+        clear_membership_cache()
+        return self
+
+    def __exit__(self, *exc):
+        clear_membership_cache()
+        self.engine.dispose()
+
+    def session(self):
+        return Session(self.engine)
+
+    def add_user(self, email, **fields):
+        with self.session() as db:
+            user = User(email=email, hashed_password="x", **fields)
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            return user
+
+    def add_class(self, code, members):
+        with self.session() as db:
+            class_obj = Class(code=code, name=f"Class {code}")
+            db.add(class_obj)
+            db.commit()
+            db.add_all([ClassMembership(class_id=class_obj.id, user_id=user.id, role=role) for user, role in members])
+            db.commit()
+            return class_obj.id
+
+
+class FakeClock:
+    """Stands in for the time module in permission_helpers"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def use_clock():
+    clock = FakeClock()
+    original = permission_helpers.time
+    permission_helpers.time = clock
+    return clock, lambda: setattr(permission_helpers, "time", original)
+
+
+def set_role(database, user, class_id, role):
+    """Change a membership without invalidating, like another worker would"""
+    with database.session() as db:
+        membership = db.exec(select(ClassMembership).where(
+            ClassMembership.user_id == user.id, ClassMembership.class_id == class_id
+        )).one()
+        membership.role = role
+        db.add(membership)
+        db.commit()
+
+
+def test_memberships_are_shared_across_sessions_until_the_ttl():
+    clock, restore = use_clock()
+    try:
+        with MembershipDatabase() as database:
+            student = database.add_user("student@example.com")
+            class_id = database.add_class("CACHE1", [(student, ClassRole.STUDENT)])
+
+            with database.session() as db:
+                assert get_user_memberships(student, db) == {class_id: ClassRole.STUDENT}
+                assert get_user_memberships(student, db) == {class_id: ClassRole.STUDENT}
+            assert database.queries == 1
+
+            # A change this process didn't make is picked up once the TTL runs out
+            set_role(database, student, class_id, ClassRole.INSTRUCTOR)
+            with database.session() as db:
+                assert get_user_memberships(student, db) == {class_id: ClassRole.STUDENT}
+            assert database.queries == 1
+
+            clock.now += permission_helpers.MEMBERSHIP_CACHE_TTL_SECONDS + 1
+            with database.session() as db:
+                assert get_user_memberships(student, db) == {class_id: ClassRole.INSTRUCTOR}
+            assert database.queries == 2
+    finally:
+        restore()
+
+
+def test_long_lived_session_sees_invalidations_and_expiry():
+    clock, restore = use_clock()
+    try:
+        with MembershipDatabase() as database:
+            student = database.add_user("student@example.com")
+            class_id = database.add_class("CACHE2", [(student, ClassRole.STUDENT)])
+
+            with database.session() as websocket_db:
+                assert get_user_memberships(student, websocket_db) == {class_id: ClassRole.STUDENT}
+
+                # Another request changes the membership and invalidates with its own session
+                set_role(database, student, class_id, ClassRole.INSTRUCTOR)
+                with database.session() as request_db:
+                    invalidate_user_memberships(student.id, request_db)
+                assert get_user_memberships(student, websocket_db) == {class_id: ClassRole.INSTRUCTOR}
+
+                # Without an invalidation, the session's copy expires with the TTL
+                set_role(database, student, class_id, ClassRole.STUDENT)
+                assert get_user_memberships(student, websocket_db) == {class_id: ClassRole.INSTRUCTOR}
+                clock.now += permission_helpers.MEMBERSHIP_CACHE_TTL_SECONDS + 1
+                assert get_user_memberships(student, websocket_db) == {class_id: ClassRole.STUDENT}
+    finally:
+        restore()
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    with MembershipDatabase() as database:
+        student = database.add_user("student@example.com")
+        class_id = database.add_class("CACHE3", [(student, ClassRole.STUDENT)])
+
+        class RacingSession(Session):
+            """The student leaves (and memberships are invalidated) right after this session reads them"""
+
+            def exec(self, statement, *args, **kwargs):
+                rows = super().exec(statement, *args, **kwargs).all()
+                with database.session() as other_db:
+                    membership = other_db.exec(select(ClassMembership).where(ClassMembership.user_id == student.id)).one()
+                    membership.is_active = False
+                    other_db.add(membership)
+                    other_db.commit()
+                    invalidate_user_memberships(student.id, other_db)
+                return SimpleNamespace(all=lambda: rows)
+
+        with RacingSession(database.engine) as db:
+            # The request that loaded it still gets its snapshot...
+            assert get_user_memberships(student, db) == {class_id: ClassRole.STUDENT}
+        # ...but it isn't stored for everyone else for the rest of the TTL
+        assert student.id not in permission_helpers._MEMBERSHIP_CACHE
+        with database.session() as db:
+            assert get_user_memberships(student, db) == {}
+            assert get_user_memberships(student, db) == {}
+        assert database.queries == 2
+
+
+def test_class_routes_invalidate_memberships():
+    with MembershipDatabase() as database:
+        instructor = database.add_user("instructor@example.com", is_global_instructor=True)
+        student = database.add_user("student@example.com")
+        classmate = database.add_user("classmate@example.com")
+
+        with database.session() as instructor_ws, database.session() as student_ws, database.session() as classmate_ws:
+            # Long-lived sessions holding memberships, like websockets
+            assert get_user_memberships(instructor, instructor_ws) == {}
+            assert get_user_memberships(student, student_ws) == {}
+            assert get_user_memberships(classmate, classmate_ws) == {}
+
+            with database.session() as db:
+                created = classes.create_class(classes.ClassCreateRequest(name="Biology"), current_user=db.get(User, instructor.id), db=db)
+            assert get_user_memberships(instructor, instructor_ws) == {created.id: ClassRole.INSTRUCTOR}
+
+            with database.session() as db:
+                classes.join_class(classes.ClassJoinRequest(join_code=created.code), current_user=db.get(User, student.id), db=db)
+            assert get_user_memberships(student, student_ws) == {created.id: ClassRole.STUDENT}
+
+            with database.session() as db:
+                classes.kick_class_member(created.id, classes.KickMemberRequest(user_id=student.id), current_user=db.get(User, instructor.id), db=db)
+            assert get_user_memberships(student, student_ws) == {}
+
+            with database.session() as db:
+                classes.join_class(classes.ClassJoinRequest(join_code=created.code), current_user=db.get(User, classmate.id), db=db)
+            assert get_user_memberships(classmate, classmate_ws) == {created.id: ClassRole.STUDENT}
+
+            with database.session() as db:
+                classes.leave_class(created.id, current_user=db.get(User, classmate.id), db=db)
+            assert get_user_memberships(classmate, classmate_ws) == {}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the class membership cache")
+
+    try:
+        test_memberships_are_shared_across_sessions_until_the_ttl()
+        test_long_lived_session_sees_invalidations_and_expiry()
+        test_load_racing_an_invalidation_is_not_cached()
+        test_class_routes_invalidate_memberships()
+        print("\n🎉 All membership cache tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared presentation clock: timers are absolute deadlines served by
+one process-wide heap, expiries fire once, cancelled or re-armed timers never
+fire stale events, drift corrections stop at the deadline, and a presentation's
+timer is announced once with its deadline and re-armed from the database.
+
+Timers use sub-second deadlines; students connect over fake websockets.
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from services.deployment_types.presentation_clock import PresentationClock
+from services.deployment_types import live_presentation
+from services.deployment_types.live_presentation import LivePresentationDeployment
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def types(self):
+        return [message["type"] for message in self.sent]
+
+
+def test_one_heap_fires_every_deadline_once():
+    async def scenario():
+        clock = PresentationClock(sync_interval_seconds=0)
+        fired = []
+
+        def on_expire(key):
+            async def callback():
+                fired.append((key, time.time()))
+            return callback
+
+        start = time.time()
+        # 40 classrooms, deadlines out of order
+        for i in range(40):
+            clock.schedule(f"room-{i}", start + 0.05 + (i % 7) * 0.02, on_expire(f"room-{i}"))
+        clock.cancel("room-3")
+        clock.schedule("room-5", start + 0.3, on_expire("room-5-rearmed"))
+
+        await asyncio.sleep(0.45)
+        keys = [key for key, _ in fired]
+        assert len(keys) == len(set(keys)) == 39
+        assert "room-3" not in keys and "room-5" not in keys and "room-5-rearmed" in keys
+        assert all(fired_at >= start + 0.05 for _, fired_at in fired)
+        assert clock.pending_count() == 0
+
+        # An earlier deadline added while the clock sleeps on a later one still fires on time
+        clock.schedule("late", time.time() + 5, on_expire("late"))
+        clock.schedule("early", time.time() + 0.05, on_expire("early"))
+        await asyncio.sleep(0.15)
+        assert fired[-1][0] == "early" and clock.pending_count() == 1
+        clock.cancel("late")
+
+    asyncio.run(scenario())
+
+
+def test_drift_corrections_stop_at_the_deadline():
+    async def scenario():
+        clock = PresentationClock(sync_interval_seconds=0.05)
+        events = []
+
+        async def on_sync():
+            events.append("sync")
+
+        async def on_expire():
+            events.append("expire")
+
+        clock.schedule("room", time.time() + 0.22, on_expire, on_sync)
+        assert 0.1 < clock.remaining_seconds("room") <= 0.22
+        await asyncio.sleep(0.35)
+        assert events[-1] == "expire" and events.count("expire") == 1
+        assert 3 <= events.count("sync") <= 4
+        assert clock.remaining_seconds("room") is None
+
+    asyncio.run(scenario())
+
+
+def test_presentation_timer_is_a_deadline():
+    async def scenario():
+        presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-clock")
+        presentation.presentation_active = True
+        student = FakeWebSocket()
+        await presentation.connect_student("id-1", "Ada", student)
+
+        await presentation.start_timer(0, 1)
+        started = [message for message in student.sent if message["type"] == "timer_started"][-1]
+        ends_at = datetime.fromisoformat(started["ends_at"])
+        assert ends_at - datetime.fromisoformat(started["start_time"]) == timedelta(seconds=1)
+        assert started["remaining_seconds"] == 1 and "server_time" in started
+        assert presentation.get_presentation_stats()["timer"]["ends_at"] == started["ends_at"]
+
+        # Late joiners get the running timer once, with the same deadline
+        late = FakeWebSocket()
+        await presentation.connect_student("id-2", "Grace", late)
+        assert [m["ends_at"] for m in late.sent if m["type"] == "timer_started"] == [started["ends_at"]]
+
+        await asyncio.sleep(1.2)
+        assert student.types().count("timer_expired") == 1 and "timer_update" not in student.types()
+        assert not presentation.timer_active and presentation.timer_remaining_seconds == 0
+
+        # A stopped timer never expires
+        await presentation.start_timer(0, 1)
+        await presentation.stop_timer()
+        await asyncio.sleep(1.1)
+        assert student.types().count("timer_expired") == 1 and student.types()[-1] == "timer_stopped"
+        assert live_presentation.PRESENTATION_CLOCK.remaining_seconds(presentation._timer_key) is None
+
+    asyncio.run(scenario())
+
+
+def test_running_timer_is_rearmed_from_the_database():
+    from models.database.live_presentation_models import LivePresentationSession
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[LivePresentationSession.__table__])
+    with Session(engine) as db:
+        ends_at = datetime.now(timezone.utc) + timedelta(seconds=90)
+        db.add(LivePresentationSession(deployment_id="deploy-restart", presentation_active=True,
+                                       timer_ends_at=ends_at, timer_duration_seconds=120))
+        db.commit()
+
+        async def scenario():
+            presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-restart")
+            presentation._db_session = db
+            await presentation.restore_from_database()
+            assert presentation.timer_active and presentation.timer_duration_seconds == 120
+            assert 88 <= presentation.timer_remaining_seconds <= 90
+            assert 88 <= live_presentation.PRESENTATION_CLOCK.remaining_seconds(presentation._timer_key) <= 90
+
+            await presentation.stop_timer()
+            assert db.get(LivePresentationSession, 1).timer_ends_at is None
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the presentation clock")
+
+    try:
+        test_one_heap_fires_every_deadline_once()
+        test_drift_corrections_stop_at_the_deadline()
+        test_presentation_timer_is_a_deadline()
+        test_running_timer_is_rearmed_from_the_database()
+        print("\n🎉 All presentation clock tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
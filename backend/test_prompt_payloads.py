@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Tests for prepared prompt payloads in live presentations: a prompt's per-group
+payloads (list item, group submissions) are computed once per group when it is
+sent, late joiners and roomcast resyncs reuse them without list variable or
+submission lookups, and replacing the group data re-prepares the payloads while
+keeping the list items already dealt.
+
+Students and roomcast devices connect over fake websockets; no database is used.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import subprocess
+from types import SimpleNamespace
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types.live_presentation import LivePresentationDeployment, StudentConnection
+from services.deployment_types.prompt_payloads import PreparedPrompt, SubmissionIndex
+
+STUDENTS = [f"Student {i}" for i in range(300)]
+GROUPS = {f"Group{g + 1}": STUDENTS[g * 5:(g + 1) * 5] for g in range(60)}
+THEMES = [{"title": f"Theme {t}", "description": f"About {t}"} for t in range(12)]
+SUBMISSIONS = {
+    "students": [
+        {"name": name, "submission_responses": {
+            "submission_0": {"response": f"site of {name}", "media_type": "text"},
+            "submission_1": {"response": f"notes of {name}", "media_type": "text"},
+        }}
+        for name in STUDENTS
+    ]
+}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def of_type(self, message_type):
+        return [message for message in self.sent if message["type"] == message_type]
+
+
+async def make_presentation():
+    presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-payloads")
+    presentation.input_variable_data = GROUPS
+    presentation._submission_data = SUBMISSIONS
+    presentation._response_summarizer = None
+    presentation._parent_page_deployment = SimpleNamespace()
+    presentation._list_variable_cache["themes"] = THEMES
+    presentation.presentation_active = True
+
+    sockets = {}
+    for i, name in enumerate(STUDENTS[:-5]):  # Group60 joins late
+        sockets[name] = FakeWebSocket()
+        await presentation.connect_student(f"id-{i}", name, sockets[name])
+    return presentation, sockets
+
+
+def count_calls(presentation, method_name):
+    calls = []
+    original = getattr(presentation, method_name)
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    setattr(presentation, method_name, counted)
+    return calls
+
+
+def test_list_items_are_dealt_once_and_reused_for_late_joiners():
+    async def scenario():
+        presentation, sockets = await make_presentation()
+        member_lookups = count_calls(presentation, "_get_group_members")
+        await presentation.send_prompt_to_students({
+            "id": "p-themes", "statement": "Discuss your theme", "useRandomListItem": True,
+            "selectedListVariable": "themes", "include_submission_responses": True,
+            "requested_submission_indices": [0],
+        })
+
+        items = {}
+        for group_name, members in GROUPS.items():
+            for name in members[:4] if group_name == "Group60" else members:
+                prompt = sockets.get(name).of_type("prompt_received")[-1]["prompt"] if name in sockets else None
+                if prompt is None:
+                    continue
+                items.setdefault(group_name, prompt["assigned_list_item"])
+                assert prompt["assigned_list_item"] == items[group_name]
+                assert set(prompt["group_submission_responses"]) == set(members)
+                assert all(set(responses) == {"submission_0"} for responses in prompt["group_submission_responses"].values())
+        assert len(items) == 59 and len(member_lookups) == 59
+        assert "group_submission_responses" not in presentation.current_prompt
+
+        # Late joiners reuse the deal: no list variable lookup, the group's item, the next item for a new group
+        presentation._get_list_variable_data = None
+        late = StudentConnection("id-late", GROUPS["Group1"][0], FakeWebSocket())
+        presentation._assign_group_info_to_student(late)
+        assert await presentation._get_list_item_for_late_joining_student(late, "p-themes", "themes") == items["Group1"]
+        newcomer = StudentConnection("id-299", STUDENTS[299], FakeWebSocket())
+        presentation._assign_group_info_to_student(newcomer)
+        prepared = presentation._prompt_payloads.latest("p-themes")
+        expected = prepared.list_items[59 % len(THEMES)]
+        assert await presentation._get_list_item_for_late_joining_student(newcomer, "p-themes", "themes") == expected
+        fields = presentation._submission_fields_for_student(presentation._prepare_prompt(presentation.current_prompt), late)
+        assert set(fields["group_submission_responses"]) == set(GROUPS["Group1"])
+        assert len(member_lookups) == 59
+
+        # A roomcast resync gets the group's item and submissions from the same payloads
+        group_payload = prepared.groups["Group7"]
+        display = FakeWebSocket()
+        presentation.roomcast_devices["Group7"] = {"websocket": display}
+        await presentation._resync_roomcast_device_state("Group7", "p-themes")
+        prompt = display.of_type("roomcast_prompt")[-1]["prompt"]
+        assert prompt["assigned_list_item"] == items["Group7"]
+        assert set(prompt["group_submission_responses"]) == set(GROUPS["Group7"])
+        assert presentation._prepare_prompt(presentation.current_prompt).groups["Group7"] is group_payload
+
+    asyncio.run(scenario())
+
+
+def test_new_group_data_reprepares_but_keeps_dealt_items():
+    async def scenario():
+        presentation, sockets = await make_presentation()
+        await presentation.send_prompt_to_students({
+            "id": "p-themes", "statement": "Review your theme", "useRandomListItem": True,
+            "selectedListVariable": "themes",
+        })
+        before = presentation._prepare_prompt(presentation.current_prompt)
+        assert presentation._prepare_prompt(presentation.current_prompt) is before
+        dealt = dict(before.item_assignments)
+
+        # The teacher moves a student: payloads are rebuilt, list items stay where they were
+        regrouped = {name: list(members) for name, members in GROUPS.items()}
+        regrouped["Group2"].append(regrouped["Group1"].pop())
+        presentation.set_input_variable_data(regrouped)
+        after = presentation._prepare_prompt(presentation.current_prompt)
+        assert after is not before and after.version > before.version
+        assert after.item_assignments == dealt
+        moved = StudentConnection("id-4", GROUPS["Group1"][4], FakeWebSocket())
+        presentation._assign_group_info_to_student(moved)
+        fields = presentation._submission_fields_for_student(after, moved)
+        assert set(fields["group_submission_responses"]) == set(regrouped["Group2"])
+
+        # Sending the prompt again is a fresh preparation
+        await presentation.send_prompt_to_students({"id": "p-plain", "statement": "Thanks", "isSystemPrompt": True})
+        plain = presentation._prompt_payloads.latest("p-plain")
+        assert plain.list_items is None and not plain.include_responses
+        last = sockets[STUDENTS[0]].of_type("prompt_received")[-1]["prompt"]
+        assert "assigned_list_item" not in last and "group_submission_responses" not in last
+
+    asyncio.run(scenario())
+
+
+def test_submission_index_and_navigation_lookups():
+    index = SubmissionIndex(SUBMISSIONS)
+    assert len(index) == 300
+    assert index.submission("Student 3", "submission_1")["response"] == "notes of Student 3"
+    assert index.submission("Student 3", "prompt_1")["response"] == "notes of Student 3"
+    assert index.submission("Nobody", "submission_0") is None
+    assert set(index.for_group(["Student 1", "Nobody"])) == {"Student 1"}
+
+    prepared = PreparedPrompt(prompt_id="p", version=1)
+    prepared.shuffle_list_items(THEMES)
+    again = PreparedPrompt(prompt_id="p", version=2)
+    again.shuffle_list_items(THEMES)
+    assert prepared.list_items == again.list_items and sorted(t["title"] for t in prepared.list_items) == sorted(t["title"] for t in THEMES)
+
+    async def scenario():
+        presentation, sockets = await make_presentation()
+        presentation._get_submission_data_from_database = None  # data is already cached; no refetch
+        await presentation.send_prompt_to_students({
+            "id": "p-nav", "statement": "Navigate", "enableGroupSubmissionNavigation": True,
+            "submissionPromptId": "submission_0",
+        })
+        prompt = sockets[STUDENTS[5]].of_type("send_prompt")[-1]["prompt"]
+        assert sorted(entry["studentName"] for entry in prompt["groupSubmissions"]) == sorted(GROUPS["Group2"])
+        assert prompt["totalSubmissions"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_list_item_deal_is_the_same_in_every_process():
+    # String hashing is randomized per process; the deal must not depend on it
+    script = (
+        "from services.deployment_types.prompt_payloads import PreparedPrompt\n"
+        "prepared = PreparedPrompt(prompt_id='p-restart', version=1)\n"
+        "prepared.shuffle_list_items(list(range(12)))\n"
+        "print(prepared.list_items)\n"
+    )
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    deals = {
+        subprocess.run(
+            [sys.executable, "-c", script], cwd=backend_dir, capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": hash_seed},
+        ).stdout
+        for hash_seed in ("1", "2", "3")
+    }
+    assert len(deals) == 1
+
+    prepared = PreparedPrompt(prompt_id="p-restart", version=1)
+    prepared.shuffle_list_items(list(range(12)))
+    assert deals == {f"{prepared.list_items}\n"}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing prepared prompt payloads")
+
+    try:
+        test_list_items_are_dealt_once_and_reused_for_late_joiners()
+        test_new_group_data_reprepares_but_keeps_dealt_items()
+        test_submission_index_and_navigation_lookups()
+        test_list_item_deal_is_the_same_in_every_process()
+        print("\n🎉 All prompt payload tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
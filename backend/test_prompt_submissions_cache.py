@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the prompt submissions cache in api/deployments/deployment_prompt_routes.py.
+
+Runs against an in-memory SQLite database. Checks that new completed sessions
+are picked up through the version stamp, and that the submit and edit routes
+drop the cached snapshot - an edit can leave the stamp unchanged, so without
+the explicit invalidation it would be served stale.
+"""
+
+import sys
+import os
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from api.deployments import deployment_prompt_routes as prompt_routes
+from models.database.db_models import User, Deployment, PromptSession, PromptSubmission
+from models.enums import DeploymentType
+
+DEPLOYMENT_ID = "prompt-cache-deployment"
+REQUIREMENTS = [{"prompt": "Describe your project", "mediaType": "textarea"}]
+
+
+class FakePromptService:
+    """Accepts every textual submission"""
+
+    def is_question_only(self):
+        return False
+
+    def validate_submission(self, submission_index, response):
+        return {"valid": True}
+
+
+class PromptDatabase:
+    """In-memory database with a prompt deployment, and the routes pointed at it"""
+
+    def __enter__(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(self.engine)
+        with self.session() as db:
+            owner = User(email="instructor@example.com", hashed_password="x")
+            db.add(owner)
+            db.commit()
+            deployment = Deployment(
+                deployment_id=DEPLOYMENT_ID, user_id=owner.id, workflow_id=1, class_id=1,
+                workflow_name="Project pitches", config={}, type=DeploymentType.PROMPT, is_open=True,
+            )
+            db.add(deployment)
+            db.commit()
+            self.deployment_pk = deployment.id
+
+        async def get_deployment_and_check_access(deployment_id, current_user, db):
+            return db.exec(select(Deployment).where(Deployment.deployment_id == deployment_id)).one()
+
+        async def ensure_deployment_loaded(deployment_id, user_id, db):
+            return {"mcp_deployment": SimpleNamespace(_prompt_service=FakePromptService())}
+
+        async def run_serialized_write_async(write):
+            with self.session() as write_db:
+                return write(write_db)
+
+        self.originals = {}
+        for name, replacement in (
+            ("get_deployment_and_check_access", get_deployment_and_check_access),
+            ("ensure_deployment_loaded", ensure_deployment_loaded),
+            ("run_serialized_write_async", run_serialized_write_async),
+        ):
+            self.originals[name] = getattr(prompt_routes, name)
+            setattr(prompt_routes, name, replacement)
+        prompt_routes._PROMPT_SUBMISSIONS_CACHE.clear()
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self.originals.items():
+            setattr(prompt_routes, name, original)
+        prompt_routes._PROMPT_SUBMISSIONS_CACHE.clear()
+        self.engine.dispose()
+
+    def session(self):
+        return Session(self.engine)
+
+    def add_student(self, email, response=None, submitted_at=None):
+        """Add a student with a prompt session, completed if a response is given"""
+        with self.session() as db:
+            user = User(email=email, hashed_password="x")
+            db.add(user)
+            db.commit()
+            session = PromptSession(
+                user_id=user.id, deployment_id=self.deployment_pk, main_question="Pitch your project",
+                submission_requirements=REQUIREMENTS,
+                completed_at=datetime.now(timezone.utc) if response is not None else None,
+            )
+            db.add(session)
+            db.commit()
+            if response is not None:
+                submission = PromptSubmission(
+                    session_id=session.id, submission_index=0, prompt_text=REQUIREMENTS[0]["prompt"],
+                    media_type="textarea", user_response=response,
+                )
+                if submitted_at:
+                    submission.submitted_at = submitted_at
+                db.add(submission)
+                db.commit()
+            return user.id
+
+    def texts(self):
+        with self.session() as db:
+            result = prompt_routes.get_all_prompt_submissions_for_deployment(DEPLOYMENT_ID, db)
+        return {student["name"]: student["text"] for student in result["students"]}
+
+
+def test_new_completed_sessions_are_picked_up_by_the_version():
+    with PromptDatabase() as database:
+        database.add_student("alice@example.com", "Solar kettles")
+        assert database.texts() == {"alice@example.com": "Solar kettles"}
+        assert DEPLOYMENT_ID in prompt_routes._PROMPT_SUBMISSIONS_CACHE
+
+        # Written without invalidating, like Celery PDF ingestion in another process
+        database.add_student("bob@example.com", "Bike sharing")
+        assert database.texts() == {"alice@example.com": "Solar kettles", "bob@example.com": "Bike sharing"}
+
+
+def test_edit_at_an_unchanged_version_is_not_served_stale():
+    with PromptDatabase() as database:
+        alice_id = database.add_student("alice@example.com", "First draft")
+        # The latest submission, so an edit of alice's keeps count and max(submitted_at) as they are
+        database.add_student("bob@example.com", "Bike sharing", submitted_at=datetime(2100, 1, 1))
+        assert database.texts()["alice@example.com"] == "First draft"
+        version = prompt_routes._PROMPT_SUBMISSIONS_CACHE[DEPLOYMENT_ID][0]
+
+        # The version stamp alone can't see such an edit...
+        with database.session() as db:
+            submission = db.exec(select(PromptSubmission).where(PromptSubmission.user_response == "First draft")).one()
+            submission.user_response = "Unseen draft"
+            submission.submitted_at = datetime.now(timezone.utc)
+            db.add(submission)
+            db.commit()
+            assert prompt_routes._get_prompt_submissions_version(database.deployment_pk, db) == version
+        assert database.texts()["alice@example.com"] == "First draft"
+
+        # ...so the edit route has to drop the snapshot itself
+        async def scenario():
+            with database.session() as db:
+                await prompt_routes.edit_prompt_response(
+                    DEPLOYMENT_ID,
+                    prompt_routes.PromptEditSubmissionRequest(submission_index=0, response="Second draft"),
+                    current_user=db.get(User, alice_id),
+                    db=db,
+                )
+
+        asyncio.run(scenario())
+        assert DEPLOYMENT_ID not in prompt_routes._PROMPT_SUBMISSIONS_CACHE
+        assert database.texts()["alice@example.com"] == "Second draft"
+
+
+def test_submit_drops_the_cached_submissions():
+    with PromptDatabase() as database:
+        database.add_student("alice@example.com", "Solar kettles")
+        bob_id = database.add_student("bob@example.com")
+        assert database.texts() == {"alice@example.com": "Solar kettles"}
+
+        async def scenario():
+            with database.session() as db:
+                await prompt_routes.submit_prompt_response(
+                    DEPLOYMENT_ID,
+                    prompt_routes.PromptSubmissionRequest(submission_index=0, response="Bike sharing"),
+                    current_user=db.get(User, bob_id),
+                    db=db,
+                )
+
+        asyncio.run(scenario())
+        assert DEPLOYMENT_ID not in prompt_routes._PROMPT_SUBMISSIONS_CACHE
+        assert database.texts() == {"alice@example.com": "Solar kettles", "bob@example.com": "Bike sharing"}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the prompt submissions cache")
+
+    try:
+        test_new_completed_sessions_are_picked_up_by_the_version()
+        test_edit_at_an_unchanged_version_is_not_served_stale()
+        test_submit_drops_the_cached_submissions()
+        print("\n🎉 All prompt submissions cache tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
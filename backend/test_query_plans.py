@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Query plan regression tests for hot database lookups.
+
+Seeds an in-memory SQLite database, applies the index migration on top of a
+schema created without the composite indexes (as an existing deployment would
+have), then runs EXPLAIN QUERY PLAN on the queries the API issues most often.
+A test fails if any of them degrades to a full table scan.
+"""
+
+import sys
+import os
+import datetime as dt
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from models.database.db_models import (
+    User, Class, ClassMembership, Deployment, Problem, Submission,
+    PromptSession, PromptSubmission, ChatConversation, ChatMessage,
+    LivePresentationSession, LivePresentationStudentConnection, LivePresentationResponse,
+    ClassRole,
+)
+import database.database as database_module
+
+
+def _create_seeded_engine():
+    engine = create_engine("sqlite://")
+
+    # Build the schema without the composite indexes, like a database created
+    # before they were declared, and let the migration add them
+    composite_indexes = []
+    for table in SQLModel.metadata.sorted_tables:
+        for index in list(table.indexes):
+            if index.name and index.name.startswith("ix_") and len(index.columns) > 1:
+                composite_indexes.append((table, index))
+                table.indexes.discard(index)
+    try:
+        SQLModel.metadata.create_all(engine)
+    finally:
+        for table, index in composite_indexes:
+            table.indexes.add(index)
+
+    with engine.begin() as conn:
+        database_module._apply_index_migrations(conn)
+
+    now = dt.datetime.now(dt.timezone.utc)
+    with Session(engine) as db:
+        users = [User(email=f"student{i}@example.com", hashed_password="x") for i in range(50)]
+        db.add_all(users)
+        class_obj = Class(code="PLAN01", name="Query Plans")
+        db.add(class_obj)
+        db.commit()
+
+        db.add_all([
+            ClassMembership(class_id=class_obj.id, user_id=user.id, role=ClassRole.STUDENT)
+            for user in users
+        ])
+        deployments = [
+            Deployment(
+                deployment_id=f"plan-deployment-{d}",
+                user_id=users[0].id,
+                workflow_id=1,
+                class_id=class_obj.id,
+                workflow_name="Plans",
+                config={},
+                collection_name="plans",
+            )
+            for d in range(10)
+        ]
+        problems = [
+            Problem(title=f"Problem {p}", description="", class_id=class_obj.id, created_by_id=users[0].id)
+            for p in range(10)
+        ]
+        db.add_all(deployments + problems)
+        db.commit()
+
+        for i, user in enumerate(users):
+            for problem in problems:
+                for attempt in range(3):
+                    db.add(Submission(user_id=user.id, problem_id=problem.id, code="pass",
+                                      submitted_at=now + dt.timedelta(minutes=attempt)))
+            for deployment in deployments:
+                session = PromptSession(
+                    user_id=user.id,
+                    deployment_id=deployment.id,
+                    main_question="Why?",
+                    submission_requirements=[],
+                    completed_at=now if i % 2 == 0 else None,
+                )
+                db.add(session)
+                db.flush()
+                db.add(PromptSubmission(session_id=session.id, submission_index=0, prompt_text="Why?",
+                                        media_type="textarea", user_response="Because"))
+
+                conversation = ChatConversation(deployment_id=deployment.deployment_id, user_id=user.id, workflow_name="Plans")
+                db.add(conversation)
+                db.flush()
+                db.add_all([
+                    ChatMessage(conversation_id=conversation.id, message_text=f"message {m}", is_user_message=m % 2 == 0)
+                    for m in range(4)
+                ])
+        db.commit()
+
+        for l in range(10):
+            live_session = LivePresentationSession(deployment_id=f"plan-live-{l}")
+            db.add(live_session)
+            db.flush()
+            for user in users:
+                connection = LivePresentationStudentConnection(
+                    session_id=live_session.id, user_id=str(user.id), user_name=user.email
+                )
+                db.add(connection)
+                db.flush()
+                db.add_all([
+                    LivePresentationResponse(session_id=live_session.id, student_connection_id=connection.id,
+                                             prompt_id=f"prompt-{p}", response_text="answer")
+                    for p in range(5)
+                ])
+        db.commit()
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    return engine
+
+
+def _query_plan(engine, statement):
+    compiled = statement.compile(dialect=engine.dialect)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(compiled.params[name] for name in compiled.positiontup)).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _assert_no_full_scan(engine, label, statement, expected_index=None):
+    plan = _query_plan(engine, statement)
+    print(f"{label}:")
+    for detail in plan:
+        print(f"    {detail}")
+
+    scans = [detail for detail in plan if detail.startswith("SCAN ")]
+    assert not scans, f"{label} degraded to a full scan: {scans}"
+    if expected_index:
+        assert any(expected_index in detail for detail in plan), f"{label} does not use {expected_index}: {plan}"
+
+
+def test_hot_queries_use_indexes():
+    engine = _create_seeded_engine()
+
+    _assert_no_full_scan(
+        engine,
+        "Latest code submission for a student",
+        select(Submission)
+        .where(Submission.problem_id == 1, Submission.user_id == 2)
+        .order_by(Submission.submitted_at.desc())
+        .limit(1),
+        expected_index="ix_submission_problem_user_submitted",
+    )
+    _assert_no_full_scan(
+        engine,
+        "Submissions for a problem",
+        select(Submission).where(Submission.problem_id == 1).order_by(Submission.submitted_at.asc()),
+        expected_index="ix_submission_problem_user_submitted",
+    )
+    _assert_no_full_scan(
+        engine,
+        "Completed prompt sessions with submissions",
+        select(PromptSession, User.email, PromptSubmission)
+        .join(User, PromptSession.user_id == User.id)
+        .join(PromptSubmission, PromptSubmission.session_id == PromptSession.id)
+        .where(
+            PromptSession.deployment_id == 1,
+            PromptSession.is_active == True,
+            PromptSession.completed_at.isnot(None),
+        )
+        .order_by(PromptSession.id, PromptSubmission.submission_index),
+        expected_index="ix_promptsession_deployment_active_completed",
+    )
+    _assert_no_full_scan(
+        engine,
+        "Membership snapshot for a user",
+        select(ClassMembership.class_id, ClassMembership.role).where(
+            ClassMembership.user_id == 3,
+            ClassMembership.is_active == True,
+        ),
+        expected_index="ix_classmembership_user_class_active",
+    )
+    _assert_no_full_scan(
+        engine,
+        "Membership in a class",
+        select(ClassMembership).where(
+            ClassMembership.user_id == 3,
+            ClassMembership.class_id == 1,
+            ClassMembership.is_active == True,
+        ),
+    )
+    _assert_no_full_scan(
+        engine,
+        "Live responses for a prompt",
+        select(LivePresentationResponse).where(
+            LivePresentationResponse.session_id == 1,
+            LivePresentationResponse.prompt_id == "prompt-1",
+        ),
+    )
+    _assert_no_full_scan(
+        engine,
+        "Active live responses for a session",
+        select(LivePresentationResponse).where(
+            LivePresentationResponse.session_id == 1,
+            LivePresentationResponse.is_active == True,
+        ),
+        expected_index="ix_livepresentationresponse_session_prompt",
+    )
+    _assert_no_full_scan(
+        engine,
+        "Messages in a conversation",
+        select(ChatMessage).where(ChatMessage.conversation_id == 1).order_by(ChatMessage.created_at.asc()),
+        expected_index="ix_chatmessage_conversation_created",
+    )
+
+
+def test_index_migration_is_idempotent():
+    engine = _create_seeded_engine()
+    with engine.begin() as conn:
+        database_module._apply_index_migrations(conn)
+        names = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type='index'")}
+
+    for expected in (
+        "ix_submission_problem_user_submitted",
+        "ix_promptsession_deployment_active_completed",
+        "ix_classmembership_user_class_active",
+        "ix_livepresentationresponse_session_prompt",
+        "ix_chatmessage_conversation_created",
+    ):
+        assert expected in names, f"Missing index {expected}"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing query plans for hot lookups")
+
+    try:
+        test_hot_queries_use_indexes()
+        test_index_migration_is_idempotent()
+        print("\n🎉 All query plan tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
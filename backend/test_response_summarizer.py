@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent, batched and cached response summaries.
+
+Uses a fake chat model (plain and structured-output), so no OpenAI key or
+network access is needed. Checks that per-group and per-student summaries run
+concurrently within the semaphore, that batched mode packs several items per
+request within the token budget, that items a batched response leaves out are
+summarized on their own, and that unchanged response sets come from the cache.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types import response_summarizer
+from services.deployment_types.response_summarizer import (
+    QuestionContext, ResponseSummarizer, StudentResponse, clear_summary_cache,
+)
+
+QUESTION = QuestionContext(question_text="How should the city adapt to flooding?")
+
+
+class FakeChatModel:
+    """Stands in for ChatOpenAI: plain calls answer in SUMMARY/KEY_THEMES form, structured calls per item."""
+
+    def __init__(self, delay_seconds: float = 0.05, skip_items=()):
+        self.delay_seconds = delay_seconds
+        self.skip_items = set(skip_items)
+        self.calls = 0
+        self.batched_calls = 0
+        self.batch_sizes = []
+        self.active = 0
+        self.peak_active = 0
+
+    def with_structured_output(self, schema, method=None, strict=None):
+        assert schema is response_summarizer.SUMMARY_BATCH_SCHEMA and method == "json_schema"
+        return FakeStructuredModel(self)
+
+    async def _call(self):
+        self.calls += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.delay_seconds)
+        finally:
+            self.active -= 1
+
+    async def ainvoke(self, messages):
+        await self._call()
+        scope = messages[-1].content.split("summary for ", 1)[1].split(".\n", 1)[0]
+        return type("Message", (), {"content": f"SUMMARY:\n{scope} talked about levees.\n\nKEY_THEMES:\n- Levees\n- Zoning"})()
+
+
+class FakeStructuredModel:
+    def __init__(self, model):
+        self.model = model
+
+    async def ainvoke(self, messages):
+        await self.model._call()
+        self.model.batched_calls += 1
+        prompt = messages[-1].content
+        sections = prompt.split("### ")[1:]
+        self.model.batch_sizes.append(len(sections))
+        summaries = []
+        for section in sections:
+            item_id = section.splitlines()[0].strip()
+            scope = section.splitlines()[1].replace("Scope: ", "")
+            if scope in self.model.skip_items:
+                continue
+            summaries.append({"item_id": item_id, "summary": f"{scope} talked about levees.", "key_themes": ["Levees"]})
+        # Malformed and unknown entries are ignored
+        summaries.append({"item_id": "item_99", "summary": "Not asked for", "key_themes": []})
+        summaries.append({"item_id": "item_1", "summary": "", "key_themes": None})
+        return {"summaries": summaries}
+
+
+def make_responses(count: int, group_size: int = 5, words: int = 20):
+    return [
+        StudentResponse(
+            student_id=f"s{i}",
+            student_name=f"Name{i}",
+            response_text=" ".join(["We should build higher levees and restrict building in flood zones."] * (words // 10 or 1)),
+            group_id=f"Group{i // group_size + 1}"
+        )
+        for i in range(count)
+    ]
+
+
+def summarize(summarizer, responses, group_by, batched=False):
+    return asyncio.run(summarizer.summarize_responses(QUESTION, responses, group_by=group_by, summary_style="brief", batched=batched))
+
+
+def test_individual_summaries_run_concurrently():
+    clear_summary_cache()
+    llm = FakeChatModel(delay_seconds=0.05)
+    summarizer = ResponseSummarizer(max_concurrent=4, llm=llm)
+    responses = make_responses(20)
+
+    results = summarize(summarizer, responses, "individual")
+
+    assert llm.calls == 20 and llm.peak_active == 4
+    assert [result.summary_text for result in results] == [f"Student Name{i} talked about levees." for i in range(20)]
+    assert results[7].group_id == "Group2" and results[7].student_count == 1
+    assert results[0].key_themes == ["Levees", "Zoning"]
+
+
+def test_batched_mode_packs_items_within_budget():
+    clear_summary_cache()
+    llm = FakeChatModel()
+    summarizer = ResponseSummarizer(max_tokens=2000, llm=llm)
+    responses = make_responses(40)
+
+    results = summarize(summarizer, responses, "group", batched=True)
+
+    assert len(results) == 8
+    assert [result.group_id for result in results] == [f"Group{g + 1}" for g in range(8)]
+    assert all(result.student_count == 5 for result in results)
+    assert results[2].summary_text == "Group Group3 talked about levees."
+    # max_tokens 2000 leaves room for 8 summaries of 250 tokens: one request
+    assert llm.calls == 1 and llm.batch_sizes == [8]
+
+    # A small token budget splits the same groups across more requests
+    clear_summary_cache()
+    budget = response_summarizer.SUMMARY_BATCH_TOKEN_BUDGET
+    response_summarizer.SUMMARY_BATCH_TOKEN_BUDGET = 450
+    try:
+        llm = FakeChatModel()
+        summarize(ResponseSummarizer(max_tokens=2000, llm=llm), responses, "group", batched=True)
+    finally:
+        response_summarizer.SUMMARY_BATCH_TOKEN_BUDGET = budget
+    # About 200 tokens of responses per group: two groups per request
+    assert llm.calls == 4 and llm.batch_sizes == [2, 2, 2, 2]
+
+
+def test_items_missing_from_a_batch_are_summarized_alone():
+    clear_summary_cache()
+    llm = FakeChatModel(skip_items={"Student Name3"})
+    summarizer = ResponseSummarizer(max_tokens=2000, llm=llm)
+
+    results = summarize(summarizer, make_responses(6), "individual", batched=True)
+
+    assert llm.batched_calls == 1 and llm.calls == 2
+    assert results[3].summary_text == "Student Name3 talked about levees."
+    assert results[3].key_themes == ["Levees", "Zoning"]
+
+
+def test_unchanged_responses_come_from_cache():
+    clear_summary_cache()
+    responses = make_responses(15)
+    summarize(ResponseSummarizer(llm=FakeChatModel()), responses, "group")
+
+    llm = FakeChatModel()
+    results = summarize(ResponseSummarizer(llm=llm), responses, "group", batched=True)
+    assert llm.calls == 0 and results[1].summary_text == "Group Group2 talked about levees."
+
+    # Editing one response only re-summarizes that student's group
+    responses[6].response_text = "Move the library out of the flood plain."
+    llm = FakeChatModel()
+    summarize(ResponseSummarizer(llm=llm), responses, "group")
+    assert llm.calls == 1
+
+    # Summarizing everyone together is cached too
+    llm = FakeChatModel()
+    summarizer = ResponseSummarizer(llm=llm)
+    first = asyncio.run(summarizer.summarize_responses(QUESTION, responses, group_by="all"))
+    second = asyncio.run(summarizer.summarize_responses(QUESTION, responses, group_by="all"))
+    assert llm.calls == 1 and first.summary_text == second.summary_text
+
+
+if __name__ == "__main__":
+    print("🧪 Testing concurrent and batched response summaries")
+
+    try:
+        test_individual_summaries_run_concurrently()
+        test_batched_mode_packs_items_within_budget()
+        test_items_missing_from_a_batch_are_summarized_alone()
+        test_unchanged_responses_come_from_cache()
+        print("\n🎉 All response summarizer tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Tests for streamed uploads: chunked staging with incremental size limits and
+hashing, atomic store_file from bytes/streams/staged files, and resumable
+chunked upload sessions.
+
+Storage and temp directories are redirected to a temporary directory, and
+uploads are FastAPI UploadFile objects over in-memory buffers.
+"""
+
+import sys
+import os
+import io
+import asyncio
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import UploadFile
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from api import file_storage
+from models.database.db_models import StoredBlob
+from api.file_storage import (
+    FileTooLargeError,
+    UploadSessionConflictError,
+    UploadSessionError,
+    append_upload_chunk,
+    create_upload_session,
+    delete_upload_session,
+    finish_upload_session,
+    get_upload_session,
+    stage_upload,
+    store_file,
+)
+
+
+class TemporaryStorage:
+    """Points the storage, temp and upload session directories at a temp dir (blob refcounts in an in-memory DB)."""
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine, tables=[StoredBlob.__table__])
+
+        def run_write(write):
+            with Session(engine) as session:
+                return write(session)
+
+        self.saved = (file_storage.STORAGE_BASE_DIR, file_storage.UPLOADS_TEMP_DIR, file_storage.UPLOAD_SESSIONS_DIR, file_storage.UPLOAD_CHUNK_SIZE, file_storage.run_serialized_write)
+        file_storage.run_serialized_write = run_write
+        file_storage.STORAGE_BASE_DIR = root / "uploads"
+        file_storage.UPLOADS_TEMP_DIR = root / "temp"
+        file_storage.UPLOAD_SESSIONS_DIR = root / "temp" / "upload_sessions"
+        file_storage.UPLOAD_CHUNK_SIZE = 1024
+        return root
+
+    def __exit__(self, *exc):
+        (file_storage.STORAGE_BASE_DIR, file_storage.UPLOADS_TEMP_DIR, file_storage.UPLOAD_SESSIONS_DIR,
+         file_storage.UPLOAD_CHUNK_SIZE, file_storage.run_serialized_write) = self.saved
+        self.tmp.cleanup()
+
+
+class CountingBuffer(io.BytesIO):
+    """Records the size of every read, to check uploads are consumed in chunks."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+async def body_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_stage_upload_streams_in_chunks_and_hashes():
+    data = os.urandom(5000)
+    with TemporaryStorage() as root:
+        buffer = CountingBuffer(data)
+        staged = asyncio.run(stage_upload(UploadFile(buffer, filename="notes.pdf"), "upload", max_bytes=10_000))
+
+        assert staged.path.parent == root / "temp" and staged.path.name.endswith("_notes.pdf")
+        assert staged.path.read_bytes() == data
+        assert staged.size == 5000
+        assert staged.sha256 == hashlib.sha256(data).hexdigest()
+        assert buffer.reads and all(0 < size <= 1024 for size in buffer.reads)
+        assert not list((root / "temp").glob("*.part"))
+
+
+def test_stage_upload_stops_at_size_limit():
+    with TemporaryStorage() as root:
+        buffer = CountingBuffer(b"x" * 50_000)
+        try:
+            asyncio.run(stage_upload(UploadFile(buffer, filename="big.pdf"), "upload", max_bytes=2048))
+        except FileTooLargeError:
+            pass
+        else:
+            raise AssertionError("Expected FileTooLargeError")
+
+        # Rejected after the limit was crossed, without reading the rest, and nothing left behind
+        assert len(buffer.reads) == 3
+        assert not any((root / "temp").iterdir())
+
+
+def test_store_file_from_bytes_stream_and_staged_file():
+    with TemporaryStorage() as root:
+        path = store_file(b"abc", 1, "u1", "a.pdf")
+        assert path == os.path.join("1", "u1", "a.pdf")
+        assert (root / "uploads" / path).read_bytes() == b"abc"
+
+        stream_data = os.urandom(4000)
+        path = store_file(io.BytesIO(stream_data), 1, "u2", "b.pdf")
+        assert (root / "uploads" / path).read_bytes() == stream_data
+
+        staged = root / "staged.mp4"
+        staged.write_bytes(b"video")
+        path = store_file(staged, 2, "u3", "c.mp4")
+        assert staged.exists(), "a staged file is copied unless move=True"
+        path = store_file(staged, 2, "u4", "d.mp4", move=True)
+        assert not staged.exists()
+        assert (root / "uploads" / path).read_bytes() == b"video"
+
+        # Only finished files are ever visible in storage
+        assert not list((root / "uploads").rglob("*.part"))
+
+
+def test_resumable_session_accepts_chunks_in_order():
+    data = os.urandom(3000)
+    with TemporaryStorage():
+        session = create_upload_session(7, len(data), {"filename": "lecture.mp4", "workflow_id": 3})
+        session_id = session["session_id"]
+        assert session["received"] == 0 and session["chunk_size"] == 1024
+
+        assert asyncio.run(append_upload_chunk(session_id, 0, body_chunks(data[:1000], data[1000:1200]))) == 1200
+
+        # A retried chunk at a stale offset is refused; the client resumes from "received"
+        try:
+            asyncio.run(append_upload_chunk(session_id, 0, body_chunks(data[:1000])))
+        except UploadSessionError:
+            pass
+        else:
+            raise AssertionError("Expected UploadSessionError for a stale offset")
+        assert get_upload_session(session_id)["received"] == 1200
+
+        try:
+            finish_upload_session(session_id)
+        except UploadSessionError as e:
+            assert "1200 of 3000" in str(e)
+        else:
+            raise AssertionError("Expected UploadSessionError for an incomplete upload")
+
+        asyncio.run(append_upload_chunk(session_id, 1200, body_chunks(data[1200:])))
+        staged = finish_upload_session(session_id, expected_sha256=hashlib.sha256(data).hexdigest())
+        assert staged.size == 3000 and staged.path.read_bytes() == data
+        assert get_upload_session(session_id)["metadata"] == {"filename": "lecture.mp4", "workflow_id": 3}
+
+        assert delete_upload_session(session_id)
+        assert get_upload_session(session_id) is None
+
+
+def test_resumable_session_rejects_overflow_and_bad_hash():
+    with TemporaryStorage():
+        session_id = create_upload_session(7, 100, {})["session_id"]
+
+        # A chunk that runs past the declared size is rolled back entirely
+        try:
+            asyncio.run(append_upload_chunk(session_id, 0, body_chunks(b"a" * 60, b"b" * 60)))
+        except UploadSessionError:
+            pass
+        else:
+            raise AssertionError("Expected UploadSessionError for too much data")
+        assert get_upload_session(session_id)["received"] == 0
+
+        asyncio.run(append_upload_chunk(session_id, 0, body_chunks(b"a" * 100)))
+        try:
+            finish_upload_session(session_id, expected_sha256="0" * 64)
+        except UploadSessionError:
+            pass
+        else:
+            raise AssertionError("Expected UploadSessionError for a SHA-256 mismatch")
+
+        # Session ids are hex tokens; anything else never reaches the filesystem
+        assert get_upload_session("../secrets") is None
+        assert not delete_upload_session("../secrets")
+
+
+def test_concurrent_appends_to_one_session_conflict():
+    async def scenario():
+        session_id = create_upload_session(7, 300, {})["session_id"]
+        first_chunk_written = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_body():
+            yield b"a" * 100
+            first_chunk_written.set()
+            await release.wait()
+            yield b"b" * 100
+
+        first = asyncio.create_task(append_upload_chunk(session_id, 0, slow_body()))
+        await first_chunk_written.wait()
+
+        # Same offset as the first request: both passed the early offset check, only one may write
+        try:
+            await append_upload_chunk(session_id, 0, body_chunks(b"c" * 100))
+        except UploadSessionConflictError:
+            pass
+        else:
+            raise AssertionError("Expected UploadSessionConflictError for a second writer")
+
+        release.set()
+        assert await first == 200
+
+        # Once the lock is free, a stale offset is a conflict too and the next chunk goes through
+        try:
+            await append_upload_chunk(session_id, 100, body_chunks(b"c" * 100))
+        except UploadSessionConflictError as e:
+            assert "Expected offset 200" in str(e)
+        else:
+            raise AssertionError("Expected UploadSessionConflictError for a stale offset")
+        assert await append_upload_chunk(session_id, 200, body_chunks(b"c" * 100)) == 300
+        assert finish_upload_session(session_id).path.read_bytes() == b"a" * 100 + b"b" * 100 + b"c" * 100
+
+    with TemporaryStorage():
+        asyncio.run(scenario())
+
+
+def test_expired_sessions_are_cleaned_up():
+    with TemporaryStorage():
+        stale_id = create_upload_session(1, 10, {})["session_id"]
+        meta = get_upload_session(stale_id)
+        meta["updated_at"] = 0
+        file_storage._write_session_meta(stale_id, {key: value for key, value in meta.items() if key not in ("received", "chunk_size")})
+
+        # Directories without meta.json yet may be sessions another worker is still creating
+        creating_dir = file_storage.UPLOAD_SESSIONS_DIR / "abc123"
+        creating_dir.mkdir()
+        abandoned_dir = file_storage.UPLOAD_SESSIONS_DIR / "def456"
+        abandoned_dir.mkdir()
+        long_ago = time.time() - file_storage.UPLOAD_SESSION_TTL_SECONDS - 60
+        os.utime(abandoned_dir, (long_ago, long_ago))
+
+        fresh_id = create_upload_session(1, 10, {})["session_id"]
+        assert get_upload_session(stale_id) is None
+        assert get_upload_session(fresh_id) is not None
+        assert creating_dir.exists() and not abandoned_dir.exists()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streamed uploads")
+
+    try:
+        test_stage_upload_streams_in_chunks_and_hashes()
+        test_stage_upload_stops_at_size_limit()
+        test_store_file_from_bytes_stream_and_staged_file()
+        test_resumable_session_accepts_chunks_in_order()
+        test_resumable_session_rejects_overflow_and_bad_hash()
+        test_concurrent_appends_to_one_session_conflict()
+        test_expired_sessions_are_cleaned_up()
+        print("\n🎉 All streamed upload tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable live presentation student sessions: a whole room that drops
+and reconnects with its resume tokens is restored from memory without touching the
+database, messages lost with the old sockets are replayed in order, what was sent
+while students were away is caught up, and expired or unknown tokens fall back to
+the cold-start path.
+
+Students connect over fake websockets; the database is a stub that fails on use.
+"""
+
+import sys
+import os
+import json
+import asyncio
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types.live_presentation import LivePresentationDeployment
+from services.deployment_types.student_sessions import StudentSessionStore
+
+STUDENTS = [f"Student {i}" for i in range(300)]
+GROUPS = {f"Group{g + 1}": STUDENTS[g * 5:(g + 1) * 5] for g in range(60)}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.dropped = False
+
+    async def send_text(self, text):
+        if self.dropped:
+            raise ConnectionError("socket dropped")
+        self.sent.append(json.loads(text))
+
+    def of_type(self, message_type):
+        return [message for message in self.sent if message["type"] == message_type]
+
+    def last_seq(self):
+        return max((message["seq"] for message in self.sent if "seq" in message), default=0)
+
+
+class NoDatabase:
+    """Any use of the database session fails the test"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"database used during resume: {name}")
+
+
+def make_presentation():
+    presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-sessions")
+    presentation.input_variable_data = GROUPS
+    presentation._response_summarizer = None
+    presentation._dashboard_updates.interval_seconds = 0.05
+    presentation.presentation_active = True
+    return presentation
+
+
+async def connect_room(presentation):
+    sockets = {}
+    for i, name in enumerate(STUDENTS):
+        sockets[f"id-{i}"] = FakeWebSocket()
+        assert await presentation.connect_student(f"id-{i}", name, sockets[f"id-{i}"])
+    tokens = {user_id: ws.of_type("welcome")[0]["resume_token"] for user_id, ws in sockets.items()}
+    return sockets, tokens
+
+
+def test_room_wide_reconnect_replays_from_memory():
+    async def scenario():
+        presentation = make_presentation()
+        sockets, tokens = await connect_room(presentation)
+        assert len(set(tokens.values())) == 300
+
+        # The room's Wi-Fi drops while a prompt goes out: every send fails
+        for ws in sockets.values():
+            ws.dropped = True
+        last_seen = {user_id: ws.last_seq() for user_id, ws in sockets.items()}
+        await presentation.send_prompt_to_students({"id": "p1", "statement": "What did you notice?"})
+        assert not presentation.students and len(presentation._student_sessions.detached()) == 300
+
+        presentation._db_session = NoDatabase()
+        fresh = {}
+        for i, name in enumerate(STUDENTS):
+            user_id = f"id-{i}"
+            fresh[user_id] = FakeWebSocket()
+            assert await presentation.connect_student(user_id, name, fresh[user_id], tokens[user_id], last_seen[user_id])
+        assert len(presentation.students) == 300 and not presentation._student_sessions.detached()
+
+        for user_id, ws in fresh.items():
+            assert ws.sent[0]["type"] == "session_resumed" and ws.sent[0]["replayed"] == 1
+            replayed = ws.sent[1]
+            assert replayed["type"] == "prompt_received" and replayed["prompt"]["id"] == "p1"
+            assert replayed["seq"] == last_seen[user_id] + 1
+            assert not ws.of_type("welcome") and len(ws.of_type("prompt_received")) == 1
+        assert fresh["id-7"].sent[0]["group_info"]["group_name"] == "Group2"
+        assert presentation._completion_index.progress("p1", "Group2") == (0, 5)
+
+        # The old socket's late disconnect doesn't remove the resumed student
+        await presentation.disconnect_student("id-7", sockets["id-7"])
+        assert "id-7" in presentation.students
+
+    asyncio.run(scenario())
+
+
+def test_absent_students_catch_up_and_acks_trim_the_buffer():
+    async def scenario():
+        presentation = make_presentation()
+        first = FakeWebSocket()
+        await presentation.connect_student("id-0", STUDENTS[0], first)
+        token = first.sent[0]["resume_token"]
+        await presentation.send_prompt_to_students({"id": "p1", "statement": "First"})
+        await presentation.handle_student_message("id-0", {"type": "student_response", "prompt_id": "p1", "response": "mine"})
+        session = presentation._student_sessions.get("id-0")
+        await presentation.handle_student_message("id-0", {"type": "ack", "seq": first.last_seq()})
+        assert not session.outbox
+
+        # A clean disconnect; the next prompt and a timer go out while the student is away
+        await presentation.disconnect_student("id-0", first)
+        await presentation.send_prompt_to_students({"id": "p2", "statement": "Second"})
+        await presentation.start_timer(1, 0)
+
+        presentation._db_session = NoDatabase()
+        second = FakeWebSocket()
+        assert await presentation.connect_student("id-0", STUDENTS[0], second, token, first.last_seq())
+        assert second.sent[0]["replayed"] == 0
+        prompts = second.of_type("prompt_received")
+        assert [message["prompt"]["id"] for message in prompts] == ["p2"] and prompts[0]["seq"] == first.last_seq() + 1
+        assert len(second.of_type("timer_started")) == 1
+        assert presentation.students["id-0"].responses["p1"]["response"] == "mine"
+        presentation._db_session = None
+        await presentation.stop_timer()
+
+        # Resuming again with nothing missed sends nothing but the confirmation
+        third = FakeWebSocket()
+        assert await presentation.connect_student("id-0", STUDENTS[0], third, token, second.last_seq())
+        assert [message["type"] for message in third.sent] == ["session_resumed"]
+
+    asyncio.run(scenario())
+
+
+def test_buffer_gaps_resync_and_expired_tokens_start_cold():
+    async def scenario():
+        presentation = make_presentation()
+        presentation._student_sessions = StudentSessionStore(resume_window_seconds=0.1, replay_limit=2)
+        saved = []
+
+        async def save_student_connection(student):
+            saved.append(student.status)
+
+        presentation._save_student_connection = save_student_connection
+        ws = FakeWebSocket()
+        await presentation.connect_student("id-0", STUDENTS[0], ws)
+        token = ws.sent[0]["resume_token"]
+        for n in range(4):
+            await presentation.send_prompt_to_students({"id": f"p{n}", "statement": f"Prompt {n}"})
+
+        # More missed messages than the buffer holds: the current state is sent instead
+        await presentation.disconnect_student("id-0", ws)
+        resumed = FakeWebSocket()
+        assert await presentation.connect_student("id-0", STUDENTS[0], resumed, token, 1)
+        assert resumed.sent[0]["replayed"] == 0
+        assert [message["prompt"]["id"] for message in resumed.of_type("prompt_received")] == ["p3"]
+        assert len(resumed.of_type("group_info")) == 1
+        assert saved == ["connected"]  # the cold connect only; the blip was never written
+
+        # Past the resume window the disconnect is saved and the token no longer works
+        await presentation.disconnect_student("id-0", resumed)
+        await asyncio.sleep(0.25)
+        assert saved == ["connected", "disconnected"]
+        cold = FakeWebSocket()
+        assert await presentation.connect_student("id-0", STUDENTS[0], cold, token, resumed.last_seq())
+        assert cold.sent[0]["type"] == "welcome" and cold.sent[0]["resume_token"] != token
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing resumable student sessions")
+
+    try:
+        test_room_wide_reconnect_replays_from_memory()
+        test_absent_students_catch_up_and_acks_trim_the_buffer()
+        test_buffer_gaps_resync_and_expired_tokens_start_cold()
+        print("\n🎉 All student session tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for the embedding prefilter in SubmissionMatcher.find_best_match.
+
+Uses a fake chat model and a bag-of-words fake embedding model, so no OpenAI key,
+network access or FastEmbed model is needed. Checks that only the top-k most
+similar submissions reach the LLM (k per matching strategy), that the strategy
+decides which fields are compared, that submission embeddings are reused across
+matches, and that small batches skip the prefilter.
+"""
+
+import sys
+import os
+import re
+import asyncio
+
+import numpy as np
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types import submission_matcher
+from services.deployment_types.submission_matcher import (
+    SubmissionMatcher, SummaryData, WebsiteSubmission, clear_embedding_cache, cosine_similarities,
+)
+
+VOCABULARY = ["vaccine", "health", "remedy", "climate", "warming", "election", "ballot", "satire",
+              "blog", "video", "forum", "social", "news", "shop", "podcast", "wiki"]
+
+TOPICS = {
+    "health": ("Cure Corner", "Anti vaccine health remedy claims"),
+    "climate": ("Cool Planet", "Climate warming denial"),
+    "election": ("Ballot Watch", "Election ballot fraud rumours"),
+    "satire": ("The Onion Patch", "Satire mistaken for news"),
+}
+PLATFORMS = ["blog", "video", "forum", "social", "shop", "podcast", "wiki", "news"]
+
+
+class FakeEmbeddings:
+    """Counts vocabulary words; records every text it embeds"""
+
+    model_name = "fake-bag-of-words"
+
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def _vector(self, text):
+        words = re.findall(r"[a-z]+", text.lower())
+        return [float(words.count(word)) for word in VOCABULARY]
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self._vector(text)
+
+
+class FakeChatModel:
+    """Picks the first submission in the prompt; records the student names it was shown"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def shown(self, index=-1):
+        return re.findall(r"^Submission \d+ - (.+):$", self.prompts[index], re.MULTILINE)
+
+    async def ainvoke(self, messages):
+        self.prompts.append(messages[-1].content)
+        names = self.shown()
+        scores = "\n".join(f"- {name}: {0.9 if i == 0 else 0.2}" for i, name in enumerate(names))
+        content = f"ANALYSIS:\nCompared.\n\nBEST_MATCH: {names[0]}\nCONFIDENCE: 0.9\nREASONING: Closest fit.\n\nSCORES:\n{scores}"
+        return type("Message", (), {"content": content})()
+
+
+def make_submissions(per_topic=10):
+    submissions = []
+    for topic, (name, purpose) in TOPICS.items():
+        for i in range(per_topic):
+            submissions.append(WebsiteSubmission(
+                student_name=f"{topic}-{i}",
+                url=f"https://{topic}{i}.example.com",
+                name=f"{name} {i}",
+                purpose=purpose,
+                platform=PLATFORMS[i % len(PLATFORMS)]
+            ))
+    return submissions
+
+
+SUMMARY = SummaryData(
+    category="Health misinformation",
+    purpose="Spreads vaccine and health remedy myths",
+    platform="video",
+    strategy="Check medical claims against trusted sources"
+)
+
+
+def use_top_k(**top_k):
+    original = dict(submission_matcher.PREFILTER_TOP_K)
+    submission_matcher.PREFILTER_TOP_K.update(top_k)
+    return lambda: (submission_matcher.PREFILTER_TOP_K.clear(), submission_matcher.PREFILTER_TOP_K.update(original))
+
+
+def test_only_top_k_submissions_reach_the_llm():
+    clear_embedding_cache()
+    restore = use_top_k(comprehensive=5)
+    llm = FakeChatModel()
+    matcher = SubmissionMatcher(llm=llm, embeddings=FakeEmbeddings())
+    try:
+        result = asyncio.run(matcher.find_best_match(SUMMARY, make_submissions(), "comprehensive"))
+    finally:
+        restore()
+
+    shown = llm.shown()
+    assert len(shown) == 5 and all(name.startswith("health-") for name in shown)
+    assert result.candidate_count == 5 and result.best_match_student == shown[0]
+    assert set(result.prefilter_scores) == set(shown) and set(result.all_scores) == set(shown)
+    # Candidates are listed most similar first
+    assert list(result.prefilter_scores.values()) == sorted(result.prefilter_scores.values(), reverse=True)
+
+
+def test_strategy_decides_k_and_compared_fields():
+    clear_embedding_cache()
+    restore = use_top_k(platform_focused=4, purpose_focused=6)
+    embeddings = FakeEmbeddings()
+    llm = FakeChatModel()
+    matcher = SubmissionMatcher(llm=llm, embeddings=embeddings)
+    try:
+        asyncio.run(matcher.find_best_match(SUMMARY, make_submissions(), "platform_focused"))
+        asyncio.run(matcher.find_best_match(SUMMARY, make_submissions(), "purpose_focused"))
+    finally:
+        restore()
+
+    # Platform matching compares platforms: every video site, whatever its topic
+    platform_shown = llm.shown(0)
+    assert len(platform_shown) == 4
+    assert all(int(name.split("-")[1]) % len(PLATFORMS) == PLATFORMS.index("video") for name in platform_shown)
+    assert embeddings.queries[0].startswith("video")
+    # Purpose matching compares purposes
+    assert len(llm.shown(1)) == 6 and all(name.startswith("health-") for name in llm.shown(1))
+
+
+def test_submission_embeddings_are_reused():
+    clear_embedding_cache()
+    restore = use_top_k(comprehensive=5)
+    embeddings = FakeEmbeddings()
+    submissions = make_submissions()
+    try:
+        asyncio.run(SubmissionMatcher(llm=FakeChatModel(), embeddings=embeddings).find_best_match(SUMMARY, submissions, "comprehensive"))
+        assert len(embeddings.documents) == len(submissions)
+
+        # Another summary against the same submissions (from a new matcher) only embeds the summary
+        other = SummaryData(category="Climate denial", purpose="Denies climate warming", platform="blog", strategy="")
+        llm = FakeChatModel()
+        asyncio.run(SubmissionMatcher(llm=llm, embeddings=embeddings).find_best_match(other, submissions, "comprehensive"))
+        assert len(embeddings.documents) == len(submissions) and len(embeddings.queries) == 2
+        assert all(name.startswith("climate-") for name in llm.shown())
+
+        # An edited submission is embedded again, alone
+        submissions[0].purpose = "Now reviews hiking boots"
+        asyncio.run(SubmissionMatcher(llm=FakeChatModel(), embeddings=embeddings).find_best_match(SUMMARY, submissions, "comprehensive"))
+        assert len(embeddings.documents) == len(submissions) + 1
+    finally:
+        restore()
+
+
+def test_small_batches_skip_the_prefilter():
+    clear_embedding_cache()
+    restore = use_top_k(comprehensive=50)
+    embeddings = FakeEmbeddings()
+    llm = FakeChatModel()
+    try:
+        result = asyncio.run(SubmissionMatcher(llm=llm, embeddings=embeddings).find_best_match(SUMMARY, make_submissions(), "comprehensive"))
+    finally:
+        restore()
+
+    assert embeddings.documents == [] and len(llm.shown()) == 40
+    assert result.candidate_count == 40 and result.prefilter_scores is None
+
+
+def test_cosine_similarities_handle_zero_vectors():
+    vectors = np.array([[1.0, 0.0], [0.0, 2.0], [0.0, 0.0]], dtype=np.float32)
+    similarities = cosine_similarities(np.array([3.0, 0.0], dtype=np.float32), vectors)
+    assert np.allclose(similarities, [1.0, 0.0, 0.0])
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the submission matcher prefilter")
+
+    try:
+        test_only_top_k_submissions_reach_the_llm()
+        test_strategy_decides_k_and_compared_fields()
+        test_submission_embeddings_are_reused()
+        test_small_batches_skip_the_prefilter()
+        test_cosine_similarities_handle_zero_vectors()
+        print("\n🎉 All submission prefilter tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
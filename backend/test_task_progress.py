@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for pushed task progress: Celery tasks publish their update_state calls
+over Redis pub/sub, and the server-sent event stream relays them.
+
+Runs tasks through an in-memory broker and an in-process worker, and replaces
+Redis with small in-memory stand-ins for publish/subscribe, so no Redis server
+is needed.
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+
+from services import task_queues
+from services.task_progress import ProgressTask, progress_channel, task_event_stream
+
+
+class RecordingRedis:
+    """Records PUBLISH calls (and accepts the queue metrics writes)."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+    def pipeline(self):
+        return self
+
+    def lpush(self, *args):
+        return self
+
+    def ltrim(self, *args):
+        return self
+
+    def execute(self):
+        return []
+
+
+class FakeAsyncPubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = set()
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def aclose(self):
+        self.closed = True
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        if not self.messages:
+            await asyncio.sleep(min(timeout or 0, 0.01))
+            return None
+        return {"type": "message", "data": json.dumps(self.messages.pop(0)).encode()}
+
+
+class FakeAsyncRedis:
+    def __init__(self, messages=None):
+        self.pubsub_instance = FakeAsyncPubSub(list(messages or []))
+
+    def pubsub(self):
+        return self.pubsub_instance
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def events(chunks):
+    return [json.loads(chunk[len("data: "):]) for chunk in chunks if chunk.startswith("data: ")]
+
+
+def test_update_state_and_final_state_are_published():
+    recording_redis = RecordingRedis()
+    task_queues._redis_client = recording_redis
+    app = Celery("test_task_progress", broker="memory://", backend="cache+memory://", task_cls=ProgressTask)
+
+    @app.task(name="test_progress_task", bind=True)
+    def progress_task(self):
+        self.update_state(state="PROGRESS", meta={"status": "Embedding...", "progress": 50, "stage": "indexing", "traceback": "x"})
+        self.update_state(state="PROGRESS", meta={"status": "Saving...", "progress": 80, "stage": "persistence"})
+        return {"ok": True}
+
+    try:
+        with start_worker(app, pool="solo", perform_ping_check=False):
+            result = progress_task.delay()
+            assert result.get(timeout=10) == {"ok": True}
+    finally:
+        task_queues._redis_client = None
+
+    published = [event for channel, event in recording_redis.published if channel == progress_channel(result.id)]
+    assert [event["state"] for event in published] == ["PROGRESS", "PROGRESS", "SUCCESS"]
+    assert published[0] == {"task_id": result.id, "state": "PROGRESS", "status": "Embedding...", "progress": 50, "stage": "indexing"}
+
+
+def test_stream_relays_events_until_final_status():
+    statuses = iter([
+        {"state": "PROGRESS", "status": "Initializing...", "progress": 10, "stage": "init"},
+        {"state": "SUCCESS", "status": "Completed", "progress": 100, "stage": "completed", "result": {"groups": 3}},
+    ])
+    status_reads = []
+
+    def get_status(task_id):
+        status_reads.append(task_id)
+        return next(statuses)
+
+    redis_client = FakeAsyncRedis([
+        {"task_id": "t1", "state": "PROGRESS", "status": "Clustering...", "progress": 60, "stage": "execution"},
+        {"task_id": "t1", "state": "SUCCESS"},
+        {"task_id": "t1", "state": "PROGRESS", "status": "never relayed", "progress": 99, "stage": "late"},
+    ])
+    relayed = events(collect(task_event_stream("t1", get_status, heartbeat_seconds=0.01, redis_client=redis_client)))
+
+    assert [event["state"] for event in relayed] == ["PROGRESS", "PROGRESS", "SUCCESS"]
+    assert relayed[1]["stage"] == "execution"
+    # The final event carries the full result, read once from the result backend
+    assert relayed[-1]["result"] == {"groups": 3}
+    assert status_reads == ["t1", "t1"]
+    assert redis_client.pubsub_instance.closed and not redis_client.pubsub_instance.channels
+
+
+def test_stream_of_finished_task_sends_one_event():
+    redis_client = FakeAsyncRedis()
+    relayed = events(collect(task_event_stream(
+        "t2", lambda task_id: {"state": "FAILURE", "error": "boom", "progress": 0, "stage": "failed"},
+        heartbeat_seconds=0.01, redis_client=redis_client,
+    )))
+    assert relayed == [{"state": "FAILURE", "error": "boom", "progress": 0, "stage": "failed"}]
+
+
+def test_idle_stream_notices_task_that_died_silently():
+    statuses = iter([
+        {"state": "PROGRESS", "progress": 30, "stage": "execution"},
+        {"state": "PROGRESS", "progress": 30, "stage": "execution"},
+        {"state": "FAILURE", "error": "worker lost", "progress": 0, "stage": "failed"},
+    ])
+    chunks = collect(task_event_stream("t3", lambda task_id: next(statuses), heartbeat_seconds=0.01, redis_client=FakeAsyncRedis()))
+    assert ": keep-alive\n\n" in chunks
+    assert events(chunks)[-1]["error"] == "worker lost"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing pushed task progress")
+
+    try:
+        test_update_state_and_final_state_are_published()
+        test_stream_relays_events_until_final_status()
+        test_stream_of_finished_task_sends_one_event()
+        test_idle_stream_notices_task_that_died_silently()
+        print("\n🎉 All task progress tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
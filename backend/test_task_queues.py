@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Tests for Celery workload queues: routing, per-queue time limits and priorities,
+the queue config checks, worker command lines and the worker programs started by
+supervisord/docker-compose, and queue depth/latency metrics.
+
+Runs tasks through an in-memory broker and an in-process worker, with a small
+in-memory stand-in for the Redis commands the metrics use, so neither Redis nor
+a separate worker process is needed.
+"""
+
+import sys
+import os
+import json
+import re
+import time
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+
+from services import task_queues
+from services.task_queues import celery_queue_settings, get_queue_metrics, queue_for_task, validate_task_queues, worker_argv
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeRedis:
+    """The list commands used by the queue metrics, kept in memory."""
+
+    def __init__(self):
+        self.lists = {}
+        self._pending = None
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value.encode() if isinstance(value, str) else value)
+        return self
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:end + 1]
+        return self
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lindex(self, key, index):
+        values = self.lists.get(key, [])
+        return values[index] if values else None
+
+    def lrange(self, key, start, end):
+        values = self.lists.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue_call(*args):
+            self.calls.append((name, args))
+            return self
+        return queue_call
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+def test_tasks_are_routed_with_queue_limits_and_priorities():
+    settings = celery_queue_settings()
+    routes = settings["task_routes"]
+    assert routes["execute_behavior"]["queue"] == "behaviors"
+    assert routes["process_prompt_pdf_submission"]["queue"] == "ingest"
+    assert routes["match_submission_to_summary"]["queue"] == "llm"
+    assert routes["embed_analyses_to_qdrant"]["queue"] == "light"
+    # Student PDF submissions are taken before bulk document uploads on the ingest queue
+    assert routes["process_prompt_pdf_submission"]["priority"] < routes["process_document_uploads"]["priority"]
+
+    behaviors = task_queues.TASK_QUEUES["behaviors"]
+    assert settings["task_annotations"]["execute_behavior"] == {
+        "soft_time_limit": behaviors["soft_time_limit"], "time_limit": behaviors["time_limit"],
+    }
+    assert {queue.name for queue in settings["task_queues"]} >= {"ingest", "behaviors", "llm", "light"}
+    assert queue_for_task("unknown_task") == settings["task_default_queue"]
+
+
+def test_worker_command_uses_queue_concurrency():
+    argv = worker_argv("ingest")
+    assert argv[argv.index("-Q") + 1] == "ingest"
+    assert argv[argv.index("--concurrency") + 1] == str(task_queues.TASK_QUEUES["ingest"]["concurrency"])
+
+    argv = worker_argv("all")
+    assert set(argv[argv.index("-Q") + 1].split(",")) == set(task_queues.TASK_QUEUES)
+
+    try:
+        worker_argv("nope")
+    except ValueError as e:
+        assert "nope" in str(e)
+    else:
+        raise AssertionError("Expected ValueError for an unknown queue")
+
+
+def expect_invalid(task_queues_config, default_queue, message, task_names=None):
+    try:
+        validate_task_queues(task_queues_config, default_queue, task_names)
+    except ValueError as e:
+        assert message in str(e), str(e)
+    else:
+        raise AssertionError(f"Expected ValueError containing '{message}'")
+
+
+def test_queue_config_is_checked():
+    # The configured queues pass, including against the tasks actually registered
+    from services.celery_tasks import celery_app
+    registered = [name for name in celery_app.tasks if not name.startswith("celery.")]
+    validate_task_queues(task_queues.TASK_QUEUES, task_queues.DEFAULT_QUEUE, registered)
+    assert all(queue_for_task(name) in task_queues.TASK_QUEUES for name in registered)
+
+    expect_invalid({}, "light", "No Celery queues configured")
+    # e.g. the default queue renamed in one place but not the other
+    expect_invalid({"quick": {"tasks": {"check_task_status": 0}}}, "light", "'light' is not one of celery.queues")
+    expect_invalid(
+        {"light": {"tasks": ["execute_behavior"]}, "behaviors": {"tasks": {"execute_behavior": 5}}},
+        "light", "listed on both queue 'light' and 'behaviors'",
+    )
+    expect_invalid({"light": {"tasks": ["execute_behaviour"]}}, "light", "unknown task(s): execute_behaviour", ["execute_behavior"])
+
+
+def test_worker_programs_serve_every_queue():
+    def served_queues(path):
+        with open(os.path.join(REPO_ROOT, path)) as f:
+            return re.findall(r"scripts\.celery_worker ([\w${}]+)", f.read())
+
+    # One worker per configured queue, so no queue is left without a consumer
+    for path in ("supervisord.conf", "docker-compose.yml"):
+        queues = served_queues(path)
+        assert sorted(queues) == sorted(task_queues.TASK_QUEUES), (path, queues)
+
+    # Single-worker setups serve every queue
+    assert served_queues("entrypoint.sh") == ["all"]
+    assert served_queues("Dockerfile.celery") == ["${CELERY_QUEUE}"]
+    with open(os.path.join(REPO_ROOT, "Dockerfile.celery")) as f:
+        assert "ENV CELERY_QUEUE=all" in f.read()
+
+
+def test_worker_records_wait_and_runtime_metrics():
+    fake_redis = FakeRedis()
+    task_queues._redis_client = fake_redis
+    app = Celery("test_task_queues", broker="memory://", backend="cache+memory://")
+    app.conf.update(**{key: value for key, value in celery_queue_settings().items() if key != "broker_transport_options"})
+
+    @app.task(name="execute_behavior")
+    def slow_behavior():
+        time.sleep(0.05)
+        return "done"
+
+    try:
+        results = [slow_behavior.delay() for _ in range(3)]
+        # Published while no worker is running, so these wait in the queue
+        time.sleep(0.1)
+        with start_worker(app, pool="solo", perform_ping_check=False, queues=["behaviors"]):
+            assert [result.get(timeout=10) for result in results] == ["done"] * 3
+    finally:
+        task_queues._redis_client = None
+
+    samples = [json.loads(raw) for raw in fake_redis.lrange(f"{task_queues.METRICS_KEY_PREFIX}behaviors", 0, -1)]
+    assert len(samples) == 3
+    assert all(sample["task"] == "execute_behavior" and sample["state"] == "SUCCESS" for sample in samples)
+    assert all(sample["wait"] >= 0.1 for sample in samples)
+    assert all(sample["runtime"] >= 0.05 for sample in samples)
+
+    metrics = get_queue_metrics(fake_redis)["queues"]["behaviors"]
+    assert metrics["recent"]["samples"] == 3
+    assert metrics["recent"]["wait_p50"] >= 0.1
+    assert metrics["recent"]["states"] == {"SUCCESS": 3}
+
+
+def test_metrics_report_depth_and_oldest_waiting_message():
+    fake_redis = FakeRedis()
+    now = time.time()
+    message = lambda enqueued_at: json.dumps({"headers": {"enqueued_at": enqueued_at}, "body": ""})
+    fake_redis.lpush("ingest", message(now - 30))
+    fake_redis.lpush("ingest", message(now - 5))
+    fake_redis.lpush("ingest:2", message(now - 12))
+
+    metrics = get_queue_metrics(fake_redis)["queues"]
+    assert metrics["ingest"]["depth"] == 3
+    assert metrics["ingest"]["depth_by_priority"] == {"0": 2, "2": 1}
+    assert 29 <= metrics["ingest"]["oldest_wait_seconds"] < 40
+    assert metrics["llm"]["depth"] == 0 and metrics["llm"]["oldest_wait_seconds"] is None
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Celery workload queues")
+
+    try:
+        test_tasks_are_routed_with_queue_limits_and_priorities()
+        test_worker_command_uses_queue_concurrency()
+        test_queue_config_is_checked()
+        test_worker_programs_serve_every_queue()
+        test_worker_records_wait_and_runtime_metrics()
+        test_metrics_report_depth_and_oldest_waiting_message()
+        print("\n🎉 All task queue tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
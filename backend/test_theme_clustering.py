@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the clustering engines in services/deployment_types/theme_creator.py.
+
+Uses planted, well-separated blobs, so no embedding model is needed. Checks
+that "auto" picks the engine by input size, that spherical k-means keeps its
+centers on the unit sphere, that the silhouette search finds the planted
+number of clusters, and that the theme metadata records the engine actually
+used, the auto-selected theme count and the even-distribution fallback.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types import theme_creator
+from services.deployment_types.theme_creator import (
+    ThemeCreatorBehavior,
+    resolve_clustering_engine,
+    run_clustering,
+    select_num_clusters,
+    spherical_kmeans,
+    normalize_rows,
+)
+
+
+def planted_blobs(num_clusters, per_cluster, dimensions=16, noise=0.05, seed=0):
+    """Tight blobs around random directions; returns (vectors, planted labels)"""
+    rng = np.random.default_rng(seed)
+    directions = normalize_rows(rng.normal(size=(num_clusters, dimensions)), dtype=np.float64)
+    labels = np.repeat(np.arange(num_clusters), per_cluster)
+    vectors = directions[labels] + rng.normal(scale=noise, size=(len(labels), dimensions))
+    return vectors, labels
+
+
+class BlobThemeBehavior(ThemeCreatorBehavior):
+    """Fake vectors: one blob per topic named in the student's text"""
+
+    clustering_fails = False
+
+    def _build_student_vectors(self, student_data, db_session):
+        vectors, _ = planted_blobs(4, 1, seed=7)
+        rng = np.random.default_rng(1)
+        return [
+            (s["name"], (vectors[int(s["text"][-2])] + rng.normal(scale=0.05, size=vectors.shape[1])).tolist())
+            for s in student_data
+        ]
+
+    def _perform_clustering(self, vectors, num_themes):
+        if self.clustering_fails:
+            raise RuntimeError("clustering exploded")
+        return super()._perform_clustering(vectors, num_themes)
+
+
+def create_students(count=16):
+    return [{"name": f"Student_{i + 1}", "text": f"I am interested in topic {i % 4}."} for i in range(count)]
+
+
+def run_theme(clustering_fails=False, **config):
+    behavior = BlobThemeBehavior({"use_llm_polish": False, "enhance_with_web_search": False, **config})
+    behavior.clustering_fails = clustering_fails
+    return behavior.execute(create_students())
+
+
+def test_auto_engine_is_picked_by_data_size():
+    threshold = theme_creator.MINIBATCH_MIN_VECTORS
+    assert resolve_clustering_engine("auto", threshold - 1) == "kmeans"
+    assert resolve_clustering_engine("auto", threshold) == "minibatch"
+    # Explicit engines are used as configured, whatever the input size
+    for engine in ("kmeans", "minibatch", "spherical"):
+        assert resolve_clustering_engine(engine, 10) == engine
+        assert resolve_clustering_engine(engine, threshold * 10) == engine
+
+    vectors, _ = planted_blobs(3, 5)
+    with pytest.raises(ValueError, match="Unknown clustering engine"):
+        run_clustering(vectors, 3, "agglomerative")
+
+
+def test_spherical_kmeans_centers_are_unit_norm():
+    vectors, planted = planted_blobs(5, 40, seed=3)
+    # Scaling the inputs must not matter: they are normalized before clustering
+    vectors *= np.random.default_rng(4).uniform(0.5, 20, size=(len(vectors), 1))
+
+    labels, centers = spherical_kmeans(normalize_rows(vectors), 5)
+    assert centers.shape == (5, vectors.shape[1])
+    assert np.allclose(np.linalg.norm(centers, axis=1), 1.0, atol=1e-5)
+    assert adjusted_rand_score(planted, labels) == 1.0
+
+    labels, centers = run_clustering(vectors, 5, "spherical")
+    assert np.allclose(np.linalg.norm(centers, axis=1), 1.0, atol=1e-5)
+    assert adjusted_rand_score(planted, labels) == 1.0
+
+
+def test_auto_k_finds_the_planted_number_of_clusters():
+    for planted_k in (3, 5):
+        vectors, _ = planted_blobs(planted_k, 30, seed=planted_k)
+        for engine in ("kmeans", "minibatch", "spherical"):
+            best_k, scores = select_num_clusters(vectors, 2, 8, engine)
+            assert best_k == planted_k, (engine, scores)
+            assert sorted(scores) == list(range(2, 9))
+
+    # Candidates are fitted on a sample when the input is larger than sample_size
+    vectors, _ = planted_blobs(4, 200, seed=9)
+    best_k, scores = select_num_clusters(vectors, 2, 6, "kmeans", sample_size=120)
+    assert best_k == 4
+    assert sorted(scores) == list(range(2, 7))
+
+
+def test_metadata_records_the_engine_used_and_the_auto_selected_themes():
+    result = run_theme(num_themes=2, auto_num_themes=True)
+    metadata = result["metadata"]
+    assert metadata["clustering_engine"] == theme_creator.CLUSTERING_ENGINE
+    assert metadata["clustering_method"] == resolve_clustering_engine(theme_creator.CLUSTERING_ENGINE, 16)
+    assert metadata["clustering_method"] != "auto"
+    assert metadata["auto_selected_themes"] == 4
+    assert metadata["total_themes"] == 4 and metadata["requested_themes"] == 2
+    assert set(metadata["silhouette_scores"]) == {str(k) for k in range(2, 9)}
+    assert max(metadata["silhouette_scores"], key=metadata["silhouette_scores"].get) == "4"
+    assert len(result["themes"]) == 4
+
+    result = run_theme(num_themes=4, clustering_engine="spherical")
+    metadata = result["metadata"]
+    assert metadata["clustering_engine"] == "spherical"
+    assert metadata["clustering_method"] == "spherical"
+    assert metadata["auto_selected_themes"] is None and metadata["silhouette_scores"] is None
+    assert sorted(len(theme["student_names"]) for theme in result["themes"]) == [4, 4, 4, 4]
+
+
+def test_failed_clustering_is_recorded_as_even_distribution():
+    result = run_theme(num_themes=4, clustering_fails=True)
+    assert result["metadata"]["clustering_method"] == "even_distribution"
+    assert result["metadata"]["clustering_engine"] == theme_creator.CLUSTERING_ENGINE
+    # Students are dealt round-robin across the themes
+    for theme in result["themes"]:
+        assert theme["student_names"] == [f"Student_{i + 1}" for i in range(16) if i % 4 == theme["cluster_id"]]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing theme clustering engines")
+
+    try:
+        test_auto_engine_is_picked_by_data_size()
+        test_spherical_kmeans_centers_are_unit_norm()
+        test_auto_k_finds_the_planted_number_of_clusters()
+        test_metadata_records_the_engine_used_and_the_auto_selected_themes()
+        test_failed_clustering_is_recorded_as_even_distribution()
+        print("\n🎉 All theme clustering tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent, cached theme enrichment in ThemeCreatorBehavior.
+
+Uses the offline stub search backend and a fake chat model, so no network
+access or OpenAI key is needed. Checks that web lookups and name polishing
+run concurrently, that repeated queries are served from the search cache,
+and that themes still running at the enrichment deadline come back as-is.
+"""
+
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.deployment_types import theme_creator
+from services.deployment_types.theme_creator import ThemeCreatorBehavior, StubSearchBackend
+
+
+class FakeChatModel:
+    """Stands in for ChatOpenAI: answers after a delay and records peak concurrency."""
+
+    def __init__(self, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+        self.active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            time.sleep(self.delay_seconds)
+            prompt = messages[-1].content
+            if "ENHANCED DESCRIPTION" in prompt:
+                return SimpleNamespace(content="Recent reporting links this theme to ongoing policy debates.")
+            title = prompt.split('Current theme: "', 1)[1].split('"', 1)[0]
+            return SimpleNamespace(content=f"Polished {title}")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeLLMThemeCreator(ThemeCreatorBehavior):
+    def __init__(self, config, search_backend, llm):
+        super().__init__(config, search_backend=search_backend)
+        self.llm = llm
+
+    def _create_enrichment_llm(self, model):
+        return self.llm
+
+
+def create_themes(count: int = 8):
+    return [
+        {
+            "title": f"Theme {i + 1}",
+            "description": f"Theme based on {3 + i} student responses",
+            "keywords": [f"keyword{i}", "energy", "policy"],
+            "snippets": [f"Students discussed topic {i} in depth."],
+            "cluster_id": i,
+        }
+        for i in range(count)
+    ]
+
+
+def test_enrichment_runs_concurrently():
+    theme_creator.clear_search_cache()
+    search_backend = StubSearchBackend(delay_seconds=0.3)
+    llm = FakeChatModel(delay_seconds=0.3)
+    behavior = FakeLLMThemeCreator({"enhance_with_web_search": True}, search_backend, llm)
+    behavior.enrichment_max_concurrency = 8
+
+    themes = create_themes(8)
+    start = time.perf_counter()
+    enriched = behavior._enrich_themes(themes, "Energy policy", with_web_search=True, with_polish=True)
+    elapsed = time.perf_counter() - start
+
+    # Sequentially this is 8 x (0.3s search + 0.3s analysis + 0.3s polish) = 7.2s
+    assert elapsed < 3.0, f"Enrichment took {elapsed:.2f}s, expected concurrent execution"
+    assert llm.peak_active > 1
+    assert search_backend.calls == 8
+    for original, theme in zip(themes, enriched):
+        assert theme["title"] == f"Polished {original['title']}"
+        assert theme["enhanced_with_web_search"] is True
+        assert "Recent context:" in theme["description"]
+        assert original["title"].startswith("Theme ")  # inputs are not mutated
+
+
+def test_search_results_are_cached():
+    theme_creator.clear_search_cache()
+    search_backend = StubSearchBackend()
+    behavior = FakeLLMThemeCreator({"enhance_with_web_search": True}, search_backend, FakeChatModel())
+
+    themes = create_themes(4)
+    behavior._enrich_themes(themes, None, with_web_search=True)
+    behavior._enrich_themes(themes, None, with_web_search=True)
+    assert search_backend.calls == 4, f"Expected 4 backend searches, got {search_backend.calls}"
+
+    theme_creator.clear_search_cache()
+    behavior._enrich_themes(themes, None, with_web_search=True)
+    assert search_backend.calls == 8
+
+
+def test_deadline_returns_unfinished_themes_as_is():
+    theme_creator.clear_search_cache()
+    search_backend = StubSearchBackend(delay_seconds=5.0)
+    llm = FakeChatModel(delay_seconds=0.05)
+    behavior = FakeLLMThemeCreator({"enhance_with_web_search": True}, search_backend, llm)
+    behavior.enrichment_deadline_seconds = 0.5
+
+    themes = create_themes(3)
+    start = time.perf_counter()
+    enriched = behavior._enrich_themes(themes, None, with_web_search=True, with_polish=True)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2.0, f"Enrichment ignored the deadline ({elapsed:.2f}s)"
+    for original, theme in zip(themes, enriched):
+        # Polishing finished in time, the slow web lookups did not
+        assert theme["title"] == f"Polished {original['title']}"
+        assert theme["description"] == original["description"]
+        assert "enhanced_with_web_search" not in theme
+
+
+def test_unknown_search_backend_is_rejected():
+    try:
+        theme_creator.get_search_backend("does-not-exist")
+    except ValueError as e:
+        assert "does-not-exist" in str(e)
+    else:
+        raise AssertionError("Expected ValueError for an unknown search backend")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing concurrent theme enrichment")
+
+    try:
+        test_enrichment_runs_concurrently()
+        test_search_results_are_cached()
+        test_deadline_returns_unfinished_themes_as_is()
+        test_unknown_search_backend_is_rejected()
+        print("\n🎉 All theme enrichment tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for video delivery: signed stream tokens, range and conditional
+(ETag/Last-Modified) responses for stored files, X-Accel-Redirect offload, and
+HLS rendition planning (ffmpeg commands and master playlist).
+
+Files are served by a minimal FastAPI app through the same response helper the
+video routes use; no database or ffmpeg is needed.
+"""
+
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services import video_streaming
+from services.video_streaming import (
+    create_stream_token,
+    ffmpeg_rendition_command,
+    master_playlist,
+    plan_renditions,
+    stored_file_response,
+    verify_stream_token,
+)
+
+VIDEO_BYTES = bytes(range(256)) * 4096  # 1 MiB
+VIDEO_SHA256 = "ab" * 32
+
+
+def make_client(path: Path) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/video")
+    async def video(request: Request):
+        return stored_file_response(request, path, media_type="video/mp4", filename="lecture.mp4", sha256=VIDEO_SHA256)
+
+    return TestClient(app)
+
+
+def test_stream_tokens_are_bound_to_video_and_expire():
+    token, expires_at = create_stream_token(12, 7, ttl_seconds=60)
+    assert expires_at > time.time()
+    assert verify_stream_token(token, 12) == 7
+    assert verify_stream_token(token, 13) is None
+
+    video_id, user_id, expiry, signature = token.split(".")
+    assert verify_stream_token(f"{video_id}.8.{expiry}.{signature}", 12) is None
+    assert verify_stream_token(f"{video_id}.{user_id}.{int(expiry) + 3600}.{signature}", 12) is None
+    assert verify_stream_token(None, 12) is None and verify_stream_token("garbage", 12) is None
+
+    expired, _ = create_stream_token(12, 7, ttl_seconds=-1)
+    assert verify_stream_token(expired, 12) is None
+
+
+def test_range_requests_return_partial_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lecture.mp4"
+        path.write_bytes(VIDEO_BYTES)
+        client = make_client(path)
+
+        full = client.get("/video")
+        assert full.status_code == 200 and full.content == VIDEO_BYTES
+        assert full.headers["etag"] == f'"{VIDEO_SHA256}"'
+        assert full.headers["accept-ranges"] == "bytes"
+        assert full.headers["content-disposition"].startswith("inline")
+
+        partial = client.get("/video", headers={"Range": "bytes=1000-1999"})
+        assert partial.status_code == 206
+        assert partial.content == VIDEO_BYTES[1000:2000]
+        assert partial.headers["content-range"] == f"bytes 1000-1999/{len(VIDEO_BYTES)}"
+
+        tail = client.get("/video", headers={"Range": "bytes=-100"})
+        assert tail.status_code == 206 and tail.content == VIDEO_BYTES[-100:]
+
+        # If-Range with a stale validator gets the whole (changed) file instead of a range
+        stale = client.get("/video", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        assert stale.status_code == 200 and len(stale.content) == len(VIDEO_BYTES)
+        fresh = client.get("/video", headers={"Range": "bytes=0-9", "If-Range": f'"{VIDEO_SHA256}"'})
+        assert fresh.status_code == 206 and fresh.content == VIDEO_BYTES[:10]
+
+
+def test_conditional_requests_return_not_modified():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lecture.mp4"
+        path.write_bytes(VIDEO_BYTES)
+        client = make_client(path)
+        first = client.get("/video")
+
+        cached = client.get("/video", headers={"If-None-Match": first.headers["etag"]})
+        assert cached.status_code == 304 and cached.content == b""
+        assert client.get("/video", headers={"If-None-Match": '"other"'}).status_code == 200
+
+        since = client.get("/video", headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert since.status_code == 304
+        assert client.get("/video", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+
+
+def test_accel_redirect_hands_the_file_to_nginx():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Path(tmp) / "uploads"
+        blob = storage / "blobs" / "ab" / "ab" / VIDEO_SHA256
+        blob.parent.mkdir(parents=True)
+        blob.write_bytes(VIDEO_BYTES)
+        link = storage / "3" / "u1" / "lecture.mp4"
+        link.parent.mkdir(parents=True)
+        link.symlink_to(os.path.relpath(blob, link.parent))
+
+        saved = (video_streaming.ACCEL_REDIRECT_PREFIX, video_streaming.STORAGE_BASE_DIR)
+        video_streaming.ACCEL_REDIRECT_PREFIX = "/protected-uploads/"
+        video_streaming.STORAGE_BASE_DIR = storage
+        try:
+            response = make_client(link).get("/video")
+        finally:
+            video_streaming.ACCEL_REDIRECT_PREFIX, video_streaming.STORAGE_BASE_DIR = saved
+
+        assert response.status_code == 200 and response.content == b""
+        assert response.headers["x-accel-redirect"] == f"/protected-uploads/blobs/ab/ab/{VIDEO_SHA256}"
+        assert response.headers["etag"] == f'"{VIDEO_SHA256}"'
+
+
+def test_hls_renditions_follow_source_resolution():
+    planned = plan_renditions(1920, 1080)
+    assert [(r["name"], r["width"], r["height"]) for r in planned] == [("360p", 640, 360), ("720p", 1280, 720)]
+    # Never upscaled, but there is always at least one rendition
+    assert [r["name"] for r in plan_renditions(854, 480)] == ["360p"]
+    assert [r["name"] for r in plan_renditions(320, 240)] == ["360p"]
+
+    playlist = master_playlist(planned)
+    assert playlist.startswith("#EXTM3U\n")
+    assert "#EXT-X-STREAM-INF:BANDWIDTH=896000,RESOLUTION=640x360\n360p/index.m3u8" in playlist
+    assert "720p/index.m3u8" in playlist
+
+    command = ffmpeg_rendition_command(Path("/in.mp4"), Path("/out/720p"), planned[1], segment_seconds=4)
+    assert command[command.index("-vf") + 1] == "scale=-2:720"
+    assert command[command.index("-hls_time") + 1] == "4"
+    assert command[command.index("-force_key_frames") + 1] == "expr:gte(t,n_forced*4)"
+    assert command[-1] == "/out/720p/index.m3u8"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing video streaming")
+
+    try:
+        test_stream_tokens_are_bound_to_video_and_expire()
+        test_range_requests_return_partial_content()
+        test_conditional_requests_return_not_modified()
+        test_accel_redirect_hands_the_file_to_nginx()
+        test_hls_renditions_follow_source_resolution()
+        print("\n🎉 All video streaming tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
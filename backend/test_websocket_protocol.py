@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the negotiated websocket protocol: the encoding is picked from the
+subprotocols a client offers (JSON text when none is), live presentation messages
+go out in each socket's encoding, JSON text is compact and handles datetimes and
+non-string keys, and broadcasts are serialized once per encoding.
+
+Students and teachers connect over fake websockets; no database is used. The
+msgpack checks run only where msgpack is installed.
+"""
+
+import sys
+import os
+import json
+import asyncio
+from datetime import datetime
+
+# Add the current directory to Python path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services import websocket_protocol
+from services.websocket_protocol import (
+    EncodedMessage, JSON_CODEC, MSGPACK_CODEC, codec_for, dumps_text, negotiate_protocol,
+)
+from services.deployment_types.live_presentation import LivePresentationDeployment
+
+STUDENTS = [f"Student {i}" for i in range(20)]
+GROUPS = {f"Group{g + 1}": STUDENTS[g * 5:(g + 1) * 5] for g in range(4)}
+
+
+class FakeWebSocket:
+    def __init__(self, subprotocols=None):
+        self.scope = {"type": "websocket", "subprotocols": subprotocols or []}
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+    async def send_bytes(self, data):
+        self.frames.append(bytes(data))
+
+    def messages(self):
+        return [codec_for(self).decode(frame) for frame in self.frames]
+
+    def of_type(self, message_type):
+        return [message for message in self.messages() if message["type"] == message_type]
+
+
+def count_encodes(codec):
+    calls = []
+    original = codec.encode
+
+    def counted(message):
+        calls.append(message.get("type"))
+        return original(message)
+
+    codec.encode = counted
+    return calls, lambda: setattr(codec, "encode", original)
+
+
+def test_subprotocol_negotiation():
+    plain = FakeWebSocket()
+    assert negotiate_protocol(plain) is None and codec_for(plain) is JSON_CODEC
+
+    offered = FakeWebSocket(["chat.v9", "json.v1"])
+    assert negotiate_protocol(offered) == "json.v1" and codec_for(offered) is JSON_CODEC
+
+    unknown = FakeWebSocket(["chat.v9"])
+    assert negotiate_protocol(unknown) is None and codec_for(unknown) is JSON_CODEC
+
+    binary = FakeWebSocket(["msgpack.v1", "json.v1"])
+    if websocket_protocol.MSGPACK_ENABLED:
+        assert negotiate_protocol(binary) == "msgpack.v1" and codec_for(binary) is MSGPACK_CODEC
+    else:
+        # Without msgpack installed the client's JSON fallback is chosen
+        assert negotiate_protocol(binary) == "json.v1" and codec_for(binary) is JSON_CODEC
+
+
+def test_json_text_is_compact_and_lenient():
+    message = {"type": "stats_update", "counts": {1: 3, "groups": [1, 2]}, "at": datetime(2024, 5, 1, 9, 30)}
+    text = dumps_text(message)
+    assert ", " not in text and ": " not in text
+    assert json.loads(text) == {"type": "stats_update", "counts": {"1": 3, "groups": [1, 2]}, "at": "2024-05-01T09:30:00"}
+
+    if websocket_protocol.MSGPACK_ENABLED:
+        frame = MSGPACK_CODEC.encode(message)
+        assert isinstance(frame, bytes)
+        # Same message as the JSON text, and decodable with strict map keys
+        assert MSGPACK_CODEC.decode(frame) == json.loads(text)
+
+
+def test_presentation_messages_use_each_sockets_encoding():
+    async def scenario():
+        presentation = LivePresentationDeployment({"title": "Lecture"}, "deploy-protocol")
+        presentation.input_variable_data = GROUPS
+        presentation._response_summarizer = None
+        presentation._dashboard_updates.interval_seconds = 0.05
+        presentation.presentation_active = True
+
+        sockets = {}
+        for i, name in enumerate(STUDENTS):
+            sockets[name] = FakeWebSocket(["msgpack.v1", "json.v1"] if i % 2 else [])
+            negotiate_protocol(sockets[name])
+            await presentation.connect_student(f"id-{i}", name, sockets[name])
+
+        teachers = [FakeWebSocket(["json.v1"]) for _ in range(3)]
+        for teacher in teachers:
+            negotiate_protocol(teacher)
+            presentation.teacher_websockets.add(teacher)
+
+        await presentation.send_prompt_to_students({"id": "p1", "statement": "What did you notice?"})
+        for name, ws in sockets.items():
+            binary = codec_for(ws) is MSGPACK_CODEC
+            assert all(isinstance(frame, bytes) == binary for frame in ws.frames)
+            prompt = ws.of_type("prompt_received")[-1]
+            assert prompt["prompt"]["id"] == "p1" and prompt["seq"] >= 2
+
+        # One dashboard delta to three teachers is serialized once
+        calls, restore = count_encodes(JSON_CODEC)
+        try:
+            await presentation.handle_student_message("id-0", {"type": "student_response", "prompt_id": "p1", "response": "Rivers"})
+            await asyncio.sleep(0.15)
+        finally:
+            restore()
+        assert calls.count("dashboard_delta") == 1
+        for teacher in teachers:
+            delta = teacher.of_type("dashboard_delta")[-1]
+            assert delta["responses"][0]["response"] == "Rivers"
+
+    asyncio.run(scenario())
+
+
+def test_encoded_message_frames_once_per_codec():
+    async def scenario():
+        encoded = EncodedMessage({"type": "roomcast_group_info", "group_name": "Group1", "members": STUDENTS[:5]})
+        calls, restore = count_encodes(JSON_CODEC)
+        try:
+            sockets = [FakeWebSocket() for _ in range(10)]
+            for ws in sockets:
+                await encoded.send(ws)
+        finally:
+            restore()
+        assert len(calls) == 1
+        assert all(ws.frames == sockets[0].frames for ws in sockets)
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the websocket protocol")
+
+    try:
+        test_subprotocol_negotiation()
+        test_json_text_is_compact_and_lenient()
+        test_presentation_messages_use_each_sockets_encoding()
+        test_encoded_message_frames_once_per_codec()
+        print("\n🎉 All websocket protocol tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -84,10 +84,10 @@ NEXTJS_PID=$!
 # Wait for Next.js to be ready
 wait_for_service localhost 3000 "Next.js"
 
-# Start Celery worker in background
+# Start Celery worker in background (serving every workload queue)
 log_info "Starting Celery worker..."
 cd /app/backend
-celery -A services.celery_tasks.celery_app worker --loglevel=info &
+python -m scripts.celery_worker all &
 CELERY_PID=$!
 
 # Give Celery a moment to start
@@ -15,6 +15,19 @@ export class ThemeCreatorNodeConfig extends BaseNodeConfig {
       min: 1,
       max: 20,
     },
+    {
+      key: "auto_num_themes",
+      label: "Choose Number of Themes Automatically (Pick the best-separated theme count, up to 8)",
+      type: "checkbox",
+      defaultValue: false,
+    },
+    {
+      key: "clustering_engine",
+      label: "Clustering Engine",
+      type: "select",
+      defaultValue: "auto",
+      options: ["auto", "kmeans", "minibatch", "spherical"],
+    },
     {
       key: "selected_submission_prompts",
       label: "Submission Prompts for Theming",
@@ -11,9 +11,43 @@ import {
   GroupSummaryMessage,
   RoomcastStatus,
   NavigationUpdateMessage,
-  SubmissionUpdatedMessage
+  SubmissionUpdatedMessage,
+  DashboardDeltaMessage,
+  StudentConnection
 } from '../types/livePresentation';
 
+// Merge a coalesced dashboard delta into the last full stats snapshot
+const applyDashboardDelta = (stats: PresentationStats, delta: DashboardDeltaMessage): PresentationStats => {
+  const removed = new Set(delta.removed);
+  const changed = new Map<string, StudentConnection>(
+    [...delta.added, ...delta.updated].map((student): [string, StudentConnection] => [student.user_id, student])
+  );
+  const students = stats.students
+    .filter(student => !removed.has(student.user_id))
+    .map(student => {
+      const update = changed.get(student.user_id);
+      changed.delete(student.user_id);
+      return update ?? student;
+    });
+  students.push(...Array.from(changed.values()));
+
+  const groupStats = { ...stats.group_stats };
+  Object.entries(delta.group_connected).forEach(([groupName, connected]) => {
+    if (groupStats[groupName]) {
+      groupStats[groupName] = { ...groupStats[groupName], connected_members: connected };
+    }
+  });
+
+  return {
+    ...stats,
+    ...delta.counts,
+    students,
+    group_stats: groupStats,
+    response_counts: { ...stats.response_counts, ...delta.response_counts },
+    dashboard_seq: delta.seq
+  };
+};
+
 interface UseLivePresentationWebSocketProps {
   deploymentId: string;
   isTeacher: boolean;
@@ -55,6 +89,8 @@ export const useLivePresentationWebSocket = ({
   const [savedPrompts, setSavedPrompts] = useState<LivePresentationPrompt[]>([]);
   const [studentResponses, setStudentResponses] = useState<StudentResponse[]>([]);
   const [roomcastStatus, setRoomcastStatus] = useState<RoomcastStatus | null>(null);
+  // Sequence number of the last dashboard snapshot/delta applied, to detect missed deltas
+  const dashboardSeqRef = useRef<number>(0);
 
   // Timer states
   const [timerActive, setTimerActive] = useState(false);
@@ -64,12 +100,17 @@ export const useLivePresentationWebSocket = ({
   // Track last server push for timer to allow drift correction
   const lastTimerSyncRef = useRef<number | null>(null);
   const lastServerRemainingRef = useRef<number>(0);
+  // Server clock minus local clock (ms), so the countdown to the server deadline ignores local clock skew
+  const clockOffsetRef = useRef<number>(0);
 
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const reconnectAttempts = useRef(0);
   const maxReconnectAttempts = 3; // Reduce max attempts
   const lastConnectAttempt = useRef<number>(0);
+  // Student resume token and the last sequenced message handled, sent back on reconnect to resume the session
+  const resumeRef = useRef<{ token: string; seq: number } | null>(null);
+  const ackTimeoutRef = useRef<NodeJS.Timeout | null>(null);
 
   // Helper function to set live presentation message with optional timeout
   const setMessageWithTimeout = useCallback((message: string | null, timeoutMs?: number) => {
@@ -117,6 +158,15 @@ export const useLivePresentationWebSocket = ({
         }
         break;
 
+      case 'session_resumed':
+        // Reconnected to the same session; missed messages follow this one
+        console.log(`🎤 Session resumed, ${message.replayed} missed messages replayed`);
+        setPresentationActive(message.presentation_active);
+        if (message.group_info) {
+          setGroupInfo(message.group_info);
+        }
+        break;
+
       case 'presentation_started':
         setPresentationActive(true);
         setMessageWithTimeout(
@@ -306,6 +356,7 @@ export const useLivePresentationWebSocket = ({
 
       case 'teacher_connected':
         if (isTeacher) {
+          dashboardSeqRef.current = message.stats.dashboard_seq ?? 0;
           setStats(message.stats);
           setSavedPrompts(message.saved_prompts || []);
           // Set presentation active state from message
@@ -330,6 +381,7 @@ export const useLivePresentationWebSocket = ({
       case 'connection_test_result':
         // Teacher receives connection test results
         if (isTeacher && message.stats) {
+          dashboardSeqRef.current = message.stats.dashboard_seq ?? dashboardSeqRef.current;
           setStats(message.stats);
           setMessageWithTimeout(
             `${message.message} (${message.failed_count} students removed)`,
@@ -344,6 +396,30 @@ export const useLivePresentationWebSocket = ({
         }
         break;
 
+      case 'dashboard_delta':
+        if (isTeacher) {
+          if (message.seq <= dashboardSeqRef.current) {
+            break; // Already covered by a newer snapshot
+          }
+          if (message.seq > dashboardSeqRef.current + 1 && wsRef.current?.readyState === WebSocket.OPEN) {
+            // Missed a delta: ask for a full snapshot, which replaces whatever we merge now
+            wsRef.current.send(JSON.stringify({ type: 'get_stats' }));
+          }
+          dashboardSeqRef.current = message.seq;
+          setStats(prev => (prev ? applyDashboardDelta(prev, message) : prev));
+          if (message.responses.length > 0) {
+            const responses: StudentResponse[] = message.responses.map(response => ({
+              response: response.response,
+              prompt_id: response.prompt_id,
+              timestamp: response.timestamp,
+              user_id: response.user_id,
+              user_name: response.user_name
+            }));
+            setStudentResponses(prev => [...responses.reverse(), ...prev]);
+          }
+        }
+        break;
+
       case 'student_response_received':
         if (isTeacher) {
           const response: StudentResponse = {
@@ -379,6 +455,7 @@ export const useLivePresentationWebSocket = ({
 
       case 'stats_update':
         if (isTeacher) {
+          dashboardSeqRef.current = message.stats.dashboard_seq ?? dashboardSeqRef.current;
           setStats(message.stats);
         }
         break;
@@ -436,6 +513,9 @@ export const useLivePresentationWebSocket = ({
         break;
 
       case 'timer_started':
+        if (message.server_time) {
+          clockOffsetRef.current = new Date(message.server_time).getTime() - Date.now();
+        }
         setTimerActive(true);
         setTimerRemainingSeconds(message.remaining_seconds);
         setTimerDurationSeconds(message.duration_seconds);
@@ -453,6 +533,9 @@ export const useLivePresentationWebSocket = ({
         break;
 
       case 'timer_update':
+        if (message.server_time) {
+          clockOffsetRef.current = new Date(message.server_time).getTime() - Date.now();
+        }
         if (timerActive) {
           setTimerRemainingSeconds(message.remaining_seconds);
           lastTimerSyncRef.current = Date.now();
@@ -493,9 +576,9 @@ export const useLivePresentationWebSocket = ({
 
     const tick = () => {
       const now = Date.now();
-      const remaining = Math.max(0, Math.round((endMs - now) / 1000));
+      const remaining = Math.max(0, Math.round((endMs - (now + clockOffsetRef.current)) / 1000));
 
-      // If we have a recent server sync (within last 12s) prefer monotonic decrement from that to smooth out jitter
+      // If we have a server sync prefer monotonic decrement from that to smooth out jitter
       if (lastTimerSyncRef.current) {
         const elapsedSinceSyncMs = now - lastTimerSyncRef.current;
         const derivedFromSync = Math.max(0, lastServerRemainingRef.current - Math.round(elapsedSinceSyncMs / 1000));
@@ -547,7 +630,12 @@ export const useLivePresentationWebSocket = ({
       const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
       const wsHost = API_CONFIG.BASE_URL.replace(/^https?:\/\//, '');
       const role = isTeacher ? 'teacher' : 'student';
-      const wsUrl = `${wsProtocol}//${wsHost}/api/deploy/ws/live-presentation/${deploymentId}/${role}`;
+      let wsUrl = `${wsProtocol}//${wsHost}/api/deploy/ws/live-presentation/${deploymentId}/${role}`;
+      // Students reconnecting within the resume window pick up where they left off
+      if (!isTeacher && resumeRef.current) {
+        const { token, seq } = resumeRef.current;
+        wsUrl += `?resume_token=${encodeURIComponent(token)}&last_seq=${seq}`;
+      }
 
       console.log('🎤 Attempting WebSocket connection:', {
         protocol: wsProtocol,
@@ -577,6 +665,28 @@ export const useLivePresentationWebSocket = ({
       ws.onmessage = (event) => {
         try {
           const message: WebSocketMessage = JSON.parse(event.data);
+          if (!isTeacher) {
+            // A new session starts numbering from scratch
+            if (typeof message.resume_token === 'string' && message.type !== 'session_resumed') {
+              resumeRef.current = { token: message.resume_token, seq: 0 };
+            }
+            if (typeof message.seq === 'number' && resumeRef.current) {
+              // Replays can overlap what was already handled before the drop
+              if (message.seq <= resumeRef.current.seq) {
+                return;
+              }
+              resumeRef.current.seq = message.seq;
+              // Acknowledge in batches so the server can trim its replay buffer
+              if (!ackTimeoutRef.current) {
+                ackTimeoutRef.current = setTimeout(() => {
+                  ackTimeoutRef.current = null;
+                  if (wsRef.current?.readyState === WebSocket.OPEN && resumeRef.current) {
+                    wsRef.current.send(JSON.stringify({ type: 'ack', seq: resumeRef.current.seq }));
+                  }
+                }, 1000);
+              }
+            }
+          }
           handleMessage(message as TypedWebSocketMessage);
         } catch (error) {
           console.error('Failed to parse WebSocket message:', error);
@@ -639,6 +749,10 @@ export const useLivePresentationWebSocket = ({
       clearTimeout(reconnectTimeoutRef.current);
       reconnectTimeoutRef.current = null;
     }
+    if (ackTimeoutRef.current) {
+      clearTimeout(ackTimeoutRef.current);
+      ackTimeoutRef.current = null;
+    }
     
     // Reset reconnect attempts and rate limiting
     reconnectAttempts.current = 0;
@@ -93,6 +93,8 @@ export interface PresentationStats {
   ready_students: number;
   students: StudentConnection[];
   group_stats: Record<string, GroupStats>;
+  response_counts?: Record<string, number>;
+  dashboard_seq?: number;
   current_prompt?: LivePresentationPrompt & { sent_at: string };
   saved_prompts_count: number;
   roomcast?: RoomcastStatus;
@@ -104,6 +106,8 @@ export interface TimerStatus {
   remaining_seconds: number;
   duration_seconds: number;
   start_time: string | null;
+  ends_at?: string | null;
+  server_time?: string;
 }
 
 export interface StudentResponse {
@@ -145,6 +149,7 @@ export interface LivePresentationInfo {
 export type MessageType = 
   | 'welcome'
   | 'waiting_for_teacher'
+  | 'session_resumed'
   | 'presentation_started'
   | 'presentation_ended'
   | 'presentation_state_changed'
@@ -161,6 +166,7 @@ export type MessageType =
   | 'teacher_connected'
   | 'connection_update'
   | 'student_response_received'
+  | 'dashboard_delta'
   | 'stats_update'
   | 'connection_test'
   | 'connection_test_result'
@@ -188,6 +194,7 @@ export interface WelcomeMessage {
   message: string;
   group_info?: GroupInfo;
   presentation_active?: boolean;
+  resume_token?: string;
 }
 
 export interface WaitingForTeacherMessage {
@@ -195,6 +202,16 @@ export interface WaitingForTeacherMessage {
   message: string;
   group_info?: GroupInfo;
   presentation_active?: boolean;
+  resume_token?: string;
+}
+
+export interface SessionResumedMessage {
+  type: 'session_resumed';
+  resume_token: string;
+  replayed: number;
+  session_active: boolean;
+  presentation_active: boolean;
+  group_info?: GroupInfo;
 }
 
 export interface PresentationStartedMessage {
@@ -269,6 +286,32 @@ export interface TeacherConnectedMessage {
   presentation_active?: boolean;
 }
 
+export interface DashboardResponse {
+  user_id: string;
+  user_name: string;
+  group_name: string | null;
+  prompt_id: string;
+  response: string;
+  timestamp: string;
+}
+
+// Coalesced teacher dashboard changes since the previous delta (full stats come only on connect)
+export interface DashboardDeltaMessage {
+  type: 'dashboard_delta';
+  seq: number;
+  added: StudentConnection[];
+  updated: StudentConnection[];
+  removed: string[];
+  responses: DashboardResponse[];
+  response_counts: Record<string, number>;
+  counts: {
+    total_students: number;
+    connected_students: number;
+    ready_students: number;
+  };
+  group_connected: Record<string, number>;
+}
+
 export interface StudentResponseReceivedMessage {
   type: 'student_response_received';
   response: string;
@@ -299,6 +342,8 @@ export interface TimerStartedMessage {
   duration_seconds: number;
   remaining_seconds: number;
   start_time: string;
+  ends_at?: string;
+  server_time?: string;
 }
 
 export interface TimerStoppedMessage {
@@ -309,6 +354,8 @@ export interface TimerUpdateMessage {
   type: 'timer_update';
   remaining_seconds: number;
   duration_seconds: number;
+  ends_at?: string;
+  server_time?: string;
 }
 
 export interface TimerExpiredMessage {
@@ -347,6 +394,7 @@ export interface SummarySubmittedMessage {
 export type TypedWebSocketMessage = 
   | WelcomeMessage
   | WaitingForTeacherMessage
+  | SessionResumedMessage
   | PresentationStartedMessage
   | PresentationEndedMessage
   | PresentationStateChangedMessage
@@ -364,6 +412,7 @@ export type TypedWebSocketMessage =
   | ErrorMessage
   | TeacherConnectedMessage
   | StudentResponseReceivedMessage
+  | DashboardDeltaMessage
   | SummaryGenerationStartedMessage
   | GroupInfoSentMessage
   | GroupSummaryGeneratedMessage
@@ -1066,7 +1066,83 @@ export default function PageDeploymentAdmin({
     }
   };
 
-  // Poll task status for async behaviors
+  // Apply a task status update (polled or streamed); returns true once the task has finished
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  const handleTaskStatus = (taskId: string, behaviorNumber: string, status: any): boolean => {
+    // Update task status for progress tracking
+    setTaskStatus(prev => {
+      const newMap = new Map(prev);
+      newMap.set(taskId, {
+        progress: status.progress || 0,
+        stage: status.stage || 'unknown'
+      });
+      return newMap;
+    });
+    
+    if (status.state === 'SUCCESS') {
+      // Task completed successfully
+      setLastExecution({
+        behavior_number: behaviorNumber,
+        success: true,
+        execution_time: status.result?.execution_time,
+        output_written_to_variable: status.result?.output_written_to_variable,
+        groups: status.result?.groups,
+        explanations: status.result?.explanations,
+        themes: status.result?.themes,
+        warning: status.result?.warning,
+        error: status.result?.error
+      });
+      
+      // If this was a theme creator behavior, refresh theme assignments
+      if (status.result?.themes && Array.isArray(status.result.themes)) {
+        fetchThemeAssignments();
+      }
+      
+      // Refresh analytics to show updated variable states
+      setRefreshKey(prev => prev + 1);
+      
+      // Remove from executing behaviors
+      setExecutingBehavior(null);
+      setBehaviorTasks(prev => {
+        const newMap = new Map(prev);
+        newMap.delete(behaviorNumber);
+        return newMap;
+      });
+      setTaskStatus(prev => {
+        const newMap = new Map(prev);
+        newMap.delete(taskId);
+        return newMap;
+      });
+      
+      alert(`Behavior execution completed successfully!`);
+      return true;
+    } else if (status.state === 'FAILURE' || status.state === 'REVOKED') {
+      // Task failed
+      setLastExecution({
+        behavior_number: behaviorNumber,
+        success: false,
+        error: status.error || (status.state === 'REVOKED' ? 'Behavior execution was cancelled' : 'Behavior execution failed')
+      });
+      
+      setExecutingBehavior(null);
+      setBehaviorTasks(prev => {
+        const newMap = new Map(prev);
+        newMap.delete(behaviorNumber);
+        return newMap;
+      });
+      setTaskStatus(prev => {
+        const newMap = new Map(prev);
+        newMap.delete(taskId);
+        return newMap;
+      });
+      
+      alert(`Behavior execution failed: ${status.error || 'Unknown error'}`);
+      return true;
+    }
+    return false;
+  };
+
+  // Poll task status for async behaviors (fallback when the event stream is unavailable)
   const pollTaskStatus = async (taskId: string, behaviorNumber: string) => {
     try {
       const response = await fetch(
@@ -1077,74 +1153,7 @@ export default function PageDeploymentAdmin({
       if (response.ok) {
         const status = await response.json();
         
-        // Update task status for progress tracking
-        setTaskStatus(prev => {
-          const newMap = new Map(prev);
-          newMap.set(taskId, {
-            progress: status.progress || 0,
-            stage: status.stage || 'unknown'
-          });
-          return newMap;
-        });
-        
-        if (status.state === 'SUCCESS') {
-          // Task completed successfully
-          setLastExecution({
-            behavior_number: behaviorNumber,
-            success: true,
-            execution_time: status.result?.execution_time,
-            output_written_to_variable: status.result?.output_written_to_variable,
-            groups: status.result?.groups,
-            explanations: status.result?.explanations,
-            themes: status.result?.themes,
-            warning: status.result?.warning,
-            error: status.result?.error
-          });
-          
-          // If this was a theme creator behavior, refresh theme assignments
-          if (status.result?.themes && Array.isArray(status.result.themes)) {
-            fetchThemeAssignments();
-          }
-          
-          // Refresh analytics to show updated variable states
-          setRefreshKey(prev => prev + 1);
-          
-          // Remove from executing behaviors
-          setExecutingBehavior(null);
-          setBehaviorTasks(prev => {
-            const newMap = new Map(prev);
-            newMap.delete(behaviorNumber);
-            return newMap;
-          });
-          setTaskStatus(prev => {
-            const newMap = new Map(prev);
-            newMap.delete(taskId);
-            return newMap;
-          });
-          
-          alert(`Behavior execution completed successfully!`);
-        } else if (status.state === 'FAILURE') {
-          // Task failed
-          setLastExecution({
-            behavior_number: behaviorNumber,
-            success: false,
-            error: status.error || 'Behavior execution failed'
-          });
-          
-          setExecutingBehavior(null);
-          setBehaviorTasks(prev => {
-            const newMap = new Map(prev);
-            newMap.delete(behaviorNumber);
-            return newMap;
-          });
-          setTaskStatus(prev => {
-            const newMap = new Map(prev);
-            newMap.delete(taskId);
-            return newMap;
-          });
-          
-          alert(`Behavior execution failed: ${status.error || 'Unknown error'}`);
-        } else {
+        if (!handleTaskStatus(taskId, behaviorNumber, status)) {
           // Task still running, poll again
           setTimeout(() => pollTaskStatus(taskId, behaviorNumber), 2000);
         }
@@ -1183,6 +1192,33 @@ export default function PageDeploymentAdmin({
     }
   };
 
+  // Follow task progress pushed by the server, falling back to polling
+  const watchTaskStatus = (taskId: string, behaviorNumber: string) => {
+    if (typeof EventSource === 'undefined') {
+      setTimeout(() => pollTaskStatus(taskId, behaviorNumber), 1000);
+      return;
+    }
+    
+    const source = new EventSource(
+      `${API_CONFIG.BASE_URL}/api/deploy/${deploymentId}/behaviors/tasks/${taskId}/events`,
+      { withCredentials: true }
+    );
+    let finished = false;
+    
+    source.onmessage = (event) => {
+      if (handleTaskStatus(taskId, behaviorNumber, JSON.parse(event.data))) {
+        finished = true;
+        source.close();
+      }
+    };
+    source.onerror = () => {
+      source.close();
+      if (!finished) {
+        setTimeout(() => pollTaskStatus(taskId, behaviorNumber), 2000);
+      }
+    };
+  };
+
   // Execute behavior
   const executeBehavior = async (behaviorNumber: string) => {
     try {
@@ -1203,15 +1239,15 @@ export default function PageDeploymentAdmin({
         
         // Check if this is an async response (has task_id) or sync response (has success)
         if (result.task_id) {
-          // Async execution - start polling for status
+          // Async execution - follow its status
           setBehaviorTasks(prev => {
             const newMap = new Map(prev);
             newMap.set(behaviorNumber, result.task_id);
             return newMap;
           });
           
-          // Start polling
-          setTimeout(() => pollTaskStatus(result.task_id, behaviorNumber), 1000);
+          // Follow progress
+          watchTaskStatus(result.task_id, behaviorNumber);
           
           alert(`Behavior execution started. Running in background...`);
         } else {
@@ -110,6 +110,15 @@ export default function VideoInterface({
 
   const resolvedStreamUrl = useMemo(() => {
     if (!video) return null;
+    // HLS renditions where the browser plays them natively (Safari, iOS); byte-range streaming elsewhere
+    const hlsUrl = ensureAbsoluteUrl(baseUrl, video.hls_url);
+    if (
+      hlsUrl &&
+      typeof document !== "undefined" &&
+      document.createElement("video").canPlayType("application/vnd.apple.mpegurl")
+    ) {
+      return hlsUrl;
+    }
     return (
       ensureAbsoluteUrl(baseUrl, video.stream_url) ??
       (video.id ? VideoAPI.buildStreamUrl(video.id) : null)
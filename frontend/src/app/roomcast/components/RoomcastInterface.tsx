@@ -62,6 +62,8 @@ export default function RoomcastInterface({ code, onDisconnect }: RoomcastInterf
   // Local drift tracking
   const lastTimerSyncRef = useRef<number | null>(null);
   const lastServerRemainingRef = useRef<number>(0);
+  // Server clock minus local clock (ms), so the countdown to the server deadline ignores local clock skew
+  const clockOffsetRef = useRef<number>(0);
   const [wsRef, setWsRef] = useState<WebSocket | null>(null);
   // Navigation state for cycling through group submissions
   const [currentSubmissionIndex, setCurrentSubmissionIndex] = useState(0);
@@ -396,6 +398,9 @@ export default function RoomcastInterface({ code, onDisconnect }: RoomcastInterf
         {
           const timerMsg = msg as unknown as TimerStartedMessage;
           debug('timer_started', timerMsg);
+          if (timerMsg.server_time) {
+            clockOffsetRef.current = new Date(timerMsg.server_time).getTime() - Date.now();
+          }
           setTimerActive(true);
           setTimerRemainingSeconds(timerMsg.remaining_seconds);
           setTimerDurationSeconds(timerMsg.duration_seconds);
@@ -418,6 +423,9 @@ export default function RoomcastInterface({ code, onDisconnect }: RoomcastInterf
         {
           const timerMsg = msg as unknown as TimerUpdateMessage;
           debug('timer_update', timerMsg);
+          if (timerMsg.server_time) {
+            clockOffsetRef.current = new Date(timerMsg.server_time).getTime() - Date.now();
+          }
           if (timerActive) {
             setTimerRemainingSeconds(timerMsg.remaining_seconds);
             lastTimerSyncRef.current = Date.now();
@@ -716,7 +724,7 @@ export default function RoomcastInterface({ code, onDisconnect }: RoomcastInterf
 
     const tick = () => {
       const now = Date.now();
-      const remaining = Math.max(0, Math.round((endMs - now) / 1000));
+      const remaining = Math.max(0, Math.round((endMs - (now + clockOffsetRef.current)) / 1000));
 
       if (lastTimerSyncRef.current) {
         const elapsedSinceSyncMs = now - lastTimerSyncRef.current;
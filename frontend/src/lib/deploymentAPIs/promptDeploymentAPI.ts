@@ -100,6 +100,7 @@ export interface PromptInstructorSubmissionView {
 }
 
 import { API_CONFIG } from '@/lib/constants';
+import { waitForTaskEvents } from '@/lib/utils';
 
 export class PromptDeploymentAPI {
   // Get prompt deployment info
@@ -240,6 +241,17 @@ export class PromptDeploymentAPI {
       const timeoutMs = 10 * 60 * 1000; // 10 minutes
       const intervalMs = 1200;
 
+      // Follow pushed progress events; poll below only if the stream is unavailable
+      const streamed = await waitForTaskEvents<PromptPdfTaskStatus>(`${statusUrl}/events`, timeoutMs, onProgress);
+      if (streamed) {
+        onProgress?.(streamed);
+        if (streamed.state === 'SUCCESS') {
+          const payload: { result?: PromptSubmissionResult } | PromptSubmissionResult = streamed.result ?? {};
+          return ('result' in payload ? payload.result : payload) as PromptSubmissionResult;
+        }
+        throw new Error(streamed.error || streamed.status || 'PDF processing failed');
+      }
+
       while (true) {
         if (Date.now() - start > timeoutMs) {
           throw new Error('PDF processing timed out');
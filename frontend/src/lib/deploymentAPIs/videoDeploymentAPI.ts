@@ -9,6 +9,7 @@ export interface VideoAssetDetails {
   uploaded_at?: string | null;
   status?: string | null;
   stream_url?: string | null;
+  hls_url?: string | null;
   download_url?: string | null;
   thumbnail_url?: string | null;
   source?: string | null;
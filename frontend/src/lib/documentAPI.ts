@@ -1,4 +1,5 @@
 import { getApiConfig } from "@/lib/config";
+import { waitForTaskEvents } from "@/lib/utils";
 
 export interface DocumentInfo {
   id: number;
@@ -135,12 +136,24 @@ export class DocumentAPI {
     return await res.json();
   }
 
-  // Polls until task SUCCESS/FAILURE and returns the final UploadResponse on success
+  // Waits until task SUCCESS/FAILURE (pushed events, polling as fallback) and returns the final UploadResponse on success
   static async waitForUploadResult(taskId: string, opts?: { intervalMs?: number; timeoutMs?: number }): Promise<UploadResponse> {
     const interval = opts?.intervalMs ?? 1500;
     const timeout = opts?.timeoutMs ?? 10 * 60 * 1000; // 10 minutes
     const start = Date.now();
 
+    const streamed = await waitForTaskEvents<UploadTaskStatus>(
+      `${this.BASE_URL}/api/documents/upload/status/${encodeURIComponent(taskId)}/events`,
+      timeout
+    );
+    if (streamed?.state === 'SUCCESS') {
+      const payload: { result?: UploadResponse } | UploadResponse = (streamed.result) ?? {};
+      return ('result' in payload ? payload.result : payload) as UploadResponse;
+    }
+    if (streamed) {
+      throw new Error(streamed.error || streamed.status || 'Upload failed');
+    }
+
     while (true) {
       if (Date.now() - start > timeout) {
         throw new Error('Upload timed out');
@@ -181,8 +194,21 @@ export class DocumentAPI {
 
     if (response.status === 202) {
       const { task_id } = await response.json();
-      // Poll the prompt status endpoint
       const statusUrl = `${this.BASE_URL}/api/deploy/${encodeURIComponent(deploymentId)}/prompt/submit_pdf/status/${encodeURIComponent(task_id)}`;
+      // Follow pushed progress events, polling the prompt status endpoint if they are unavailable
+      const streamed = await waitForTaskEvents<{
+        state: string;
+        status?: string;
+        error?: string;
+        result?: { result?: PromptSubmissionResponse } | PromptSubmissionResponse;
+      }>(`${statusUrl}/events`, 10 * 60 * 1000);
+      if (streamed?.state === 'SUCCESS') {
+        const payload: { result?: PromptSubmissionResponse } | PromptSubmissionResponse = streamed.result ?? {};
+        return ('result' in payload ? payload.result : payload) as PromptSubmissionResponse;
+      }
+      if (streamed) {
+        throw new Error(streamed.error || streamed.status || 'Prompt PDF upload failed');
+      }
       const wait = async (): Promise<PromptSubmissionResponse> => {
         const r = await fetch(statusUrl, { credentials: 'include' });
         if (!r.ok) throw new Error(`Prompt PDF status failed: ${r.status}`);
@@ -134,3 +134,33 @@ export const formatDateTime = (date: Date | string): string => {
     minute: '2-digit',
   });
 }; 
+
+// Follows a background task's server-sent progress events until it finishes.
+// Resolves with the final status, or null if the stream is unavailable (callers then poll).
+export const waitForTaskEvents = <T extends { state: string }>(
+  eventsUrl: string,
+  timeoutMs: number,
+  onProgress?: (status: T) => void
+): Promise<T | null> => {
+  if (typeof EventSource === 'undefined') return Promise.resolve(null);
+
+  return new Promise(resolve => {
+    const source = new EventSource(eventsUrl, { withCredentials: true });
+    const finish = (status: T | null) => {
+      clearTimeout(timer);
+      source.close();
+      resolve(status);
+    };
+    const timer = setTimeout(() => finish(null), timeoutMs);
+
+    source.onmessage = (event) => {
+      const status: T = JSON.parse(event.data);
+      if (status.state === 'SUCCESS' || status.state === 'FAILURE' || status.state === 'REVOKED') {
+        finish(status);
+      } else {
+        onProgress?.(status);
+      }
+    };
+    source.onerror = () => finish(null);
+  });
+};
@@ -9,6 +9,7 @@ export interface VideoInfo {
   uploaded_at?: string;
   thumbnail_url?: string | null;
   stream_url?: string | null;
+  hls_url?: string | null;
   download_url?: string | null;
   status?: "pending" | "processing" | "ready" | "failed" | string;
 }
@@ -38,15 +39,119 @@ export interface VideoUploadStatus {
   error?: string;
 }
 
+export interface VideoUploadSession {
+  upload_session_id: string;
+  filename: string;
+  total_size: number;
+  received: number;
+  chunk_size: number;
+  complete: boolean;
+}
+
+// Videos larger than this go through resumable chunked upload sessions
+const RESUMABLE_UPLOAD_THRESHOLD = 32 * 1024 * 1024;
+const RESUMABLE_CHUNK_RETRIES = 5;
+
 export class VideoAPI {
   private static readonly BASE_URL = getApiConfig().base_url;
 
   static async uploadVideos(
     files: FileList | File[],
+    workflowId: number,
+    onProgress?: (uploadedBytes: number, totalBytes: number) => void
+  ): Promise<VideoUploadResponse> {
+    const allFiles = Array.from(files);
+    const largeFiles = allFiles.filter((file) => file.size > RESUMABLE_UPLOAD_THRESHOLD);
+    const smallFiles = allFiles.filter((file) => file.size <= RESUMABLE_UPLOAD_THRESHOLD);
+
+    const videos: VideoInfo[] = [];
+    if (smallFiles.length > 0) {
+      videos.push(...(await this.uploadVideosForm(smallFiles, workflowId)).videos);
+    }
+    for (const file of largeFiles) {
+      videos.push(...(await this.uploadVideoResumable(file, workflowId, onProgress)).videos);
+    }
+    return { workflow_id: workflowId, videos, message: "Videos uploaded successfully" };
+  }
+
+  // Upload one large video in chunks; a failed chunk is retried from the offset the server reports
+  static async uploadVideoResumable(
+    file: File,
+    workflowId: number,
+    onProgress?: (uploadedBytes: number, totalBytes: number) => void
+  ): Promise<VideoUploadResponse> {
+    const startResponse = await fetch(`${this.BASE_URL}/api/videos/uploads`, {
+      method: "POST",
+      credentials: "include",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        workflow_id: workflowId,
+        filename: file.name,
+        total_size: file.size,
+        content_type: file.type || null,
+      }),
+    });
+    if (!startResponse.ok) {
+      const error = await startResponse
+        .json()
+        .catch(() => ({ detail: "Video upload failed" }));
+      throw new Error(error.detail || `Video upload failed: ${startResponse.status}`);
+    }
+
+    let session: VideoUploadSession = await startResponse.json();
+    const sessionUrl = `${this.BASE_URL}/api/videos/uploads/${encodeURIComponent(session.upload_session_id)}`;
+    let failures = 0;
+
+    while (session.received < session.total_size) {
+      const chunk = file.slice(session.received, session.received + session.chunk_size);
+      try {
+        const response = await fetch(`${sessionUrl}?offset=${session.received}`, {
+          method: "PUT",
+          credentials: "include",
+          headers: { "Content-Type": "application/octet-stream" },
+          body: chunk,
+        });
+        if (!response.ok) {
+          throw new Error(`Chunk upload failed: ${response.status}`);
+        }
+        session = await response.json();
+        failures = 0;
+        onProgress?.(session.received, session.total_size);
+      } catch (error) {
+        failures += 1;
+        if (failures > RESUMABLE_CHUNK_RETRIES) {
+          throw error instanceof Error ? error : new Error("Video upload failed");
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000 * failures));
+        // Resume from whatever the server actually received
+        const statusResponse = await fetch(sessionUrl, { credentials: "include" }).catch(() => null);
+        if (statusResponse?.ok) {
+          session = await statusResponse.json();
+        }
+      }
+    }
+
+    const completeResponse = await fetch(`${sessionUrl}/complete`, {
+      method: "POST",
+      credentials: "include",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({}),
+    });
+    if (!completeResponse.ok) {
+      const error = await completeResponse
+        .json()
+        .catch(() => ({ detail: "Video upload failed" }));
+      throw new Error(error.detail || `Video upload failed: ${completeResponse.status}`);
+    }
+    return await completeResponse.json();
+  }
+
+  private static async uploadVideosForm(
+    files: File[],
     workflowId: number
   ): Promise<VideoUploadResponse> {
     const formData = new FormData();
-    Array.from(files).forEach((file) => {
+    files.forEach((file) => {
       // Backend expects the field name 'files' (List[UploadFile])
       formData.append("files", file);
     });